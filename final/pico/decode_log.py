@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# decode_log.py - host-side decoder for Pico binary result logs (ResultLog in main.py)
+# Converts packed records to the TB VIS CSV layout: T,dT,Gimpl,Gexp
+
+import struct
+from typing import Iterator, List, Optional, Tuple
+
+LOG_MAGIC    = b"FZL1"
+LOG_REC_SIZE = 4
+_REC = struct.Struct("<bbBb")   # T (s8), dT (s8), Gimpl (u8), Gexp (s8)
+
+def iter_records(data: bytes) -> Iterator[Tuple[int, int, int, int]]:
+    """Yield (T, dT, Gimpl, Gexp) from a raw log image; validates magic and length."""
+    if data[:LOG_REC_SIZE] != LOG_MAGIC:
+        raise ValueError("not a Pico result log (bad magic)")
+    if len(data) % LOG_REC_SIZE:
+        raise ValueError("truncated log: %d bytes" % len(data))
+    return _REC.iter_unpack(memoryview(data)[LOG_REC_SIZE:])
+
+def decode_file(path: str) -> List[Tuple[int, int, int, int]]:
+    """Read a binary log and return all result records."""
+    with open(path, "rb") as f:
+        return list(iter_records(f.read()))
+
+def to_csv(src: str, dst: str) -> int:
+    """Convert a binary log to CSV with header T,dT,Gimpl,Gexp; returns row count."""
+    rows = decode_file(src)
+    with open(dst, "w", encoding="utf-8", newline="\n") as f:
+        f.write("T,dT,Gimpl,Gexp\n")
+        f.write("".join("%d,%d,%d,%d\n" % r for r in rows))
+    return len(rows)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    p = argparse.ArgumentParser("Pico result log decoder")
+    p.add_argument("src", help="binary log copied from the Pico (e.g. vis_heatmap.bin)")
+    p.add_argument("dst", nargs="?", help="output CSV (default: src with .csv suffix)")
+    args = p.parse_args(argv)
+    dst = args.dst or (args.src.rsplit(".", 1)[0] + ".csv")
+    n = to_csv(args.src, dst)
+    print(f"Saved: {dst} ({n} rows)")
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
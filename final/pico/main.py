@@ -1,8 +1,12 @@
 # pico_mmio_simple.py - RPi Pico <-> FPGA (active HIGH: CS/WR/RD)
 # Flash this as main.py on MicroPython
 
-from machine import Pin
+from machine import Pin, idle
 import time
+import _thread
+import json
+import os
+import struct
 
 # ======= PINOUT (your setup) =======
 ADDR_BITS     = 6
@@ -14,10 +18,30 @@ WR_GP         = 26
 RD_GP         = 27
 RDY_GP        = 28      # input
 
-# ======= Timings (us) - conservative margins =======
+# ======= Timings (us) - conservative margins, overridden by calibration =======
 T_SETUP_US    = 20
 T_STROBE_US   = 20
 RD_TIMEOUT_US = 20000
+T_FALLBACK_US = 20                   # known-safe setup/strobe when no calibration is valid
+TIMING_CFG    = "bus_timing.json"    # written by calibrate_bus_timing(), loaded at boot
+
+def load_bus_timing(path: str = TIMING_CFG) -> bool:
+    """Apply calibrated delays from flash; keep the conservative defaults if absent or invalid."""
+    global T_SETUP_US, T_STROBE_US
+    try:
+        with open(path) as f:
+            cfg = json.load(f)
+        setup_us = int(cfg["t_setup_us"])
+        strobe_us = int(cfg["t_strobe_us"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return False
+    if not (0 <= setup_us <= T_FALLBACK_US and 0 <= strobe_us <= T_FALLBACK_US):
+        return False
+    T_SETUP_US = setup_us
+    T_STROBE_US = strobe_us
+    return True
+
+load_bus_timing()
 
 # ======= GPIO init =======
 A  = [Pin(ADDR_BASE_GP + i,  Pin.OUT, value=0) for i in range(ADDR_BITS)]
@@ -34,6 +58,10 @@ REG_CTRL   = 0x01  # START/INIT and mode bits
 REG_TIN    = 0x02  # T (int8, Q7.0)
 REG_DTIN   = 0x03  # dT (int8, Q7.0)
 REG_G_OUT  = 0x04  # G result (0..255)
+REG_RESULT = 0x3C  # {fresh, G[6:0]}, fresh clears on read
+RES_FRESH  = 0x80
+MODES_EXT  = 0b00000010  # reg_mode=1, dt_mode=0
+MODES_INT  = 0b00000110  # reg_mode=1, dt_mode=1
 
 # ======= Low-level bus primitives =======
 def set_addr(a: int) -> None:
@@ -59,6 +87,10 @@ def get_dr() -> int:
 def write_reg(addr: int, val: int) -> None:
     """Write cycle: set A, set D_W; CS=1; pulse WR; CS=0."""
     set_addr(addr)
+    _wr_cycle(val)
+
+def _wr_cycle(val: int) -> None:
+    """Data strobe on the address already driven: set D_W; CS=1; pulse WR; CS=0."""
     put_dw(val)
     time.sleep_us(T_SETUP_US)
     CS.value(1)
@@ -91,14 +123,24 @@ def read_reg(addr: int, timeout_us: int = RD_TIMEOUT_US) -> int:
     time.sleep_us(T_SETUP_US)
     return v
 
+REG_BURST_ADDR = 0x2D  # WO: base address for BURST_DATA
+REG_BURST_DATA = 0x2E  # WO: write at BURST_ADDR, then BURST_ADDR += 1
+
+def write_burst(base: int, data) -> None:
+    """Auto-increment burst: one BURST_ADDR write, then one data strobe per byte."""
+    write_reg(REG_BURST_ADDR, base)
+    set_addr(REG_BURST_DATA)
+    for v in data:
+        _wr_cycle(v)
+
 # ======= Mid-level helpers =======
-def pulse_init() -> None:
-    """INIT = write-1-pulse (for example CTRL bit3)."""
-    write_reg(REG_CTRL, 0b00001000)
+def pulse_init(modes: int = 0) -> None:
+    """INIT = write-1-pulse (CTRL bit3). CTRL also loads the mode bits: pass the active ones."""
+    write_reg(REG_CTRL, 0b00001000 | modes)
 
-def pulse_start() -> None:
-    """START = write-1-pulse (for example CTRL bit0)."""
-    write_reg(REG_CTRL, 0b00000001)
+def pulse_start(modes: int = 0) -> None:
+    """START = write-1-pulse (CTRL bit0). CTRL also loads the mode bits: pass the active ones."""
+    write_reg(REG_CTRL, 0b00000001 | modes)
 
 def set_modes_9rules_dt_external() -> None:
     """reg_mode=1, dt_mode=0 -> 0b00000010."""
@@ -122,17 +164,465 @@ def run_once_ext(T_val: int, dT_val: int) -> int:
     set_modes_9rules_dt_external()
     write_reg(REG_TIN,  T_val & 0xFF)
     write_reg(REG_DTIN, dT_val & 0xFF)
-    pulse_init()
-    pulse_start()
+    pulse_init(MODES_EXT)
+    pulse_start(MODES_EXT)
     if not poll_valid(max_ms=1000, step_ms=5):
         raise RuntimeError("VALID timeout")
     return read_reg(REG_G_OUT)
 
+def read_result(max_ms: int = 1000) -> int:
+    """Read RESULT until fresh; once the result is ready this is one transaction."""
+    t0 = time.ticks_ms()
+    while True:
+        v = read_reg(REG_RESULT)
+        if v & RES_FRESH:
+            return v & 0x7F
+        if time.ticks_diff(time.ticks_ms(), t0) > max_ms:
+            raise RuntimeError("RESULT timeout")
+
+def run_point(T_val: int, dT_val: int) -> int:
+    """Sweep step, modes already MODES_EXT: write T, dT, START; one RESULT read."""
+    write_reg(REG_TIN,  T_val & 0xFF)
+    write_reg(REG_DTIN, dT_val & 0xFF)
+    pulse_start(MODES_EXT)
+    return read_result()
+
+# ======= DONE/IRQ completion =======
+# With CS low the FPGA drives done_irq on the RDY pin (top_wukong). A rising edge
+# wakes the driver, which then reads G once: no STATUS polling transactions.
+_done = False
+
+def _on_done(pin) -> None:
+    global _done
+    _done = True
+
+def irq_enable(on: bool = True) -> None:
+    """Attach/detach the RDY rising-edge handler."""
+    RDY.irq(handler=_on_done if on else None, trigger=Pin.IRQ_RISING)
+
+def wait_done(max_ms: int = 1000) -> bool:
+    """Wait for the done_irq edge (bus idle, CS low); no bus transactions.
+    The core sleeps in idle() (WFI) between interrupts: the RDY edge or the 1 ms tick."""
+    t0 = time.ticks_ms()
+    while not _done:
+        if time.ticks_diff(time.ticks_ms(), t0) > max_ms:
+            return False
+        idle()
+    return True
+
+def run_once_irq(T_val: int, dT_val: int) -> int:
+    """As run_once_ext, but completion comes from done_irq: 5 writes + 1 read per result."""
+    global _done
+    set_modes_9rules_dt_external()
+    write_reg(REG_TIN,  T_val & 0xFF)
+    write_reg(REG_DTIN, dT_val & 0xFF)
+    pulse_init(MODES_EXT)
+    _done = False           # RDY edges of earlier reads are behind us; START writes keep RDY low
+    pulse_start(MODES_EXT)
+    if not wait_done():
+        raise RuntimeError("DONE timeout")
+    return read_reg(REG_G_OUT)
+
 def cmd_status() -> None:
     """Print STATUS and valid bit."""
     s = read_reg(REG_STATUS)
     print("STATUS=0x%02X valid=%d" % (s, s & 1))
 
+# ======= Bus timing calibration =======
+GRID_T  = (-128, -64, -32, -16, 0, 16, 32, 64, 96, 127)   # TB GRID 10x7
+GRID_DT = (-60, -30, -10, 0, 10, 30, 60)
+CAL_MARGIN_PCT = 50                  # stored delay = fastest passing delay + 50% (at least +1 us)
+
+def set_bus_timing(setup_us: int, strobe_us: int) -> None:
+    """Set the bus delays used by write_reg/read_reg (not persisted)."""
+    global T_SETUP_US, T_STROBE_US
+    T_SETUP_US = setup_us
+    T_STROBE_US = strobe_us
+
+def _timing_ok(golden) -> bool:
+    """True if GRID 10x7 reproduces 'golden' and register read-back is consistent."""
+    try:
+        k = 0
+        for T in GRID_T:
+            for dT in GRID_DT:
+                G = run_once_ext(T, dT)
+                if G != golden[k] or read_reg(REG_G_OUT) != G:
+                    return False
+                # valid was consumed by poll_valid and the FIFOs are cleared and
+                # unused, so every STATUS bit (FIFO flags included) reads as zero
+                if read_reg(REG_STATUS) != 0x00:
+                    return False
+                k += 1
+    except RuntimeError:
+        return False
+    return True
+
+def _restore_regs() -> None:
+    """Back to the fallback timing, then rewrite every register image the driver
+    knows: a failed probe may have landed writes at wrong addresses."""
+    global _thr_shadow, _g_shadow, _est_shadow
+    set_bus_timing(T_FALLBACK_US, T_FALLBACK_US)
+    thr, g, est = _thr_shadow, _g_shadow, _est_shadow
+    _thr_shadow = _g_shadow = _est_shadow = None    # full uploads
+    if thr is not None:
+        upload_thresholds(thr)
+    if g is not None:
+        upload_singletons(g)
+    if est is not None:
+        set_estimator(*est)
+
+def _probe_ok(golden) -> bool:
+    """_timing_ok at the current delays; a failure restores the fallback state."""
+    if _timing_ok(golden):
+        return True
+    _restore_regs()
+    return False
+
+def _search_min(ok, hi: int) -> int:
+    """Smallest v in [0, hi] with ok(v) True, assuming ok is monotonic and ok(hi) holds."""
+    lo = 0
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if ok(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return hi
+
+def calibrate_bus_timing(path: str = TIMING_CFG) -> bool:
+    """Binary-search setup, then strobe delay, against the GRID 10x7 golden set.
+
+    The golden G values are captured twice at T_FALLBACK_US and must agree. On
+    success the fastest passing delays plus CAL_MARGIN_PCT are verified once more
+    and saved to 'path'; on any failure the conservative fallback stays active.
+    After every failed probe the fallback timing is restored and the uploaded
+    threshold/singleton/estimator images are rewritten before the next probe
+    (registers never uploaded have no shadow and are not restored).
+    """
+    set_bus_timing(T_FALLBACK_US, T_FALLBACK_US)
+    write_reg(REG_CTRL, CTRL_FIFO_CLR)  # STATUS FIFO flags start (and must stay) clear
+    try:
+        golden = [run_once_ext(T, dT) for T in GRID_T for dT in GRID_DT]
+    except RuntimeError as e:
+        print("CAL: bus error at fallback timing:", e)
+        return False
+    if not _timing_ok(golden):
+        print("CAL: golden check failed at fallback, keeping %d/%d us" % (T_FALLBACK_US, T_FALLBACK_US))
+        return False
+
+    def setup_ok(v):
+        set_bus_timing(v, T_FALLBACK_US)
+        return _probe_ok(golden)
+    setup_us = _search_min(setup_ok, T_FALLBACK_US)
+
+    def strobe_ok(v):
+        set_bus_timing(setup_us, v)
+        return _probe_ok(golden)
+    strobe_us = _search_min(strobe_ok, T_FALLBACK_US)
+
+    setup_us = min(T_FALLBACK_US, setup_us + max(1, setup_us * CAL_MARGIN_PCT // 100))
+    strobe_us = min(T_FALLBACK_US, strobe_us + max(1, strobe_us * CAL_MARGIN_PCT // 100))
+    set_bus_timing(setup_us, strobe_us)
+    if not _probe_ok(golden):
+        print("CAL: margin check failed, keeping fallback %d/%d us" % (T_FALLBACK_US, T_FALLBACK_US))
+        return False
+    with open(path, "w") as f:
+        json.dump({"t_setup_us": setup_us, "t_strobe_us": strobe_us}, f)
+    print("CAL: setup=%d us strobe=%d us -> %s" % (setup_us, strobe_us, path))
+    return True
+
+# ======= Config profiles (threshold image, minimal-delta upload) =======
+# Profiles are made on the host: fuzzy_refmodel.py [--cfg tb | --thr-image HEX]
+# [--g-image HEX] [--profile-est] --profile-out prof_<name>.json
+# {"name", "image": 24 bytes for 0x10..0x27, "golden": [[T, dT, G], ...]}, plus
+# optional "g_image" and "est_image".
+# Thresholds are write-only in mmio_if, so the driver keeps a shadow of the last
+# uploaded image and verifies with golden spot checks instead of read-back.
+REG_THR_BASE  = 0x10
+REG_THR_COUNT = 24
+PROFILE_FMT   = "prof_%s.json"
+REG_G_BASE    = 0x30        # singletons G00..G22 (percent 0..100)
+REG_G_COUNT   = 9
+REG_EST_BASE  = 0x39        # ALPHA, K_DT, D_MAX of the dT estimator
+_thr_shadow   = None        # image currently in mmio_if; None = unknown (full upload)
+_g_shadow     = None        # same for the singleton registers
+_est_shadow   = None        # same for ALPHA/K_DT/D_MAX
+
+def write_bulk(pairs) -> None:
+    """pairs = [(addr, val), ...]; runs of consecutive addresses go out as bursts."""
+    i = 0
+    while i < len(pairs):
+        j = i + 1
+        while j < len(pairs) and pairs[j][0] == pairs[j - 1][0] + 1:
+            j += 1
+        if j - i > 1:
+            write_burst(pairs[i][0], [v for _, v in pairs[i:j]])
+        else:
+            write_reg(pairs[i][0], pairs[i][1])
+        i = j
+
+def _delta_pairs(base: int, image, old):
+    """(addr, val) for every byte of 'image' that differs from 'old' (None = all)."""
+    return [(base + i, image[i] & 0xFF) for i in range(len(image))
+            if old is None or old[i] != (image[i] & 0xFF)]
+
+def upload_thresholds(image) -> int:
+    """Write only the threshold bytes that differ from the shadow; returns bus writes."""
+    global _thr_shadow
+    old = _thr_shadow
+    _thr_shadow = None      # unknown until the batch completes
+    img = image[:REG_THR_COUNT]
+    pairs = _delta_pairs(REG_THR_BASE, img, old)
+    write_bulk(pairs)
+    _thr_shadow = bytes(v & 0xFF for v in img)
+    return len(pairs)
+
+def upload_singletons(g) -> int:
+    """g = [G00, G01, G02, G10, ..., G22] in percent; writes only changed registers."""
+    global _g_shadow
+    if len(g) != REG_G_COUNT:
+        raise ValueError("need %d singletons" % REG_G_COUNT)
+    old = _g_shadow
+    _g_shadow = None
+    pairs = _delta_pairs(REG_G_BASE, g, old)
+    write_bulk(pairs)
+    _g_shadow = bytes(v & 0xFF for v in g)
+    return len(pairs)
+
+def set_estimator(alpha: int = 32, k_dt: int = 3, d_max: int = 64) -> int:
+    """Write the ALPHA/K_DT/D_MAX bytes that differ from the shadow (defaults =
+    RTL reset values); returns bus writes."""
+    global _est_shadow
+    old = _est_shadow
+    _est_shadow = None
+    img = [alpha & 0xFF, k_dt & 0xFF, d_max & 0xFF]
+    pairs = _delta_pairs(REG_EST_BASE, img, old)
+    write_bulk(pairs)
+    _est_shadow = img
+    return len(pairs)
+
+def spot_check(golden) -> int:
+    """Run golden (T, dT, G) vectors; returns the number of mismatches."""
+    bad = 0
+    for T, dT, G in golden:
+        got = run_once_ext(T, dT)
+        if got != G:
+            print("SPOT FAIL T=%d dT=%d: got=%d exp=%d" % (T, dT, got, G))
+            bad += 1
+    return bad
+
+def profile_apply(name: str, verify: bool = True) -> bool:
+    """Upload profile 'name' as a minimal delta and spot-check it."""
+    global _thr_shadow, _g_shadow, _est_shadow
+    with open(PROFILE_FMT % name) as f:
+        prof = json.load(f)
+    n = upload_thresholds(prof["image"])
+    if "g_image" in prof:
+        n += upload_singletons(prof["g_image"])
+    if "est_image" in prof:
+        n += set_estimator(*prof["est_image"])
+    if verify and spot_check(prof["golden"]):
+        _thr_shadow = None  # force a full rewrite next time
+        _g_shadow = None
+        _est_shadow = None
+        ref_unload()        # the loaded table belongs to a config that is not in mmio_if
+        print("PROFILE %s: verify FAILED" % name)
+        return False
+    print("PROFILE %s: %d writes, %d spot checks" % (name, n, len(prof["golden"]) if verify else 0))
+    try:
+        ref_load(GTAB_FMT % name)
+    except (OSError, ValueError):
+        ref_unload()            # no (valid) table for this profile: results are logged with Gexp=-1
+    return True
+
+# ======= Live self-check (run-length G table, made by ref/g_table.py) =======
+# gtab_<name>.bin holds the reference G plane of one config as per-row runs
+# (rowmap, row offsets, run starts, run values). With a table loaded every logged
+# sweep point gets its Gexp from it instead of -1 and mismatches are counted as
+# they happen, so a broken run shows on the console, not after copying the logs.
+# STREAM runs and the goext/goirq REPL commands are checked against it as well.
+# RAM: the table is held whole (one f.read()); DEFAULT_CFG with reg_mode=1 is
+# 20710 B (~20.7 KB) against 64 KB for the raw plane, so it fits the RP2040 heap
+# next to the log ring (LOG_BLOCKS * LOG_BLOCK = 4 KB) and the sweep queues (~3.5 KB).
+GTAB_MAGIC    = b"FZG1"
+GTAB_FMT      = "gtab_%s.bin"
+GTAB_HDR_SIZE = 48
+REF_PRINT_MAX = 8           # mismatches printed per table load
+
+class GTable:
+    """Reference G lookup: O(log runs) per point, no allocation."""
+    def __init__(self, data) -> None:
+        if data[:4] != GTAB_MAGIC:
+            raise ValueError("not a G table")
+        self.reg_mode = data[4]
+        rows = data[6] | (data[7] << 8)
+        runs = struct.unpack_from("<I", data, 8)[0]
+        self.thr = bytes(data[12:36])
+        self.g_img = bytes(data[36:45])
+        o = GTAB_HDR_SIZE
+        if len(data) != o + 256 + 4 * (rows + 1) + 2 * runs:
+            raise ValueError("G table: bad size")
+        mv = memoryview(data)
+        self.rowmap = mv[o:o + 256]
+        o += 256
+        self.offsets = struct.unpack_from("<%dI" % (rows + 1), data, o)
+        o += 4 * (rows + 1)
+        self.starts = mv[o:o + runs]
+        self.values = mv[o + runs:o + 2 * runs]
+
+    def g(self, T: int, dT: int) -> int:
+        r = self.rowmap[T + 128]
+        lo = self.offsets[r]
+        hi = self.offsets[r + 1]
+        x = dT + 128
+        s = self.starts
+        while hi - lo > 1:
+            m = (lo + hi) >> 1
+            if s[m] <= x:
+                lo = m
+            else:
+                hi = m
+        return self.values[lo]
+
+class RefCheck:
+    """Counters of the live comparison (updated by the logging core only)."""
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.checked = 0
+        self.mismatches = 0
+        self.max_err = 0
+        self.printed = 0
+
+    def report(self) -> None:
+        print("SELF: checked=%d mismatches=%d max_err=%d" % (self.checked, self.mismatches, self.max_err))
+
+_ref       = None           # GTable of the config in mmio_if; None = no live check
+_ref_path  = None
+_ref_check = RefCheck()
+
+def ref_load(path: str) -> bool:
+    """Load a G table and reset the counters; warns when it does not match the uploaded config."""
+    global _ref, _ref_path
+    with open(path, "rb") as f:
+        tab = GTable(f.read())
+    _ref, _ref_path = tab, path
+    _ref_check.reset()
+    ok = tab.reg_mode == 1      # sweeps run with 9 rules
+    if _thr_shadow is not None and tab.thr != _thr_shadow:
+        ok = False
+    if _g_shadow is not None and tab.g_img != _g_shadow:
+        ok = False
+    print("REF: %s loaded%s" % (path, "" if ok else " (WARN: table does not match the active config)"))
+    return ok
+
+def ref_unload() -> None:
+    global _ref, _ref_path
+    _ref = _ref_path = None
+
+def ref_expect(T: int, dT: int, G: int) -> int:
+    """Reference G for a hardware result (-1 without a table); counts mismatches."""
+    tab = _ref
+    if tab is None:
+        return -1
+    exp = tab.g(T, dT)
+    c = _ref_check
+    c.checked += 1
+    if G != exp:
+        c.mismatches += 1
+        err = G - exp if G > exp else exp - G
+        if err > c.max_err:
+            c.max_err = err
+        if c.printed < REF_PRINT_MAX:
+            c.printed += 1
+            print("SELF FAIL T=%d dT=%d: got=%d exp=%d" % (T, dT, G, exp))
+    return exp
+
+def _print_g(T: int, dT: int, G: int) -> None:
+    """REPL result line, with the reference G when a table is loaded."""
+    exp = ref_expect(T, dT, G)
+    if exp < 0:
+        print("G =", G)
+    else:
+        print("G = %d (ref %d)" % (G, exp))
+
+# ======= Streaming FIFO mode =======
+# CTRL[4]=STREAM makes mmio_if auto-start the core from its input FIFO and queue
+# each G in a result FIFO. Vectors are pushed as FIFO_T + FIFO_DT writes; the
+# level registers are read once per burst, so no per-vector STATUS polling.
+REG_FIFO_T    = 0x28  # WO: stage T
+REG_FIFO_DT   = 0x29  # WO: push {staged T, dT}
+REG_FIFO_G    = 0x2A  # RO: pop one G
+REG_IN_LEVEL  = 0x2B  # RO: input FIFO entries
+REG_OUT_LEVEL = 0x2C  # RO: result FIFO entries
+CTRL_STREAM   = 0b00010000
+CTRL_FIFO_CLR = 0b00100000
+ST_FIFO_OVF   = 0b00001000
+FIFO_DEPTH    = 16
+
+def stream_begin(dt_internal: bool = False) -> None:
+    """Flush both FIFOs and enable STREAM with 9 rules (ext or int dT)."""
+    write_reg(REG_CTRL, CTRL_STREAM | CTRL_FIFO_CLR | (0b110 if dt_internal else 0b010))
+
+def stream_end() -> None:
+    """Leave STREAM mode (9 rules, external dT)."""
+    set_modes_9rules_dt_external()
+
+def fifo_push_burst(Ts, dTs, start: int = 0) -> int:
+    """Push vectors from index 'start' while the input FIFO has room; returns count."""
+    n = min(FIFO_DEPTH - read_reg(REG_IN_LEVEL), len(Ts) - start)
+    for i in range(start, start + n):
+        write_reg(REG_FIFO_T, Ts[i] & 0xFF)
+        write_reg(REG_FIFO_DT, dTs[i] & 0xFF)
+    return n
+
+def fifo_pop_burst(out, max_n: int = FIFO_DEPTH) -> int:
+    """Append all queued results (at most max_n) to 'out'; returns count."""
+    n = min(read_reg(REG_OUT_LEVEL), max_n)
+    for _ in range(n):
+        out.append(read_reg(REG_FIFO_G))
+    return n
+
+def stream_run(Ts, dTs, timeout_ms: int = 1000):
+    """Evaluate (Ts[i], dTs[i]) in STREAM mode; returns G list in input order."""
+    stream_begin()
+    out = []
+    sent = 0
+    t0 = time.ticks_ms()
+    try:
+        while len(out) < len(Ts):
+            k = len(out)
+            sent += fifo_push_burst(Ts, dTs, sent)
+            if fifo_pop_burst(out, sent - k):
+                t0 = time.ticks_ms()
+            elif time.ticks_diff(time.ticks_ms(), t0) > timeout_ms:
+                raise RuntimeError("STREAM timeout after %d results" % len(out))
+        if read_reg(REG_STATUS) & ST_FIFO_OVF:
+            raise RuntimeError("STREAM input FIFO overflow")
+    finally:
+        stream_end()
+    if _ref is not None:
+        for i in range(len(out)):
+            ref_expect(Ts[i], dTs[i], out[i])
+    return out
+
+def stream_grid_check() -> int:
+    """GRID 10x7 in STREAM mode vs single-shot run_once_ext; returns mismatches."""
+    Ts = [T for T in GRID_T for _ in GRID_DT]
+    dTs = [dT for _ in GRID_T for dT in GRID_DT]
+    t0 = time.ticks_ms()
+    got = stream_run(Ts, dTs)
+    dt_ms = time.ticks_diff(time.ticks_ms(), t0)
+    bad = 0
+    for i in range(len(Ts)):
+        if got[i] != run_once_ext(Ts[i], dTs[i]):
+            bad += 1
+    print("STREAM: %d results in %d ms, %d mismatches" % (len(got), dt_ms, bad))
+    if _ref is not None:
+        _ref_check.report()
+    return bad
+
 # ======= Auto-demo on boot =======
 def demo_once() -> None:
     print("BOOT OK")
@@ -154,62 +644,452 @@ if __name__ == "__main__":
     demo_once()
     # then in REPL: repl()
 
-# ========= VIS CSV helpers (match TB) =========
-def _open_csv_on_pico(filename: str):
-    """Open CSV for writing with LF; header matches TB (Gexp = -1 on hardware)."""
-    f = open(filename, "w")
-    f.write("T,dT,Gimpl,Gexp\n")
-    return f
+# ========= Binary result log (RAM ring -> flash blocks) =========
+# Record layout (LOG_REC_SIZE bytes): T (s8), dT (s8), Gimpl (u8), Gexp (s8, -1 = no reference).
+# The first record of every file is LOG_MAGIC. Decode on the host with decode_log.py.
+LOG_MAGIC    = b"FZL1"
+LOG_REC_SIZE = 4
+LOG_BLOCK    = 1024     # flash write size (bytes), multiple of LOG_REC_SIZE
+LOG_BLOCKS   = 4        # ring capacity in blocks
 
-def vis_T_at_dt0_csv(path="vis_T_at_dt0.csv") -> None:
-    """DT_MODE=0, REG_MODE=1, dT=0, T=-128..127 step 2."""
+class ResultLog:
+    """Preallocated ring of packed result records, written to flash in whole blocks.
+
+    put() only stores four bytes into the ring and never allocates, so the sweep
+    loop stays bus-bound; a block is written out every LOG_BLOCK bytes.
+    With on_flush set, every flush is synced to flash and on_flush(n) is called
+    with the number of result records durably stored (used for checkpoints).
+    append=True continues an existing, block-aligned log.
+
+    deferred=True splits the ring between cores: put() (core1) only fills RAM and
+    flush() (core0) writes the complete blocks, so flash I/O stays on core0.
+    Only put() moves _done and only flush() moves _out; full() tells the
+    producer to wait for core0.
+    """
+    def __init__(self, path: str, blocks: int = LOG_BLOCKS,
+                 append: bool = False, on_flush=None, deferred: bool = False) -> None:
+        self._size = LOG_BLOCK * blocks
+        self._n = blocks
+        self._buf = bytearray(self._size)
+        mv = memoryview(self._buf)
+        # Views are built once so flushing a block does not allocate
+        self._blocks = [mv[i * LOG_BLOCK:(i + 1) * LOG_BLOCK] for i in range(blocks)]
+        self._mv = mv
+        self._on_flush = on_flush
+        self._deferred = deferred
+        self._head = 0          # next write offset (bytes)
+        self._done = 0          # complete blocks (producer)
+        self._out = 0           # blocks written to flash (consumer)
+        self.count = 0          # result records stored by this instance
+        if append:
+            self._f = open(path, "ab")
+            self._flushed = os.stat(path)[6]
+        else:
+            self._f = open(path, "wb")
+            self._flushed = 0
+            self._buf[0:LOG_REC_SIZE] = LOG_MAGIC
+            self._head = LOG_REC_SIZE
+
+    def put(self, T: int, dT: int, G: int, Gexp: int = -1) -> None:
+        """Store one result record (allocation-free)."""
+        b = self._buf
+        h = self._head
+        b[h]     = T & 0xFF
+        b[h + 1] = dT & 0xFF
+        b[h + 2] = G & 0xFF
+        b[h + 3] = Gexp & 0xFF
+        h += LOG_REC_SIZE
+        if h == self._size:
+            h = 0
+        self._head = h
+        self.count += 1
+        if h % LOG_BLOCK == 0:
+            self._done += 1
+            if not self._deferred:
+                self.flush()
+
+    def full(self) -> bool:
+        """True if the next put() would overwrite a block not yet on flash."""
+        return self._head % LOG_BLOCK == 0 and self._done - self._out >= self._n
+
+    def pending(self) -> bool:
+        return self._done != self._out
+
+    def flush(self) -> int:
+        """Write every complete block to flash; returns the number written."""
+        n = 0
+        while self._out != self._done:
+            self._f.write(self._blocks[self._out % self._n])
+            self._out += 1
+            self._flushed += LOG_BLOCK
+            n += 1
+        if n and self._on_flush is not None:
+            self._f.flush()
+            self._on_flush(self._flushed // LOG_REC_SIZE - 1)
+        return n
+
+    def close(self, keep_tail: bool = True) -> None:
+        """Write complete blocks, the partial tail block (unless keep_tail=False) and close."""
+        self.flush()
+        t = (self._out % self._n) * LOG_BLOCK
+        if keep_tail and self._head != t:
+            self._f.write(self._mv[t:self._head])
+        self._f.close()
+
+# ========= Dual-core sweep pipeline (core0: bus + flash, core1: vectors/log ring/USB) =========
+# Flash writes stall XIP for both cores, so every file operation (log blocks,
+# checkpoints) runs on core0 between bus transactions; core1 only touches RAM.
+class SpscRing:
+    """Single-producer/single-consumer ring of fixed-size byte records.
+
+    Lock-free across cores: only the producer moves 'head' and only the consumer
+    moves 'tail'. Callers write/read fields directly in 'buf' at the returned
+    offset, so neither side allocates.
+    """
+    def __init__(self, rec_size: int, capacity: int) -> None:
+        self.rec = rec_size
+        self.cap = capacity
+        self.buf = bytearray(rec_size * capacity)
+        self.head = 0
+        self.tail = 0
+
+    def slot_in(self) -> int:
+        """Byte offset of the next free record, or -1 when full."""
+        h = self.head
+        nxt = h + 1
+        if nxt == self.cap:
+            nxt = 0
+        return -1 if nxt == self.tail else h * self.rec
+
+    def commit_in(self) -> None:
+        h = self.head + 1
+        self.head = 0 if h == self.cap else h
+
+    def slot_out(self) -> int:
+        """Byte offset of the oldest record, or -1 when empty."""
+        t = self.tail
+        return -1 if t == self.head else t * self.rec
+
+    def commit_out(self) -> None:
+        t = self.tail + 1
+        self.tail = 0 if t == self.cap else t
+
+def _s8(b: int) -> int:
+    """uint8 bus byte -> signed int8."""
+    return b - 256 if b & 0x80 else b
+
+class _SweepJob:
+    """State shared by both cores for one pipelined sweep."""
+    def __init__(self, log, Ts, dTs, stream, start=0) -> None:
+        self.log = log                  # ResultLog(deferred=True): core1 put(), core0 flush()
+        self.Ts = list(Ts)
+        self.dTs = list(dTs)
+        self.total = len(self.Ts) * len(self.dTs)
+        self.stream = stream
+        self.start = start              # first vector index (resume point)
+        self.vq = SpscRing(2, 256)      # core1 -> core0: (T, dT) bytes
+        self.rq = SpscRing(3, 1024)     # core0 -> core1: (T, dT, G) bytes
+        self.abort = False              # set by either core on error
+        self.finished = False           # set by core1 when it stops
+        self.logged = start
+        self.error = None               # core1 exception
+
+    def stopped(self) -> bool:
+        return self.abort or self.error is not None
+
+def _core1_worker(job: _SweepJob) -> None:
+    """core1: feed vectors, drain results into the log ring and optionally print them."""
+    vq, rq = job.vq, job.rq
+    vb, rb = vq.buf, rq.buf
+    Ts, dTs = job.Ts, job.dTs
+    nd = len(dTs)
+    i = job.start                       # next vector index to enqueue
+    log = job.log
+    try:
+        while job.logged < job.total and not job.abort:
+            while i < job.total:
+                o = vq.slot_in()
+                if o < 0:
+                    break
+                vb[o]     = Ts[i // nd] & 0xFF
+                vb[o + 1] = dTs[i % nd] & 0xFF
+                vq.commit_in()
+                i += 1
+            o = rq.slot_out()
+            while o >= 0:
+                while log.full():       # core0 has not written the oldest block yet
+                    if job.abort:
+                        return
+                    time.sleep_us(50)
+                T, dT, G = _s8(rb[o]), _s8(rb[o + 1]), rb[o + 2]
+                rq.commit_out()
+                log.put(T, dT, G, ref_expect(T, dT, G))
+                if job.stream:
+                    print("%d,%d,%d" % (T, dT, G))
+                job.logged += 1
+                o = rq.slot_out()
+    except Exception as e:
+        job.error = e
+        job.abort = True
+    finally:
+        job.finished = True
+
+def _sweep_to_log(path: str, Ts, dTs, stream: bool = False,
+                  start: int = 0, on_flush=None) -> int:
+    """DT_MODE=0, REG_MODE=1: run every (T, dT) pair; core1 logs while core0 drives the bus.
+
+    'start' skips the first vectors (resume); on_flush is passed to ResultLog and,
+    like every flash write, runs on core0.
+    Returns the number of logged points (including the skipped ones).
+    """
     set_modes_9rules_dt_external()
-    f = _open_csv_on_pico(path)
-    dT = 0
-    for T in range(-128, 128, 2):
-        G = run_once_ext(T, dT)
-        f.write("%d,%d,%d,%d\n" % (T & 0xFF if T < 0 else T, dT & 0xFF if dT < 0 else dT, G, -1))
-    f.flush()
-    f.close()
-    print("INFO: VIS_T_at_dt0 ->", path)
-
-def vis_dT_lines_csv(path="vis_dT_lines.csv") -> None:
+    log = ResultLog(path, append=start > 0, on_flush=on_flush, deferred=True)
+    job = _SweepJob(log, Ts, dTs, stream, start)
+    vq, rq = job.vq, job.rq
+    vb, rb = vq.buf, rq.buf
+    t0 = time.ticks_ms()
+    _thread.start_new_thread(_core1_worker, (job,))
+    try:
+        n = job.start
+        while n < job.total and not job.stopped():
+            if log.pending():
+                log.flush()
+            o = vq.slot_out()
+            if o < 0:                   # core1 has not queued the next vector yet
+                time.sleep_us(20)
+                continue
+            T, dT = vb[o], vb[o + 1]
+            vq.commit_out()
+            G = run_point(T, dT)        # bus masks to 8 bits, raw bytes are fine
+            o = rq.slot_in()
+            while o < 0 and not job.stopped():  # core1 fell behind: wait for space
+                log.flush()             # core1 may be waiting for a free log block
+                time.sleep_us(20)
+                o = rq.slot_in()
+            if o < 0:
+                break
+            rb[o], rb[o + 1], rb[o + 2] = T, dT, G
+            rq.commit_in()
+            n += 1
+    except BaseException:               # KeyboardInterrupt too: core1 must stop before close
+        job.abort = True
+        raise
+    finally:
+        while not job.finished:
+            log.flush()
+            time.sleep_ms(1)
+        # A checkpointed log must stay block aligned after an abort so it can resume
+        log.close(keep_tail=not (job.stopped() and on_flush is not None))
+    if job.error is not None:
+        raise job.error
+    dt_ms = time.ticks_diff(time.ticks_ms(), t0)
+    print("INFO: %d pts in %d ms" % (job.logged, dt_ms))
+    if _ref is not None:
+        _ref_check.report()
+    return job.logged
+
+def vis_T_at_dt0_log(path="vis_T_at_dt0.bin") -> None:
+    """DT_MODE=0, REG_MODE=1, dT=0, T=-128..127 step 2."""
+    n = _sweep_to_log(path, range(-128, 128, 2), (0,))
+    print("INFO: VIS_T_at_dt0 -> %s (%d pts)" % (path, n))
+
+def vis_dT_lines_log(path="vis_dT_lines.bin") -> None:
     """DT_MODE=0, REG_MODE=1, T in {-32,0,32}, dT=-60..60 step 4."""
-    set_modes_9rules_dt_external()
-    f = _open_csv_on_pico(path)
-    for T in (-32, 0, 32):
-        for dT in range(-60, 61, 4):
-            G = run_once_ext(T, dT)
-            f.write("%d,%d,%d,%d\n" % (T & 0xFF if T < 0 else T, dT & 0xFF if dT < 0 else dT, G, -1))
-    f.flush()
-    f.close()
-    print("INFO: VIS_dT_lines ->", path)
-
-def vis_heatmap_csv(path="vis_heatmap.csv") -> None:
+    n = _sweep_to_log(path, (-32, 0, 32), range(-60, 61, 4))
+    print("INFO: VIS_dT_lines -> %s (%d pts)" % (path, n))
+
+def vis_heatmap_log(path="vis_heatmap.bin") -> None:
     """DT_MODE=0, REG_MODE=1, T=-64..64 step 8, dT=-60..60 step 5."""
-    set_modes_9rules_dt_external()
-    f = _open_csv_on_pico(path)
-    for T in range(-64, 65, 8):
-        for dT in range(-60, 61, 5):
-            G = run_once_ext(T, dT)
-            f.write("%d,%d,%d,%d\n" % (T & 0xFF if T < 0 else T, dT & 0xFF if dT < 0 else dT, G, -1))
-    f.flush()
-    f.close()
-    print("INFO: VIS_heatmap ->", path)
-
-def grid_10x7_csv(path="grid_10x7.csv") -> None:
+    n = _sweep_to_log(path, range(-64, 65, 8), range(-60, 61, 5))
+    print("INFO: VIS_heatmap -> %s (%d pts)" % (path, n))
+
+def grid_10x7_log(path="grid_10x7.bin") -> None:
     """DT_MODE=0, REG_MODE=1, GRID T(10) x dT(7) matching the TB grid points."""
-    Ts  = [-128, -64, -32, -16, 0, 16, 32, 64, 96, 127]
-    dTs = [-60, -30, -10, 0, 10, 30, 60]
+    n = _sweep_to_log(path, GRID_T, GRID_DT)
+    print("INFO: GRID_10x7 -> %s (%d pts)" % (path, n))
+
+def sweep_full(path="sweep_full.bin", stream: bool = False) -> None:
+    """DT_MODE=0, REG_MODE=1, exhaustive 256x256 (T, dT) sweep."""
+    n = _sweep_to_log(path, range(-128, 128), range(-128, 128), stream)
+    print("INFO: SWEEP_full -> %s (%d pts)" % (path, n))
+
+# ========= Adaptive heatmap (quadtree refinement, see ref/adaptive_sweep.py) =========
+# Breakpoints of the mmio_if reset thresholds (DEFAULT_CFG in the reference model)
+DEFAULT_BREAKS = (-128, -64, 0, 64, 127)
+
+def adaptive_heatmap(path="vis_heatmap_adaptive.bin", T_range=(-64, 64), dT_range=(-60, 60),
+                     coarse=8, breaks_T=DEFAULT_BREAKS, breaks_dT=DEFAULT_BREAKS) -> int:
+    """DT_MODE=0, REG_MODE=1: refine cells whose corner G differ or that contain a breakpoint.
+
+    Every evaluated point is logged once; on the host,
+    adaptive_sweep.reconstruct() with the same arguments rebuilds the full map.
+    Returns the number of bus evaluations.
+    """
     set_modes_9rules_dt_external()
-    f = _open_csv_on_pico(path)
-    for T in Ts:
-        for dT in dTs:
-            G = run_once_ext(T, dT)
-            f.write("%d,%d,%d,%d\n" % (T & 0xFF if T < 0 else T, dT & 0xFF if dT < 0 else dT, G, -1))
-    f.flush()
-    f.close()
-    print("INFO: GRID_10x7 ->", path)
+    # G of every evaluated point, 0xFF = not evaluated yet (G <= 100); a flat
+    # bytearray instead of a dict of tuples keeps ~16k points within the heap
+    T0, d0 = T_range[0], dT_range[0]
+    nd = dT_range[1] - d0 + 1
+    seen = bytearray(b"\xff" * ((T_range[1] - T0 + 1) * nd))
+    log = ResultLog(path)
+
+    def g(T, dT):
+        k = (T - T0) * nd + dT - d0
+        v = seen[k]
+        if v == 0xFF:
+            v = seen[k] = run_point(T, dT)
+            log.put(T, dT, v, ref_expect(T, dT, v))
+        return v
+
+    tn = list(range(T_range[0], T_range[1], coarse)) + [T_range[1]]
+    dn = list(range(dT_range[0], dT_range[1], coarse)) + [dT_range[1]]
+    stack = [(tn[i], tn[i + 1], dn[j], dn[j + 1])
+             for i in range(len(tn) - 1) for j in range(len(dn) - 1)]
+    try:
+        while stack:
+            t0, t1, d0, d1 = stack.pop()
+            c00, c01, c10, c11 = g(t0, d0), g(t0, d1), g(t1, d0), g(t1, d1)
+            diff = not (c00 == c01 == c10 == c11)
+            split_T = t1 - t0 > 1 and (diff or any(t0 < b < t1 for b in breaks_T))
+            split_D = d1 - d0 > 1 and (diff or any(d0 < b < d1 for b in breaks_dT))
+            if not (split_T or split_D):
+                continue
+            tm = (t0 + t1) // 2
+            dm = (d0 + d1) // 2
+            ts = ((t0, tm), (tm, t1)) if split_T else ((t0, t1),)
+            ds = ((d0, dm), (dm, d1)) if split_D else ((d0, d1),)
+            for a, b in ts:
+                for c, d in ds:
+                    stack.append((a, b, c, d))
+    finally:
+        log.close()
+    full = (T_range[1] - T_range[0] + 1) * (dT_range[1] - dT_range[0] + 1)
+    print("INFO: adaptive heatmap -> %s (%d of %d pts)" % (path, log.count, full))
+    if _ref is not None:
+        _ref_check.report()
+    return log.count
+
+# ========= Checkpointed sweep jobs (resume after reset) =========
+# The log file is the source of truth for progress: blocks are synced before the
+# checkpoint is rewritten, so after a reset the job continues at the first vector
+# that is not on flash yet. The checkpoint keeps the sweep definition, CTRL modes
+# and bus timing so the resumed part runs under the same conditions.
+JOB_CFG = "sweep_job.json"
+
+def _job_save(job: dict) -> None:
+    """Atomically replace the checkpoint file."""
+    tmp = JOB_CFG + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(job, f)
+    os.rename(tmp, JOB_CFG)
+
+def _job_load():
+    try:
+        with open(JOB_CFG) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _log_truncate(path: str, size: int) -> None:
+    """Keep the first 'size' bytes (a multiple of LOG_BLOCK) of 'path'.
+
+    MicroPython has no truncate(): copy block by block into a new file and rename.
+    """
+    tmp = path + ".tmp"
+    buf = bytearray(LOG_BLOCK)
+    with open(path, "rb") as src, open(tmp, "wb") as dst:
+        for _ in range(size // LOG_BLOCK):
+            src.readinto(buf)
+            dst.write(buf)
+    os.rename(tmp, path)
+
+def _log_records(path: str, trim: bool = False) -> int:
+    """Result records in the whole blocks of 'path' (0 if missing or empty).
+
+    A partial last block (reset during a block write, or a log closed with its
+    tail) is not counted; trim=True also cuts it off so the log can be appended to.
+    """
+    try:
+        size = os.stat(path)[6]
+    except OSError:
+        return 0
+    tail = size % LOG_BLOCK
+    if tail and trim:
+        _log_truncate(path, size - tail)
+        print("JOB: dropped %d B partial block of %s" % (tail, path))
+    size -= tail
+    if size == 0:
+        return 0
+    return size // LOG_REC_SIZE - 1
+
+def _job_run(job: dict) -> None:
+    set_bus_timing(job["t_setup_us"], job["t_strobe_us"])
+    write_reg(REG_CTRL, job["ctrl"])
+    if job.get("thr") is not None:
+        upload_thresholds(job["thr"])   # FPGA may have been reset as well
+    if job.get("g") is not None:
+        upload_singletons(job["g"])
+    if job.get("est") is not None:
+        set_estimator(*job["est"])
+    if job.get("gtab") is not None:
+        ref_load(job["gtab"])   # counters restart with the resumed part
+    start = _log_records(job["log"], trim=True)
+    base_ms = job["elapsed_ms"] if start else 0
+    t_run = time.ticks_ms()
+
+    def checkpoint(done):
+        job["done"] = done
+        job["elapsed_ms"] = base_ms + time.ticks_diff(time.ticks_ms(), t_run)
+        _job_save(job)
+
+    if start:
+        print("JOB: resuming %s at %d/%d" % (job["log"], start, job["total"]))
+    _sweep_to_log(job["log"], range(*job["T"]), range(*job["dT"]), start=start, on_flush=checkpoint)
+    job["state"] = "done"
+    checkpoint(job["total"])
+    print("JOB: done -> %s" % job["log"])
+
+def job_start(log: str = "sweep_full.bin", T=(-128, 128, 1), dT=(-128, 128, 1)) -> None:
+    """Start a new checkpointed sweep over range(*T) x range(*dT) (replaces any old job)."""
+    try:
+        os.remove(log)
+    except OSError:
+        pass
+    job = {
+        "log": log, "T": list(T), "dT": list(dT),
+        "total": len(range(*T)) * len(range(*dT)), "done": 0, "elapsed_ms": 0,
+        "ctrl": 0b00000010,             # reg_mode=1, dt_mode=0 (as run_once_ext)
+        "t_setup_us": T_SETUP_US, "t_strobe_us": T_STROBE_US,
+        "thr": list(_thr_shadow) if _thr_shadow is not None else None,
+        "g": list(_g_shadow) if _g_shadow is not None else None,
+        "est": _est_shadow,
+        "gtab": _ref_path,
+        "state": "run",
+    }
+    _job_save(job)
+    _job_run(job)
+
+def job_resume() -> bool:
+    """Continue an interrupted job; returns False if there is nothing to resume."""
+    job = _job_load()
+    if job is None or job.get("state") != "run":
+        return False
+    _job_run(job)
+    return True
+
+def job_status() -> None:
+    """Print progress and ETA of the current/last job."""
+    job = _job_load()
+    if job is None:
+        print("JOB: none")
+        return
+    total = job["total"]
+    done = job["done"] if job["state"] == "done" else _log_records(job["log"])
+    el_s = job["elapsed_ms"] // 1000
+    eta_s = (job["elapsed_ms"] * (total - done) // done) // 1000 if done else -1
+    pct = done * 100 // total if total else 100     # empty range: nothing to do
+    print("JOB: %s %s %d/%d (%d%%) elapsed=%ds eta=%ds" %
+          (job["log"], job["state"], done, total, pct, el_s, eta_s))
 
 # ========= REPL commands =========
 def repl_help() -> None:
@@ -221,20 +1101,50 @@ def repl_help() -> None:
     print("  init          -> pulse INIT")
     print("  start         -> pulse START")
     print("  status        -> print STATUS + valid bit")
+    print("  cal           -> calibrate bus delays, save to bus_timing.json")
+    print("  profile name  -> upload prof_<name>.json (changed thresholds only) + spot check,")
+    print("                   load gtab_<name>.bin if present")
+    print("  timing        -> print active bus delays")
+    print("  gset g00..g22 -> write the 9 singletons (percent, changed ones only)")
+    print("  est a k dmax  -> write dT estimator ALPHA, K_DT, D_MAX")
+    print("  ref <file>    -> load a G table (gtab_*.bin) for the live self-check")
+    print("  check [reset] -> self-check counters")
     print("  goext T dT    -> run once (ext dT)")
-    print("  vis_t0        -> make vis_T_at_dt0.csv")
-    print("  vis_lines     -> make vis_dT_lines.csv")
-    print("  vis_heatmap   -> make vis_heatmap.csv")
-    print("  grid          -> make grid_10x7.csv")
-    print("  dump <file>   -> print file to console")
+    print("  goirq T dT    -> run once, completion via done_irq on RDY")
+    print("  stream        -> GRID 10x7 through the FIFOs, compare with single-shot")
+    print("  vis_t0        -> make vis_T_at_dt0.bin")
+    print("  vis_lines     -> make vis_dT_lines.bin")
+    print("  vis_heatmap   -> make vis_heatmap.bin")
+    print("  vis_adaptive  -> make vis_heatmap_adaptive.bin (quadtree, full 1-step map)")
+    print("  grid          -> make grid_10x7.bin")
+    print("  full [stream] -> make sweep_full.bin (65536 pts, optional USB echo)")
+    print("  job [start|resume] -> checkpointed full sweep: progress+ETA / start / resume")
+    print("  dump <file>   -> print a text file, or an FZL1 result log as T,dT,Gimpl,Gexp")
     print("  help")
 
 def _dump_file(p: str) -> None:
-    """Print a text file to console using LF lines."""
+    """Print a text file to console using LF lines. FZL1 result logs are decoded to
+    the T,dT,Gimpl,Gexp lines of decode_log.py; other binary files are refused."""
     try:
+        with open(p, "rb") as f:
+            head = f.read(256)
+            if head[:LOG_REC_SIZE] == LOG_MAGIC:
+                f.seek(LOG_REC_SIZE)
+                print("T,dT,Gimpl,Gexp")
+                buf = bytearray(LOG_BLOCK)
+                n = f.readinto(buf)
+                while n:
+                    for o in range(0, n - n % LOG_REC_SIZE, LOG_REC_SIZE):
+                        print("%d,%d,%d,%d" % (_s8(buf[o]), _s8(buf[o + 1]), buf[o + 2], _s8(buf[o + 3])))
+                    n = f.readinto(buf)
+                return
+        if b"\x00" in head:
+            raise UnicodeError
         with open(p, "r") as f:
             for line in f:
                 print(line.rstrip("\n"))
+    except UnicodeError:
+        print("ERR: %s is binary, copy it to the host (FZL1 logs: decode_log.py)" % p)
     except Exception as e:
         print("ERR:", e)
 
@@ -266,17 +1176,49 @@ def repl() -> None:
                 pulse_start(); print("ok")
             elif cmd == "status":
                 cmd_status()
+            elif cmd == "cal":
+                calibrate_bus_timing()
+            elif cmd == "profile" and len(parts) == 2:
+                profile_apply(parts[1])
+            elif cmd == "gset" and len(parts) == 1 + REG_G_COUNT:
+                n = upload_singletons([int(x, 0) for x in parts[1:]]); print("ok (%d writes)" % n)
+            elif cmd == "est" and len(parts) == 4:
+                set_estimator(*[int(x, 0) for x in parts[1:]]); print("ok")
+            elif cmd == "ref" and len(parts) == 2:
+                ref_load(parts[1])
+            elif cmd == "check":
+                _ref_check.report()
+                if len(parts) == 2 and parts[1] == "reset":
+                    _ref_check.reset()
+            elif cmd == "timing":
+                print("setup=%d us strobe=%d us" % (T_SETUP_US, T_STROBE_US))
             elif cmd == "goext" and len(parts) == 3:
                 T = int(parts[1], 0); dT = int(parts[2], 0)
-                G = run_once_ext(T, dT); print("G =", G)
+                _print_g(T, dT, run_once_ext(T, dT))
+            elif cmd == "goirq" and len(parts) == 3:
+                irq_enable()
+                T = int(parts[1], 0); dT = int(parts[2], 0)
+                _print_g(T, dT, run_once_irq(T, dT))
+            elif cmd == "stream":
+                stream_grid_check()
             elif cmd == "vis_t0":
-                vis_T_at_dt0_csv(); print("done")
+                vis_T_at_dt0_log(); print("done")
             elif cmd == "vis_lines":
-                vis_dT_lines_csv(); print("done")
+                vis_dT_lines_log(); print("done")
             elif cmd == "vis_heatmap":
-                vis_heatmap_csv(); print("done")
+                vis_heatmap_log(); print("done")
+            elif cmd == "vis_adaptive":
+                adaptive_heatmap(); print("done")
             elif cmd == "grid":
-                grid_10x7_csv(); print("done")
+                grid_10x7_log(); print("done")
+            elif cmd == "job" and len(parts) == 1:
+                job_status()
+            elif cmd == "job" and parts[1] == "start":
+                job_start(); print("done")
+            elif cmd == "job" and parts[1] == "resume":
+                print("done" if job_resume() else "JOB: nothing to resume")
+            elif cmd == "full":
+                sweep_full(stream=(len(parts) == 2 and parts[1] == "stream")); print("done")
             elif cmd == "dump" and len(parts) == 2:
                 _dump_file(parts[1])
             elif cmd == "help":
@@ -285,3 +1227,10 @@ def repl() -> None:
                 print("??? (help)")
         except Exception as e:
             print("ERR:", e)
+
+if __name__ == "__main__":
+    # Continue a sweep job that was interrupted by a reset or brown-out
+    try:
+        job_resume()
+    except Exception as e:
+        print("JOB ERROR:", e)
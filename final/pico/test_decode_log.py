@@ -0,0 +1,29 @@
+# test_decode_log.py - host-side checks for the Pico binary result log decoder
+
+import pytest
+
+from decode_log import LOG_MAGIC, iter_records, decode_file, to_csv
+
+def _pack(records):
+    out = bytearray(LOG_MAGIC)
+    for T, dT, G, Gexp in records:
+        out += bytes((T & 0xFF, dT & 0xFF, G & 0xFF, Gexp & 0xFF))
+    return bytes(out)
+
+def test_roundtrip_signed_fields(tmp_path):
+    recs = [(-128, -60, 100, -1), (0, 0, 50, 50), (127, 60, 0, -1)]
+    src = tmp_path / "vis.bin"
+    src.write_bytes(_pack(recs))
+    assert decode_file(str(src)) == recs
+
+    dst = tmp_path / "vis.csv"
+    assert to_csv(str(src), str(dst)) == 3
+    lines = dst.read_text().splitlines()
+    assert lines[0] == "T,dT,Gimpl,Gexp"
+    assert lines[1] == "-128,-60,100,-1"
+
+def test_rejects_bad_magic_and_truncation():
+    with pytest.raises(ValueError):
+        list(iter_records(b"XXXX"))
+    with pytest.raises(ValueError):
+        list(iter_records(LOG_MAGIC + b"\x00\x00"))
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+adaptive_sweep.py - Adaptive quadtree sampling of the G(T, dT) surface.
+
+Starts from a coarse grid and splits a cell along an axis only when its corner
+G values differ or when an MF breakpoint of that axis lies strictly inside it.
+Cells that stop splitting with equal corners are filled with that value, which
+gives a full-resolution map from a fraction of the evaluations.
+
+The evaluator is any callable eval_fn(T, dT) -> G: the reference model
+(model_evaluator) or hardware. The Pico driver runs the same split rules
+(adaptive_heatmap in main.py) and logs the evaluated points; reconstruct()
+replays the deterministic split order on those samples to rebuild the map.
+"""
+
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from fuzzy_refmodel import CoprocessorCfg, MfSet3, top_step
+
+Point = Tuple[int, int]
+Cell = Tuple[int, int, int, int]       # (T0, T1, dT0, dT1), inclusive corners
+
+# -------------------- Breakpoints / evaluators --------------------
+
+def mf_breakpoints(mf: MfSet3) -> List[int]:
+    """Sorted unique a/b/c/d thresholds of one axis."""
+    return sorted({v for t in (mf.neg, mf.zero, mf.pos) for v in (t.a, t.b, t.c, t.d)})
+
+def cfg_breakpoints(cfg: CoprocessorCfg) -> Tuple[List[int], List[int]]:
+    """(T breakpoints, dT breakpoints) for a coprocessor configuration."""
+    return mf_breakpoints(cfg.mf_T), mf_breakpoints(cfg.mf_dT)
+
+def model_evaluator(cfg: CoprocessorCfg, reg_mode: int = 1) -> Callable[[int, int], int]:
+    """eval_fn backed by the reference model (dt_mode=0)."""
+    def eval_fn(T: int, dT: int) -> int:
+        return top_step(T, dT, cfg, reg_mode, dt_mode=0, estimator=None)[0]
+    return eval_fn
+
+# -------------------- Sampler --------------------
+
+def _nodes(lo: int, hi: int, step: int) -> List[int]:
+    n = list(range(lo, hi, step))
+    n.append(hi)
+    return n
+
+def adaptive_sample(eval_fn: Callable[[int, int], int],
+                    T_range: Tuple[int, int] = (-128, 127),
+                    dT_range: Tuple[int, int] = (-128, 127),
+                    coarse: int = 16,
+                    breaks_T: Sequence[int] = (),
+                    breaks_dT: Sequence[int] = ()) -> Tuple[Dict[Point, int], List[Cell]]:
+    """
+    Refine the inclusive (T, dT) rectangle adaptively.
+    Returns (samples, leaves): every evaluated point with its G, and the leaf cells.
+    Cells are processed in a fixed LIFO order so the Pico port visits points identically.
+    """
+    samples: Dict[Point, int] = {}
+
+    def g(T: int, dT: int) -> int:
+        k = (T, dT)
+        v = samples.get(k)
+        if v is None:
+            v = samples[k] = eval_fn(T, dT)
+        return v
+
+    tn = _nodes(T_range[0], T_range[1], coarse)
+    dn = _nodes(dT_range[0], dT_range[1], coarse)
+    stack = [(tn[i], tn[i + 1], dn[j], dn[j + 1])
+             for i in range(len(tn) - 1) for j in range(len(dn) - 1)]
+    leaves: List[Cell] = []
+    while stack:
+        t0, t1, d0, d1 = stack.pop()
+        c00, c01, c10, c11 = g(t0, d0), g(t0, d1), g(t1, d0), g(t1, d1)
+        diff = not (c00 == c01 == c10 == c11)
+        split_T = t1 - t0 > 1 and (diff or any(t0 < b < t1 for b in breaks_T))
+        split_D = d1 - d0 > 1 and (diff or any(d0 < b < d1 for b in breaks_dT))
+        if not (split_T or split_D):
+            leaves.append((t0, t1, d0, d1))
+            continue
+        tm = (t0 + t1) // 2
+        dm = (d0 + d1) // 2
+        ts = ((t0, tm), (tm, t1)) if split_T else ((t0, t1),)
+        ds = ((d0, dm), (dm, d1)) if split_D else ((d0, d1),)
+        for a, b in ts:
+            for c, d in ds:
+                stack.append((a, b, c, d))
+    return samples, leaves
+
+def fill_leaves(samples: Dict[Point, int], leaves: Iterable[Cell]) -> Dict[Point, int]:
+    """Full-resolution map: constant leaves are filled, evaluated samples take precedence."""
+    full: Dict[Point, int] = {}
+    for t0, t1, d0, d1 in leaves:
+        v = samples[(t0, d0)]
+        if v == samples[(t0, d1)] == samples[(t1, d0)] == samples[(t1, d1)]:
+            for T in range(t0, t1 + 1):
+                for dT in range(d0, d1 + 1):
+                    full[(T, dT)] = v
+    full.update(samples)
+    return full
+
+def reconstruct(samples: Dict[Point, int], **sweep) -> Dict[Point, int]:
+    """Rebuild the full map from logged samples by replaying adaptive_sample(**sweep)."""
+    replay, leaves = adaptive_sample(lambda T, dT: samples[(T, dT)], **sweep)
+    return fill_leaves(replay, leaves)
+
+def adaptive_map(cfg: CoprocessorCfg, reg_mode: int = 1,
+                 T_range: Tuple[int, int] = (-128, 127),
+                 dT_range: Tuple[int, int] = (-128, 127),
+                 coarse: int = 16) -> Tuple[Dict[Point, int], int]:
+    """Full-resolution G map of the reference model; returns (map, evaluations)."""
+    bT, bD = cfg_breakpoints(cfg)
+    samples, leaves = adaptive_sample(model_evaluator(cfg, reg_mode), T_range, dT_range,
+                                      coarse, bT, bD)
+    return fill_leaves(samples, leaves), len(samples)
@@ -0,0 +1,33 @@
+# conftest.py - fixtures shared by the final/ref suites
+
+import pytest
+
+from golden_surface import GoldenSurfaces, SurfaceCache
+
+def pytest_addoption(parser):
+    parser.addoption("--surface-cache-dir", action="store", default=None,
+                     help="on-disk golden surface cache (default: in the pytest cache, 'none' disables)")
+    parser.addoption("--runslow", action="store_true", default=False,
+                     help="also run the end-to-end tests marked slow")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: end-to-end test (~0.1 s or more), skipped without --runslow")
+
+def pytest_collection_modifyitems(config, items):
+    # the default run stays under a second; --runslow adds the end-to-end checks
+    if config.getoption("--runslow"):
+        return
+    skip = pytest.mark.skip(reason="slow: run with --runslow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
+
+@pytest.fixture(scope="session")
+def golden(request):
+    """Compiled G/S_w/S_wg surfaces per (cfg, reg_mode), shared by every test of the session."""
+    path = request.config.getoption("--surface-cache-dir")
+    if path is None and getattr(request.config, "cache", None) is not None:
+        path = str(request.config.cache.mkdir("golden_surfaces"))
+    if not path or path == "none":
+        return GoldenSurfaces()
+    return GoldenSurfaces(cache=SurfaceCache(path))
@@ -5,8 +5,10 @@ Covers REQ-010/020/030/040/050/210 (dt_mode=0 exact), and provides a pluggable
 estimator for REQ-060/061/062.
 """
 
+from collections import Counter
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Tuple, Optional, List
+from typing import Dict, Iterable, Tuple, Optional, List, Union
 
 Q15_MAX = 32767
 
@@ -49,6 +51,97 @@ def clip_to_range(x: int, lo: int, hi: int) -> int:
     """Clip x to [lo, hi]."""
     return lo if x < lo else (hi if x > hi else x)
 
+# -------------------- Stage events (opt-in) --------------------
+
+EVENT_KINDS = ("aggregate.S_w", "aggregate.S_wg", "defuzz.gt100", "estimator.+d_max", "estimator.-d_max")
+
+class StageEvents:
+    """
+    Counters of the silent clamps in the pipeline: aggregate saturating S_w / S_wg at
+    Q15_MAX, defuzz limiting the percentage to 100 and EstimatorRTLExact clipping at
+    +/-d_max. The first `capture` events of each kind are kept with their inputs.
+
+    Enabled with stage_events() (or enable_stage_events); while disabled the stages
+    only test a module global inside their clamp branches, so the common path is
+    unchanged. state() / merge() / merged() aggregate batch and worker-process runs.
+    Compiled golden surfaces run each stage once per distinct input, not per lookup,
+    so while a collector is active GoldenSurfaces evaluates lookups directly
+    (golden_surface.DirectSurface) and every lookup is counted.
+    """
+
+    def __init__(self, capture: int = 0):
+        self.capture = capture
+        self.counts: Counter = Counter()
+        self.captured: Dict[str, List[dict]] = {}
+
+    def hit(self, kind: str, inputs: dict, n: int = 1) -> None:
+        self.counts[kind] += n
+        if self.capture:
+            lst = self.captured.setdefault(kind, [])
+            if len(lst) < self.capture:
+                lst.append(inputs)
+
+    def aggregate_clamp(self, reg_mode: int, w, g, sumw: int, sumwg: int, n: int = 1) -> None:
+        inputs = {"reg_mode": reg_mode, "w": tuple(w), "g": tuple(g), "sumw": sumw, "sumwg": sumwg}
+        if sumw > Q15_MAX:
+            self.hit("aggregate.S_w", inputs, n)
+        if sumwg > Q15_MAX:
+            self.hit("aggregate.S_wg", inputs, n)
+
+    def estimator_clamp(self, clip_hit: int, inputs: dict, n: int = 1) -> None:
+        """clip_hit as in EstimatorRTLExact: +1 clamped at +d_max, -1 at -d_max."""
+        if clip_hit:
+            self.hit("estimator.+d_max" if clip_hit > 0 else "estimator.-d_max", inputs, n)
+
+    def state(self) -> dict:
+        return {"capture": self.capture, "counts": dict(self.counts),
+                "captured": {k: list(v) for k, v in self.captured.items()}}
+
+    def merge(self, other: Union["StageEvents", dict]) -> "StageEvents":
+        st = other.state() if isinstance(other, StageEvents) else other
+        self.capture = max(self.capture, st["capture"])
+        self.counts.update(st["counts"])
+        for k, v in st["captured"].items():
+            lst = self.captured.setdefault(k, [])
+            lst.extend(v[:max(self.capture - len(lst), 0)])
+        return self
+
+    @classmethod
+    def merged(cls, parts: Iterable[Union["StageEvents", dict]]) -> "StageEvents":
+        ev = cls()
+        for p in parts:
+            ev.merge(p)
+        return ev
+
+    def summary(self) -> dict:
+        return {"counts": {k: self.counts[k] for k in EVENT_KINDS},
+                "captured": {k: self.captured.get(k, []) for k in EVENT_KINDS if self.captured.get(k)}}
+
+_events: Optional[StageEvents] = None
+
+def enable_stage_events(capture: int = 0) -> StageEvents:
+    """Start counting (replaces any active collector); returns the collector."""
+    global _events
+    _events = StageEvents(capture)
+    return _events
+
+def disable_stage_events() -> Optional[StageEvents]:
+    """Stop counting; returns the collector that was active."""
+    global _events
+    ev, _events = _events, None
+    return ev
+
+@contextmanager
+def stage_events(capture: int = 0):
+    """with stage_events(capture=10) as ev: ... -- counts inside the block only."""
+    global _events
+    prev = _events
+    ev = _events = StageEvents(capture)
+    try:
+        yield ev
+    finally:
+        _events = prev
+
 # -------------------- Memberships, rules, aggregation, defuzz --------------------
 
 def trapezoid_mu(x: int, a: int, b: int, c: int, d: int) -> int:
@@ -76,26 +169,41 @@ def rules9_min(muTn: int, muTz: int, muTp: int, muDn: int, muDz: int, muDp: int)
     w20 = min(muTp, muDn); w21 = min(muTp, muDz); w22 = min(muTp, muDp)
     return w00, w01, w02, w10, w11, w12, w20, w21, w22
 
-def aggregate(reg_mode: int,
-              w: Tuple[int, int, int, int, int, int, int, int, int],
-              g: Tuple[int, int, int, int, int, int, int, int, int]) -> Tuple[int, int]:
-    """Aggregate weights and singletons; returns (sum_w, sum_wg) saturated to Q1.15."""
+def aggregate_terms(reg_mode: int,
+                    w: Tuple[int, int, int, int, int, int, int, int, int],
+                    g: Tuple[int, int, int, int, int, int, int, int, int]):
+    """
+    Aggregate before saturation: (mask, wg, sum_w, sum_wg). Bit i of 'mask' is set
+    for every rule that fires (w_i > 0; corner rules only with reg_mode=0), 'wg' are
+    the mul_q15_round(w_i, g_i) products. Shared by aggregate and Coverage.
+    """
     w00, w01, w02, w10, w11, w12, w20, w21, w22 = w
-    g00, g01, g02, g10, g11, g12, g20, g21, g22 = g
 
     if reg_mode == 0:
         # 4-rule mode disables center/edges
         w01 = w10 = w11 = w12 = w21 = 0
 
-    gq = [g2q15_percent(x) for x in (g00, g01, g02, g10, g11, g12, g20, g21, g22)]
-    wg = [mul_q15_round(wi, gi) for wi, gi in zip((w00, w01, w02, w10, w11, w12, w20, w21, w22), gq)]
+    wg = [mul_q15_round(wi, g2q15_percent(gi)) for wi, gi in zip((w00, w01, w02, w10, w11, w12, w20, w21, w22), g)]
+    mask = ((w00 > 0) | (w01 > 0) << 1 | (w02 > 0) << 2 | (w10 > 0) << 3 | (w11 > 0) << 4
+            | (w12 > 0) << 5 | (w20 > 0) << 6 | (w21 > 0) << 7 | (w22 > 0) << 8)
 
     sumw = int(w00) + int(w01) + int(w02) + int(w10) + int(w11) + int(w12) + int(w20) + int(w21) + int(w22)
     sumwg = int(wg[0]) + int(wg[1]) + int(wg[2]) + int(wg[3]) + int(wg[4]) + int(wg[5]) + int(wg[6]) + int(wg[7]) + int(wg[8])
+    return mask, wg, sumw, sumwg
+
+def aggregate(reg_mode: int,
+              w: Tuple[int, int, int, int, int, int, int, int, int],
+              g: Tuple[int, int, int, int, int, int, int, int, int]) -> Tuple[int, int]:
+    """Aggregate weights and singletons; returns (sum_w, sum_wg) saturated to Q1.15."""
+    _, _, sumw, sumwg = aggregate_terms(reg_mode, w, g)
 
-    S_w = sumw if sumw <= Q15_MAX else Q15_MAX
-    S_wg = sumwg if sumwg <= Q15_MAX else Q15_MAX
-    return S_w, S_wg
+    if sumw > Q15_MAX or sumwg > Q15_MAX:
+        if _events is not None:
+            _events.aggregate_clamp(reg_mode, w, g, sumw, sumwg)
+        S_w = sumw if sumw <= Q15_MAX else Q15_MAX
+        S_wg = sumwg if sumwg <= Q15_MAX else Q15_MAX
+        return S_w, S_wg
+    return sumw, sumwg
 
 def defuzz(S_w: int, S_wg: int) -> int:
     """Centroid-like percentage: identical rounding to RTL (+0.5 LSB before >>15)."""
@@ -103,6 +211,8 @@ def defuzz(S_w: int, S_wg: int) -> int:
     ratio_q15 = (int(S_wg) << 15) // den
     percent_u = (ratio_q15 * 100 + 16384) >> 15
     if percent_u > 100:
+        if _events is not None:
+            _events.hit("defuzz.gt100", {"S_w": S_w, "S_wg": S_wg, "percent": percent_u})
         percent_u = 100
     if percent_u < 0:
         percent_u = 0
@@ -160,6 +270,87 @@ DEFAULT_CFG = CoprocessorCfg(
     singletons=Singletons()
 )
 
+# -------------------- MMIO register image --------------------
+
+REG_THR_BASE = 0x10     # 0x10..0x1B T thresholds, 0x1C..0x27 dT thresholds (mmio_if)
+REG_THR_COUNT = 24
+REG_G_BASE = 0x30       # 0x30..0x38 singletons G00..G22 (percent)
+REG_G_COUNT = 9
+REG_EST_BASE = 0x39     # 0x39 ALPHA, 0x3A K_DT, 0x3B D_MAX (dT estimator)
+REG_EST_COUNT = 3
+_G_FIELDS = ("g00", "g01", "g02", "g10", "g11", "g12", "g20", "g21", "g22")
+
+def _mf_bytes(mf: MfSet3) -> List[int]:
+    return [v & 0xFF for t in (mf.neg, mf.zero, mf.pos) for v in (t.a, t.b, t.c, t.d)]
+
+def cfg_to_reg_image(cfg: CoprocessorCfg) -> bytes:
+    """Threshold registers 0x10..0x27 as written by the MCU (two's complement bytes)."""
+    return bytes(_mf_bytes(cfg.mf_T) + _mf_bytes(cfg.mf_dT))
+
+def reg_image_to_cfg(image: bytes, singletons: Singletons = Singletons()) -> CoprocessorCfg:
+    """Inverse of cfg_to_reg_image (singletons are not part of the threshold image)."""
+    if len(image) != REG_THR_COUNT:
+        raise ValueError(f"threshold image must be {REG_THR_COUNT} bytes")
+    v = [sxt(b, 8) for b in image]
+    def mfset(o: int) -> MfSet3:
+        return MfSet3(neg=MfThresholds(*v[o:o + 4]),
+                      zero=MfThresholds(*v[o + 4:o + 8]),
+                      pos=MfThresholds(*v[o + 8:o + 12]))
+    return CoprocessorCfg(mf_T=mfset(0), mf_dT=mfset(12), singletons=singletons)
+
+def singletons_to_reg_image(s: Singletons) -> bytes:
+    """Singleton registers 0x30..0x38 (G00, G01, ..., G22); clamped to 0..100 where g2q15 saturates anyway."""
+    return bytes(min(max(getattr(s, f), 0), 100) for f in _G_FIELDS)
+
+def reg_image_to_singletons(image: bytes) -> Singletons:
+    """Inverse of singletons_to_reg_image."""
+    if len(image) != REG_G_COUNT:
+        raise ValueError(f"singleton image must be {REG_G_COUNT} bytes")
+    return Singletons(*image)
+
+def reg_image_delta(old: Optional[bytes], new: bytes, base: int = REG_THR_BASE) -> List[Tuple[int, int]]:
+    """(addr, value) writes needed to go from 'old' to 'new'; old=None means unknown (write all)."""
+    return [(base + i, b) for i, b in enumerate(new) if old is None or old[i] != b]
+
+def _slope_mids(z: MfThresholds) -> List[int]:
+    return [(lo + hi) // 2 for lo, hi in ((z.a, z.b), (z.c, z.d)) if hi - lo > 1]
+
+def _axis_probes(mf: MfSet3, old: Optional[MfSet3]) -> List[int]:
+    """Slope midpoints of every MF that differs from 'old' (all MFs if old is None)."""
+    mids = set()
+    for k in ("neg", "zero", "pos"):
+        t = getattr(mf, k)
+        if old is None or getattr(old, k) != t:
+            mids.update(_slope_mids(t))
+    return sorted(mids)
+
+def spot_vectors(cfg: CoprocessorCfg, old: Optional[CoprocessorCfg] = None) -> List[Tuple[int, int]]:
+    """
+    (T, dT) points on the slopes of every MF whose thresholds differ from 'old'
+    (all MFs when old is None), where G depends on the uploaded thresholds. An
+    axis without changes is probed on its ZERO-MF slopes only.
+    """
+    Ts = _axis_probes(cfg.mf_T, old.mf_T if old is not None else None)
+    dTs = _axis_probes(cfg.mf_dT, old.mf_dT if old is not None else None)
+    Ts = Ts or _slope_mids(cfg.mf_T.zero) or [0]
+    dTs = dTs or _slope_mids(cfg.mf_dT.zero) or [0]
+    return [(T, dT) for T in Ts for dT in dTs]
+
+def make_profile(name: str, cfg: CoprocessorCfg, reg_mode: int = 1,
+                 estimator: Optional["EstimatorRTLExact"] = None,
+                 base: Optional[CoprocessorCfg] = None) -> dict:
+    """
+    Pico profile: threshold/singleton (and optional estimator) images plus golden
+    spot checks. With 'base' (the config the profile is applied on top of) only the
+    slopes of the MFs that change are probed.
+    """
+    golden = [[T, dT, top_step(T, dT, cfg, reg_mode)[0]] for T, dT in spot_vectors(cfg, base)]
+    prof = {"name": name, "image": list(cfg_to_reg_image(cfg)),
+            "g_image": list(singletons_to_reg_image(cfg.singletons)), "golden": golden}
+    if estimator is not None:
+        prof["est_image"] = list(estimator_to_reg_image(estimator))
+    return prof
+
 # -------------------- Estimators --------------------
 
 class SimpleDtEstimator:
@@ -215,17 +406,21 @@ class EstimatorRTLExact:
         self.T_prev = 0                 # s8
         self.dT_prev_q15 = 0            # s16
         self.dt_valid = False
+        self.clip_hit = 0               # last step: +1 clamped at +d_max, -1 at -d_max
+        self.trace = None               # trace_ring.TraceRing recording every step (dt_mode=1)
 
     def reset(self) -> None:
         self.T_prev = 0
         self.dT_prev_q15 = 0
         self.dt_valid = False
+        self.clip_hit = 0
 
     def init_pulse(self, T_cur: int) -> None:
         # Same sequence as RTL: capture T_cur, clear filter, dt_valid=0
         self.T_prev = sxt(T_cur, 8)
         self.dT_prev_q15 = 0
         self.dt_valid = False
+        self.clip_hit = 0
 
     def step(self, T_cur: int) -> Tuple[int, bool]:
         T_cur_s8 = sxt(T_cur, 8)
@@ -256,22 +451,32 @@ class EstimatorRTLExact:
         hi = dmax_q15
         lo = sxt(-dmax_q15, 16)
         clip = dT_new_q15
+        self.clip_hit = 0
         if clip > hi:
             clip = hi
+            self.clip_hit = 1
         if clip < lo:
             clip = lo
+            self.clip_hit = -1
+        if self.clip_hit and _events is not None:
+            _events.estimator_clamp(self.clip_hit,
+                                    {"T_cur": T_cur_s8, "T_prev": self.T_prev, "dT_prev_q15": self.dT_prev_q15,
+                                     "dT_new_q15": dT_new_q15, "d_max": self.d_max})
         clip = sxt(clip, 16)
 
-        # update state
-        self.T_prev = T_cur_s8
-        self.dT_prev_q15 = clip
-
         # dT_out = clip[14:7] with truncation exactly like RTL
         if clip < 0:
             dT_out_s8 = sxt(((clip + 127) >> 7) & 0xFF, 8)
         else:
             dT_out_s8 = sxt((clip >> 7) & 0xFF, 8)
 
+        if self.trace is not None:
+            self.trace.est(T_cur_s8, delta_scaled, self.dT_prev_q15, clip, dT_out_s8, self.clip_hit)
+
+        # update state
+        self.T_prev = T_cur_s8
+        self.dT_prev_q15 = clip
+
         was_valid = self.dt_valid
         self.dt_valid = True
         return dT_out_s8, was_valid
@@ -310,9 +515,203 @@ def top_step(T_in: int, dT_in: int, cfg: CoprocessorCfg, reg_mode: int,
 
     S_w, S_wg = aggregate(reg_mode, w, g)
     G = defuzz(S_w, S_wg)
+    if dt_mode == 1:
+        tr = getattr(estimator, "trace", None)
+        if tr is not None:
+            tr.fill(muT, muD, G)
     dbg = {"dT_sel": dT_sel, "dt_valid": dt_valid, "muT": muT, "muD": muD, "w": w, "S_w": S_w, "S_wg": S_wg}
     return G, dbg
 
+def series_trace(T_values, cfg: CoprocessorCfg, reg_mode: int = 1,
+                 estimator: Optional[object] = None) -> List[Tuple[int, int, int]]:
+    """
+    Time-series flow as run on hardware (dt_mode=1): a single INIT capturing the
+    first T, then one START per sample with only T_in updated. dt_estimator steps
+    once per accepted START, so the trace does not depend on bus timing (checked
+    clock by clock against mmio_model.ClockedMmio).
+    Returns [(T, dT_sel, G), ...] for comparison with the Pico run_series() log.
+    """
+    est = estimator if estimator is not None else EstimatorRTLExact()
+    trace = []
+    for i, T in enumerate(T_values):
+        if i == 0:
+            est.init_pulse(T)
+        G, dbg = top_step(T, 0, cfg, reg_mode, dt_mode=1, estimator=est)
+        trace.append((T, dbg["dT_sel"], G))
+    return trace
+
+def estimator_to_reg_image(est: EstimatorRTLExact) -> bytes:
+    """Estimator registers 0x39..0x3B (ALPHA, K_DT, D_MAX) for an EstimatorRTLExact setup."""
+    return bytes((est.alpha & 0xFF, est.k_dt & 0xFF, est.d_max & 0xFF))
+
+def reg_image_to_estimator(image: bytes) -> EstimatorRTLExact:
+    """Fresh EstimatorRTLExact configured like the hardware after writing 'image'."""
+    if len(image) != REG_EST_COUNT:
+        raise ValueError(f"estimator image must be {REG_EST_COUNT} bytes")
+    return EstimatorRTLExact(alpha=image[0], k_dt=image[1], d_max=image[2])
+
+# -------------------- Coverage --------------------
+
+MF_CLASSES = ("neg", "zero", "pos", "none")
+RULE_NAMES = ("w00", "w01", "w02", "w10", "w11", "w12", "w20", "w21", "w22")
+_RULES_RM0 = (0, 2, 6, 8)               # corner rules, the only ones active with reg_mode=0
+NEAR_EPS_MAX = 4                        # S_w of 1..4 LSB: near the EPS path (as in the TB)
+
+def dominant_mf(mu: Tuple[int, int, int]) -> int:
+    """Index of the dominant membership (neg=0, zero=1, pos=2, none=3); max3_idx_or_none in the TB."""
+    a, b, c = mu
+    if not (a or b or c):
+        return 3
+    if a >= b and a >= c:
+        return 0
+    if b >= c:
+        return 1
+    return 2
+
+class Coverage:
+    """
+    Functional coverage of the reference model, the Python side of the TB REQ-320
+    counters (update_cov_vars / cov_dump_summary). Bins:
+
+      dom_T, dom_dT   dominant MF per axis (MF_CLASSES)
+      cross           (T class, dT class, reg_mode, dt_mode), as cov_counts in the TB
+      rules           (reg_mode, rule index): samples where the rule fires (w > 0)
+      rule_sets       (reg_mode, 9-bit mask of firing rules)
+      sat             S_w / S_wg sums that saturated at Q15_MAX in aggregate
+      eps             defuzz denominator: "zero" (S_w = 0, EPS path), "near" (1..4 LSB), "normal"
+      est_clamp       dt_mode=1 steps clamped by the estimator at "+d_max" / "-d_max", or "none"
+
+    Rule masks and sums come from aggregate_terms, as in aggregate; the sat and
+    est_clamp counts are kept in a StageEvents collector (self.events), the same
+    classification the opt-in stage counters use.
+
+    State is plain dicts of int counts: state() pickles across worker processes and
+    merge() adds another collector or state; summary() is the JSON export.
+    """
+
+    GROUPS = ("dom_T", "dom_dT", "cross", "rules", "rule_sets", "eps")
+
+    def __init__(self):
+        self.samples = 0
+        self.est_steps = 0              # dt_mode=1 samples with an estimator
+        self.bins: Dict[str, Counter] = {g: Counter() for g in self.GROUPS}
+        self.events = StageEvents()
+
+    def _add(self, muT, muD, reg_mode: int, dt_mode: int, g, n: int = 1) -> None:
+        b = self.bins
+        t, d = dominant_mf(muT), dominant_mf(muD)
+        b["dom_T"][t] += n
+        b["dom_dT"][d] += n
+        b["cross"][(t, d, reg_mode, dt_mode)] += n
+        w = rules9_min(muT[0], muT[1], muT[2], muD[0], muD[1], muD[2])
+        mask, _, sumw, sumwg = aggregate_terms(reg_mode, w, g)
+        for i in range(9):
+            if mask >> i & 1:
+                b["rules"][(reg_mode, i)] += n
+        b["rule_sets"][(reg_mode, mask)] += n
+        if sumw > Q15_MAX or sumwg > Q15_MAX:
+            self.events.aggregate_clamp(reg_mode, w, g, sumw, sumwg, n)
+        b["eps"]["zero" if sumw == 0 else ("near" if sumw <= NEAR_EPS_MAX else "normal")] += n
+        self.samples += n
+
+    def sample(self, dbg: dict, cfg: CoprocessorCfg, reg_mode: int, dt_mode: int = 0,
+               estimator: Optional[object] = None) -> None:
+        """One top_step result (its dbg dict); for dt_mode=1 pass the estimator that was stepped."""
+        s = cfg.singletons
+        self._add(dbg["muT"], dbg["muD"], reg_mode, dt_mode,
+                  (s.g00, s.g01, s.g02, s.g10, s.g11, s.g12, s.g20, s.g21, s.g22))
+        if dt_mode == 1 and estimator is not None:
+            self.est_steps += 1
+            self.events.estimator_clamp(getattr(estimator, "clip_hit", 0), {})
+
+    def sample_batch(self, Ts: Iterable[int], dTs: Iterable[int], cfg: CoprocessorCfg,
+                     reg_mode: int) -> None:
+        """
+        dt_mode=0 batch: every distinct T and dT is fuzzified once and every distinct
+        (T memberships, dT memberships) pair is binned once with its multiplicity.
+        """
+        Ts, dTs = list(Ts), list(dTs)
+        if len(Ts) != len(dTs):
+            raise ValueError("Ts and dTs differ in length")
+        muT = {T: fuzzify(T, cfg.mf_T) for T in set(Ts)}
+        muD = {dT: fuzzify(dT, cfg.mf_dT) for dT in set(dTs)}
+        s = cfg.singletons
+        g = (s.g00, s.g01, s.g02, s.g10, s.g11, s.g12, s.g20, s.g21, s.g22)
+        for (mt, md), n in Counter(zip(map(muT.__getitem__, Ts), map(muD.__getitem__, dTs))).items():
+            self._add(mt, md, reg_mode, 0, g, n)
+
+    def state(self) -> dict:
+        """Picklable counts (for multiprocessing results)."""
+        return {"samples": self.samples, "est_steps": self.est_steps,
+                "bins": {k: dict(v) for k, v in self.bins.items()}, "events": self.events.state()}
+
+    def merge(self, other: Union["Coverage", dict]) -> "Coverage":
+        st = other.state() if isinstance(other, Coverage) else other
+        self.samples += st["samples"]
+        self.est_steps += st["est_steps"]
+        for k, v in st["bins"].items():
+            self.bins[k].update(v)
+        self.events.merge(st["events"])
+        return self
+
+    def _sat(self) -> Dict[str, int]:
+        return {k: self.events.counts["aggregate." + k] for k in ("S_w", "S_wg")}
+
+    def _est_clamp(self) -> Dict[str, int]:
+        c = {k: self.events.counts["estimator." + k] for k in ("+d_max", "-d_max")}
+        c["none"] = self.est_steps - c["+d_max"] - c["-d_max"]
+        return c
+
+    @classmethod
+    def merged(cls, parts: Iterable[Union["Coverage", dict]]) -> "Coverage":
+        cov = cls()
+        for p in parts:
+            cov.merge(p)
+        return cov
+
+    def holes(self) -> List[str]:
+        """Unhit bins: MF classes, cross bins and rules of the (reg_mode, dt_mode) seen, edge events."""
+        b = self.bins
+        out = ["dom_%s=%s" % (ax, MF_CLASSES[c]) for ax in ("T", "dT") for c in range(4)
+               if not b["dom_" + ax][c]]
+        modes = sorted({k[2:] for k in b["cross"]})
+        out += ["cross rm=%d dt=%d T=%s dT=%s" % (rm, dm, MF_CLASSES[t], MF_CLASSES[d])
+                for rm, dm in modes for t in range(4) for d in range(4) if not b["cross"][(t, d, rm, dm)]]
+        for rm in sorted({rm for rm, _ in modes}):
+            out += ["rule rm=%d %s" % (rm, RULE_NAMES[i]) for i in (range(9) if rm else _RULES_RM0)
+                    if not b["rules"][(rm, i)]]
+        out += ["sat=%s" % k for k, v in self._sat().items() if not v]
+        out += ["eps=%s" % k for k in ("zero", "near") if not b["eps"][k]]
+        if any(dm for _, dm in modes):
+            clamp = self._est_clamp()
+            out += ["est_clamp=%s" % k for k in ("+d_max", "-d_max") if not clamp[k]]
+        return out
+
+    def summary(self) -> dict:
+        """JSON-ready export: counts per bin (cross as 4x4 T x dT matrices per mode) and holes."""
+        b = self.bins
+        modes = sorted({k[2:] for k in b["cross"]})
+        return {
+            "samples": self.samples,
+            "dom_T": {MF_CLASSES[c]: b["dom_T"][c] for c in range(4)},
+            "dom_dT": {MF_CLASSES[c]: b["dom_dT"][c] for c in range(4)},
+            "cross": {"rm%d_dt%d" % (rm, dm): [[b["cross"][(t, d, rm, dm)] for d in range(4)] for t in range(4)]
+                      for rm, dm in modes},
+            "rules": {"rm%d" % rm: {RULE_NAMES[i]: b["rules"][(rm, i)] for i in range(9)}
+                      for rm in sorted({rm for rm, _ in modes})},
+            "rule_sets": {"rm%d" % rm: {"0x%03x" % m: n for (r, m), n in sorted(b["rule_sets"].items()) if r == rm}
+                          for rm in sorted({rm for rm, _ in b["rule_sets"]})},
+            "sat": self._sat(),
+            "eps": {k: b["eps"][k] for k in ("zero", "near", "normal")},
+            "est_clamp": self._est_clamp(),
+            "holes": self.holes(),
+        }
+
+    def write_json(self, path: str) -> None:
+        import json
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(), f, indent=1)
+
 # -------------------- CLI --------------------
 
 def _parse_int(s: str) -> int:
@@ -335,6 +734,9 @@ def main(argv: List[str] = None) -> int:
     # batch (dt_mode=0 only)
     p.add_argument("--csv", type=str, help="CSV with columns: T,dT (dt_mode=0 only)")
     p.add_argument("--out", type=str, help="write CSV with: T,dT,G_out,S_w,S_wg")
+    p.add_argument("--cache-dir", type=str,
+                   help="golden surface cache dir: --csv batches are looked up in the mapped planes")
+    p.add_argument("--coverage", type=str, help="write the coverage summary (JSON) of the --csv batch")
 
     # estimator options
     p.add_argument("--est", choices=["simple", "exact"], default="exact",
@@ -345,9 +747,37 @@ def main(argv: List[str] = None) -> int:
     p.add_argument("--no-est-init", action="store_true",
                    help="Do NOT perform implicit INIT capture before first step (default: INIT is performed)")
 
+    # configuration (all modes)
+    p.add_argument("--cfg", choices=["default", "tb"], default="default",
+                   help="default: mmio_if reset values (DEFAULT_CFG), tb: CoprocessorCfg() as in the TB")
+    p.add_argument("--thr-image", type=str, help="24 threshold register bytes (hex, 0x10..0x27) overriding --cfg")
+    p.add_argument("--g-image", type=str, help="9 singleton register bytes (hex, 0x30..0x38) overriding --cfg")
+
+    # Pico profile export
+    p.add_argument("--profile-out", type=str,
+                   help="write Pico profile JSON (threshold/singleton images + golden spot checks) and exit")
+    p.add_argument("--profile-est", action="store_true",
+                   help="include the estimator image (--alpha/--kdt/--dmax) in the profile")
+
     args = p.parse_args(argv)
 
-    cfg = DEFAULT_CFG
+    cfg = DEFAULT_CFG if args.cfg == "default" else CoprocessorCfg()
+    if args.thr_image or args.g_image:
+        try:
+            sg = reg_image_to_singletons(bytes.fromhex(args.g_image)) if args.g_image else cfg.singletons
+            cfg = reg_image_to_cfg(bytes.fromhex(args.thr_image), sg) if args.thr_image else \
+                CoprocessorCfg(mf_T=cfg.mf_T, mf_dT=cfg.mf_dT, singletons=sg)
+        except ValueError as e:
+            p.error(str(e))
+
+    if args.profile_out:
+        import json
+        pth = pathlib.Path(args.profile_out)
+        est_p = EstimatorRTLExact(alpha=args.alpha, k_dt=args.kdt, d_max=args.dmax) if args.profile_est else None
+        prof = make_profile(pth.stem, cfg, args.reg_mode, est_p)
+        pth.write_text(json.dumps(prof))
+        print(f"Saved: {pth}")
+        return 0
 
     est = None
     if args.dt_mode == 1:
@@ -369,14 +799,27 @@ def main(argv: List[str] = None) -> int:
         if args.dt_mode != 0:
             print("CSV batch only for dt_mode=0", file=sys.stderr)
             return 2
+        srf = None
+        if args.cache_dir:
+            from golden_surface import GoldenSurfaces, SurfaceCache
+            srf = GoldenSurfaces(cache=SurfaceCache(args.cache_dir)).surface(cfg, args.reg_mode)
         with open(args.csv, newline="") as f:
             rdr = csv.DictReader(f)
             for row in rdr:
                 T = _parse_int(row["T"])
                 dT = _parse_int(row["dT"])
-                G, dbg = top_step(T, dT, cfg, args.reg_mode, 0, None)
-                rows.append({"T": T, "dT": dT, "G_out": G, "S_w": dbg["S_w"], "S_wg": dbg["S_wg"]})
-                print(f"T={T:4d} dT={dT:4d} | G={G:3d} S_w={dbg['S_w']:5d} S_wg={dbg['S_wg']:5d}")
+                if srf is not None:
+                    S_w, S_wg, G = srf.point(T, dT)
+                else:
+                    G, dbg = top_step(T, dT, cfg, args.reg_mode, 0, None)
+                    S_w, S_wg = dbg["S_w"], dbg["S_wg"]
+                rows.append({"T": T, "dT": dT, "G_out": G, "S_w": S_w, "S_wg": S_wg})
+                print(f"T={T:4d} dT={dT:4d} | G={G:3d} S_w={S_w:5d} S_wg={S_wg:5d}")
+        if args.coverage:
+            cov = Coverage()
+            cov.sample_batch([r["T"] for r in rows], [r["dT"] for r in rows], cfg, args.reg_mode)
+            cov.write_json(args.coverage)
+            print(f"Coverage: {args.coverage} ({len(cov.holes())} holes)")
     else:
         if args.T is None:
             print("Provide --T (and --dT) or --csv", file=sys.stderr)
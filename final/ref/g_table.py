@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+g_table.py - Run-length G table of one (cfg, reg_mode) for the Pico live self-check.
+
+The raw G plane is 64 KB. Here every T row is stored as runs of constant G over dT,
+and identical rows (T values with the same membership triple) are stored once:
+
+    header   GTAB_HDR: magic, reg_mode, row count, run count, threshold + singleton images
+    rowmap   256 x u8       unique row id of T = -128..127
+    offsets  (rows+1) x u32 LE  first run of each unique row
+    starts   runs x u8      dT + 128 where the run begins (0 for the first run of a row)
+    values   runs x u8      G of the run
+
+A lookup is one rowmap byte plus a binary search over the starts of that row, so it
+is O(log runs_per_row) and allocation-free. main.py (GTable) reads the same file;
+the images in the header let it warn when the table does not match the uploaded
+config.
+
+    python g_table.py --out gtab_default.bin
+    python g_table.py --profile prof_tb.json --out gtab_tb.bin
+"""
+
+import struct
+import sys
+from typing import List, Optional, Tuple
+
+from fuzzy_refmodel import (
+    DEFAULT_CFG, CoprocessorCfg, cfg_to_reg_image, reg_image_to_cfg, reg_image_to_singletons,
+    singletons_to_reg_image,
+)
+from golden_surface import N_AXIS, GoldenSurfaces
+
+GTAB_MAGIC = b"FZG1"
+GTAB_HDR = struct.Struct("<4sBxHI24s9s3x")     # magic, reg_mode, rows, runs, thr, g
+
+def encode_plane(plane: bytes) -> Tuple[bytes, List[int], bytes, bytes]:
+    """(rowmap, offsets, starts, values) of a flat 256x256 G plane."""
+    if len(plane) != N_AXIS * N_AXIS:
+        raise ValueError("G plane must be %d bytes" % (N_AXIS * N_AXIS))
+    rowmap = bytearray(N_AXIS)
+    uniq = {}
+    offsets = [0]
+    starts, values = bytearray(), bytearray()
+    for r in range(N_AXIS):
+        row = plane[r << 8:(r + 1) << 8]
+        u = uniq.get(row)
+        if u is None:
+            u = uniq[row] = len(uniq)
+            prev = -1
+            for x, G in enumerate(row):
+                if G != prev:
+                    starts.append(x)
+                    values.append(G)
+                    prev = G
+            offsets.append(len(starts))
+        rowmap[r] = u
+    return bytes(rowmap), offsets, bytes(starts), bytes(values)
+
+def table_bytes(plane: bytes, reg_mode: int, cfg: CoprocessorCfg) -> bytes:
+    rowmap, offsets, starts, values = encode_plane(plane)
+    hdr = GTAB_HDR.pack(GTAB_MAGIC, reg_mode, len(offsets) - 1, len(starts),
+                        cfg_to_reg_image(cfg), singletons_to_reg_image(cfg.singletons))
+    return hdr + rowmap + struct.pack("<%dI" % len(offsets), *offsets) + starts + values
+
+class GTable:
+    """Decoded view of a table file (same lookup as GTable in final/pico/main.py)."""
+
+    def __init__(self, data: bytes):
+        magic, self.reg_mode, rows, runs, thr, g = GTAB_HDR.unpack_from(data)
+        if magic != GTAB_MAGIC:
+            raise ValueError("not a G table (bad magic)")
+        o = GTAB_HDR.size
+        if len(data) != o + N_AXIS + 4 * (rows + 1) + 2 * runs:
+            raise ValueError("G table: bad size %d" % len(data))
+        self.cfg = reg_image_to_cfg(thr, reg_image_to_singletons(g))
+        self.rowmap = data[o:o + N_AXIS]
+        o += N_AXIS
+        self.offsets = list(struct.unpack_from("<%dI" % (rows + 1), data, o))
+        o += 4 * (rows + 1)
+        self.starts = data[o:o + runs]
+        self.values = data[o + runs:o + 2 * runs]
+        self.rows, self.runs = rows, runs
+
+    @classmethod
+    def load(cls, path: str) -> "GTable":
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def g(self, T: int, dT: int) -> int:
+        r = self.rowmap[T + 128]
+        lo, hi = self.offsets[r], self.offsets[r + 1]
+        x, s = dT + 128, self.starts
+        while hi - lo > 1:
+            m = (lo + hi) >> 1
+            if s[m] <= x:
+                lo = m
+            else:
+                hi = m
+        return self.values[lo]
+
+    def plane(self) -> bytes:
+        """Expanded 256x256 G plane, flat at golden_surface.surface_index(T, dT)."""
+        rows = []
+        for r in range(self.rows):
+            lo, hi = self.offsets[r], self.offsets[r + 1]
+            ends = list(self.starts[lo + 1:hi]) + [N_AXIS]
+            rows.append(b"".join(bytes((self.values[i],)) * (ends[i - lo] - self.starts[i])
+                                 for i in range(lo, hi)))
+        return b"".join(rows[u] for u in self.rowmap)
+
+def write_table(path: str, cfg: CoprocessorCfg, reg_mode: int = 1,
+                surfaces: Optional[GoldenSurfaces] = None) -> int:
+    """Write the table of (cfg, reg_mode); returns its size in bytes."""
+    surfaces = surfaces if surfaces is not None else GoldenSurfaces()
+    data = table_bytes(surfaces.surface(cfg, reg_mode).plane(), reg_mode, cfg)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(data)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    import json
+    ap = argparse.ArgumentParser(description="Run-length G table for the Pico self-check")
+    ap.add_argument("--out", required=True, help="table file (gtab_<profile>.bin next to prof_<profile>.json)")
+    ap.add_argument("--profile", help="Pico profile JSON (image/g_image); default: DEFAULT_CFG")
+    ap.add_argument("--reg-mode", type=int, default=1, choices=[0, 1])
+    args = ap.parse_args(argv)
+    cfg = DEFAULT_CFG
+    if args.profile:
+        with open(args.profile) as f:
+            prof = json.load(f)
+        s = reg_image_to_singletons(bytes(prof["g_image"])) if "g_image" in prof else DEFAULT_CFG.singletons
+        cfg = reg_image_to_cfg(bytes(v & 0xFF for v in prof["image"]), s)
+    n = write_table(args.out, cfg, args.reg_mode)
+    print("Saved: %s (%d bytes, raw plane %d)" % (args.out, n, N_AXIS * N_AXIS))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+golden_surface.py - Compiled G / S_w / S_wg planes of the reference model.
+
+A Surface holds the dt_mode=0 outputs for every (T, dT) in -128..127 x -128..127
+for one (cfg, reg_mode), flat at index ((T + 128) << 8) | (dT + 128). The plane is
+built from the model's fuzzify / rules9_min / aggregate / defuzz stages, not from
+top_step: each axis is fuzzified once, aggregate+defuzz runs once per distinct
+weight vector and rows sharing a T membership triple are copied, so a full plane
+costs a fraction of 65536 top_step calls.
+
+GoldenSurfaces caches planes per (cfg, reg_mode); the pytest suites share one
+instance through the session-scoped `golden` fixture. `model` is any module with
+the four stage functions (final/ref or python/ fuzzy_refmodel).
+
+While the model's stage events are enabled (fuzzy_refmodel.stage_events) the
+compiled planes would hide the clamps -- a stage runs once per distinct weight
+vector, or never for a mapped file -- so GoldenSurfaces then hands out a
+DirectSurface instead, which runs the stages on every lookup and counts them as
+top_step would.
+
+SurfaceCache keeps compiled planes on disk across processes, content-addressed by
+a sha256 of the serialized cfg, reg_mode and a tag hashed from the model's stage
+source (an edit to the arithmetic invalidates old files). Files are mapped
+read-only with mmap, so a warm load costs a file open; eviction is LRU by mtime
+under a byte budget.
+
+    python golden_surface.py --cache-dir ~/.cache/fuzzy_surfaces --at=-10,5
+"""
+
+import dataclasses
+import hashlib
+import inspect
+import json
+import mmap
+import os
+import sys
+from array import array
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import fuzzy_refmodel
+from fuzzy_refmodel import CoprocessorCfg
+
+N_AXIS = 256
+
+def surface_index(T: int, dT: int) -> int:
+    """Flat plane index of an s8 (T, dT) pair."""
+    return ((T + 128) << 8) | (dT + 128)
+
+class Surface:
+    """
+    G, S_w and S_wg of one (cfg, reg_mode) over the full s8 x s8 input plane.
+    Rows (one T, all dT) are filled on first lookup; rows whose T membership triple
+    was seen before are copied, so sparse users (a grid, one VIS line) stay cheap.
+    """
+
+    def __init__(self, cfg: CoprocessorCfg, reg_mode: int = 1, model=fuzzy_refmodel):
+        s = cfg.singletons
+        self.cfg = cfg
+        self.reg_mode = reg_mode
+        self.model = model
+        self._g = (s.g00, s.g01, s.g02, s.g10, s.g11, s.g12, s.g20, s.g21, s.g22)
+        self._muT = [model.fuzzify(x, cfg.mf_T) for x in range(-128, 128)]
+        # many dT share a membership triple (shoulders, plateaus): evaluate the distinct ones
+        uD: Dict[Tuple[int, int, int], int] = {}
+        self._colD = [uD.setdefault(model.fuzzify(x, cfg.mf_dT), len(uD)) for x in range(-128, 128)]
+        self._uD = list(uD)
+        self._memo: Dict[tuple, Tuple[int, int, int]] = {}
+        self._rows: Dict[Tuple[int, int, int], int] = {}
+        self.G = bytearray(b"\xff" * (N_AXIS * N_AXIS))   # 0xFF: row not filled yet
+        self.S_w = array("H", bytes(2 * N_AXIS * N_AXIS))
+        self.S_wg = array("H", bytes(2 * N_AXIS * N_AXIS))
+
+    @classmethod
+    def mapped(cls, cfg: CoprocessorCfg, reg_mode: int, model, mm: mmap.mmap) -> "Surface":
+        """Fully evaluated surface backed by a mapped SurfaceCache file."""
+        srf = cls.__new__(cls)
+        srf.cfg, srf.reg_mode, srf.model = cfg, reg_mode, model
+        view = memoryview(mm)
+        srf.G = view[_HDR:_HDR + _PLANE]
+        if sys.byteorder == "little":
+            srf.S_w = view[_HDR + _PLANE:_HDR + 3 * _PLANE].cast("H")
+            srf.S_wg = view[_HDR + 3 * _PLANE:_HDR + 5 * _PLANE].cast("H")
+        else:
+            srf.S_w, srf.S_wg = array("H"), array("H")
+            srf.S_w.frombytes(view[_HDR + _PLANE:_HDR + 3 * _PLANE])
+            srf.S_wg.frombytes(view[_HDR + 3 * _PLANE:_HDR + 5 * _PLANE])
+            srf.S_w.byteswap()
+            srf.S_wg.byteswap()
+        srf._mm = mm
+        return srf
+
+    def _fill(self, r: int) -> None:
+        t = self._muT[r]
+        base = r << 8
+        src = self._rows.get(t)
+        if src is not None:
+            self.G[base:base + N_AXIS] = self.G[src:src + N_AXIS]
+            self.S_w[base:base + N_AXIS] = self.S_w[src:src + N_AXIS]
+            self.S_wg[base:base + N_AXIS] = self.S_wg[src:src + N_AXIS]
+            return
+        m = self.model
+        rules9_min, aggregate, defuzz = m.rules9_min, m.aggregate, m.defuzz
+        memo, g, reg_mode = self._memo, self._g, self.reg_mode
+        vals = []
+        for d in self._uD:
+            w = rules9_min(t[0], t[1], t[2], d[0], d[1], d[2])
+            v = memo.get(w)
+            if v is None:
+                S_w, S_wg = aggregate(reg_mode, w, g)
+                v = memo[w] = (S_w, S_wg, defuzz(S_w, S_wg))
+            vals.append(v)
+        G, S_w, S_wg = self.G, self.S_w, self.S_wg
+        i = base
+        for c in self._colD:
+            S_w[i], S_wg[i], G[i] = vals[c]
+            i += 1
+        self._rows[t] = base
+
+    def g(self, T: int, dT: int) -> int:
+        i = ((T + 128) << 8) | (dT + 128)
+        v = self.G[i]
+        if v == 0xFF:
+            self._fill(T + 128)
+            v = self.G[i]
+        return v
+
+    def point(self, T: int, dT: int) -> Tuple[int, int, int]:
+        """(S_w, S_wg, G) at (T, dT)."""
+        i = ((T + 128) << 8) | (dT + 128)
+        if self.G[i] == 0xFF:
+            self._fill(T + 128)
+        return self.S_w[i], self.S_wg[i], self.G[i]
+
+    def plane(self) -> bytes:
+        """Whole G plane, flat at surface_index(T, dT)."""
+        for r in range(N_AXIS):
+            if self.G[r << 8] == 0xFF:
+                self._fill(r)
+        return bytes(self.G)
+
+class DirectSurface:
+    """Surface lookups evaluated through the model stages every time (no memo, no cache)."""
+
+    def __init__(self, cfg: CoprocessorCfg, reg_mode: int = 1, model=fuzzy_refmodel):
+        s = cfg.singletons
+        self.cfg = cfg
+        self.reg_mode = reg_mode
+        self.model = model
+        self._g = (s.g00, s.g01, s.g02, s.g10, s.g11, s.g12, s.g20, s.g21, s.g22)
+
+    def point(self, T: int, dT: int) -> Tuple[int, int, int]:
+        m = self.model
+        t, d = m.fuzzify(T, self.cfg.mf_T), m.fuzzify(dT, self.cfg.mf_dT)
+        S_w, S_wg = m.aggregate(self.reg_mode, m.rules9_min(t[0], t[1], t[2], d[0], d[1], d[2]), self._g)
+        return S_w, S_wg, m.defuzz(S_w, S_wg)
+
+    def g(self, T: int, dT: int) -> int:
+        return self.point(T, dT)[2]
+
+    def plane(self) -> bytes:
+        return bytes(self.point(T, dT)[2] for T in range(-128, 128) for dT in range(-128, 128))
+
+def compile_surface(cfg: CoprocessorCfg, reg_mode: int = 1, model=fuzzy_refmodel) -> Surface:
+    """Fully evaluated surface."""
+    srf = Surface(cfg, reg_mode, model)
+    srf.plane()
+    return srf
+
+# -------------------- On-disk cache --------------------
+
+SURFACE_MAGIC = b"GSRF\x01\x00\x00\x00"
+_HDR = len(SURFACE_MAGIC) + 32          # magic + sha256 key
+_PLANE = N_AXIS * N_AXIS
+SURFACE_FILE_SIZE = _HDR + 5 * _PLANE   # G (u8), S_w, S_wg (u16 LE)
+_MODEL_STAGES = ("trapezoid_mu", "fuzzify", "rules9_min", "g2q15_percent", "mul_q15_round",
+                 "aggregate_terms", "aggregate", "defuzz")
+
+def model_tag(model=fuzzy_refmodel) -> str:
+    """Version tag of the model arithmetic: hash of the stage functions' source."""
+    h = hashlib.sha256()
+    for name in _MODEL_STAGES:
+        fn = getattr(model, name, None)
+        try:
+            h.update(inspect.getsource(fn).encode())
+        except (OSError, TypeError):
+            h.update(("%s:%s" % (getattr(model, "__name__", "?"), name)).encode())
+    return h.hexdigest()[:16]
+
+def surface_key(cfg: CoprocessorCfg, reg_mode: int, tag: str) -> str:
+    """Content address of one surface: serialized cfg + reg_mode + model tag."""
+    blob = json.dumps({"cfg": dataclasses.asdict(cfg), "reg_mode": reg_mode, "model": tag},
+                      sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+class SurfaceCache:
+    """
+    Directory of compiled surfaces, one <key>.srf file each, mapped read-only on load.
+    A hit refreshes the file's mtime; store() evicts least recently used files until
+    the directory fits in max_bytes.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 64 << 20, model=None):
+        self.dir = cache_dir
+        self.max_bytes = max_bytes
+        self.model = model if model is not None else fuzzy_refmodel
+        self.tag = model_tag(self.model)
+        self.hits = self.misses = self.evicted = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.dir, key + ".srf")
+
+    def load(self, cfg: CoprocessorCfg, reg_mode: int) -> Optional[Surface]:
+        key = surface_key(cfg, reg_mode, self.tag)
+        pth = self.path(key)
+        try:
+            with open(pth, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        if len(mm) != SURFACE_FILE_SIZE or mm[:_HDR] != SURFACE_MAGIC + bytes.fromhex(key):
+            mm.close()
+            self._remove(pth)           # truncated or foreign file: rebuild
+            self.misses += 1
+            return None
+        try:
+            os.utime(pth)
+        except OSError:
+            pass
+        self.hits += 1
+        return Surface.mapped(cfg, reg_mode, self.model, mm)
+
+    def store(self, srf: Surface) -> str:
+        """Write a (fully evaluated) surface atomically; returns its path."""
+        key = surface_key(srf.cfg, srf.reg_mode, self.tag)
+        pth = self.path(key)
+        G = srf.plane()
+        S_w, S_wg = array("H", srf.S_w), array("H", srf.S_wg)
+        if sys.byteorder == "big":
+            S_w.byteswap()
+            S_wg.byteswap()
+        tmp = "%s.%d.tmp" % (pth, os.getpid())
+        with open(tmp, "wb") as f:
+            f.write(SURFACE_MAGIC + bytes.fromhex(key))
+            f.write(G)
+            f.write(S_w.tobytes())
+            f.write(S_wg.tobytes())
+        os.replace(tmp, pth)
+        self.evict(keep=pth)
+        return pth
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Drop least recently used surfaces while the cache exceeds max_bytes."""
+        files = []
+        for name in os.listdir(self.dir):
+            if name.endswith(".srf"):
+                p = os.path.join(self.dir, name)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+        total = sum(sz for _, sz, _ in files)
+        n = 0
+        for _, sz, p in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if p == keep:
+                continue
+            if self._remove(p):
+                total -= sz
+                n += 1
+        self.evicted += n
+        return n
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+class GoldenSurfaces:
+    """
+    Per-(cfg, reg_mode) cache of surfaces. Without a SurfaceCache surfaces are
+    filled lazily; with one they are mapped from disk or compiled in full and stored.
+    At most max_surfaces are kept (~320 KiB each), least recently used dropped first.
+    With the model's stage events enabled, surface() returns an uncached DirectSurface;
+    surfaces handed out earlier keep the compiled (uncounted) path.
+    """
+
+    def __init__(self, model=None, cache: Optional[SurfaceCache] = None, max_surfaces: int = 64):
+        self.model = model if model is not None else fuzzy_refmodel
+        self.disk = cache
+        self.max_surfaces = max_surfaces
+        self._cache: "OrderedDict[tuple, Surface]" = OrderedDict()
+        self.compiled = 0
+
+    def surface(self, cfg: CoprocessorCfg, reg_mode: int = 1) -> Surface:
+        if getattr(self.model, "_events", None) is not None:
+            return DirectSurface(cfg, reg_mode, self.model)
+        key = (cfg.mf_T, cfg.mf_dT, cfg.singletons, reg_mode)
+        srf = self._cache.get(key)
+        if srf is None:
+            srf = self.disk.load(cfg, reg_mode) if self.disk is not None else None
+            if srf is None:
+                srf = Surface(cfg, reg_mode, self.model)
+                self.compiled += 1
+                if self.disk is not None:
+                    self.disk.store(srf)
+            self._cache[key] = srf
+            while len(self._cache) > self.max_surfaces:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return srf
+
+    def g(self, cfg: CoprocessorCfg, reg_mode: int, T: int, dT: int) -> int:
+        return self.surface(cfg, reg_mode).g(T, dT)
+
+    def point(self, cfg: CoprocessorCfg, reg_mode: int, T: int, dT: int) -> Tuple[int, int, int]:
+        return self.surface(cfg, reg_mode).point(T, dT)
+
+    def evaluator(self, cfg: CoprocessorCfg, reg_mode: int = 1):
+        """eval_fn(T, dT) -> G for adaptive_sweep, backed by the compiled plane."""
+        return self.surface(cfg, reg_mode).g
+
+def main(argv: Optional[list] = None) -> int:
+    import argparse
+    import time
+    from fuzzy_refmodel import DEFAULT_CFG
+    ap = argparse.ArgumentParser(description="Compile a golden surface and look up points")
+    ap.add_argument("--reg-mode", type=int, default=1)
+    ap.add_argument("--at", action="append", default=[], metavar="T,dT",
+                    help="point to print (repeatable, e.g. --at=-10,5)")
+    ap.add_argument("--cache-dir", help="on-disk surface cache (mapped on later runs)")
+    ap.add_argument("--cache-mb", type=int, default=64, help="cache size budget, MiB")
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    if args.cache_dir:
+        gs = GoldenSurfaces(cache=SurfaceCache(args.cache_dir, args.cache_mb << 20))
+        srf = gs.surface(DEFAULT_CFG, args.reg_mode)
+        how = "mapped" if gs.disk.hits else "compiled+stored"
+    else:
+        srf, how = compile_surface(DEFAULT_CFG, args.reg_mode), "compiled"
+    print("%s in %.3f s" % (how, time.perf_counter() - t0))
+    for p in args.at:
+        T, dT = (int(v, 0) for v in p.split(","))
+        print("T=%d dT=%d S_w=%d S_wg=%d G=%d" % ((T, dT) + srf.point(T, dT)))
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,777 @@
+#!/usr/bin/env python3
+"""
+mmio_model.py - Clock-level Python models of mmio_if + top_coprocessor (final/sv).
+
+StreamingMmio follows the STREAM mode of mmio_if register by register: input FIFO
+push on the FIFO_DT write edge, auto-start when the core is idle, result FIFO push
+on the core's valid pulse and pop at the end of a FIFO_G read. The core is the SV
+IDLE/RUN/DONE FSM with the registered defuzz stage, so one evaluation occupies
+four clocks from auto-start to the result FIFO. G values come from fuzzy_refmodel.
+
+BurstRegFile is a transaction-level model of the BURST_ADDR/BURST_DATA
+auto-increment path, counting data strobes and address changes on the bus.
+
+DoneIrq, ResultReg and completion_cost model the done_irq output and the
+clear-on-read RESULT register against STATUS polling at bus-transaction
+granularity, to compare transactions per result.
+
+ClockedMmio runs the whole mmio_if + top_coprocessor pair clock by clock from a
+bus-transaction trace (driver_trace builds the traces of the Pico driver
+functions) and reports clocks per result and core idle ratio. Bus phases in
+which nothing but the G pipeline still moves are fast-forwarded, idle bus phases
+(setup, gap, idle waits) are skipped without evaluating a clock, and G comes from
+a lazily filled golden surface, so traces of 10^6 transactions take seconds. Run
+as a script for a per-strategy summary.
+"""
+
+from collections import deque
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fuzzy_refmodel import (
+    DEFAULT_CFG, REG_EST_BASE, REG_EST_COUNT, REG_G_BASE, REG_G_COUNT, REG_THR_BASE,
+    REG_THR_COUNT, CoprocessorCfg, EstimatorRTLExact, cfg_to_reg_image, estimator_to_reg_image,
+    reg_image_to_cfg, reg_image_to_estimator, reg_image_to_singletons, singletons_to_reg_image,
+    sxt, top_step,
+)
+from golden_surface import GoldenSurfaces, Surface
+
+FIFO_DEPTH = 16
+REG_BURST_ADDR = 0x2D
+REG_BURST_DATA = 0x2E
+REG_RESULT = 0x3C
+RES_FRESH = 0x80
+
+S_IDLE, S_RUN, S_DONE = 0, 1, 2
+
+Vector = Tuple[int, int]
+
+# -------------------- Streaming FIFO mode --------------------
+
+class StreamingMmio:
+    """Cycle-accurate model of STREAM mode (dt_mode=0: dT comes from the FIFO)."""
+
+    def __init__(self, cfg: CoprocessorCfg, reg_mode: int = 1, depth: int = FIFO_DEPTH):
+        self.cfg = cfg
+        self.reg_mode = reg_mode
+        self.depth = depth
+        self._chain: Dict[Vector, int] = {}    # combinational fuzzify..defuzz, memoized
+        self.reset()
+
+    def reset(self) -> None:
+        self.in_fifo: deque = deque()
+        self.out_fifo: deque = deque()
+        self.stream = True
+        self.busy = False
+        self.fifo_ovf = False
+        self.start_w1 = False
+        self.start_q = False
+        self.st = S_IDLE
+        self.valid = False
+        self.T_in = 0
+        self.dT_in = 0
+        self.G_q = 0
+        self.G_out = 0
+        self.cycle = 0
+
+    # ---- register view ----
+    @property
+    def in_level(self) -> int:
+        return len(self.in_fifo)
+
+    @property
+    def out_level(self) -> int:
+        return len(self.out_fifo)
+
+    @property
+    def status(self) -> int:
+        """STATUS: {4'b0, fifo_ovf, out_nonempty, in_full, valid}."""
+        return ((self.fifo_ovf << 3) | (bool(self.out_fifo) << 2)
+                | ((len(self.in_fifo) == self.depth) << 1) | int(self.valid))
+
+    def _g(self, T: int, dT: int) -> int:
+        k = (T, dT)
+        G = self._chain.get(k)
+        if G is None:
+            G = self._chain[k] = top_step(T, dT, self.cfg, self.reg_mode)[0]
+        return G
+
+    # ---- clock ----
+    def tick(self, push: Optional[Vector] = None, pop: bool = False) -> Optional[int]:
+        """
+        Advance one clock edge. 'push' is a FIFO_DT write edge in this cycle,
+        'pop' the end of a FIFO_G read. Returns the popped G, if any.
+        """
+        # combinational signals of the current cycle
+        start_pulse = self.start_w1 and not self.start_q
+        auto_start = (self.stream and not self.busy and bool(self.in_fifo)
+                      and len(self.out_fifo) < self.depth)
+        out_push = self.busy and self.valid
+        if self.st == S_IDLE:
+            st_n = S_RUN if start_pulse else S_IDLE
+        else:
+            st_n = S_DONE if self.st == S_RUN else S_IDLE
+
+        # clock edge (right-hand sides are all pre-edge values)
+        popped = self.out_fifo.popleft() if (pop and self.out_fifo) else None
+        if out_push:
+            self.out_fifo.append(self.G_out)
+            self.busy = False
+        self.G_out = self.G_q
+        self.G_q = self._g(self.T_in, self.dT_in)
+        self.valid = st_n == S_DONE
+        self.st = st_n
+        self.start_q = self.start_w1
+        self.start_w1 = False
+        accept = push is not None and len(self.in_fifo) < self.depth
+        if auto_start:
+            self.T_in, self.dT_in = self.in_fifo.popleft()
+            self.start_w1 = True
+            self.busy = True
+        if accept:
+            self.in_fifo.append(push)
+        elif push is not None:
+            self.fifo_ovf = True
+        self.cycle += 1
+        return popped
+
+    def run(self, vectors: Sequence[Vector], max_cycles: int = 1 << 24) -> Tuple[List[int], int]:
+        """
+        Ideal host: one push and one pop per clock whenever the FIFOs allow.
+        Returns (results in pop order, clocks until the last result was popped).
+        """
+        out: List[int] = []
+        i = 0
+        c0 = self.cycle
+        while len(out) < len(vectors):
+            if self.cycle - c0 >= max_cycles:
+                raise RuntimeError("stream stalled after %d results" % len(out))
+            push = None
+            if i < len(vectors) and len(self.in_fifo) < self.depth:
+                push = vectors[i]
+                i += 1
+            G = self.tick(push, pop=bool(self.out_fifo))
+            if G is not None:
+                out.append(G)
+        return out, self.cycle - c0
+
+def stream_throughput(vectors: Sequence[Vector], cfg: CoprocessorCfg,
+                      reg_mode: int = 1) -> Tuple[List[int], float]:
+    """Stream 'vectors' through a fresh model; returns (results, results per clock)."""
+    out, cycles = StreamingMmio(cfg, reg_mode).run(vectors)
+    return out, len(out) / cycles if cycles else 0.0
+
+# -------------------- Auto-increment burst --------------------
+
+class BurstRegFile:
+    """Write side of mmio_if with burst redirection; counts bus cost per write."""
+
+    def __init__(self):
+        self.regs = bytearray(256)
+        self.burst_ptr = 0
+        self.strobes = 0                # WR strobes
+        self.addr_drives = 0            # writes that had to change the address lines
+        self._addr: Optional[int] = None
+
+    def write(self, addr: int, val: int) -> None:
+        if addr != self._addr:
+            self.addr_drives += 1
+            self._addr = addr
+        self.strobes += 1
+        val &= 0xFF
+        burst = addr == REG_BURST_DATA
+        waddr = self.burst_ptr if burst else addr
+        if waddr == REG_BURST_ADDR:
+            self.burst_ptr = val
+        else:
+            self.regs[waddr] = val
+        if burst:                       # end-of-strobe increment wins, as in RTL
+            self.burst_ptr = (waddr + 1) & 0xFF
+
+    def apply(self, ops: Sequence[Tuple[int, int]]) -> None:
+        for a, v in ops:
+            self.write(a, v)
+
+def burst_ops(base: int, data: Sequence[int]) -> List[Tuple[int, int]]:
+    """Bus writes of write_burst(base, data) on the Pico."""
+    return [(REG_BURST_ADDR, base)] + [(REG_BURST_DATA, v & 0xFF) for v in data]
+
+# -------------------- DONE/IRQ completion --------------------
+
+class DoneIrq:
+    """
+    done_irq of mmio_if: set by the result, cleared by START or a G read (set wins).
+    A G read that takes several clocks is begin_read() ... end_read(): the level is
+    sampled when the read begins and cleared at its end only if the sample was set
+    and no result landed in between.
+    """
+
+    def __init__(self):
+        self.level = False
+        self._clr = False
+
+    def tick(self, done: bool = False, start: bool = False, rd_g: bool = False) -> bool:
+        if rd_g:
+            self.begin_read()
+            self.end_read()
+        if start:
+            self.level = False
+        if done:
+            self.level = True
+            self._clr = False
+        return self.level
+
+    def begin_read(self) -> None:
+        self._clr = self.level
+
+    def end_read(self) -> None:
+        if self._clr:
+            self.level = False
+        self._clr = False
+
+class ResultReg:
+    """
+    RESULT (0x3C) = {fresh, G[6:0]}: fresh set with the result, cleared by START or a
+    read. read() is one atomic transaction; begin_read()/end_read() split it at the
+    RTL sample point (first clock of the strobe) and the end of the strobe.
+    """
+
+    def __init__(self):
+        self.fresh = False
+        self.G = 0
+        self._clr = False
+
+    def done(self, G: int) -> None:
+        self.fresh = True
+        self.G = G & 0x7F
+        self._clr = False               # a pending clear belongs to the old result
+
+    def start(self) -> None:
+        self.fresh = False
+
+    def begin_read(self) -> int:
+        """Sample RESULT; the value is held for the rest of the strobe."""
+        self._clr = self.fresh
+        return (RES_FRESH if self.fresh else 0) | self.G
+
+    def end_read(self) -> None:
+        if self._clr:
+            self.fresh = False
+        self._clr = False
+
+    def read(self) -> int:
+        v = self.begin_read()
+        self.end_read()
+        return v
+
+class CompletionStats(NamedTuple):
+    results: int
+    transactions: int
+    polls: int                          # STATUS reads
+    clocks: int
+
+    @property
+    def per_result(self) -> float:
+        return self.transactions / self.results if self.results else 0.0
+
+def completion_cost(strategy: str, n: int, core_clks: int = 10, txn_clks: int = 2000,
+                    setup_writes: int = 5, poll_gap_clks: int = 0,
+                    wake_clks: int = 200) -> CompletionStats:
+    """
+    Bus cost of n single-shot evaluations with 'poll' (read STATUS until the sticky
+    valid is seen, then G), 'irq' (wait for done_irq, then read G once) or
+    'result' (read RESULT until its fresh bit is set; that read carries G).
+    setup_writes are the CTRL/T/dT/INIT/START writes; START takes effect at the
+    end of the last one. Times are in core clocks (txn_clks=2000: 100 us at 20 MHz).
+    """
+    if strategy not in ("poll", "irq", "result"):
+        raise ValueError("strategy must be 'poll', 'irq' or 'result'")
+    irq = DoneIrq()
+    res = ResultReg()
+    t = txns = polls = 0
+    for _ in range(n):
+        t += setup_writes * txn_clks
+        txns += setup_writes
+        irq.tick(start=True)
+        res.start()
+        done_at = t + core_clks
+        if strategy == "result":
+            while True:
+                t += txn_clks
+                txns += 1
+                if t >= done_at and not res.fresh:
+                    res.done(50)
+                if res.read() & RES_FRESH:
+                    break
+                polls += 1
+                t += poll_gap_clks
+            irq.tick(done=True, rd_g=True)
+            continue
+        if strategy == "poll":
+            while True:
+                t += txn_clks
+                txns += 1
+                polls += 1
+                if t >= done_at:
+                    break
+                t += poll_gap_clks
+            irq.tick(done=True)
+        else:
+            if not irq.tick(done=True):
+                raise AssertionError("done_irq did not rise")
+            t = max(t, done_at) + wake_clks
+        t += txn_clks                   # G read
+        txns += 1
+        if irq.tick(rd_g=True):
+            raise AssertionError("done_irq not cleared by the G read")
+    return CompletionStats(n, txns, polls, t)
+
+
+# -------------------- Clocked mmio_if + top_coprocessor --------------------
+
+REG_STATUS, REG_CTRL, REG_TIN, REG_DTIN, REG_G = 0x00, 0x01, 0x02, 0x03, 0x04
+REG_FIFO_T, REG_FIFO_DT, REG_FIFO_G, REG_IN_LEVEL, REG_OUT_LEVEL = 0x28, 0x29, 0x2A, 0x2B, 0x2C
+_STROBED_READS = (REG_FIFO_G, REG_RESULT, REG_G)    # reads with an end-of-strobe side effect
+_STROBED_WRITES = (REG_CTRL, REG_FIFO_DT, REG_BURST_DATA)  # writes with strobe-edge side effects
+CTRL_START, CTRL_INIT, CTRL_STREAM, CTRL_FIFO_CLR = 0x01, 0x08, 0x10, 0x20
+MODES_EXT = 0b010                       # reg_mode=1, dt_mode=0
+MODES_INT = 0b110                       # reg_mode=1, dt_mode=1
+
+# ("W", addr, data) write, ("R", addr, 0) read, ("P", addr, mask) read until
+# rdata & mask (at most max_polls reads), ("I", clocks, 0) bus idle
+Txn = Tuple[str, int, int]
+
+class BusTiming(NamedTuple):
+    """Clocks per bus phase; defaults are the Pico's T_SETUP_US/T_STROBE_US=20 at 20 MHz."""
+    setup_clks: int = 400               # CS low, address/data driven, no strobe
+    strobe_clks: int = 400              # RD/WR held; a read samples rdata in the last clock
+    gap_clks: int = 0                   # CS high before the next transaction
+
+class SimStats(NamedTuple):
+    transactions: int                   # bus strobes (every poll read counts)
+    clocks: int
+    results: int                        # core valid pulses
+    busy_clocks: int                    # core FSM outside S_IDLE
+    valid_seen: int                     # STATUS reads that caught the valid pulse
+    poll_timeouts: int
+
+    @property
+    def cycles_per_result(self) -> float:
+        return self.clocks / self.results if self.results else float("inf")
+
+    @property
+    def idle_ratio(self) -> float:
+        return 1.0 - self.busy_clocks / self.clocks if self.clocks else 1.0
+
+class ClockedMmio:
+    """
+    mmio_if + top_coprocessor (final/sv) clock by clock, driven by bus transactions.
+
+    Strobes are levels: a write repeats in every clock of its strobe and CTRL
+    START/INIT stay high as long as the strobe, the core edge-detects them.
+    STATUS[0] is the core's one-cycle valid pulse, G (0x04) follows the datapath
+    two clocks behind its inputs and the dT estimator steps once per accepted
+    START, its new estimate already feeding the START cycle. G and
+    RESULT reads return the value sampled in their first clock; done_irq and
+    RESULT.fresh clear after the strobe only if that sample had them set. Once
+    only the G pipeline can still change, the rest of a bus phase is skipped in
+    one step, so the cost per transaction does not depend on the strobe length.
+    Idle bus clocks are skipped the same way, and once a poll of a register
+    without read side effects can no longer change, its remaining polls are
+    counted without being clocked. From a settled state, a write to a plain
+    register and a plain START (its S_RUN/S_DONE pass included) are applied
+    without clocking their strobe.
+    """
+
+    def __init__(self, cfg: CoprocessorCfg = DEFAULT_CFG, estimator: Optional[EstimatorRTLExact] = None,
+                 timing: BusTiming = BusTiming(), depth: int = FIFO_DEPTH,
+                 surfaces: Optional[GoldenSurfaces] = None):
+        self.timing = timing
+        self.depth = depth
+        self.surfaces = surfaces if surfaces is not None else GoldenSurfaces()
+        self.regs = bytearray(0x40)
+        self.regs[REG_THR_BASE:REG_THR_BASE + REG_THR_COUNT] = cfg_to_reg_image(cfg)
+        self.regs[REG_G_BASE:REG_G_BASE + REG_G_COUNT] = singletons_to_reg_image(cfg.singletons)
+        self.regs[REG_EST_BASE:REG_EST_BASE + REG_EST_COUNT] = estimator_to_reg_image(
+            estimator if estimator is not None else EstimatorRTLExact())
+        self.est = reg_image_to_estimator(bytes(self.regs[REG_EST_BASE:REG_EST_BASE + REG_EST_COUNT]))
+        self._cfg: Optional[CoprocessorCfg] = None
+        self._srf: List[Optional[Surface]] = [None, None]  # per reg_mode, for the current registers
+        self.reset()
+
+    def reset(self) -> None:
+        # mmio_if
+        self.reg_mode, self.dt_mode, self.stream = 1, 1, False
+        self.T_in = self.dT_in = self.fifo_T = 0
+        self.start_w1 = self.init_w1 = False
+        self.push_q = self.pop_q = self.bdata_q = self.res_rd_q = self.g_rd_q = False
+        self.res_rd_data = self.g_rd_data = 0   # RESULT / G sampled in the first clock of a read
+        self.res_rd_clr = self.g_rd_clr = False # that sample had the flag set, clear at the end
+        self.burst_ptr = 0
+        self.in_fifo: deque = deque()
+        self.out_fifo: deque = deque()
+        self.busy = self.fifo_ovf = False
+        self.done_irq = self.res_fresh = False
+        # core
+        self.start_q = self.init_q = False
+        self.st = S_IDLE
+        self.valid = False
+        self._gq = self._gout = 0       # G_q / G_out: value, or (T, dT, reg_mode) not evaluated yet
+        self.est.reset()
+        self.dT_est = 0
+        # counters
+        self.cycle = self.results = self.busy_clocks = 0
+
+    # ---- datapath ----
+    def _g(self, T: int, dT: int, reg_mode: int) -> int:
+        srf = self._srf[reg_mode]
+        if srf is None:
+            if self._cfg is None:
+                r = bytes(self.regs)
+                self._cfg = reg_image_to_cfg(r[REG_THR_BASE:REG_THR_BASE + REG_THR_COUNT],
+                                             reg_image_to_singletons(r[REG_G_BASE:REG_G_BASE + REG_G_COUNT]))
+            srf = self._srf[reg_mode] = self.surfaces.surface(self._cfg, reg_mode)
+        return srf.g(T, dT)
+
+    def _val(self, g) -> int:
+        return g if isinstance(g, int) else self._g(*g)
+
+    @property
+    def G_out(self) -> int:
+        return self._val(self._gout)
+
+    def _write_cfg(self, addr: int, val: int) -> None:
+        if self.regs[addr] == val:
+            return
+        self._gq, self._gout = self._val(self._gq), self._val(self._gout)  # evaluated with the old cfg
+        self.regs[addr] = val
+        if addr >= REG_EST_BASE:
+            e = reg_image_to_estimator(bytes(self.regs[REG_EST_BASE:REG_EST_BASE + REG_EST_COUNT]))
+            self.est.alpha, self.est.k_dt, self.est.d_max = e.alpha, e.k_dt, e.d_max
+        else:
+            self._cfg = None
+            self._srf = [None, None]
+
+    # ---- register view ----
+    @property
+    def status(self) -> int:
+        """STATUS: {4'b0, fifo_ovf, out_nonempty, in_full, valid} - valid is the raw pulse."""
+        return ((self.fifo_ovf << 3) | (bool(self.out_fifo) << 2)
+                | ((len(self.in_fifo) == self.depth) << 1) | int(self.valid))
+
+    def rdata(self, addr: int) -> int:
+        if addr == REG_STATUS:
+            return self.status
+        if addr == REG_G:
+            return self.g_rd_data if self.g_rd_q else self.G_out
+        if addr == REG_FIFO_G:
+            return self.out_fifo[0] if self.out_fifo else 0
+        if addr == REG_IN_LEVEL:
+            return len(self.in_fifo)
+        if addr == REG_OUT_LEVEL:
+            return len(self.out_fifo)
+        if addr == REG_RESULT:
+            if self.res_rd_q:
+                return self.res_rd_data
+            return (RES_FRESH if self.res_fresh else 0) | (self.G_out & 0x7F)
+        return 0
+
+    # ---- clock ----
+    def _reg_write(self, waddr: int, wdata: int, dt_mode: int) -> None:
+        """Register effect of a write edge (dt_mode as sampled before the edge)."""
+        if waddr == REG_CTRL:
+            self.start_w1 = bool(wdata & CTRL_START)
+            self.init_w1 = bool(wdata & CTRL_INIT)
+            self.reg_mode = (wdata >> 1) & 1
+            self.dt_mode = (wdata >> 2) & 1
+            self.stream = bool(wdata & CTRL_STREAM)
+        elif waddr == REG_TIN:
+            self.T_in = sxt(wdata, 8)
+        elif waddr == REG_DTIN:
+            if not dt_mode:
+                self.dT_in = sxt(wdata, 8)
+        elif waddr == REG_FIFO_T:
+            self.fifo_T = sxt(wdata, 8)
+        elif waddr == REG_BURST_ADDR:
+            self.burst_ptr = wdata
+        elif REG_THR_BASE <= waddr < REG_THR_BASE + REG_THR_COUNT or \
+                REG_G_BASE <= waddr < REG_EST_BASE + REG_EST_COUNT:
+            self._write_cfg(waddr, wdata)
+
+    def tick(self, rd: bool = False, wr: bool = False, addr: int = 0, wdata: int = 0) -> None:
+        """One clock edge with the bus driving rd/wr/addr/wdata (CS low while rd or wr)."""
+        # combinational signals of the current cycle
+        ptr = self.burst_ptr
+        waddr = ptr if addr == REG_BURST_DATA else addr
+        push_now = wr and addr == REG_FIFO_DT
+        pop_now = rd and addr == REG_FIFO_G
+        bdata_now = wr and addr == REG_BURST_DATA
+        res_rd_now = rd and addr == REG_RESULT
+        g_rd_now = rd and addr == REG_G
+        in_push = push_now and not self.push_q
+        out_pop = self.pop_q and not pop_now and bool(self.out_fifo)
+        auto_start = (self.stream and not self.busy and bool(self.in_fifo)
+                      and len(self.out_fifo) != self.depth)
+        out_push = self.busy and self.valid
+        start_w1, valid, dt_mode = self.start_w1, self.valid, self.dt_mode
+        start_pulse = start_w1 and not self.start_q
+        init_pulse = self.init_w1 and not self.init_q
+        st = self.st
+        if st == S_IDLE:
+            st_n = S_RUN if start_pulse else S_IDLE
+        else:
+            st_n = S_DONE if st == S_RUN else S_IDLE
+            self.busy_clocks += 1
+        est_step = start_pulse and st == S_IDLE
+        dT_est = self.dT_est
+        G_out = self._gout
+
+        # core edge (a step's new estimate, 0 with INIT, already feeds this cycle)
+        if init_pulse:
+            self.est.init_pulse(self.T_in)
+            self.dT_est = 0
+        elif est_step:
+            self.dT_est = self.est.step(self.T_in)[0]
+        if est_step:
+            dT_est = self.dT_est
+        G_next = (self.T_in, dT_est if dt_mode else self.dT_in, self.reg_mode)
+        self.start_q, self.init_q = start_w1, self.init_w1
+        self.st = st_n
+        self.valid = st_n == S_DONE
+        self.results += self.valid
+        self._gout, self._gq = self._gq, G_next
+
+        # mmio_if edge (later assignments win, as in the always_ff)
+        self.start_w1 = self.init_w1 = False
+        bdata_q = self.bdata_q
+        self.push_q, self.pop_q, self.bdata_q = push_now, pop_now, bdata_now
+        if wr:
+            self._reg_write(waddr, wdata, dt_mode)
+        if bdata_q and not bdata_now:
+            self.burst_ptr = (ptr + 1) & 0xFF
+        if in_push:
+            if len(self.in_fifo) < self.depth:
+                self.in_fifo.append((self.fifo_T, sxt(wdata, 8)))
+            else:
+                self.fifo_ovf = True
+        if auto_start:
+            T, dT = self.in_fifo.popleft()
+            self.T_in = T
+            if not dt_mode:
+                self.dT_in = dT
+            self.start_w1 = True
+            self.busy = True
+        if out_push:
+            self.out_fifo.append(self._val(G_out))
+            self.busy = False
+        if out_pop:
+            self.out_fifo.popleft()
+        if g_rd_now and not self.g_rd_q:
+            self.g_rd_data, self.g_rd_clr = self._val(G_out), self.done_irq
+        if res_rd_now and not self.res_rd_q:
+            self.res_rd_data = (RES_FRESH if self.res_fresh else 0) | (self._val(G_out) & 0x7F)
+            self.res_rd_clr = self.res_fresh
+        if start_pulse or (self.g_rd_q and not g_rd_now and self.g_rd_clr):
+            self.done_irq = False
+        if start_pulse or (self.res_rd_q and not res_rd_now and self.res_rd_clr):
+            self.res_fresh = False
+        if valid:
+            self.done_irq = self.res_fresh = True
+            self.g_rd_clr = self.res_rd_clr = False
+        self.res_rd_q, self.g_rd_q = res_rd_now, g_rd_now
+        if wr and waddr == REG_CTRL and wdata & CTRL_FIFO_CLR:
+            self.in_fifo.clear()
+            self.out_fifo.clear()
+            self.busy = self.fifo_ovf = False
+        self.cycle += 1
+
+    # ---- fast-forward ----
+    def _settled(self, rd: bool, wr: bool, addr: int, wdata: int) -> bool:
+        """True if further clocks with this bus state only move the G pipeline."""
+        if self.st != S_IDLE or self.valid:
+            return False
+        ctrl = wr and (self.burst_ptr if addr == REG_BURST_DATA else addr) == REG_CTRL
+        start_n = ctrl and bool(wdata & CTRL_START)
+        init_n = ctrl and bool(wdata & CTRL_INIT)
+        return (self.start_w1 == self.start_q == start_n
+                and self.init_w1 == self.init_q == init_n
+                and self.push_q == (wr and addr == REG_FIFO_DT)
+                and self.bdata_q == (wr and addr == REG_BURST_DATA)
+                and self.pop_q == (rd and addr == REG_FIFO_G)
+                and self.res_rd_q == (rd and addr == REG_RESULT)
+                and self.g_rd_q == (rd and addr == REG_G)
+                and not (self.stream and not self.busy and self.in_fifo
+                         and len(self.out_fifo) != self.depth))
+
+    def _skip(self, m: int) -> None:
+        """m settled clocks: the core is idle and G trails its inputs by two clocks."""
+        if m <= 0:
+            return
+        G_q = (self.T_in, self.dT_est if self.dt_mode else self.dT_in, self.reg_mode)
+        self._gout = G_q if m >= 2 else self._gq
+        self._gq = G_q
+        self.cycle += m
+
+    def _hold(self, n: int, rd: bool, wr: bool, addr: int, wdata: int, sample: bool = False) -> int:
+        """Keep the bus state for n clocks; returns rdata of the last clock if 'sample'."""
+        rdata = 0
+        first = wr                      # a write lands on its first edge
+        while n > 0:
+            if not first and self._settled(rd, wr, addr, wdata):
+                if sample:
+                    self._skip(n - 1)
+                    rdata = self.rdata(addr)
+                    self._skip(1)
+                else:
+                    self._skip(n)
+                return rdata
+            if n == 1 and sample:
+                rdata = self.rdata(addr)
+            self.tick(rd, wr, addr, wdata)
+            n -= 1
+            first = False
+        return rdata
+
+    def _idle(self, n: int) -> None:
+        """n clocks with CS high; clocked only until the core and the strobe edges settle."""
+        while n > 0 and not self._settled(False, False, 0, 0):
+            self.tick()
+            n -= 1
+        self._skip(n)
+
+    # ---- bus transactions ----
+    def write(self, addr: int, val: int) -> None:
+        setup, strobe, gap = self.timing
+        val &= 0xFF
+        self._idle(setup)
+        if addr not in _STROBED_WRITES and self._settled(False, True, addr, val):
+            # only the first edge of the strobe acts, and it still latches the old inputs into G_q
+            self._skip(1)
+            self._reg_write(addr, val, self.dt_mode)
+            self._skip(strobe - 1)
+        elif addr == REG_CTRL and (val & (CTRL_START | CTRL_INIT | CTRL_STREAM | CTRL_FIFO_CLR)) == CTRL_START \
+                and strobe >= 4 and not self.busy and self._settled(False, False, 0, 0):
+            # a plain START: edge 1 latches it, edge 2 steps the estimator (S_RUN), edge 3
+            # raises valid (S_DONE), edge 4 sets done_irq/RESULT.fresh; then the strobe is settled
+            self._skip(1)
+            self._reg_write(REG_CTRL, val, self.dt_mode)
+            self.dT_est = self.est.step(self.T_in)[0]
+            self.start_q = True
+            self.results += 1
+            self.busy_clocks += 2
+            self.done_irq = self.res_fresh = True
+            self.g_rd_clr = self.res_rd_clr = False
+            self._skip(strobe - 1)
+        else:
+            self._hold(strobe, False, True, addr, val)
+        self._idle(gap)
+
+    def read(self, addr: int) -> int:
+        setup, strobe, gap = self.timing
+        self._idle(setup)
+        v = self._hold(strobe, True, False, addr, 0, sample=True)
+        self._idle(gap)
+        return v
+
+    def run(self, trace: Sequence[Txn], max_polls: int = 1000) -> Tuple[List[int], SimStats]:
+        """Execute a bus trace; returns (data of every R/P transaction, stats)."""
+        reads: List[int] = []
+        txns = seen = timeouts = 0
+        c0, r0, b0 = self.cycle, self.results, self.busy_clocks
+        for kind, a, v in trace:
+            if kind == "W":
+                self.write(a, v)
+                txns += 1
+            elif kind == "I":
+                self._idle(a)
+            elif kind in ("R", "P"):
+                polls = 1 if kind == "R" else max_polls
+                while polls:
+                    r = self.read(a)
+                    txns += 1
+                    polls -= 1
+                    if a == REG_STATUS and r & 1:
+                        seen += 1
+                    if kind == "R" or r & v:
+                        break
+                    if a not in _STROBED_READS and self._settled(False, False, 0, 0):
+                        # nothing can change any more: the remaining polls all read r
+                        txns += polls
+                        self._skip(polls * sum(self.timing))
+                        polls = 0
+                else:
+                    timeouts += 1
+                reads.append(r)
+            else:
+                raise ValueError("unknown transaction %r" % (kind,))
+        return reads, SimStats(txns, self.cycle - c0, self.results - r0,
+                               self.busy_clocks - b0, seen, timeouts)
+
+def driver_trace(strategy: str, vectors: Sequence[Vector]) -> List[Txn]:
+    """
+    Bus trace of the Pico driver evaluating 'vectors':
+      'status' - run_once_ext (modes, T, dT, INIT, START, poll STATUS.valid, read G)
+      'result' - run_point (T, dT, START, poll RESULT)
+      'series' - dt_mode=1 series: INIT once, then T, START, poll RESULT (dT unused)
+      'stream' - stream_run: FIFO pushes/pops in blocks of FIFO_DEPTH
+    """
+    tr: List[Txn] = []
+    if strategy == "status":
+        for T, dT in vectors:
+            tr += [("W", REG_CTRL, MODES_EXT), ("W", REG_TIN, T & 0xFF), ("W", REG_DTIN, dT & 0xFF),
+                   ("W", REG_CTRL, CTRL_INIT | MODES_EXT), ("W", REG_CTRL, CTRL_START | MODES_EXT),
+                   ("P", REG_STATUS, 0x01), ("R", REG_G, 0)]
+    elif strategy == "result":
+        tr.append(("W", REG_CTRL, MODES_EXT))
+        for T, dT in vectors:
+            tr += [("W", REG_TIN, T & 0xFF), ("W", REG_DTIN, dT & 0xFF),
+                   ("W", REG_CTRL, CTRL_START | MODES_EXT), ("P", REG_RESULT, RES_FRESH)]
+    elif strategy == "series":
+        if vectors:
+            tr += [("W", REG_TIN, vectors[0][0] & 0xFF), ("W", REG_CTRL, CTRL_INIT | MODES_INT)]
+        for T, _ in vectors:
+            tr += [("W", REG_TIN, T & 0xFF), ("W", REG_CTRL, CTRL_START | MODES_INT),
+                   ("P", REG_RESULT, RES_FRESH)]
+    elif strategy == "stream":
+        tr.append(("W", REG_CTRL, CTRL_STREAM | CTRL_FIFO_CLR | MODES_EXT))
+        for i in range(0, len(vectors), FIFO_DEPTH):
+            blk = vectors[i:i + FIFO_DEPTH]
+            tr.append(("R", REG_IN_LEVEL, 0))
+            for T, dT in blk:
+                tr += [("W", REG_FIFO_T, T & 0xFF), ("W", REG_FIFO_DT, dT & 0xFF)]
+            tr.append(("R", REG_OUT_LEVEL, 0))
+            tr += [("R", REG_FIFO_G, 0)] * len(blk)
+        tr += [("R", REG_STATUS, 0), ("W", REG_CTRL, MODES_EXT)]
+    else:
+        raise ValueError("strategy must be 'status', 'result', 'series' or 'stream'")
+    return tr
+
+def driver_results(strategy: str, reads: Sequence[int], n: int) -> List[int]:
+    """G values of the n vectors from the read data of a driver_trace() run."""
+    if strategy == "status":
+        return list(reads[1::2])
+    if strategy in ("result", "series"):
+        return [r & 0x7F for r in reads]
+    return [r for i, r in enumerate(reads[:-1]) if i % (FIFO_DEPTH + 2) >= 2][:n]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import random
+    import sys
+    import time
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else 10000
+    rnd = random.Random(1)
+    vecs = [(rnd.randint(-128, 127), rnd.randint(-128, 127)) for _ in range(n)]
+    surfaces = GoldenSurfaces()
+    for strategy in ("status", "result", "series", "stream"):
+        m = ClockedMmio(surfaces=surfaces)
+        t0 = time.perf_counter()
+        _, st = m.run(driver_trace(strategy, vecs), max_polls=20)
+        dt = time.perf_counter() - t0
+        print("%-7s txns=%8d results=%6d clk/result=%8.1f idle=%.5f valid_seen=%d timeouts=%d (%.2f s)"
+              % (strategy, st.transactions, st.results, st.cycles_per_result, st.idle_ratio,
+                 st.valid_seen, st.poll_timeouts, dt))
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+pipeline_model.py - Cycle-accurate model of top_coprocessor_pipe (final/sv).
+
+Four registered stages, initiation interval 1:
+  P1 fuzzify -> P2 rules -> P3 aggregate -> P4 defuzz
+A vector issued in cycle c (start=1) shows up as valid/G_out after the edge
+c + LATENCY. Stage arithmetic is taken from fuzzy_refmodel, so every result can
+be checked against top_step(). Covers dt_mode=0 (dT supplied with the vector).
+"""
+
+import random
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fuzzy_refmodel import (
+    CoprocessorCfg, aggregate, defuzz, fuzzify, rules9_min, top_step,
+)
+
+LATENCY = 4
+
+Issue = Tuple[int, int, int]            # (T, dT, reg_mode)
+
+class PipeStats(NamedTuple):
+    results: int
+    cycles: int                         # clock edges from the first issue to the last valid
+    latency: int                        # issue -> valid, in clocks
+    throughput: float                   # results per clock
+
+# -------------------- Pipeline --------------------
+
+class PipelineCore:
+    """Stage registers of top_coprocessor_pipe; tick() is one clock edge."""
+
+    def __init__(self, cfg: CoprocessorCfg):
+        s = cfg.singletons
+        self.cfg = cfg
+        self.g = (s.g00, s.g01, s.g02, s.g10, s.g11, s.g12, s.g20, s.g21, s.g22)
+        self.reset()
+
+    def reset(self) -> None:
+        self.p1 = None                  # (muT, muD, reg_mode, tag)
+        self.p2 = None                  # (w, reg_mode, tag)
+        self.p3 = None                  # (S_w, S_wg, tag)
+        self.valid = False
+        self.G_out = 0
+        self.tag = None                 # model-only: which issue produced G_out
+        self.cycle = 0
+
+    def tick(self, issue: Optional[Issue] = None, tag: object = None) -> Optional[int]:
+        """Clock edge with start=(issue is not None); returns G_out if valid after the edge."""
+        cfg = self.cfg
+        p4 = None
+        if self.p3 is not None:
+            S_w, S_wg, t = self.p3
+            p4 = (defuzz(S_w, S_wg), t)
+        p3 = None
+        if self.p2 is not None:
+            w, mode, t = self.p2
+            S_w, S_wg = aggregate(mode, w, self.g)
+            p3 = (S_w, S_wg, t)
+        p2 = None
+        if self.p1 is not None:
+            muT, muD, mode, t = self.p1
+            p2 = (rules9_min(muT[0], muT[1], muT[2], muD[0], muD[1], muD[2]), mode, t)
+        p1 = None
+        if issue is not None:
+            T, dT, mode = issue
+            p1 = (fuzzify(T, cfg.mf_T), fuzzify(dT, cfg.mf_dT), mode, tag)
+
+        self.p1, self.p2, self.p3 = p1, p2, p3
+        self.valid = p4 is not None
+        if self.valid:
+            self.G_out, self.tag = p4   # G_out holds its value when valid drops
+        self.cycle += 1
+        return self.G_out if self.valid else None
+
+    def run(self, vectors: Sequence[Issue]) -> Tuple[List[int], PipeStats]:
+        """Issue one vector per clock, drain the pipe; checks in-order completion."""
+        out: List[int] = []
+        c0 = self.cycle
+        first_valid = None
+        for i in range(len(vectors) + LATENCY):
+            issue = vectors[i] if i < len(vectors) else None
+            G = self.tick(issue, tag=i if issue is not None else None)
+            if G is not None:
+                if self.tag != len(out):
+                    raise AssertionError("out-of-order result: tag %r, expected %d" % (self.tag, len(out)))
+                if first_valid is None:
+                    first_valid = self.cycle - c0
+                out.append(G)
+        cycles = self.cycle - c0
+        return out, PipeStats(len(out), cycles, first_valid or 0,
+                              len(out) / cycles if cycles else 0.0)
+
+# -------------------- TB vector sets --------------------
+
+GRID_T = (-128, -64, -32, -16, 0, 16, 32, 64, 96, 127)
+GRID_DT = (-60, -30, -10, 0, 10, 30, 60)
+
+def tb_vector_sets(seed: int = 1, n_random: int = 1000) -> Dict[str, List[Issue]]:
+    """dt_mode=0 vector sets of tb_top_coprocessor (GRID both modes, Random, VIS)."""
+    rnd = random.Random(seed)
+    return {
+        "grid_rm0": [(T, dT, 0) for T in GRID_T for dT in GRID_DT],
+        "grid_rm1": [(T, dT, 1) for T in GRID_T for dT in GRID_DT],
+        "random": [(rnd.randint(-128, 127), rnd.randint(-128, 127), 1) for _ in range(n_random)],
+        "vis_T_at_dt0": [(T, 0, 1) for T in range(-128, 128, 2)],
+        "vis_dT_lines": [(T, dT, 1) for T in (-32, 0, 32) for dT in range(-60, 61, 4)],
+        "vis_heatmap": [(T, dT, 1) for T in range(-64, 65, 8) for dT in range(-60, 61, 5)],
+    }
+
+def check_sets(cfg: CoprocessorCfg, sets: Dict[str, List[Issue]]) -> Dict[str, PipeStats]:
+    """Run each set through a fresh pipe; raises on any mismatch vs top_step()."""
+    report = {}
+    for name, vecs in sets.items():
+        got, stats = PipelineCore(cfg).run(vecs)
+        exp = [top_step(T, dT, cfg, mode)[0] for T, dT, mode in vecs]
+        bad = [i for i, (a, b) in enumerate(zip(got, exp)) if a != b]
+        if bad or len(got) != len(exp):
+            i = bad[0] if bad else min(len(got), len(exp))
+            raise AssertionError("%s: mismatch at #%d %r" % (name, i, vecs[i] if i < len(vecs) else None))
+        report[name] = stats
+    return report
+
+def main() -> int:
+    from fuzzy_refmodel import DEFAULT_CFG
+    for name, st in check_sets(DEFAULT_CFG, tb_vector_sets()).items():
+        print("%-14s n=%5d cycles=%5d latency=%d throughput=%.3f/clk"
+              % (name, st.results, st.cycles, st.latency, st.throughput))
+    return 0
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
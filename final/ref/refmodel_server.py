@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+refmodel_server.py - Long-lived reference model query server.
+
+Keeps compiled surfaces (golden_surface) and named dT estimator sessions in
+memory and answers requests over stdin/stdout or a local Unix socket; asyncio
+serves any number of socket clients. One request per line, one reply line each
+(errors as "ERR <reason>"):
+
+    PING                               -> OK
+    CFG <name>                         -> OK        select a named config ("default" exists)
+    CFG <name> <thr_hex> [<g_hex>]     -> OK        define from register images and select:
+                                                    thr = 24 bytes (0x10..0x27), g = 9 bytes (0x30..0x38)
+    MODE <0|1>                         -> OK        reg_mode for this client
+    P <T> <dT>                         -> <G> <S_w> <S_wg>
+    B <T>,<dT> [<T>,<dT> ...]          -> <G> [<G> ...]
+    BIN <n>, then 2n raw bytes         -> 0x00, then n raw G bytes (s8 T, s8 dT pairs; no
+                                          newline). A bad count gets "ERR ..." and the
+                                          connection is closed: its payload cannot be skipped
+    EST <name> [<alpha> <k_dt> <d_max>] -> OK       new estimator session (INIT at T=0)
+    INIT <name> <T>                    -> OK
+    STEP <name> <T> [<T> ...]          -> <G>,<dT_sel>,<valid> ...   (dt_mode=1, one START per T)
+    STATS                              -> key=value ...
+    QUIT                               -> closes this client
+
+The selected config and reg_mode are per client; configs and estimator sessions
+are shared by name across clients. BIN lookups run in chunks of BIN_CHUNK points
+with a yield to the event loop in between, so a large batch does not stall the
+other clients.
+
+    python refmodel_server.py                       # stdin/stdout
+    python refmodel_server.py --socket /tmp/fz.sock --cache-dir ~/.cache/fuzzy_surfaces
+    python refmodel_server.py --socket /tmp/fz.sock --bench 5000    # latency of a running server
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fuzzy_refmodel import (
+    DEFAULT_CFG, CoprocessorCfg, EstimatorRTLExact, reg_image_to_cfg, reg_image_to_singletons,
+)
+from golden_surface import GoldenSurfaces, Surface, SurfaceCache
+
+MAX_BIN = 1 << 20                       # points per BIN request
+BIN_CHUNK = 1 << 14                     # points looked up between event loop yields
+BIN_OK = b"\x00"                        # status byte of a BIN reply ("E" of ERR otherwise)
+
+class _Client:
+    __slots__ = ("cfg_name", "reg_mode", "srf")
+
+    def __init__(self):
+        self.cfg_name = "default"
+        self.reg_mode = 1
+        self.srf: Optional[Surface] = None
+
+class RefmodelServer:
+    """Request handling; transport-independent (see serve_stream)."""
+
+    def __init__(self, surfaces: Optional[GoldenSurfaces] = None):
+        self.surfaces = surfaces if surfaces is not None else GoldenSurfaces()
+        self.cfgs: Dict[str, CoprocessorCfg] = {"default": DEFAULT_CFG}
+        self.sessions: Dict[str, EstimatorRTLExact] = {}
+        self.queries = 0
+        self.clients = 0
+
+    def _surface(self, st: _Client) -> Surface:
+        if st.srf is None:
+            st.srf = self.surfaces.surface(self.cfgs[st.cfg_name], st.reg_mode)
+        return st.srf
+
+    def _session(self, name: str) -> EstimatorRTLExact:
+        est = self.sessions.get(name)
+        if est is None:
+            raise ValueError("no session %r" % name)
+        return est
+
+    def handle(self, st: _Client, line: str) -> Optional[str]:
+        """Reply line for one text request; None ends the client."""
+        parts = line.split()
+        if not parts:
+            return "ERR empty request"
+        cmd, args = parts[0].upper(), parts[1:]
+        self.queries += 1
+        try:
+            if cmd == "P":
+                T, dT = _s8(args[0]), _s8(args[1])
+                S_w, S_wg, G = self._surface(st).point(T, dT)
+                return "%d %d %d" % (G, S_w, S_wg)
+            if cmd == "B":
+                g = self._surface(st).g
+                out = []
+                for a in args:
+                    T, dT = a.split(",")
+                    out.append(str(g(_s8(T), _s8(dT))))
+                return " ".join(out)
+            if cmd == "STEP":
+                est = self._session(args[0])
+                point = self._surface(st).point
+                out = []
+                for a in args[1:]:
+                    T = _s8(a)
+                    dT_sel, valid = est.step(T)
+                    out.append("%d,%d,%d" % (point(T, dT_sel)[2], dT_sel, 1 if valid else 0))
+                return " ".join(out)
+            if cmd == "INIT":
+                self._session(args[0]).init_pulse(_s8(args[1]))
+                return "OK"
+            if cmd == "EST":
+                vals = [int(a, 0) for a in args[1:4]]
+                est = EstimatorRTLExact(*vals)
+                est.init_pulse(0)
+                self.sessions[args[0]] = est
+                return "OK"
+            if cmd == "CFG":
+                name = args[0]
+                if len(args) > 1:
+                    s = reg_image_to_singletons(bytes.fromhex(args[2])) if len(args) > 2 else DEFAULT_CFG.singletons
+                    self.cfgs[name] = reg_image_to_cfg(bytes.fromhex(args[1]), s)
+                elif name not in self.cfgs:
+                    raise ValueError("no config %r" % name)
+                st.cfg_name, st.srf = name, None
+                return "OK"
+            if cmd == "MODE":
+                if args[0] not in ("0", "1"):
+                    raise ValueError("reg_mode must be 0 or 1")
+                st.reg_mode, st.srf = int(args[0]), None
+                return "OK"
+            if cmd == "PING":
+                return "OK"
+            if cmd == "STATS":
+                return "queries=%d clients=%d configs=%d sessions=%d surfaces=%d" % (
+                    self.queries, self.clients, len(self.cfgs), len(self.sessions),
+                    self.surfaces.compiled)
+            if cmd == "QUIT":
+                return None
+            return "ERR unknown command %s" % cmd
+        except IndexError:
+            return "ERR missing argument"
+        except ValueError as e:
+            return "ERR %s" % e
+
+    def bin_batch(self, st: _Client, data: bytes) -> bytes:
+        """G for packed (s8 T, s8 dT) pairs, one byte each."""
+        plane = self._surface(st).plane()
+        v = array("b", data)
+        return bytes(plane[((v[i] + 128) << 8) | (v[i + 1] + 128)] for i in range(0, len(v), 2))
+
+    async def serve_stream(self, reader: asyncio.StreamReader, writer) -> None:
+        """Run one client until EOF or QUIT; writer needs write() and async drain()."""
+        st = _Client()
+        self.clients += 1
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line[:4].upper() == b"BIN ":
+                    try:
+                        n = int(line[4:])
+                        if not 0 <= n <= MAX_BIN:
+                            raise ValueError
+                    except ValueError:
+                        writer.write(b"ERR bad BIN count\n")
+                        break           # payload already in flight: the stream is out of step
+                    self.queries += 1
+                    writer.write(BIN_OK)
+                    for k in range(0, n, BIN_CHUNK):
+                        data = await reader.readexactly(2 * min(BIN_CHUNK, n - k))
+                        writer.write(self.bin_batch(st, data))
+                        await writer.drain()
+                        await asyncio.sleep(0)
+                    await writer.drain()
+                    continue
+                resp = self.handle(st, line.decode("ascii", "replace"))
+                if resp is None:
+                    break
+                writer.write(resp.encode() + b"\n")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            await writer.drain()
+            self.clients -= 1
+
+    async def serve_unix(self, path: str) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+
+        async def client(reader, writer):
+            try:
+                await self.serve_stream(reader, writer)
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+
+        server = await asyncio.start_unix_server(client, path=path, limit=1 << 20)
+        async with server:
+            await server.serve_forever()
+
+    async def serve_stdio(self) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=1 << 20)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+        await self.serve_stream(reader, _StdoutWriter())
+
+class _StdoutWriter:
+    def __init__(self):
+        self.out = sys.stdout.buffer
+
+    def write(self, data: bytes) -> None:
+        self.out.write(data)
+
+    async def drain(self) -> None:
+        self.out.flush()
+
+def _s8(s: str) -> int:
+    v = int(s, 0)
+    if v < -128 or v > 127:
+        raise ValueError("s8 expected: %s" % s)
+    return v
+
+# -------------------- Client --------------------
+
+class RefmodelClient:
+    """Blocking client for the Unix socket (scripts, notebooks, TB helpers)."""
+
+    def __init__(self, path: str):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.f = self.sock.makefile("rwb")
+
+    def call(self, line: str) -> str:
+        self.f.write(line.encode() + b"\n")
+        self.f.flush()
+        resp = self.f.readline().decode().rstrip("\n")
+        if resp.startswith("ERR"):
+            raise ValueError(resp)
+        return resp
+
+    def point(self, T: int, dT: int) -> Tuple[int, int, int]:
+        """(G, S_w, S_wg) for the selected config."""
+        G, S_w, S_wg = self.call("P %d %d" % (T, dT)).split()
+        return int(G), int(S_w), int(S_wg)
+
+    def batch(self, points: Iterable[Tuple[int, int]]) -> List[int]:
+        """G for many points, in binary requests of up to MAX_BIN points."""
+        data = bytes(v & 0xFF for p in points for v in p)
+        out: List[int] = []
+        for k in range(0, len(data), 2 * MAX_BIN):
+            part = data[k:k + 2 * MAX_BIN]
+            n = len(part) // 2
+            self.f.write(b"BIN %d\n" % n + part)
+            self.f.flush()
+            status = self.f.read(1)
+            if status != BIN_OK:
+                raise ValueError((status + self.f.readline()).decode("ascii", "replace").strip())
+            out.extend(self.f.read(n))
+        return out
+
+    def close(self) -> None:
+        try:
+            self.call("QUIT")
+        except (OSError, ValueError):
+            pass
+        self.f.close()
+        self.sock.close()
+
+def latency(client: RefmodelClient, n: int = 2000) -> Dict[str, float]:
+    """Measured per-query cost, microseconds: P round trip (median) and BIN per point."""
+    pts = [((i * 37) % 256 - 128, (i * 101) % 256 - 128) for i in range(n)]
+    client.point(0, 0)
+    rt = []
+    for T, dT in pts:
+        t0 = time.perf_counter()
+        client.point(T, dT)
+        rt.append(time.perf_counter() - t0)
+    rt.sort()
+    t0 = time.perf_counter()
+    client.batch(pts * 16)
+    t_bin = time.perf_counter() - t0
+    return {"point_us": rt[len(rt) // 2] * 1e6, "point_p99_us": rt[len(rt) * 99 // 100] * 1e6,
+            "bin_us": t_bin * 1e6 / (16 * n)}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Reference model query server")
+    ap.add_argument("--socket", help="Unix socket path (default: stdin/stdout)")
+    ap.add_argument("--cache-dir", help="on-disk surface cache (golden_surface.SurfaceCache)")
+    ap.add_argument("--bench", type=int, metavar="N",
+                    help="measure query latency of the server already on --socket, N points")
+    args = ap.parse_args(argv)
+    if args.bench:
+        if not args.socket:
+            ap.error("--bench needs --socket")
+        c = RefmodelClient(args.socket)
+        r = latency(c, args.bench)
+        c.close()
+        print("P: median %.1f us, p99 %.1f us; BIN: %.2f us/point" % (
+            r["point_us"], r["point_p99_us"], r["bin_us"]))
+        return 0
+    srv = RefmodelServer(GoldenSurfaces(cache=SurfaceCache(args.cache_dir)) if args.cache_dir else None)
+    try:
+        asyncio.run(srv.serve_unix(args.socket) if args.socket else srv.serve_stdio())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+run_index.py - Run-length index of a G plane for region queries.
+
+Built on the row/run layout of g_table (identical T rows stored once, each row as
+runs of constant G over dT). Besides point lookups it answers, without touching
+the 65536 cells:
+
+    areas()            {G: cell count}                         O(1), precomputed
+    area(lo, hi)       cells with lo <= G <= hi                O(distinct G)
+    region(lo, hi)     rectangles (T0, T1, dT0, dT1), inclusive, covering exactly
+                       the cells with lo <= G <= hi; vertically merged, so a
+                       plateau or dead band is one rectangle    O(rows + runs)
+    row_spans(T, lo, hi)  dT spans of one T row                O(runs in the row)
+
+Indexes of many configs are cheap to build from GoldenSurfaces (mapped from the
+SurfaceCache when one is configured).
+
+    python run_index.py --range 0,10 --cache-dir ~/.cache/fuzzy_surfaces
+"""
+
+import sys
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+
+from fuzzy_refmodel import CoprocessorCfg
+from g_table import encode_plane
+from golden_surface import N_AXIS, GoldenSurfaces
+
+Rect = Tuple[int, int, int, int]         # T0, T1, dT0, dT1 (inclusive)
+
+class RunIndex:
+    """Per-row run boundaries of one G plane."""
+
+    def __init__(self, plane: bytes):
+        rowmap, offsets, starts, values = encode_plane(plane)
+        self.rowmap = rowmap
+        # per unique row: run starts (dT) and run values
+        self._starts: List[List[int]] = []
+        self._values: List[List[int]] = []
+        for u in range(len(offsets) - 1):
+            lo, hi = offsets[u], offsets[u + 1]
+            self._starts.append([x - 128 for x in starts[lo:hi]])
+            self._values.append(list(values[lo:hi]))
+        mult = [0] * len(self._starts)
+        for u in rowmap:
+            mult[u] += 1
+        self._areas: Dict[int, int] = {}
+        for u, (st, vals) in enumerate(zip(self._starts, self._values)):
+            ends = st[1:] + [128]
+            for s, e, G in zip(st, ends, vals):
+                self._areas[G] = self._areas.get(G, 0) + (e - s) * mult[u]
+        self._spans: Dict[Tuple[int, int], List[List[Tuple[int, int]]]] = {}
+
+    @classmethod
+    def for_config(cls, cfg: CoprocessorCfg, reg_mode: int = 1,
+                   surfaces: Optional[GoldenSurfaces] = None) -> "RunIndex":
+        surfaces = surfaces if surfaces is not None else GoldenSurfaces()
+        return cls(surfaces.surface(cfg, reg_mode).plane())
+
+    @property
+    def runs(self) -> int:
+        """Stored runs (unique rows only)."""
+        return sum(len(s) for s in self._starts)
+
+    def g(self, T: int, dT: int) -> int:
+        u = self.rowmap[T + 128]
+        return self._values[u][bisect_right(self._starts[u], dT) - 1]
+
+    def areas(self) -> Dict[int, int]:
+        return dict(self._areas)
+
+    def area(self, lo: int, hi: int) -> int:
+        return sum(n for G, n in self._areas.items() if lo <= G <= hi)
+
+    def _row_spans(self, lo: int, hi: int) -> List[List[Tuple[int, int]]]:
+        """Per unique row: maximal dT spans with lo <= G <= hi (cached per range)."""
+        spans = self._spans.get((lo, hi))
+        if spans is None:
+            spans = []
+            for st, vals in zip(self._starts, self._values):
+                ends = st[1:] + [128]
+                row: List[Tuple[int, int]] = []
+                for s, e, G in zip(st, ends, vals):
+                    if lo <= G <= hi:
+                        if row and row[-1][1] == s - 1:
+                            row[-1] = (row[-1][0], e - 1)
+                        else:
+                            row.append((s, e - 1))
+                spans.append(row)
+            self._spans[(lo, hi)] = spans
+        return spans
+
+    def row_spans(self, T: int, lo: int, hi: int) -> List[Tuple[int, int]]:
+        """Inclusive (dT0, dT1) spans of row T with lo <= G <= hi."""
+        return list(self._row_spans(lo, hi)[self.rowmap[T + 128]])
+
+    def region(self, lo: int, hi: int) -> List[Rect]:
+        """Rectangles covering exactly the cells with lo <= G <= hi, sorted by (T0, dT0)."""
+        spans = self._row_spans(lo, hi)
+        out: List[Rect] = []
+        open_: Dict[Tuple[int, int], int] = {}      # span -> first T
+        prev = None
+        for r in range(N_AXIS + 1):
+            u = self.rowmap[r] if r < N_AXIS else None
+            if u == prev:
+                continue                            # same unique row: every open rect grows
+            cur = set(spans[u]) if u is not None else set()
+            T = r - 128
+            for sp in [sp for sp in open_ if sp not in cur]:
+                out.append((open_.pop(sp), T - 1) + sp)
+            for sp in cur:
+                open_.setdefault(sp, T)
+            prev = u
+        out.sort(key=lambda q: (q[0], q[2]))
+        return out
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    from fuzzy_refmodel import DEFAULT_CFG
+    from golden_surface import SurfaceCache
+    ap = argparse.ArgumentParser(description="Region queries on the G plane of DEFAULT_CFG")
+    ap.add_argument("--reg-mode", type=int, default=1, choices=[0, 1])
+    ap.add_argument("--range", default=None, metavar="LO,HI", help="print rectangles with LO <= G <= HI")
+    ap.add_argument("--cache-dir", help="on-disk surface cache (golden_surface.SurfaceCache)")
+    args = ap.parse_args(argv)
+    surfaces = GoldenSurfaces(cache=SurfaceCache(args.cache_dir)) if args.cache_dir else None
+    idx = RunIndex.for_config(DEFAULT_CFG, args.reg_mode, surfaces)
+    print("runs=%d" % idx.runs)
+    for G, n in sorted(idx.areas().items()):
+        print("G=%d area=%d" % (G, n))
+    if args.range:
+        lo, hi = (int(v, 0) for v in args.range.split(","))
+        rects = idx.region(lo, hi)
+        print("G in [%d, %d]: %d cells, %d rectangles" % (lo, hi, idx.area(lo, hi), len(rects)))
+        for T0, T1, d0, d1 in rects:
+            print("T=%d..%d dT=%d..%d" % (T0, T1, d0, d1))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+tb_vectors.py - Packed golden vectors for tb_top_coprocessor ($readmemh).
+
+Every dt_mode=0 vector set of the TB (GRID, Random, the three VIS sweeps, and the
+exhaustive s8 x s8 plane) is written as one hex file with the expected S_w, S_wg
+and G taken in bulk from the compiled golden surface, so the TB only drives the
+DUT and compares instead of re-running ref_mu/ref_defuzz per vector. The
+"series" set is the dt_mode=1 flow of series_trace(): INIT with the first T of
+each segment, then one START per sample, with the expected dT_sel in the dT
+field. One 64-bit word per line:
+
+    [58]    INIT before this sample (series)
+    [57]    dt_mode
+    [56]    reg_mode
+    [55:48] T_in  (s8)
+    [47:40] dT_in (s8), or the expected dT_sel with dt_mode=1
+    [39:24] S_w   (Q15, saturated)
+    [23:8]  S_wg  (Q15, saturated)
+    [7:0]   G     (percent)
+
+A line of all ones (VEC_END) terminates the set; `//` header lines carry the set
+name, count and the register images of the config (CoprocessorCfg() defaults =
+set_mf_defaults + G00..G22 of the TB; SERIES_EST = SER_ALPHA/SER_KDT/SER_DMAX of
+the TB, which drives them into the estimator ports for the series set only).
+
+    python tb_vectors.py --out-dir out/vectors                 # all sets
+    python tb_vectors.py --out-dir out/vectors --sets grid,random --seed 7
+    vsim ... +vectors=out/vectors
+
+With +vectors the TB checks G_out and the aggregator's S_w/S_wg (hierarchical
+probe) of every vector, dT_sel of every series sample, and skips its own
+SV-reference grid/random/VIS blocks. A set without its end marker, an empty set,
+or no vectors at all stop the TB with $fatal. tb_top_coprocessor_pipe reads the
+same files (+vectors is required there), issues one vector per clock and checks
+G_out and LATENCY.
+"""
+
+import os
+import random
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fuzzy_refmodel import (
+    CoprocessorCfg, EstimatorRTLExact, cfg_to_reg_image, estimator_to_reg_image, series_trace,
+    singletons_to_reg_image,
+)
+from golden_surface import GoldenSurfaces, SurfaceCache
+
+VEC_END = (1 << 64) - 1
+SET_NAMES = ("grid", "random", "vis_T_at_dt0", "vis_dT_lines", "vis_heatmap", "series", "exhaustive")
+
+GRID_T = (-128, -64, -32, -16, 0, 16, 32, 64, 96, 127)
+GRID_DT = (-60, -30, -10, 0, 10, 30, 60)
+SERIES_EST = (128, 0, 40)               # alpha, k_dt, d_max: fast enough to reach the D_MAX clamp
+
+Vector = Tuple[int, int, int]           # (reg_mode, T, dT)
+
+def pack_vector(reg_mode: int, T: int, dT: int, S_w: int, S_wg: int, G: int,
+                dt_mode: int = 0, init: bool = False) -> int:
+    return ((bool(init) << 58) | ((dt_mode & 1) << 57) | ((reg_mode & 1) << 56) | ((T & 0xFF) << 48)
+            | ((dT & 0xFF) << 40) | (S_w << 24) | (S_wg << 8) | G)
+
+def unpack_vector(word: int) -> Tuple[int, int, int, int, int, int]:
+    """(reg_mode, T, dT, S_w, S_wg, G) of a packed word."""
+    T, dT = (word >> 48) & 0xFF, (word >> 40) & 0xFF
+    return ((word >> 56) & 1, T - 256 if T > 127 else T, dT - 256 if dT > 127 else dT,
+            (word >> 24) & 0xFFFF, (word >> 8) & 0xFFFF, word & 0xFF)
+
+# -------------------- Vector sets (TB order) --------------------
+
+def series_segments(seed: int = 0) -> List[List[int]]:
+    """T samples of the series set; each segment starts with an INIT."""
+    rnd = random.Random(seed)
+    ramp = ([0] * 4 + list(range(0, 121, 8)) + [120] * 6 + list(range(120, -129, -48)) + [-128] * 6
+            + list(range(-128, 127, 64)) + [127] * 4)
+    walk, T = [], 0
+    for _ in range(120):
+        T = max(-128, min(127, T + rnd.randint(-40, 40)))
+        walk.append(T)
+    return [ramp, walk]
+
+def vector_set(name: str, seed: int = 0, n_random: int = 1000) -> List[Vector]:
+    if name == "series":
+        # dT is the estimate, known only after series_trace() (see write_series_hex)
+        return [(1, T, 0) for seg in series_segments(seed) for T in seg]
+    if name == "grid":
+        return [(rm, T, dT) for rm in (0, 1) for T in GRID_T for dT in GRID_DT]
+    if name == "random":
+        # the TB draws with $urandom; this set is seeded here and replayed from the file
+        rnd = random.Random(seed)
+        return [(1, rnd.randint(-128, 127), rnd.randint(-128, 127)) for _ in range(n_random)]
+    if name == "vis_T_at_dt0":
+        return [(1, T, 0) for T in range(-128, 128, 2)]
+    if name == "vis_dT_lines":
+        return [(1, T, dT) for T in (-32, 0, 32) for dT in range(-60, 61, 4)]
+    if name == "vis_heatmap":
+        return [(1, T, dT) for T in range(-64, 65, 8) for dT in range(-60, 61, 5)]
+    if name == "exhaustive":
+        return [(rm, T, dT) for rm in (0, 1) for T in range(-128, 128) for dT in range(-128, 128)]
+    raise ValueError("unknown vector set %r" % name)
+
+# -------------------- Hex files --------------------
+
+def write_hex(path: str, name: str, vectors: Sequence[Vector], cfg: CoprocessorCfg,
+              surfaces: GoldenSurfaces) -> int:
+    """Write one set with expected values; returns the vector count."""
+    srfs = {rm: surfaces.surface(cfg, rm) for rm in {v[0] for v in vectors}}
+    lines = ["// %s: %d vectors, dt_mode=0\n" % (name, len(vectors)),
+             "// thr %s\n" % cfg_to_reg_image(cfg).hex(),
+             "// g %s\n" % singletons_to_reg_image(cfg.singletons).hex()]
+    for rm, T, dT in vectors:
+        S_w, S_wg, G = srfs[rm].point(T, dT)
+        lines.append("%016x\n" % pack_vector(rm, T, dT, S_w, S_wg, G))
+    lines.append("%016x\n" % VEC_END)
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="\n") as f:
+        f.write("".join(lines))
+    os.replace(tmp, path)
+    return len(vectors)
+
+def write_series_hex(path: str, name: str, segments: Sequence[Sequence[int]], cfg: CoprocessorCfg,
+                     surfaces: GoldenSurfaces, estimator: Optional[EstimatorRTLExact] = None) -> int:
+    """Write the dt_mode=1 series set (reg_mode=1) with the expected dT_sel; returns the sample count."""
+    est = estimator if estimator is not None else EstimatorRTLExact(*SERIES_EST)
+    srf = surfaces.surface(cfg, 1)
+    n = sum(len(seg) for seg in segments)
+    lines = ["// %s: %d vectors, dt_mode=1\n" % (name, n),
+             "// thr %s\n" % cfg_to_reg_image(cfg).hex(),
+             "// g %s\n" % singletons_to_reg_image(cfg.singletons).hex(),
+             "// est %s\n" % estimator_to_reg_image(est).hex()]
+    for seg in segments:
+        for i, (T, dT, G) in enumerate(series_trace(seg, cfg, 1, est)):
+            S_w, S_wg, _ = srf.point(T, dT)
+            lines.append("%016x\n" % pack_vector(1, T, dT, S_w, S_wg, G, dt_mode=1, init=i == 0))
+    lines.append("%016x\n" % VEC_END)
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="\n") as f:
+        f.write("".join(lines))
+    os.replace(tmp, path)
+    return n
+
+def read_hex(path: str) -> List[Tuple[int, int, int, int, int, int]]:
+    """Unpacked words of a file written by write_hex, up to the terminator."""
+    out = []
+    with open(path) as f:
+        for line in f:
+            line = line.split("//", 1)[0].strip()
+            if not line:
+                continue
+            word = int(line, 16)
+            if word == VEC_END:
+                return out
+            out.append(unpack_vector(word))
+    raise ValueError("%s: no end marker" % path)
+
+def export_vectors(out_dir: str, sets: Sequence[str] = SET_NAMES, cfg: Optional[CoprocessorCfg] = None,
+                   surfaces: Optional[GoldenSurfaces] = None, seed: int = 0,
+                   n_random: int = 1000) -> Dict[str, int]:
+    """<out_dir>/<set>.hex for each set; returns {set: count}."""
+    cfg = cfg if cfg is not None else CoprocessorCfg()
+    surfaces = surfaces if surfaces is not None else GoldenSurfaces()
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    for name in sets:
+        path = os.path.join(out_dir, name + ".hex")
+        if name == "series":
+            counts[name] = write_series_hex(path, name, series_segments(seed), cfg, surfaces)
+        else:
+            counts[name] = write_hex(path, name, vector_set(name, seed, n_random), cfg, surfaces)
+    return counts
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Export $readmemh golden vectors for tb_top_coprocessor")
+    ap.add_argument("--out-dir", default=os.path.join("out", "vectors"))
+    ap.add_argument("--sets", default=",".join(SET_NAMES), help="comma-separated subset of: " + ", ".join(SET_NAMES))
+    ap.add_argument("--seed", type=int, default=0, help="seed of the random set")
+    ap.add_argument("--n-random", type=int, default=1000)
+    ap.add_argument("--cache-dir", help="on-disk surface cache (golden_surface.SurfaceCache)")
+    args = ap.parse_args(argv)
+    sets = [s for s in args.sets.split(",") if s]
+    for s in sets:
+        if s not in SET_NAMES:
+            ap.error("unknown set %r" % s)
+    surfaces = GoldenSurfaces(cache=SurfaceCache(args.cache_dir)) if args.cache_dir else None
+    for name, n in export_vectors(args.out_dir, sets, surfaces=surfaces, seed=args.seed,
+                                  n_random=args.n_random).items():
+        print("%s: %d vectors" % (os.path.join(args.out_dir, name + ".hex"), n))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
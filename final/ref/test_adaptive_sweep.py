@@ -0,0 +1,44 @@
+# test_adaptive_sweep.py - adaptive quadtree sampler vs exhaustive reference sweep
+
+import pytest
+
+from fuzzy_refmodel import DEFAULT_CFG
+from adaptive_sweep import (
+    adaptive_map, adaptive_sample, cfg_breakpoints, fill_leaves, reconstruct,
+)
+from test_refmodel import CFG_TB
+
+def _surface_map(golden, cfg):
+    # adaptive_map with the compiled surface as evaluator
+    bT, bD = cfg_breakpoints(cfg)
+    samples, leaves = adaptive_sample(golden.evaluator(cfg, 1), coarse=16, breaks_T=bT, breaks_dT=bD)
+    return fill_leaves(samples, leaves), len(samples)
+
+# the TB layout needs a fraction of the points, the default triangles almost all of them
+@pytest.mark.slow
+@pytest.mark.parametrize("cfg,max_evals", [(CFG_TB, 256 * 256 // 4), (DEFAULT_CFG, 256 * 256)],
+                         ids=["tb", "default"])
+def test_adaptive_map_matches_exhaustive(golden, cfg, max_evals):
+    full, evals = _surface_map(golden, cfg)
+    assert len(full) == 256 * 256
+    plane = bytes(full[(T, dT)] for T in range(-128, 128) for dT in range(-128, 128))
+    bad = next((i for i, (a, b) in enumerate(zip(plane, golden.surface(cfg, 1).plane())) if a != b), None)
+    assert bad is None, (bad // 256 - 128, bad % 256 - 128)
+    assert evals < max_evals
+
+def test_adaptive_map_uses_refmodel(golden):
+    # adaptive_map itself (top_step evaluator) on a window around the MF breakpoints
+    srf = golden.surface(CFG_TB, 1)
+    full, evals = adaptive_map(CFG_TB, reg_mode=1, T_range=(-24, 24), dT_range=(-24, 24), coarse=8)
+    assert len(full) == 49 * 49 and evals < len(full)
+    assert all(G == srf.g(T, dT) for (T, dT), G in full.items())
+
+def test_reconstruct_from_logged_samples(golden):
+    # Heatmap window like vis_heatmap; samples are what the Pico would log
+    srf = golden.surface(CFG_TB, 1)
+    bT, bD = cfg_breakpoints(CFG_TB)
+    sweep = dict(T_range=(-64, 64), dT_range=(-60, 60), coarse=8, breaks_T=bT, breaks_dT=bD)
+    samples, _ = adaptive_sample(srf.g, **sweep)
+    full = reconstruct(dict(samples), **sweep)
+    assert len(full) == 129 * 121
+    assert all(G == srf.g(T, dT) for (T, dT), G in full.items())
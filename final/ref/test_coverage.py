@@ -0,0 +1,101 @@
+# test_coverage.py - reference model coverage collector (REQ-320 bins, Python side)
+
+import json
+import pickle
+import random
+
+import pytest
+
+from fuzzy_refmodel import (
+    Coverage, CoprocessorCfg, EstimatorRTLExact, MfSet3, MfThresholds, Singletons, dominant_mf,
+    stage_events, top_step,
+)
+from test_refmodel import CFG_TB
+
+def _vectors(n, seed=5):
+    rnd = random.Random(seed)
+    return [rnd.randint(-128, 127) for _ in range(n)], [rnd.randint(-128, 127) for _ in range(n)]
+
+def test_dominant_mf_matches_tb_classifier():
+    assert dominant_mf((0, 0, 0)) == 3
+    assert dominant_mf((5, 5, 5)) == 0
+    assert dominant_mf((0, 7, 7)) == 1
+    assert dominant_mf((1, 2, 3)) == 2
+
+@pytest.mark.slow
+def test_batch_matches_per_step_sampling():
+    Ts, dTs = _vectors(3000)
+    for rm in (0, 1):
+        step = Coverage()
+        for T, dT in zip(Ts, dTs):
+            step.sample(top_step(T, dT, CFG_TB, rm)[1], CFG_TB, rm)
+        batch = Coverage()
+        batch.sample_batch(Ts, dTs, CFG_TB, rm)
+        assert batch.state() == step.state()
+        assert batch.samples == 3000
+        s = batch.summary()
+        assert sum(map(sum, s["cross"]["rm%d_dt0" % rm])) == 3000
+        if rm == 0:
+            assert s["rules"]["rm0"]["w11"] == 0
+
+@pytest.mark.slow
+def test_merge_of_worker_states_equals_single_run():
+    Ts, dTs = _vectors(4000, seed=9)
+    whole = Coverage()
+    whole.sample_batch(Ts, dTs, CFG_TB, 1)
+    parts = []
+    for k in range(4):
+        c = Coverage()
+        c.sample_batch(Ts[k::4], dTs[k::4], CFG_TB, 1)
+        parts.append(pickle.loads(pickle.dumps(c.state())))
+    assert Coverage.merged(parts).state() == whole.state()
+    assert whole.merge(Coverage()).summary() == Coverage.merged(parts).summary()
+
+def test_edge_events_and_holes(tmp_path):
+    wide = MfSet3(*(MfThresholds(-128, -100, 100, 127),) * 3)
+    cfg = CoprocessorCfg(mf_T=wide, mf_dT=wide, singletons=Singletons(*(100,) * 9))
+    cov = Coverage()
+    cov.sample(top_step(0, 0, cfg, 1)[1], cfg, 1)               # 9 rules at 1.0: both sums saturate
+    cov.sample(top_step(-128, 127, CFG_TB, 1)[1], CFG_TB, 1)    # no rule fires: EPS path
+    est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=8)
+    est.init_pulse(0)
+    for T in (100, 100, -100):
+        G, dbg = top_step(T, 0, CFG_TB, 1, dt_mode=1, estimator=est)
+        cov.sample(dbg, CFG_TB, 1, dt_mode=1, estimator=est)
+    s = cov.summary()
+    assert s["sat"] == {"S_w": 1, "S_wg": 1}
+    assert s["eps"]["zero"] == 1
+    assert s["est_clamp"] == {"+d_max": 1, "-d_max": 1, "none": 1}
+    assert s["rule_sets"]["rm1"]["0x1ff"] == 1 and s["rule_sets"]["rm1"]["0x000"] == 1
+    assert cov.events.counts["aggregate.S_w"] == 1
+    holes = cov.holes()
+    assert "eps=near" in holes and not any(h.startswith(("sat=", "est_clamp=")) for h in holes)
+    path = tmp_path / "cov.json"
+    cov.write_json(str(path))
+    assert json.loads(path.read_text())["samples"] == 5
+
+def test_clamp_counts_agree_with_stage_events():
+    Ts, dTs = _vectors(500, seed=3)
+    wide = MfSet3(*(MfThresholds(-128, -60, 60, 127),) * 3)
+    cfg = CoprocessorCfg(mf_T=wide, mf_dT=wide, singletons=Singletons(*(100,) * 9))
+    cov = Coverage()
+    with stage_events() as ev:
+        for T, dT in zip(Ts, dTs):
+            cov.sample(top_step(T, dT, cfg, 1)[1], cfg, 1)
+    batch = Coverage()
+    batch.sample_batch(Ts, dTs, cfg, 1)
+    assert ev.counts["aggregate.S_w"] > 0
+    assert cov.summary()["sat"] == batch.summary()["sat"] == {
+        "S_w": ev.counts["aggregate.S_w"], "S_wg": ev.counts["aggregate.S_wg"]}
+
+def test_init_pulse_clears_clip_hit():
+    est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=8)
+    est.init_pulse(0)
+    est.step(100)
+    assert est.clip_hit == 1
+    est.init_pulse(100)
+    assert est.clip_hit == 0
+    cov = Coverage()
+    G, dbg = top_step(100, 0, CFG_TB, 1, dt_mode=1, estimator=EstimatorRTLExact())
+    cov.sample(dbg, CFG_TB, 1, dt_mode=1, estimator=est)
+    assert cov.summary()["est_clamp"] == {"+d_max": 0, "-d_max": 0, "none": 1}
@@ -0,0 +1,33 @@
+# test_g_table.py - run-length G table (Pico self-check) vs golden surface
+
+import random
+
+import pytest
+
+from fuzzy_refmodel import DEFAULT_CFG, cfg_to_reg_image
+from g_table import GTAB_HDR, GTable, table_bytes, write_table
+from test_refmodel import CFG_TB
+
+@pytest.mark.parametrize("cfg", [CFG_TB, DEFAULT_CFG], ids=["tb", "default"])
+def test_table_roundtrip_and_lookup(golden, cfg):
+    plane = golden.surface(cfg, 1).plane()
+    tab = GTable(table_bytes(plane, 1, cfg))
+    assert tab.plane() == plane
+    assert tab.cfg == cfg and tab.reg_mode == 1
+    rnd = random.Random(2)
+    for _ in range(2000):
+        T, dT = rnd.randint(-128, 127), rnd.randint(-128, 127)
+        assert tab.g(T, dT) == plane[((T + 128) << 8) | (dT + 128)]
+    for T in (-128, 127):
+        for dT in (-128, 127):
+            assert tab.g(T, dT) == plane[((T + 128) << 8) | (dT + 128)]
+
+def test_table_file_is_compact(tmp_path, golden):
+    path = str(tmp_path / "gtab_tb.bin")
+    n = write_table(path, CFG_TB, 1, golden)
+    assert n < 65536 // 8
+    data = open(path, "rb").read()
+    assert GTAB_HDR.unpack_from(data)[4] == cfg_to_reg_image(CFG_TB)
+    assert GTable.load(path).plane() == golden.surface(CFG_TB, 1).plane()
+    with pytest.raises(ValueError):
+        GTable(data[:-1])
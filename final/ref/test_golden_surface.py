@@ -0,0 +1,72 @@
+# test_golden_surface.py - compiled surfaces and the on-disk surface cache
+
+import os
+
+from fuzzy_refmodel import (
+    DEFAULT_CFG, CoprocessorCfg, MfSet3, MfThresholds, Singletons, top_step,
+)
+from golden_surface import (
+    SURFACE_FILE_SIZE, GoldenSurfaces, SurfaceCache, compile_surface, model_tag, surface_key,
+)
+from test_refmodel import CFG_TB
+
+# crisp MFs (b == a, d == c): a handful of membership triples, compiles in milliseconds
+_CRISP = MfSet3(neg=MfThresholds(-128, -128, -33, -32), zero=MfThresholds(-32, -32, 31, 32),
+                pos=MfThresholds(31, 32, 127, 127))
+
+def _crisp(g22=0):
+    return CoprocessorCfg(mf_T=_CRISP, mf_dT=_CRISP, singletons=Singletons(g22=g22))
+
+def test_cache_maps_the_stored_plane(tmp_path):
+    cache = SurfaceCache(str(tmp_path))
+    cold = GoldenSurfaces(cache=cache)
+    cfg = _crisp()
+    srf = cold.surface(cfg, 0)
+    assert (cold.compiled, cache.misses, cache.hits) == (1, 1, 0)
+    warm = GoldenSurfaces(cache=SurfaceCache(str(tmp_path)))
+    m = warm.surface(cfg, 0)
+    assert warm.compiled == 0 and warm.disk.hits == 1
+    assert m.plane() == srf.plane()
+    for T, dT in ((-64, -10), (0, 0), (127, -128), (31, 32), (-33, 5)):
+        G, dbg = top_step(T, dT, cfg, 0)
+        assert m.point(T, dT) == (dbg["S_w"], dbg["S_wg"], G)
+
+def test_key_covers_cfg_mode_and_model():
+    tag = model_tag()
+    k = surface_key(CFG_TB, 1, tag)
+    assert k == surface_key(CFG_TB, 1, tag)
+    assert k != surface_key(CFG_TB, 0, tag)
+    assert k != surface_key(DEFAULT_CFG, 1, tag)
+    assert k != surface_key(CFG_TB, 1, "other-model")
+    cfg2 = type(CFG_TB)(mf_T=CFG_TB.mf_T, mf_dT=CFG_TB.mf_dT, singletons=Singletons(g22=1))
+    assert k != surface_key(cfg2, 1, tag)
+
+def test_damaged_file_is_rebuilt(tmp_path):
+    cache = SurfaceCache(str(tmp_path))
+    pth = cache.store(compile_surface(_crisp(), 1))
+    with open(pth, "r+b") as f:
+        f.truncate(1000)
+    assert cache.load(_crisp(), 1) is None and not os.path.exists(pth)
+    assert GoldenSurfaces(cache=cache).surface(_crisp(), 1).g(0, 0) == 50
+    assert os.path.getsize(pth) == SURFACE_FILE_SIZE
+
+def test_lru_eviction_under_budget(tmp_path):
+    cache = SurfaceCache(str(tmp_path), max_bytes=2 * SURFACE_FILE_SIZE)
+    a = cache.store(compile_surface(_crisp(0), 1))
+    b = cache.store(compile_surface(_crisp(1), 1))
+    os.utime(a, (1, 1))
+    os.utime(b, (2, 2))
+    assert cache.load(_crisp(0), 1) is not None     # hit: a becomes most recent
+    c = cache.store(compile_surface(_crisp(2), 1))
+    assert os.path.exists(a) and not os.path.exists(b) and os.path.exists(c)
+    assert cache.evicted == 1
+
+def test_memory_cache_keeps_recent_surfaces():
+    gs = GoldenSurfaces(max_surfaces=2)
+    a = gs.surface(_crisp(0), 1)
+    gs.surface(_crisp(1), 1)
+    assert gs.surface(_crisp(0), 1) is a            # hit: a becomes most recent
+    gs.surface(_crisp(2), 1)
+    assert gs.surface(_crisp(0), 1) is a and gs.compiled == 3
+    gs.surface(_crisp(1), 1)                        # evicted: compiled again
+    assert gs.compiled == 4 and len(gs._cache) == 2
@@ -0,0 +1,216 @@
+# test_mmio_model.py - clock-level mmio_if/top_coprocessor models vs reference model
+
+import random
+
+import pytest
+
+from fuzzy_refmodel import (
+    REG_THR_BASE, REG_THR_COUNT, EstimatorRTLExact, cfg_to_reg_image, series_trace, top_step,
+)
+from mmio_model import (
+    CTRL_START, FIFO_DEPTH, MODES_EXT, REG_CTRL, REG_DTIN, REG_G, REG_RESULT, REG_TIN, RES_FRESH,
+    BurstRegFile, BusTiming, ClockedMmio, DoneIrq, ResultReg, StreamingMmio, burst_ops,
+    completion_cost, driver_results, driver_trace, stream_throughput,
+)
+from test_refmodel import CFG_TB
+
+def _vectors(n, seed=7):
+    rnd = random.Random(seed)
+    return [(rnd.randint(-128, 127), rnd.randint(-128, 127)) for _ in range(n)]
+
+def test_stream_preserves_order_and_values():
+    vecs = _vectors(200)
+    out, rate = stream_throughput(vecs, CFG_TB, reg_mode=1)
+    assert out == [top_step(T, dT, CFG_TB, 1)[0] for T, dT in vecs]
+    # auto-start -> RUN -> DONE -> result FIFO: one result every 4 clocks
+    assert 0.24 < rate <= 0.25
+
+def test_full_result_fifo_stalls_core_without_loss():
+    m = StreamingMmio(CFG_TB)
+    vecs = _vectors(FIFO_DEPTH + 4, seed=3)
+    for v in vecs:
+        m.tick(push=v)
+    for _ in range(200):
+        m.tick()
+    assert m.out_level == FIFO_DEPTH and m.in_level == 4 and not m.busy
+    assert not m.fifo_ovf and m.status & 0b0100
+    out, _ = m.run([])
+    assert out == []
+    got = [m.tick(pop=True) for _ in range(FIFO_DEPTH)]
+    while m.in_level or m.busy or m.out_level:
+        G = m.tick(pop=bool(m.out_level))
+        if G is not None:
+            got.append(G)
+    assert got == [top_step(T, dT, CFG_TB, 1)[0] for T, dT in vecs]
+
+def test_push_into_full_input_fifo_sets_overflow():
+    m = StreamingMmio(CFG_TB)
+    m.stream = False
+    for v in _vectors(FIFO_DEPTH + 1):
+        m.tick(push=v)
+    assert m.in_level == FIFO_DEPTH
+    assert m.fifo_ovf and m.status & 0b1010 == 0b1010
+
+def test_burst_threshold_upload_matches_direct_writes():
+    image = cfg_to_reg_image(CFG_TB)
+    direct, burst = BurstRegFile(), BurstRegFile()
+    direct.apply([(REG_THR_BASE + i, v) for i, v in enumerate(image)])
+    burst.apply(burst_ops(REG_THR_BASE, image))
+    assert burst.regs == direct.regs
+    assert bytes(burst.regs[REG_THR_BASE:REG_THR_BASE + REG_THR_COUNT]) == image
+    assert (direct.strobes, direct.addr_drives) == (24, 24)
+    assert (burst.strobes, burst.addr_drives) == (25, 2)
+    assert burst.burst_ptr == REG_THR_BASE + REG_THR_COUNT
+
+def test_done_irq_set_wins_and_clears():
+    irq = DoneIrq()
+    assert irq.tick(done=True)
+    assert irq.tick()
+    assert irq.tick(done=True, rd_g=True)
+    assert not irq.tick(start=True)
+
+def test_irq_saves_status_polls():
+    poll = completion_cost("poll", 100)
+    irq = completion_cost("irq", 100)
+    assert irq.polls == 0 and irq.per_result == 6
+    assert poll.per_result == 7
+    # slow core / short bus cycle: polling needs many STATUS reads, IRQ still one G read
+    slow = completion_cost("poll", 10, core_clks=20000, txn_clks=2000)
+    assert slow.polls == 100 and slow.per_result == 16
+
+def test_result_register_clear_on_read():
+    r = ResultReg()
+    assert r.read() == 0
+    r.done(87)
+    assert r.read() == RES_FRESH | 87
+    assert r.read() == 87               # G stays, fresh is gone
+    r.done(12)
+    r.start()
+    assert not r.read() & RES_FRESH
+
+def test_result_register_result_lands_mid_read():
+    r = ResultReg()
+    assert r.begin_read() == 0          # sampled before the result
+    r.done(87)
+    r.end_read()
+    assert r.read() == RES_FRESH | 87   # not consumed by the read that missed it
+    irq = DoneIrq()
+    irq.begin_read()
+    irq.tick(done=True)
+    irq.end_read()
+    assert irq.level
+
+def test_result_register_single_read_per_point():
+    # sweep step: T, dT, START writes; STATUS + G reads vs one RESULT read
+    poll = completion_cost("poll", 100, setup_writes=3)
+    res = completion_cost("result", 100, setup_writes=3)
+    assert res.transactions == 4 * 100 and res.polls == 0
+    assert poll.transactions == 5 * 100
+    # core slower than one bus read: unsuccessful RESULT reads are the only extra cost
+    slow = completion_cost("result", 10, core_clks=5000, setup_writes=3)
+    assert slow.polls == 20 and slow.per_result == 6
+
+def test_clocked_result_driver_matches_refmodel():
+    vecs = _vectors(300)
+    m = ClockedMmio(CFG_TB)
+    reads, st = m.run(driver_trace("result", vecs))
+    assert driver_results("result", reads, len(vecs)) == [top_step(T, dT, CFG_TB, 1)[0] for T, dT in vecs]
+    assert all(r & RES_FRESH for r in reads) and st.poll_timeouts == 0
+    # T, dT, START, RESULT: 4 transactions of 800 clocks per result, core busy 2 of them
+    assert st.transactions == 4 * len(vecs) + 1 and st.clocks == 800 * st.transactions
+    assert st.results == len(vecs) and st.busy_clocks == 2 * len(vecs)
+    assert round(st.cycles_per_result) == 3203
+
+def test_clocked_status_exposes_raw_valid_pulse():
+    vecs = _vectors(20, seed=5)
+    _, slow = ClockedMmio(CFG_TB).run(driver_trace("status", vecs), max_polls=5)
+    assert slow.valid_seen == 0 and slow.poll_timeouts == len(vecs)
+    reads, fast = ClockedMmio(CFG_TB, timing=BusTiming(0, 1, 0)).run(driver_trace("status", vecs))
+    assert fast.valid_seen == len(vecs) and fast.poll_timeouts == 0
+    assert driver_results("status", reads, len(vecs)) == [top_step(T, dT, CFG_TB, 1)[0] for T, dT in vecs]
+
+def test_clocked_fsm_timing_and_w1p_edge():
+    m = ClockedMmio(CFG_TB)
+    m.tick(wr=True, addr=REG_CTRL, wdata=MODES_EXT)
+    seen = []
+    for _ in range(6):                  # START held: a single evaluation
+        m.tick(wr=True, addr=REG_CTRL, wdata=CTRL_START | MODES_EXT)
+        seen.append(m.status & 1)
+    assert seen == [0, 0, 1, 0, 0, 0] and m.results == 1
+    assert m.res_fresh and m.done_irq   # not cleared again by the held strobe
+
+def _start_then_read(m, addr, clocks=6):
+    """One-clock START, then a read of 'addr' held across the valid pulse."""
+    m.tick(wr=True, addr=REG_CTRL, wdata=CTRL_START | MODES_EXT)
+    seen, valid_at = [], None
+    for k in range(clocks):
+        seen.append(m.rdata(addr))
+        if m.valid:
+            valid_at = k
+        m.tick(rd=True, addr=addr)
+    m.tick()
+    return seen, valid_at
+
+def test_clocked_result_lands_mid_read():
+    m = ClockedMmio(CFG_TB)
+    m.write(REG_CTRL, MODES_EXT)
+    seen, valid_at = _start_then_read(m, REG_RESULT)
+    assert 0 < valid_at < 5
+    assert seen == [seen[0]] * 6 and not seen[0] & RES_FRESH    # sampled in the first clock
+    assert m.res_fresh and m.done_irq
+    assert m.read(REG_RESULT) == RES_FRESH | (m.G_out & 0x7F)
+    m.tick()                            # cleared on the clock after the strobe
+    assert not m.res_fresh
+    # done_irq: a G read that began before the result does not clear it
+    m.write(REG_TIN, 100)
+    seen, valid_at = _start_then_read(m, REG_G)
+    assert 0 < valid_at < 5 and m.done_irq
+    m.read(REG_G)
+    m.tick()
+    assert not m.done_irq
+
+def test_clocked_dt_write_gated_in_internal_mode():
+    m = ClockedMmio(CFG_TB)
+    m.write(REG_DTIN, 40)               # reset: dt_mode=1
+    assert m.dT_in == 0
+    m.write(REG_CTRL, MODES_EXT)
+    m.write(REG_DTIN, -40 & 0xFF)
+    assert m.dT_in == -40
+
+def test_clocked_series_matches_series_trace():
+    # the estimator steps once per START, so bus timing does not change the trace
+    rnd = random.Random(4)
+    T, Ts = 0, []
+    for _ in range(120):
+        T = max(-128, min(127, T + rnd.randint(-40, 40)))
+        Ts.append(T)
+    est = EstimatorRTLExact(alpha=128, k_dt=0, d_max=100)
+    exp = [G for _, _, G in series_trace(Ts, CFG_TB, 1, EstimatorRTLExact(128, 0, 100))]
+    assert len(set(exp)) > 10
+    # (setup 0 and gap 0 would merge back-to-back polls into one RESULT strobe)
+    for timing in (BusTiming(), BusTiming(1, 1, 0), BusTiming(3, 17, 5)):
+        reads, st = ClockedMmio(CFG_TB, est, timing=timing).run(driver_trace("series", [(T, 0) for T in Ts]))
+        assert driver_results("series", reads, len(Ts)) == exp, timing
+        assert st.poll_timeouts == 0
+
+class _EveryClock(ClockedMmio):
+    def _settled(self, rd, wr, addr, wdata):
+        return False
+
+@pytest.mark.slow
+def test_clocked_fast_forward_is_exact():
+    # series with a fast estimator: G depends on the estimate of every sample
+    est = EstimatorRTLExact(alpha=32, k_dt=0, d_max=100)
+    vecs = _vectors(40, seed=9)
+    trace = (driver_trace("series", vecs) + driver_trace("result", vecs)
+             + driver_trace("series", vecs[:5]) + [("R", REG_RESULT, 0)] + driver_trace("stream", vecs)
+             + driver_trace("status", vecs[:5]))
+    for timing in (BusTiming(1, 2, 0), BusTiming(3, 6, 1), BusTiming(2, 40, 3)):
+        runs = []
+        for cls in (ClockedMmio, _EveryClock):
+            m = cls(CFG_TB, est, timing=timing)
+            reads, st = m.run(trace)
+            runs.append((reads, st, m.est.dT_prev_q15, m.dT_est, m.G_out))
+        assert runs[0] == runs[1], timing
+        if timing.strobe_clks == 2:
+            assert len({r & 0x7F for r in runs[0][0][:40]}) > 1
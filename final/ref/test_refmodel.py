@@ -14,7 +14,10 @@ from fuzzy_refmodel import (
     Q15_MAX,
     MfThresholds, MfSet3, CoprocessorCfg, Singletons,
     g2q15_percent, mul_q15_round, trapezoid_mu, rules9_min, aggregate, defuzz,
-    top_step, EstimatorRTLExact, SimpleDtEstimator, fuzzify,
+    top_step, EstimatorRTLExact, SimpleDtEstimator, fuzzify, series_trace,
+    cfg_to_reg_image, reg_image_to_cfg, reg_image_delta, make_profile, REG_THR_BASE,
+    singletons_to_reg_image, reg_image_to_singletons, REG_G_BASE,
+    estimator_to_reg_image, reg_image_to_estimator, spot_vectors,
 )
 
 # ================== TB-equivalent configuration ==================
@@ -76,6 +79,8 @@ def _vis_open(filename):
     return f, path
 
 # ================== Bit-accurate reference path helpers ==================
+# Independent golden path; test_golden_surface_cross_check holds the compiled
+# surfaces (golden fixture) to it.
 
 def _fuzzify_TD(T: int, dT: int, cfg: CoprocessorCfg):
     muT = fuzzify(T, cfg.mf_T)
@@ -132,16 +137,15 @@ def csv_file():
 # ================== Block 1: DT_MODE=0 GRID + edge ==================
 
 @pytest.mark.parametrize("reg_mode", [0, 1])
-def test_grid_dt_mode0(csv_file, reg_mode):
+def test_grid_dt_mode0(csv_file, golden, reg_mode):
     if SEED_META:
         random.seed(SEED_META)
     idx = 0
+    srf = golden.surface(CFG_TB, reg_mode)
 
     for T in _grid_T_values():
         for dT in _grid_dT_values():
-            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-            w = _weights_q15(muT, muD)
-            Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+            Sw, Swg, Gexp = srf.point(T, dT)
 
             Gimpl, dbg = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
 
@@ -152,12 +156,10 @@ def test_grid_dt_mode0(csv_file, reg_mode):
             _csv_emit(csv_file, f"Grid_T={T}_dT={dT}", idx, reg_mode, 0, T, dT, Gexp, Gimpl)
             idx += 1
 
-def test_edge_sumw_zero_dt_mode0(csv_file):
+def test_edge_sumw_zero_dt_mode0(csv_file, golden):
     reg_mode = 1
     T, dT = -128, 127
-    muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-    w = _weights_q15(muT, muD)
-    Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+    Sw, Swg, Gexp = golden.point(CFG_TB, reg_mode, T, dT)
     Gimpl, dbg = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
     assert Gexp == 0
     assert Gimpl == Gexp
@@ -165,19 +167,18 @@ def test_edge_sumw_zero_dt_mode0(csv_file):
 
 # ================== Block 2: DT_MODE=0 random MAE ==================
 
-def test_random_mae_dt_mode0(csv_file):
+def test_random_mae_dt_mode0(csv_file, golden):
     N = 1000
     reg_mode = 1
     mae_acc = 0
     idx = 0
+    srf = golden.surface(CFG_TB, reg_mode)
     if SEED_META:
         random.seed(SEED_META)
     for _ in range(N):
         T = random.randint(-128, 127)
         dT = random.randint(-128, 127)
-        muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-        w = _weights_q15(muT, muD)
-        Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+        Gexp = srf.g(T, dT)
         Gimpl, dbg = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
 
         diff = abs(Gimpl - Gexp)
@@ -191,13 +192,7 @@ def test_random_mae_dt_mode0(csv_file):
 
 # ================== Block 3: DT_MODE=1 estimator scenarios ==================
 
-def _golden_at_dT0(T: int, reg_mode: int):
-    muT, muD0 = _fuzzify_TD(T, 0, CFG_TB)
-    w = _weights_q15(muT, muD0)
-    Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
-    return Gexp
-
-def test_estimator_flow_dt_mode1(csv_file):
+def test_estimator_flow_dt_mode1(csv_file, golden):
     reg_mode = 1
     dt_mode = 1
 
@@ -206,7 +201,7 @@ def test_estimator_flow_dt_mode1(csv_file):
 
     # INIT: must match dT=0 golden for T=0
     T = 0
-    Gexp_init = _golden_at_dT0(T, reg_mode)
+    Gexp_init = golden.g(CFG_TB, reg_mode, T, 0)
     Gimpl, dbg = top_step(T, 0, CFG_TB, reg_mode, dt_mode, est)
     _csv_emit(csv_file, "EST_INIT", 0, reg_mode, dt_mode, T, 0, -1, Gimpl)
     assert 0 <= Gimpl <= 100
@@ -251,48 +246,59 @@ def test_estimator_flow_dt_mode1(csv_file):
         assert 0 <= Gimpl <= 100
         idx_rw += 1
 
+def test_series_trace_single_init():
+    # One INIT on the first sample, then the estimator state carries across samples
+    Ts = [0, 4, 8, 12, 16, 12, 8]
+    trace = series_trace(Ts, CFG_TB, reg_mode=1,
+                         estimator=EstimatorRTLExact(alpha=255, k_dt=0, d_max=64))
+
+    est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=64)
+    est.init_pulse(Ts[0])
+    for (T, dT_sel, G), T_exp in zip(trace, Ts):
+        Gexp, dbg = top_step(T_exp, 0, CFG_TB, 1, dt_mode=1, estimator=est)
+        assert (T, dT_sel, G) == (T_exp, dbg["dT_sel"], Gexp)
+    assert trace[0][1] == 0
+    assert any(dT != 0 for _, dT, _ in trace[1:])
+
 # ================== VIS flows (CSV like TB) ==================
 
-def test_vis_T_at_dt0_csv():
+def test_vis_T_at_dt0_csv(golden):
     # out/vis_T_at_dt0.csv with header T,dT,Gimpl,Gexp
     f, path = _vis_open("vis_T_at_dt0.csv")
     reg_mode = 1
+    srf = golden.surface(CFG_TB, reg_mode)
     dT = 0
     for T in range(-128, 128, 2):
-        muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-        w = _weights_q15(muT, muD)
-        _, _, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+        Gexp = srf.g(T, dT)
         Gimpl, _ = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
         assert Gimpl == Gexp
         f.write(f"{T},{dT},{Gimpl},{Gexp}\n")
     f.flush()
     f.close()
 
-def test_vis_dT_lines_csv():
+def test_vis_dT_lines_csv(golden):
     # out/vis_dT_lines.csv for T in {-32,0,32}, dT -60..60 step 4
     f, path = _vis_open("vis_dT_lines.csv")
     reg_mode = 1
+    srf = golden.surface(CFG_TB, reg_mode)
     Ts = [-32, 0, 32]
     for T in Ts:
         for dT in range(-60, 61, 4):
-            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-            w = _weights_q15(muT, muD)
-            _, _, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+            Gexp = srf.g(T, dT)
             Gimpl, _ = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
             assert Gimpl == Gexp
             f.write(f"{T},{dT},{Gimpl},{Gexp}\n")
     f.flush()
     f.close()
 
-def test_vis_heatmap_csv():
+def test_vis_heatmap_csv(golden):
     # out/vis_heatmap.csv for T -64..64 step 8, dT -60..60 step 5
     f, path = _vis_open("vis_heatmap.csv")
     reg_mode = 1
+    srf = golden.surface(CFG_TB, reg_mode)
     for T in range(-64, 65, 8):
         for dT in range(-60, 61, 5):
-            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-            w = _weights_q15(muT, muD)
-            _, _, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+            Gexp = srf.g(T, dT)
             Gimpl, _ = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
             assert Gimpl == Gexp
             f.write(f"{T},{dT},{Gimpl},{Gexp}\n")
@@ -352,16 +358,15 @@ def test_degenerate_zero_T_mf():
         Gimpl, _ = top_step(0, dT, cfg2, reg_mode, dt_mode, estimator=None)
         assert 0 <= Gimpl <= 100
 
-def test_near_eps_safe_defuzz(csv_file):
+def test_near_eps_safe_defuzz(csv_file, golden):
     # Find a coarse-grid vector with SumW in [1..4] LSBs; ensure defuzz stays finite/in-range.
     reg_mode = 1
     found = False
     cand = (0, 0)
+    srf = golden.surface(CFG_TB, reg_mode)
     for T in _grid_T_values():
         for dT in _grid_dT_values():
-            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-            w = _weights_q15(muT, muD)
-            Sw, Swg, _ = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+            Sw, Swg, _ = srf.point(T, dT)
             if 1 <= Sw <= 4:
                 cand = (T, dT)
                 found = True
@@ -374,7 +379,7 @@ def test_near_eps_safe_defuzz(csv_file):
         assert 0 <= Gimpl <= 100
         _csv_emit(csv_file, "NearEPS", 0, reg_mode, 0, T, dT, -1, Gimpl)
 
-def test_param_sweep_small_grid():
+def test_param_sweep_small_grid(golden):
     # A few legal MF layouts to prove configurability (mirror TB PARAM_SWEEP)
     reg_mode = 1
     dt_mode = 0
@@ -391,13 +396,104 @@ def test_param_sweep_small_grid():
         cfgv = CoprocessorCfg(mf_T=mfT, mf_dT=CFG_TB.mf_dT, singletons=CFG_TB.singletons)
         for T in Ts:
             for dT in dTs:
-                muT, muD = _fuzzify_TD(T, dT, cfgv)
-                w = _weights_q15(muT, muD)
-                _, _, Gexp = _agg_and_defuzz(reg_mode, w, cfgv.singletons)
+                Gexp = golden.g(cfgv, reg_mode, T, dT)
                 Gimpl, _ = top_step(T, dT, cfgv, reg_mode, dt_mode, estimator=None)
                 assert Gimpl == Gexp
                 assert 0 <= Gimpl <= 100
 
+def test_golden_surface_cross_check(golden):
+    # Stage-by-stage golden path vs the compiled surfaces on every TB vector set
+    rnd = random.Random(1)
+    grid = [(T, dT) for T in _grid_T_values() for dT in _grid_dT_values()]
+    pts = list(grid)
+    pts += [(T, 0) for T in range(-128, 128, 2)]
+    pts += [(T, dT) for T in (-32, 0, 32) for dT in range(-60, 61, 4)]
+    pts += [(T, dT) for T in range(-64, 65, 8) for dT in range(-60, 61, 5)]
+    pts += [(rnd.randint(-128, 127), rnd.randint(-128, 127)) for _ in range(1000)]
+    pts += [(-128, 127), (127, -128), (-128, -128), (127, 127)]
+    for reg_mode, vecs in ((0, grid), (1, pts)):
+        srf = golden.surface(CFG_TB, reg_mode)
+        for T, dT in vecs:
+            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
+            w = _weights_q15(muT, muD)
+            assert srf.point(T, dT) == _agg_and_defuzz(reg_mode, w, CFG_TB.singletons), (reg_mode, T, dT)
+
+# ================== MMIO register image / profiles ==================
+
+def test_reg_image_roundtrip_and_layout():
+    img = cfg_to_reg_image(CFG_TB)
+    assert len(img) == 24
+    assert img[0] == 0x80            # 0x10 T_neg_a = -128
+    assert img[12] == (-100 & 0xFF)  # 0x1C dT_neg_a
+    back = reg_image_to_cfg(img, CFG_TB.singletons)
+    assert back == CFG_TB
+
+def test_reg_image_delta_writes_only_changes():
+    old = cfg_to_reg_image(CFG_TB)
+    mfT = MfSet3(neg=MF_T_TB.neg, zero=MfThresholds(a=-20, b=0, c=0, d=20), pos=MF_T_TB.pos)
+    new = cfg_to_reg_image(CoprocessorCfg(mf_T=mfT, mf_dT=MF_DT_TB, singletons=SINGLETONS_TB))
+    assert reg_image_delta(old, new) == [(REG_THR_BASE + 4, -20 & 0xFF), (REG_THR_BASE + 7, 20)]
+    assert reg_image_delta(old, old) == []
+    assert len(reg_image_delta(None, new)) == 24
+
+def test_singleton_image_roundtrip_and_delta():
+    img = singletons_to_reg_image(SINGLETONS_TB)
+    assert list(img) == [100, 50, 30, 50, 50, 50, 80, 50, 0]
+    assert reg_image_to_singletons(img) == SINGLETONS_TB
+    flat = Singletons(g00=60, g22=40)
+    delta = reg_image_delta(img, singletons_to_reg_image(flat), base=REG_G_BASE)
+    assert delta == [(REG_G_BASE, 60), (REG_G_BASE + 8, 40)]
+
+def test_estimator_image_roundtrip():
+    assert estimator_to_reg_image(EstimatorRTLExact()) == bytes((32, 3, 64))
+    est = reg_image_to_estimator(estimator_to_reg_image(EstimatorRTLExact(alpha=200, k_dt=1, d_max=100)))
+    assert (est.alpha, est.k_dt, est.d_max) == (200, 1, 100)
+    a, b = reg_image_to_estimator(bytes((200, 1, 100))), EstimatorRTLExact(alpha=200, k_dt=1, d_max=100)
+    a.init_pulse(0)
+    b.init_pulse(0)
+    assert [a.step(T) for T in range(0, 120, 7)] == [b.step(T) for T in range(0, 120, 7)]
+
+def test_profile_golden_matches_model():
+    prof = make_profile("tb", CFG_TB)
+    assert prof["image"] == list(cfg_to_reg_image(CFG_TB))
+    assert prof["g_image"] == list(singletons_to_reg_image(CFG_TB.singletons))
+    assert "est_image" not in prof
+    assert make_profile("tb", CFG_TB, estimator=EstimatorRTLExact(k_dt=2))["est_image"] == [32, 2, 64]
+    assert prof["golden"]
+    for T, dT, G in prof["golden"]:
+        assert top_step(T, dT, CFG_TB, 1)[0] == G
+
+def test_spot_vectors_probe_changed_mfs():
+    # every MF slope when nothing is known about the registers
+    Ts = sorted({T for T, _ in spot_vectors(CFG_TB)})
+    assert Ts == [-96, -16, -8, 8, 16, 95]
+    # only the T-POS slopes moved: T probes cover them, dT stays on its ZERO slopes
+    pos = MfThresholds(0, 40, 80, 127)
+    new = CoprocessorCfg(mf_T=MfSet3(CFG_TB.mf_T.neg, CFG_TB.mf_T.zero, pos), mf_dT=CFG_TB.mf_dT,
+                         singletons=CFG_TB.singletons)
+    pts = spot_vectors(new, old=CFG_TB)
+    assert sorted({T for T, _ in pts}) == [20, 103]
+    assert sorted({dT for _, dT in pts}) == sorted({dT for _, dT in spot_vectors(CFG_TB, old=CFG_TB)})
+    # each probe sees the change
+    for T, dT in pts:
+        assert fuzzify(T, new.mf_T)[2] != fuzzify(T, CFG_TB.mf_T)[2]
+    prof = make_profile("pos", new, base=CFG_TB)
+    assert [(T, dT) for T, dT, _ in prof["golden"]] == pts
+
+def test_cli_profile_cfg_selection(tmp_path):
+    import json
+    from fuzzy_refmodel import main
+    out = tmp_path / "prof_tb.json"
+    assert main(["--cfg", "tb", "--profile-out", str(out), "--profile-est", "--kdt", "2"]) == 0
+    prof = json.loads(out.read_text())
+    assert prof["image"] == list(cfg_to_reg_image(CFG_TB)) and prof["est_image"] == [32, 2, 64]
+    img = cfg_to_reg_image(CFG_TB)
+    out2 = tmp_path / "prof_img.json"
+    assert main(["--thr-image", img.hex(), "--g-image", "646464646464646464", "--profile-out", str(out2)]) == 0
+    prof2 = json.loads(out2.read_text())
+    assert prof2["image"] == list(img) and prof2["g_image"] == [100] * 9 and "est_image" not in prof2
+    assert all(G == 100 for _, _, G in prof2["golden"])
+
 # ================== Light sanity tests kept from earlier ==================
 
 def test_req210_percent_q15_mapping_and_mul_round():
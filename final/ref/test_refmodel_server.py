@@ -0,0 +1,134 @@
+# test_refmodel_server.py - query server (Unix socket + stdio) vs reference model
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+import pytest
+
+from fuzzy_refmodel import (
+    DEFAULT_CFG, CoprocessorCfg, EstimatorRTLExact, Singletons, cfg_to_reg_image,
+    singletons_to_reg_image, top_step,
+)
+from refmodel_server import RefmodelClient, RefmodelServer, latency
+from test_golden_surface import _CRISP
+from test_refmodel import CFG_TB
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TB_CFG_CMD = "CFG tb %s %s" % (cfg_to_reg_image(CFG_TB).hex(), singletons_to_reg_image(CFG_TB.singletons).hex())
+
+@pytest.fixture
+def server_path(golden):
+    # server loop in a background thread; clients are plain blocking sockets
+    path = os.path.join(tempfile.mkdtemp(), "fz.sock")
+    srv = RefmodelServer(golden)
+    loop = asyncio.new_event_loop()
+    th = threading.Thread(target=loop.run_forever, daemon=True)
+    th.start()
+    fut = asyncio.run_coroutine_threadsafe(srv.serve_unix(path), loop)
+    while not os.path.exists(path):
+        if fut.done():
+            fut.result()
+    yield path
+
+    async def shutdown():
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    th.join(5)
+    loop.close()
+
+def test_concurrent_clients_match_refmodel(server_path):
+    errors = []
+
+    def worker(k):
+        c = RefmodelClient(server_path)
+        try:
+            c.call(TB_CFG_CMD)
+            c.call("MODE %d" % (k % 2))
+            for i in range(60):
+                T, dT = (k * 37 + i * 11) % 256 - 128, (k * 53 + i * 7) % 256 - 128
+                G, dbg = top_step(T, dT, CFG_TB, k % 2)
+                if c.point(T, dT) != (G, dbg["S_w"], dbg["S_wg"]):
+                    errors.append((k, T, dT))
+        finally:
+            c.close()
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+
+def test_batch_binary_and_estimator_session(server_path):
+    c = RefmodelClient(server_path)
+    pts = [(T, dT) for T in range(-128, 128, 9) for dT in range(-128, 128, 13)]
+    exp = [top_step(T, dT, DEFAULT_CFG, 1)[0] for T, dT in pts]
+    assert c.batch(pts) == exp
+    assert c.call("B " + " ".join("%d,%d" % p for p in pts[:20])) == " ".join(map(str, exp[:20]))
+
+    Ts = [0, 4, 8, 12, 16, 12, 8]
+    c.call("EST s1 255 0 64")
+    c.call("INIT s1 0")
+    got = c.call("STEP s1 " + " ".join(map(str, Ts))).split()
+    est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=64)
+    est.init_pulse(0)
+    for tok, T in zip(got, Ts):
+        G, dbg = top_step(T, 0, DEFAULT_CFG, 1, dt_mode=1, estimator=est)
+        assert tok == "%d,%d,%d" % (G, dbg["dT_sel"], dbg["dt_valid"])
+    # sessions are shared by name across clients
+    c2 = RefmodelClient(server_path)
+    assert c2.call("STEP s1 8").split(",")[1:] == [str(est.step(8)[0]), "1"]
+    with pytest.raises(ValueError):
+        c2.call("STEP nope 1")
+    c2.close()
+    c.close()
+
+def test_batch_reply_starting_with_err_bytes(server_path):
+    # G = 69, 82, 82 spells "ERR": the status byte keeps it apart from an error line
+    cfg = CoprocessorCfg(mf_T=_CRISP, mf_dT=_CRISP, singletons=Singletons(g11=69, g22=82))
+    c = RefmodelClient(server_path)
+    c.call("CFG err %s %s" % (cfg_to_reg_image(cfg).hex(), singletons_to_reg_image(cfg.singletons).hex()))
+    pts = [(0, 0), (100, 100), (100, 100), (-1, 2)]
+    exp = [top_step(T, dT, cfg, 1)[0] for T, dT in pts]
+    assert bytes(exp[:3]) == b"ERR"
+    assert c.batch(pts) == exp
+    assert c.call("PING") == "OK"
+    c.close()
+
+def test_bad_bin_count_closes_connection(server_path):
+    c = RefmodelClient(server_path)
+    c.f.write(b"BIN %d\n" % (1 << 21) + bytes(64))
+    c.f.flush()
+    assert c.f.readline() == b"ERR bad BIN count\n"
+    assert c.f.read() == b""            # payload bytes are never parsed as requests
+    c.f.close()
+    c.sock.close()
+
+def test_query_latency_microseconds(server_path):
+    c = RefmodelClient(server_path)
+    r = latency(c, 300)
+    c.close()
+    # one process per query costs tens of ms; a socket round trip stays well under 1 ms
+    assert r["point_us"] < 1000 and r["bin_us"] < 20
+
+@pytest.mark.slow
+def test_stdio_line_protocol():
+    req = "PING\nMODE 0\nP 0 0\nP 300 0\nMODE 1\nBIN 2\n"
+    data = req.encode() + bytes((0, 0, 0xF6, 5)) + b"STATS\nQUIT\nPING\n"
+    out = subprocess.run([sys.executable, os.path.join(HERE, "refmodel_server.py")], input=data,
+                         capture_output=True, timeout=30, cwd=HERE).stdout
+    G0, dbg = top_step(0, 0, DEFAULT_CFG, 0)
+    lines = out.split(b"\n")
+    assert lines[:4] == [b"OK", b"OK", b"%d %d %d" % (G0, dbg["S_w"], dbg["S_wg"]), b"ERR s8 expected: 300"]
+    G_bin = bytes((top_step(0, 0, DEFAULT_CFG, 1)[0], top_step(-10, 5, DEFAULT_CFG, 1)[0]))
+    assert lines[4] == b"OK" and lines[5].startswith(b"\x00" + G_bin + b"queries=")
+    assert len(lines) == 7 and lines[6] == b""           # nothing after QUIT
@@ -0,0 +1,52 @@
+# test_run_index.py - run-length surface index vs full-plane scans
+
+import random
+
+import pytest
+
+from fuzzy_refmodel import DEFAULT_CFG
+from run_index import RunIndex
+from test_refmodel import CFG_TB
+
+@pytest.fixture(scope="module", params=[CFG_TB, DEFAULT_CFG], ids=["tb", "default"])
+def indexed(request, golden):
+    plane = golden.surface(request.param, 1).plane()
+    return RunIndex(plane), plane
+
+def _cells(plane, lo, hi):
+    """Flat plane indices (surface_index) of the cells with lo <= G <= hi."""
+    return {i for i, G in enumerate(plane) if lo <= G <= hi}
+
+def test_point_lookup_and_areas(indexed):
+    idx, plane = indexed
+    rnd = random.Random(4)
+    for _ in range(2000):
+        T, dT = rnd.randint(-128, 127), rnd.randint(-128, 127)
+        assert idx.g(T, dT) == plane[((T + 128) << 8) | (dT + 128)]
+    hist = {}
+    for G in plane:
+        hist[G] = hist.get(G, 0) + 1
+    assert idx.areas() == hist
+    assert idx.area(0, 100) == 65536
+    assert idx.area(40, 60) == sum(n for G, n in hist.items() if 40 <= G <= 60)
+
+@pytest.mark.parametrize("lo,hi", [(0, 0), (50, 50), (30, 60), (81, 100), (101, 255)])
+def test_region_rectangles_cover_exactly(indexed, lo, hi):
+    idx, plane = indexed
+    cells = set()
+    for T0, T1, d0, d1 in idx.region(lo, hi):
+        assert T0 <= T1 and d0 <= d1
+        block = {((T + 128) << 8) | (dT + 128) for T in range(T0, T1 + 1) for dT in range(d0, d1 + 1)}
+        assert not cells & block                    # rectangles do not overlap
+        cells |= block
+    assert cells == _cells(plane, lo, hi)
+    assert len(cells) == idx.area(lo, hi)
+
+def test_row_spans_and_plateau_merge(indexed):
+    idx, plane = indexed
+    for T in (-128, -20, 0, 33, 127):
+        spans = idx.row_spans(T, 50, 50)
+        got = {dT for a, b in spans for dT in range(a, b + 1)}
+        assert got == {dT for dT in range(-128, 128) if plane[((T + 128) << 8) | (dT + 128)] == 50}
+    # a saturated corner is a handful of rectangles, not one per row
+    assert len(idx.region(0, 0)) < 64
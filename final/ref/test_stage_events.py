@@ -0,0 +1,73 @@
+# test_stage_events.py - opt-in clamp counters of aggregate / defuzz / estimator
+
+import pickle
+
+import fuzzy_refmodel
+from fuzzy_refmodel import (
+    Q15_MAX, CoprocessorCfg, EstimatorRTLExact, MfSet3, MfThresholds, Singletons, StageEvents,
+    aggregate, defuzz, disable_stage_events, enable_stage_events, stage_events, top_step,
+)
+from test_refmodel import CFG_TB
+
+WIDE = MfSet3(*(MfThresholds(-128, -100, 100, 127),) * 3)
+CFG_WIDE = CoprocessorCfg(mf_T=WIDE, mf_dT=WIDE, singletons=Singletons(*(100,) * 9))
+
+def test_disabled_by_default_and_results_unchanged():
+    assert fuzzy_refmodel._events is None
+    G0, dbg0 = top_step(0, 0, CFG_WIDE, 1)
+    with stage_events() as ev:
+        G1, dbg1 = top_step(0, 0, CFG_WIDE, 1)
+    assert (G0, dbg0) == (G1, dbg1)
+    assert fuzzy_refmodel._events is None
+    assert ev.counts["aggregate.S_w"] == 1 and ev.counts["aggregate.S_wg"] == 1
+
+def test_stage_counts_and_first_n_capture():
+    with stage_events(capture=2) as ev:
+        for _ in range(5):
+            aggregate(1, (Q15_MAX,) * 9, (10,) * 9)         # S_w saturates, S_wg does not
+        top_step(10, 5, CFG_TB, 1)                          # no clamp anywhere
+        defuzz(1, 2)                                        # 200 % -> 100
+        est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=8)
+        est.init_pulse(0)
+        for T in (100, 100, -100):
+            est.step(T)
+    assert ev.counts == {"aggregate.S_w": 5, "defuzz.gt100": 1, "estimator.+d_max": 1, "estimator.-d_max": 1}
+    assert len(ev.captured["aggregate.S_w"]) == 2
+    assert ev.captured["aggregate.S_w"][0]["sumw"] == 9 * Q15_MAX
+    assert ev.captured["defuzz.gt100"] == [{"S_w": 1, "S_wg": 2, "percent": 200}]
+    clip = ev.captured["estimator.-d_max"][0]
+    assert (clip["T_cur"], clip["T_prev"], clip["d_max"]) == (-100, 100, 8)
+
+def test_merge_across_workers_keeps_first_n():
+    parts = []
+    for k in range(3):
+        ev = StageEvents(capture=4)
+        for i in range(3):
+            ev.hit("defuzz.gt100", {"worker": k, "i": i})
+        parts.append(pickle.loads(pickle.dumps(ev.state())))
+    total = StageEvents.merged(parts)
+    assert total.counts["defuzz.gt100"] == 9
+    assert [e["worker"] for e in total.captured["defuzz.gt100"]] == [0, 0, 0, 1]
+    assert total.summary()["counts"]["aggregate.S_w"] == 0
+
+def test_enable_disable():
+    ev = enable_stage_events(capture=1)
+    try:
+        top_step(0, 0, CFG_WIDE, 0)
+    finally:
+        assert disable_stage_events() is ev
+    top_step(0, 0, CFG_WIDE, 1)
+    assert ev.counts["aggregate.S_w"] == 1
+
+def test_surface_lookups_are_counted(golden):
+    from golden_surface import DirectSurface
+    pts = [(0, 0), (0, 0), (5, -3)]
+    golden.surface(CFG_WIDE, 1).plane()                     # compiled before: no counts
+    with stage_events() as ev:
+        srf = golden.surface(CFG_WIDE, 1)
+        got = [srf.point(T, dT) for T, dT in pts]
+    assert isinstance(srf, DirectSurface)
+    assert ev.counts["aggregate.S_w"] == 3 and ev.counts["aggregate.S_wg"] == 3
+    exp = [top_step(T, dT, CFG_WIDE, 1) for T, dT in pts]
+    assert got == [(d["S_w"], d["S_wg"], G) for G, d in exp]
+    assert not isinstance(golden.surface(CFG_WIDE, 1), DirectSurface)
@@ -0,0 +1,59 @@
+# test_tb_vectors.py - $readmemh golden vector export vs reference model
+
+import pytest
+
+from fuzzy_refmodel import CoprocessorCfg, EstimatorRTLExact, series_trace, top_step
+from golden_surface import surface_index
+from tb_vectors import (
+    SERIES_EST, VEC_END, export_vectors, pack_vector, read_hex, series_segments, unpack_vector, vector_set,
+)
+from test_refmodel import CFG_TB
+
+def test_pack_roundtrip_and_end_marker():
+    for v in [(0, -128, 127, 0, 0, 0), (1, 127, -128, 32767, 32767, 100), (1, -1, -1, 6553, 1234, 37)]:
+        w = pack_vector(*v)
+        assert w >> 57 == 0 and w != VEC_END
+        assert unpack_vector(w) == v
+
+def test_exported_sets_match_refmodel(tmp_path, golden):
+    sets = ("grid", "random", "vis_T_at_dt0", "vis_dT_lines", "vis_heatmap")
+    counts = export_vectors(str(tmp_path), sets, surfaces=golden, seed=3, n_random=200)
+    assert counts == {"grid": 140, "random": 200, "vis_T_at_dt0": 128, "vis_dT_lines": 93, "vis_heatmap": 425}
+    for name in sets:
+        rows = read_hex(str(tmp_path / (name + ".hex")))
+        assert [r[:3] for r in rows] == vector_set(name, seed=3, n_random=200)
+        for rm, T, dT, S_w, S_wg, G in rows:
+            G_ref, dbg = top_step(T, dT, CFG_TB, rm)
+            assert (S_w, S_wg, G) == (dbg["S_w"], dbg["S_wg"], G_ref), (name, rm, T, dT)
+    # TB default config is CoprocessorCfg(); header carries its register images
+    head = (tmp_path / "grid.hex").read_text().splitlines()[:3]
+    assert head[0] == "// grid: 140 vectors, dt_mode=0"
+    assert CoprocessorCfg() == CFG_TB
+
+def test_series_set_is_series_trace(tmp_path, golden):
+    assert export_vectors(str(tmp_path), ["series"], surfaces=golden) == {"series": 166}
+    path = tmp_path / "series.hex"
+    assert path.read_text().splitlines()[3] == "// est 800028"
+    words = [int(l, 16) for l in path.read_text().splitlines() if not l.startswith("//")]
+    assert words[-1] == VEC_END
+    words = words[:-1]
+    exp, flags, est = [], [], EstimatorRTLExact(*SERIES_EST)
+    for seg in series_segments():
+        exp += series_trace(seg, CFG_TB, 1, est)
+        flags += [(1, i == 0) for i in range(len(seg))]
+    assert [((w >> 57) & 1, bool(w >> 58 & 1)) for w in words] == flags
+    rows = [unpack_vector(w) for w in words]
+    assert [(T, dT, G) for _, T, dT, _, _, G in rows] == exp
+    assert len({dT for _, dT, _ in exp}) > 10 and {-40, 40} <= {dT for _, dT, _ in exp}
+    for rm, T, dT, S_w, S_wg, G in rows:
+        _, dbg = top_step(T, dT, CFG_TB, rm)
+        assert (S_w, S_wg) == (dbg["S_w"], dbg["S_wg"])
+
+@pytest.mark.slow
+def test_exhaustive_set_is_plane_order():
+    vecs = vector_set("exhaustive")
+    assert len(vecs) == 2 * 65536
+    for rm in (0, 1):
+        part = vecs[rm * 65536:(rm + 1) * 65536]
+        assert all(r == rm for r, _, _ in part)
+        assert [surface_index(T, dT) for _, T, dT in part] == list(range(65536))
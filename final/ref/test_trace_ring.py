@@ -0,0 +1,88 @@
+# test_trace_ring.py - dt_mode=1 ring-buffer trace: recording, triggers, dump/load
+
+import dataclasses
+import random
+
+from fuzzy_refmodel import EstimatorRTLExact, Singletons, top_step
+from test_refmodel import CFG_TB
+from trace_ring import TRIG_G_JUMP, TraceRing, load
+
+def _run(est, Ts, cfg=CFG_TB):
+    out = []
+    for T in Ts:
+        G, dbg = top_step(T, 0, cfg, 1, dt_mode=1, estimator=est)
+        out.append((T, G, dbg))
+    return out
+
+def test_records_last_n_steps_in_order(tmp_path):
+    rnd = random.Random(3)
+    Ts = [0]
+    for _ in range(99):
+        Ts.append(max(-128, min(127, Ts[-1] + rnd.randint(-5, 5))))
+    est = EstimatorRTLExact()
+    ring = est.trace = TraceRing(capacity=32, on_clamp=False)
+    est.init_pulse(Ts[0])
+    res = _run(est, Ts)
+    assert ring.count == 32 and ring.steps == 100 and not ring.frozen
+    path = str(tmp_path / "trace.bin")
+    assert ring.dump(path) == 32
+    tr = load(path)
+    assert tr.trigger == -1 and tr.reason == "none" and tr.first_step == 68
+    ref = EstimatorRTLExact()
+    ref.init_pulse(Ts[0])
+    for T in Ts[:68]:
+        ref.step(T)
+    for row, (T, G, dbg) in zip(tr.rows(), res[68:]):
+        assert (row["T_cur"], row["G"], row["dT_out"]) == (T, G, dbg["dT_sel"])
+        assert (row["muT_n"], row["muT_z"], row["muT_p"]) == dbg["muT"]
+        assert (row["muD_n"], row["muD_z"], row["muD_p"]) == dbg["muD"]
+        assert row["dT_prev_q15"] == ref.dT_prev_q15
+        ref.step(T)
+        assert row["clip"] == ref.dT_prev_q15
+
+def test_clamp_freezes_after_post_steps(tmp_path):
+    est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=8)
+    ring = est.trace = TraceRing(capacity=16, post=3)
+    est.init_pulse(0)
+    _run(est, [0, 1, 2, 100, 100, 100, 100, 100, 100])
+    assert ring.frozen and ring.steps == 7                  # clamp at step 3, then 3 more
+    ring.dump(str(tmp_path / "t.bin"))
+    tr = load(str(tmp_path / "t.bin"))
+    assert tr.reason == "clamp" and tr.rows()[tr.trigger]["clip_hit"] == 1
+    assert tr.rows()[tr.trigger]["T_cur"] == 100 and len(tr) == 7
+
+def test_g_jump_and_mismatch_triggers():
+    est = EstimatorRTLExact()
+    ring = est.trace = TraceRing(capacity=8, post=0, on_clamp=False, g_jump=20)
+    est.init_pulse(-100)
+    # dT stays near zero, so G follows the T row of the dT=zero singletons
+    cfg = dataclasses.replace(CFG_TB, singletons=Singletons(g01=100, g21=0))
+    res = _run(est, [-100, -100, 100, 100], cfg)
+    assert ring.frozen and ring.reason == TRIG_G_JUMP and ring.trigger_step == 2
+    assert abs(res[2][1] - res[1][1]) >= 20
+
+    est2 = EstimatorRTLExact()
+    ring2 = est2.trace = TraceRing(capacity=8, post=1)
+    est2.init_pulse(0)
+    (_, G, _), = _run(est2, [5])
+    assert ring2.check(G) and not ring2.frozen
+    assert not ring2.check(G + 1)
+    _run(est2, [6, 7])
+    assert ring2.frozen and ring2.steps == 2 and ring2.trigger_step == 0
+
+def test_standalone_estimator_steps_advance_the_ring():
+    # no top_step: every step still gets its own record, G fields stay 0
+    est = EstimatorRTLExact(alpha=255, k_dt=0, d_max=64)
+    ring = est.trace = TraceRing(capacity=8, on_clamp=False)
+    est.init_pulse(0)
+    Ts = [4, 8, 12, 16, 20]
+    outs = [est.step(T)[0] for T in Ts]
+    assert ring.steps == 5 and ring.count == 5
+    rows = [dict(zip(("T_cur", "dT_out", "G", "step"), r)) for r in zip(
+        ring.cols["T_cur"], ring.cols["dT_out"], ring.cols["G"], ring.cols["step"])][:5]
+    assert [r["T_cur"] for r in rows] == Ts and [r["dT_out"] for r in rows] == outs
+    assert [r["step"] for r in rows] == list(range(5)) and all(r["G"] == 0 for r in rows)
+    # a top_step after them fills only its own record
+    G, dbg = top_step(24, 0, CFG_TB, 1, dt_mode=1, estimator=est)
+    assert ring.steps == 6 and ring.cols["G"][5] == G and ring.cols["G"][4] == 0
+    assert (ring.cols["muT_n"][5], ring.cols["muT_z"][5], ring.cols["muT_p"][5]) == dbg["muT"]
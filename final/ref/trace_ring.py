@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+trace_ring.py - Preallocated ring-buffer trace of dt_mode=1 steps.
+
+Attach a TraceRing to an EstimatorRTLExact (est.trace = ring). Every step then
+writes one record into fixed array.array columns, with no allocation:
+
+    EstimatorRTLExact.step  -> est():    T_cur, delta_scaled, dT_prev_q15 (before the
+                                         step), clip, dT_out, clip_hit; advances
+    top_step (dt_mode=1)    -> fill():   memberships of T and dT_sel, G of that record
+
+The estimator owns the ring position, so an estimator stepped outside top_step
+(the query server's STEP, a standalone filter) still records one row per step;
+its membership and G fields stay 0 unless fill() is called.
+
+A trigger (estimator clamp, G jump >= g_jump, a mismatch reported with check() or
+trigger()) freezes the ring after `post` more steps, so the dump holds the last
+`capacity` steps around the event. dump() writes a binary file; load() reads it
+back for offline analysis.
+
+    python trace_ring.py trace.bin [--csv trace.csv]
+"""
+
+import struct
+import sys
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TRACE_MAGIC = b"FZTR\x01\x00\x00\x00"
+_HDR = struct.Struct("<8sIIqiB3x")      # magic, capacity, count, first step, trigger row, reason
+
+# column name, array typecode (all fixed-size on every platform Python runs on here)
+TRACE_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("step", "q"), ("T_cur", "b"), ("delta_scaled", "h"), ("dT_prev_q15", "h"), ("clip", "h"),
+    ("dT_out", "b"), ("clip_hit", "b"),
+    ("muT_n", "H"), ("muT_z", "H"), ("muT_p", "H"), ("muD_n", "H"), ("muD_z", "H"), ("muD_p", "H"),
+    ("G", "B"),
+)
+
+TRIG_NONE, TRIG_CLAMP, TRIG_G_JUMP, TRIG_MISMATCH, TRIG_MANUAL = range(5)
+TRIG_NAMES = ("none", "clamp", "g_jump", "mismatch", "manual")
+
+class TraceRing:
+    """Last `capacity` dt_mode=1 steps; freezes `post` steps after the first trigger."""
+
+    def __init__(self, capacity: int = 1024, post: int = 16, on_clamp: bool = True,
+                 g_jump: int = 0):
+        self.capacity = capacity
+        self.post = post
+        self.on_clamp = on_clamp
+        self.g_jump = g_jump                # 0: no G jump trigger
+        self.cols: Dict[str, array] = {name: array(tc, bytes(array(tc).itemsize * capacity))
+                                       for name, tc in TRACE_FIELDS}
+        for name, _ in TRACE_FIELDS:
+            setattr(self, "_" + name, self.cols[name])
+        self.reset()
+
+    def reset(self) -> None:
+        """Empty and re-arm the ring (buffers are kept)."""
+        self.steps = 0                      # recorded steps since reset
+        self.count = 0
+        self.frozen = False
+        self.reason = TRIG_NONE
+        self.trigger_step = -1
+        self._i = 0
+        self._open = -1                     # slot of the last record until fill()
+        self._post_left = -1                # >= 0 once triggered
+        self._last_G = -1
+
+    def est(self, T_cur: int, delta_scaled: int, dT_prev_q15: int, clip: int,
+            dT_out: int, clip_hit: int) -> None:
+        """Record one estimator step and advance."""
+        if self.frozen:
+            return
+        i = self._i
+        self._step[i] = self.steps
+        self._T_cur[i] = T_cur
+        self._delta_scaled[i] = delta_scaled
+        self._dT_prev_q15[i] = dT_prev_q15
+        self._clip[i] = clip
+        self._dT_out[i] = dT_out
+        self._clip_hit[i] = clip_hit
+        self._muT_n[i] = self._muT_z[i] = self._muT_p[i] = 0
+        self._muD_n[i] = self._muD_z[i] = self._muD_p[i] = 0
+        self._G[i] = 0
+        self._open = i
+        self.steps += 1
+        self._i = i + 1 if i + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+        if self._post_left >= 0:
+            self._post_left -= 1
+            if self._post_left < 0:
+                self.frozen = True
+        elif self.on_clamp and clip_hit:
+            self._fire(TRIG_CLAMP, self.steps - 1)
+
+    def fill(self, muT: Sequence[int], muD: Sequence[int], G: int) -> None:
+        """Memberships and G of the record the last est() wrote (once per record)."""
+        i = self._open
+        if i < 0:
+            return
+        self._open = -1
+        self._muT_n[i], self._muT_z[i], self._muT_p[i] = muT
+        self._muD_n[i], self._muD_z[i], self._muD_p[i] = muD
+        self._G[i] = G
+        jump = self.g_jump and self._last_G >= 0 and abs(G - self._last_G) >= self.g_jump
+        self._last_G = G
+        if jump:
+            self.trigger(TRIG_G_JUMP)
+
+    def _fire(self, reason: int, step: int) -> None:
+        self.reason = reason
+        self.trigger_step = step
+        self._post_left = self.post - 1
+        if self._post_left < 0:
+            self.frozen = True
+
+    def trigger(self, reason: int = TRIG_MANUAL) -> None:
+        """Trigger on the last recorded step (no-op if already triggered)."""
+        if self._post_left < 0 and not self.frozen and self.steps:
+            self._fire(reason, self.steps - 1)
+
+    def check(self, G_impl: int) -> bool:
+        """Compare a hardware/other-model G with the last recorded step; a mismatch triggers."""
+        ok = self.count > 0 and G_impl == self._G[self._i - 1]
+        if not ok:
+            self.trigger(TRIG_MISMATCH)
+        return ok
+
+    def _order(self) -> List[Tuple[int, int]]:
+        """Slot ranges in chronological order."""
+        if self.count < self.capacity:
+            return [(0, self.count)]
+        return [(self._i, self.capacity), (0, self._i)]
+
+    def columns(self) -> Dict[str, array]:
+        """Chronological copy of every column (oldest first)."""
+        out = {}
+        for name, tc in TRACE_FIELDS:
+            a = array(tc)
+            for lo, hi in self._order():
+                a.extend(self.cols[name][lo:hi])
+            out[name] = a
+        return out
+
+    def dump(self, path: str) -> int:
+        """Write the recorded steps; returns the record count."""
+        cols = self.columns()
+        first = cols["step"][0] if self.count else 0
+        trig = self.trigger_step - first if self.trigger_step >= first and self.count else -1
+        with open(path, "wb") as f:
+            f.write(_HDR.pack(TRACE_MAGIC, self.capacity, self.count, first, trig, self.reason))
+            for name, _ in TRACE_FIELDS:
+                a = cols[name]
+                if sys.byteorder == "big" and a.itemsize > 1:
+                    a.byteswap()
+                f.write(a.tobytes())
+        return self.count
+
+class TraceDump:
+    """A dump read back by load(): columns, trigger row (-1 = none) and reason."""
+
+    def __init__(self, capacity: int, first_step: int, trigger: int, reason: int,
+                 columns: Dict[str, array]):
+        self.capacity = capacity
+        self.first_step = first_step
+        self.trigger = trigger
+        self.reason = TRIG_NAMES[reason] if reason < len(TRIG_NAMES) else str(reason)
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["step"])
+
+    def rows(self) -> List[dict]:
+        names = [n for n, _ in TRACE_FIELDS]
+        return [dict(zip(names, r)) for r in zip(*(self.columns[n] for n in names))]
+
+def load(path: str) -> TraceDump:
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, capacity, count, first, trig, reason = _HDR.unpack_from(data)
+    if magic != TRACE_MAGIC:
+        raise ValueError("%s: not a trace dump" % path)
+    o = _HDR.size
+    cols = {}
+    for name, tc in TRACE_FIELDS:
+        a = array(tc)
+        n = a.itemsize * count
+        if o + n > len(data):
+            raise ValueError("%s: truncated" % path)
+        a.frombytes(data[o:o + n])
+        if sys.byteorder == "big" and a.itemsize > 1:
+            a.byteswap()
+        cols[name] = a
+        o += n
+    return TraceDump(capacity, first, trig, reason, cols)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    ap = argparse.ArgumentParser(description="Print or convert a dt_mode=1 trace dump")
+    ap.add_argument("dump")
+    ap.add_argument("--csv", help="write all records as CSV")
+    args = ap.parse_args(argv)
+    tr = load(args.dump)
+    names = [n for n, _ in TRACE_FIELDS]
+    print("%d records, trigger=%s at row %d" % (len(tr), tr.reason, tr.trigger))
+    if args.csv:
+        with open(args.csv, "w", encoding="utf-8", newline="\n") as f:
+            f.write(",".join(names) + "\n")
+            f.write("".join(",".join(str(r[n]) for n in names) + "\n" for r in tr.rows()))
+        print("Saved: %s" % args.csv)
+    else:
+        rows = tr.rows()
+        lo = max(tr.trigger - 8, 0) if tr.trigger >= 0 else max(len(rows) - 16, 0)
+        print(" ".join(names))
+        for k, r in enumerate(rows[lo:lo + 24], lo):
+            print(("*" if k == tr.trigger else " ") + " ".join(str(r[n]) for n in names))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,37 @@
 // mmio_if.sv - register shadow for MCU (8-bit bus) <-> top_coprocessor (core)
 //
 // RO:
-//   0x00 STATUS: {7'b0, valid}
+//   0x00 STATUS: {4'b0, fifo_ovf, out_nonempty, in_full, valid}
 //   0x04 G: 0..100
+//   0x2A FIFO_G: result FIFO head (popped at the end of the read strobe)
+//   0x2B IN_LEVEL: input FIFO entries (0..FIFO_DEPTH)
+//   0x2C OUT_LEVEL: result FIFO entries (0..FIFO_DEPTH)
+//   0x3C RESULT: {fresh, G[6:0]}; fresh is set with the result and cleared by START
+//                or at the end of a RESULT read that returned fresh=1 (one read per
+//                evaluation). The byte is sampled in the first clock of the read and
+//                held for the rest of the strobe, so a result landing mid-read stays
+//                fresh for the next read.
 // WO:
-//   0x01 CTRL: [3]=INIT (W1P), [2]=DT_MODE, [1]=REG_MODE, [0]=START (W1P)
+//   0x01 CTRL: [5]=FIFO_CLR (W1P), [4]=STREAM, [3]=INIT (W1P), [2]=DT_MODE, [1]=REG_MODE, [0]=START (W1P)
 //   0x02 T (Q7.0), 0x03 dT (Q7.0; ignored when DT_MODE=1)
 //   0x10..0x1B: T thresholds (a,b,c,d) for {neg,zero,pos}
 //   0x1C..0x27: dT thresholds (a,b,c,d) for {neg,zero,pos}
+//   0x28 FIFO_T: stage T of the next vector
+//   0x29 FIFO_DT: push {FIFO_T, dT} into the input FIFO (rising edge of the write strobe)
+//   0x2D BURST_ADDR: base address for BURST_DATA
+//   0x2E BURST_DATA: write wdata to the register at BURST_ADDR, which advances by one
+//                    at the end of the write strobe (24 thresholds = 1 + 24 strobes)
+//                    a burst write to 0x29 pushes into the input FIFO like a direct write
+//   0x30..0x38: singletons G00,G01,G02,G10,G11,G12,G20,G21,G22 (percent 0..100)
+//   0x39 ALPHA (~/256), 0x3A K_DT (2^k), 0x3B D_MAX (Q7.0): dT estimator parameters
+//
+// done_irq: level DONE/IRQ output, set by the core's valid pulse (G_out is valid
+// from then on), cleared by the next START or at the end of a G (0x04) read that
+// began while it was set. G is sampled in the first clock of the read, like RESULT.
+//
+// STREAM mode: while the input FIFO is non-empty, the core is idle and the result
+// FIFO has room, one vector is popped into T_in/dT_in and START is auto-pulsed;
+// each G is pushed into the result FIFO in input order.
 module mmio_if (
   input  logic        clk,
   input  logic        rst_n,
@@ -19,6 +43,7 @@ module mmio_if (
   output logic  [7:0] rdata,
   output logic        start,        // one-cycle level (core edge-detects)
   output logic        init,         // one-cycle level (core edge-detects)
+  output logic        done_irq,     // level: result ready, cleared by START or G read
   output logic        reg_mode,
   output logic        dt_mode,
   output logic signed [7:0] T_in,
@@ -47,6 +72,18 @@ module mmio_if (
   output logic signed [7:0] dT_pos_b,
   output logic signed [7:0] dT_pos_c,
   output logic signed [7:0] dT_pos_d,
+  output logic  [7:0] g00,
+  output logic  [7:0] g01,
+  output logic  [7:0] g02,
+  output logic  [7:0] g10,
+  output logic  [7:0] g11,
+  output logic  [7:0] g12,
+  output logic  [7:0] g20,
+  output logic  [7:0] g21,
+  output logic  [7:0] g22,
+  output logic  [7:0] alpha,
+  output logic  [7:0] k_dt,
+  output logic  [7:0] d_max,
   input  logic        valid,
   input  logic  [7:0] G_out
 );
@@ -54,6 +91,63 @@ module mmio_if (
   // Internal one-cycle strobes (only these are registered)
   logic start_w1;
   logic init_w1;
+  logic start_w1_q;
+  logic start_rise;                 // START held for a whole write strobe clears once
+  assign start_rise = start_w1 && !start_w1_q;
+
+  // Streaming FIFOs
+  localparam int FIFO_DEPTH = 16;
+  localparam int FIFO_AW    = 4;
+  logic        [15:0] in_mem  [FIFO_DEPTH];   // {T, dT}
+  logic         [7:0] out_mem [FIFO_DEPTH];
+  logic [FIFO_AW-1:0] in_wp;
+  logic [FIFO_AW-1:0] in_rp;
+  logic [FIFO_AW-1:0] out_wp;
+  logic [FIFO_AW-1:0] out_rp;
+  logic   [FIFO_AW:0] in_cnt;
+  logic   [FIFO_AW:0] out_cnt;
+  logic               stream;
+  logic               busy;         // auto-started evaluation in flight
+  logic               fifo_ovf;     // sticky: a push into a full input FIFO was dropped
+  logic signed  [7:0] fifo_T;
+  logic               push_q;
+  logic               pop_q;
+
+  // RESULT register (clear-on-read fresh flag)
+  logic       res_fresh;
+  logic       res_rd_q;
+  logic       res_rd_now;
+  logic [7:0] res_rd_data;          // RESULT as sampled in the first clock of the read
+  logic       res_rd_clr;           // that sample had fresh=1 and no result landed since
+  assign res_rd_now = cs && rd && (addr == 8'h3C);
+
+  // G read (clears done_irq the same way)
+  logic       g_rd_q;
+  logic       g_rd_now;
+  logic [7:0] g_rd_data;
+  logic       g_rd_clr;
+  assign g_rd_now = cs && rd && (addr == 8'h04);
+
+  // Auto-increment burst: BURST_DATA writes are redirected to burst_ptr
+  logic [7:0] burst_ptr;
+  logic       bdata_q;
+  logic       bdata_now;
+  logic [7:0] waddr;
+  assign bdata_now = cs && wr && (addr == 8'h2E);
+  assign waddr     = (addr == 8'h2E) ? burst_ptr : addr;
+
+  logic push_now;
+  logic pop_now;
+  logic in_push;
+  logic out_pop;
+  logic auto_start;
+  logic out_push;
+  assign push_now   = cs && wr && (waddr == 8'h29);
+  assign pop_now    = cs && rd && (addr == 8'h2A);
+  assign in_push    = push_now && !push_q;
+  assign out_pop    = pop_q && !pop_now && (out_cnt != '0);
+  assign auto_start = stream && !busy && (in_cnt != '0) && (out_cnt != FIFO_DEPTH);
+  assign out_push   = busy && valid;
 
   // Register file and write-one-pulse generation
   always_ff @(posedge clk or negedge rst_n) begin
@@ -89,24 +183,69 @@ module mmio_if (
       dT_pos_c  <= 8'h80;
       dT_pos_d  <= 8'h80;
 
+      g00       <= 8'd100;
+      g01       <= 8'd50;
+      g02       <= 8'd30;
+      g10       <= 8'd50;
+      g11       <= 8'd50;
+      g12       <= 8'd50;
+      g20       <= 8'd80;
+      g21       <= 8'd50;
+      g22       <= 8'd0;
+      alpha     <= 8'd32;
+      k_dt      <= 8'd3;
+      d_max     <= 8'd64;
+
       start_w1  <= 1'b0;
       init_w1   <= 1'b0;
+      start_w1_q <= 1'b0;
+
+      in_wp     <= '0;
+      in_rp     <= '0;
+      out_wp    <= '0;
+      out_rp    <= '0;
+      in_cnt    <= '0;
+      out_cnt   <= '0;
+      stream    <= 1'b0;
+      busy      <= 1'b0;
+      fifo_ovf  <= 1'b0;
+      fifo_T    <= 8'sd0;
+      push_q    <= 1'b0;
+      pop_q     <= 1'b0;
+      burst_ptr <= 8'h00;
+      bdata_q   <= 1'b0;
+      done_irq  <= 1'b0;
+      res_fresh <= 1'b0;
+      res_rd_q  <= 1'b0;
+      res_rd_data <= 8'h00;
+      res_rd_clr  <= 1'b0;
+      g_rd_q    <= 1'b0;
+      g_rd_data <= 8'h00;
+      g_rd_clr  <= 1'b0;
     end else begin
       // default: clear one-cycle pulses
       start_w1  <= 1'b0;
       init_w1   <= 1'b0;
+      start_w1_q <= start_w1;
+      push_q    <= push_now;
+      pop_q     <= pop_now;
+      bdata_q   <= bdata_now;
 
       if (cs && wr) begin
-        unique case (addr)
+        unique case (waddr)
           8'h01: begin
             // CTRL: pulse bits asserted for one cycle
             start_w1 <= wdata[0];
             init_w1  <= wdata[3];
             reg_mode <= wdata[1];
             dt_mode  <= wdata[2];
+            stream   <= wdata[4];
           end
           8'h02: T_in <= wdata;
           8'h03: if (!dt_mode) dT_in <= wdata;
+          8'h28: fifo_T <= wdata;
+          8'h29: /* push handled below (edge) */;
+          8'h2D: burst_ptr <= wdata;
 
           // T thresholds (WO)
           8'h10: T_neg_a  <= wdata;
@@ -136,9 +275,89 @@ module mmio_if (
           8'h26: dT_pos_c  <= wdata;
           8'h27: dT_pos_d  <= wdata;
 
+          // Singletons (WO)
+          8'h30: g00 <= wdata;
+          8'h31: g01 <= wdata;
+          8'h32: g02 <= wdata;
+          8'h33: g10 <= wdata;
+          8'h34: g11 <= wdata;
+          8'h35: g12 <= wdata;
+          8'h36: g20 <= wdata;
+          8'h37: g21 <= wdata;
+          8'h38: g22 <= wdata;
+
+          // dT estimator parameters (WO)
+          8'h39: alpha <= wdata;
+          8'h3A: k_dt  <= wdata;
+          8'h3B: d_max <= wdata;
+
           default: /* no-op */;
         endcase
       end
+      if (bdata_q && !bdata_now) burst_ptr <= burst_ptr + 1'b1;
+
+      // Input FIFO: push on write edge, pop on auto-start
+      if (in_push) begin
+        if (in_cnt != FIFO_DEPTH) begin
+          in_mem[in_wp] <= {fifo_T, wdata};
+          in_wp         <= in_wp + 1'b1;
+        end else begin
+          fifo_ovf      <= 1'b1;
+        end
+      end
+      if (auto_start) begin
+        T_in     <= in_mem[in_rp][15:8];
+        if (!dt_mode) dT_in <= in_mem[in_rp][7:0];
+        in_rp    <= in_rp + 1'b1;
+        start_w1 <= 1'b1;
+        busy     <= 1'b1;
+      end
+      in_cnt <= in_cnt + ((in_push && in_cnt != FIFO_DEPTH) ? 1'b1 : 1'b0) - (auto_start ? 1'b1 : 1'b0);
+
+      // Result FIFO: push on core DONE, pop at the end of a FIFO_G read
+      if (out_push) begin
+        out_mem[out_wp] <= G_out;
+        out_wp          <= out_wp + 1'b1;
+        busy            <= 1'b0;
+      end
+      if (out_pop) out_rp <= out_rp + 1'b1;
+      out_cnt <= out_cnt + (out_push ? 1'b1 : 1'b0) - (out_pop ? 1'b1 : 1'b0);
+
+      // DONE/IRQ: sampled when a G read begins, cleared when that read ends;
+      // valid wins over a clear in the same cycle and cancels a pending one
+      g_rd_q <= g_rd_now;
+      if (g_rd_now && !g_rd_q) begin
+        g_rd_data <= G_out;
+        g_rd_clr  <= done_irq;
+      end
+      if (start_rise || (g_rd_q && !g_rd_now && g_rd_clr)) done_irq <= 1'b0;
+
+      // RESULT.fresh: same rule for RESULT reads
+      res_rd_q <= res_rd_now;
+      if (res_rd_now && !res_rd_q) begin
+        res_rd_data <= {res_fresh, G_out[6:0]};
+        res_rd_clr  <= res_fresh;
+      end
+      if (start_rise || (res_rd_q && !res_rd_now && res_rd_clr)) res_fresh <= 1'b0;
+
+      if (valid) begin
+        done_irq   <= 1'b1;
+        res_fresh  <= 1'b1;
+        g_rd_clr   <= 1'b0;
+        res_rd_clr <= 1'b0;
+      end
+
+      // FIFO_CLR (CTRL[5]) drops everything in flight
+      if (cs && wr && waddr == 8'h01 && wdata[5]) begin
+        in_wp    <= '0;
+        in_rp    <= '0;
+        out_wp   <= '0;
+        out_rp   <= '0;
+        in_cnt   <= '0;
+        out_cnt  <= '0;
+        busy     <= 1'b0;
+        fifo_ovf <= 1'b0;
+      end
     end
   end
 
@@ -151,8 +370,12 @@ module mmio_if (
     rdata = 8'h00;
     if (cs && rd) begin
       unique case (addr)
-        8'h00: rdata = {7'b0, valid};
-        8'h04: rdata = G_out;
+        8'h00: rdata = {4'b0, fifo_ovf, (out_cnt != '0), (in_cnt == FIFO_DEPTH), valid};
+        8'h04: rdata = g_rd_q ? g_rd_data : G_out;
+        8'h2A: rdata = out_mem[out_rp];
+        8'h2B: rdata = {{(7-FIFO_AW){1'b0}}, in_cnt};
+        8'h2C: rdata = {{(7-FIFO_AW){1'b0}}, out_cnt};
+        8'h3C: rdata = res_rd_q ? res_rd_data : {res_fresh, G_out[6:0]};
         default: rdata = 8'h00;
       endcase
     end
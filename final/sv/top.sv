@@ -7,7 +7,8 @@ module top (
   input  logic        wr,
   input  logic  [7:0] addr,
   input  logic  [7:0] wdata,
-  output logic  [7:0] rdata
+  output logic  [7:0] rdata,
+  output logic        done_irq        // result ready (see mmio_if)
 );
 
   // Wires shadow <-> core
@@ -41,6 +42,18 @@ module top (
   logic signed [7:0] dT_pos_b;
   logic signed [7:0] dT_pos_c;
   logic signed [7:0] dT_pos_d;
+  logic  [7:0] g00;
+  logic  [7:0] g01;
+  logic  [7:0] g02;
+  logic  [7:0] g10;
+  logic  [7:0] g11;
+  logic  [7:0] g12;
+  logic  [7:0] g20;
+  logic  [7:0] g21;
+  logic  [7:0] g22;
+  logic  [7:0] alpha;
+  logic  [7:0] k_dt;
+  logic  [7:0] d_max;
   logic        valid;
   logic  [7:0] G_out;
 
@@ -54,6 +67,7 @@ module top (
     .addr(addr),
     .wdata(wdata),
     .rdata(rdata),
+    .done_irq(done_irq),
     .start(start),
     .init(init),
     .reg_mode(reg_mode),
@@ -84,6 +98,18 @@ module top (
     .dT_pos_b(dT_pos_b),
     .dT_pos_c(dT_pos_c),
     .dT_pos_d(dT_pos_d),
+    .g00(g00),
+    .g01(g01),
+    .g02(g02),
+    .g10(g10),
+    .g11(g11),
+    .g12(g12),
+    .g20(g20),
+    .g21(g21),
+    .g22(g22),
+    .alpha(alpha),
+    .k_dt(k_dt),
+    .d_max(d_max),
     .valid(valid),
     .G_out(G_out)
   );
@@ -122,6 +148,18 @@ module top (
     .dT_pos_b(dT_pos_b),
     .dT_pos_c(dT_pos_c),
     .dT_pos_d(dT_pos_d),
+    .g00(g00),
+    .g01(g01),
+    .g02(g02),
+    .g10(g10),
+    .g11(g11),
+    .g12(g12),
+    .g20(g20),
+    .g21(g21),
+    .g22(g22),
+    .alpha(alpha),
+    .k_dt(k_dt),
+    .d_max(d_max),
     .valid(valid),
     .G_out(G_out)
   );
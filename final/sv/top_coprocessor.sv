@@ -34,24 +34,22 @@ module top_coprocessor (
   input  logic signed [7:0] dT_pos_b,
   input  logic signed [7:0] dT_pos_c,
   input  logic signed [7:0] dT_pos_d,
+  input  logic  [7:0] g00,             // singletons, percent 0..100
+  input  logic  [7:0] g01,
+  input  logic  [7:0] g02,
+  input  logic  [7:0] g10,
+  input  logic  [7:0] g11,
+  input  logic  [7:0] g12,
+  input  logic  [7:0] g20,
+  input  logic  [7:0] g21,
+  input  logic  [7:0] g22,
+  input  logic  [7:0] alpha,           // estimator: approx alpha/256
+  input  logic  [7:0] k_dt,            // estimator: divide by 2^k
+  input  logic  [7:0] d_max,           // estimator: clamp Q7.0
   output logic        valid,           // 1-cycle DONE pulse
   output logic  [7:0] G_out            // 0..100 result (registered)
 );
 
-  // Singletons and estimator params (constants fixed in RTL)
-  localparam logic [7:0] G00 = 8'd100;
-  localparam logic [7:0] G01 = 8'd50;
-  localparam logic [7:0] G02 = 8'd30;
-  localparam logic [7:0] G10 = 8'd50;
-  localparam logic [7:0] G11 = 8'd50;
-  localparam logic [7:0] G12 = 8'd50;
-  localparam logic [7:0] G20 = 8'd80;
-  localparam logic [7:0] G21 = 8'd50;
-  localparam logic [7:0] G22 = 8'd0;
-  localparam logic [7:0] ALPHA_P = 8'd32;  // approx alpha/256
-  localparam logic [7:0] KDT_P   = 8'd3;   // divide by 2^k
-  localparam logic [7:0] DMAX_P  = 8'd64;  // clamp Q7.0
-
   // Edge detect for start/init
   logic start_q;
   logic init_q;
@@ -70,24 +68,28 @@ module top_coprocessor (
     end
   end
 
-  // Internal dT estimator
+  // Internal dT estimator: one step per accepted START
   logic signed [7:0] dT_est;
+  logic signed [7:0] dT_est_next;
   logic              dt_valid;
+  logic              est_step;
   dt_estimator u_dt_estimator (
     .clk(clk),
     .rst_n(rst_n),
     .T_cur(T_in),
-    .alpha(ALPHA_P),
-    .k_dt(KDT_P),
-    .d_max(DMAX_P),
+    .alpha(alpha),
+    .k_dt(k_dt),
+    .d_max(d_max),
     .init(init_pulse),
+    .step(est_step),
     .dT_out(dT_est),
+    .dT_next(dT_est_next),
     .dt_valid(dt_valid)
   );
 
-  // dT select
+  // dT select (the START cycle already sees the estimate of this sample)
   logic signed [7:0] dT_sel;
-  assign dT_sel = dt_mode ? dT_est : dT_in;
+  assign dT_sel = !dt_mode ? dT_in : (est_step ? dT_est_next : dT_est);
 
   // Fuzzification for T
   logic [15:0] muT_neg;
@@ -177,15 +179,15 @@ module top_coprocessor (
     .w20(w20),
     .w21(w21),
     .w22(w22),
-    .g00(G00),
-    .g01(G01),
-    .g02(G02),
-    .g10(G10),
-    .g11(G11),
-    .g12(G12),
-    .g20(G20),
-    .g21(G21),
-    .g22(G22),
+    .g00(g00),
+    .g01(g01),
+    .g02(g02),
+    .g10(g10),
+    .g11(g11),
+    .g12(g12),
+    .g20(g20),
+    .g21(g21),
+    .g22(g22),
     .S_w(S_w),
     .S_wg(S_wg)
   );
@@ -205,6 +207,8 @@ module top_coprocessor (
   state_e st;
   state_e st_n;
 
+  assign est_step = start_pulse && (st == S_IDLE);
+
   always_comb begin
     st_n = st;
     unique case (st)
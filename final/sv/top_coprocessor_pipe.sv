@@ -0,0 +1,275 @@
+// top_coprocessor_pipe.sv - pipelined variant of top_coprocessor (II = 1)
+// Same ports as top_coprocessor. Every cycle with start=1 issues (T_in, dT_sel,
+// reg_mode); valid/G_out follow LATENCY = 4 cycles later, one result per clock:
+//   P1 fuzzify -> P2 rules -> P3 aggregate -> P4 defuzz (registered in defuzz)
+// Thresholds (used in P1) and singletons (P3) are not pipelined; keep them stable
+// while vectors are in flight.
+module top_coprocessor_pipe (
+  input  logic        clk,
+  input  logic        rst_n,
+  input  logic        start,           // issue: one vector per cycle while high
+  input  logic        init,            // level; rising edge re-inits dT estimator
+  input  logic        reg_mode,        // 0: 4 rules, 1: 9 rules
+  input  logic        dt_mode,         // 0: external dT_in, 1: internal estimator
+  input  logic signed [7:0] T_in,      // Q7.0
+  input  logic signed [7:0] dT_in,     // ignored when dt_mode=1
+  input  logic signed [7:0] T_neg_a,
+  input  logic signed [7:0] T_neg_b,
+  input  logic signed [7:0] T_neg_c,
+  input  logic signed [7:0] T_neg_d,
+  input  logic signed [7:0] T_zero_a,
+  input  logic signed [7:0] T_zero_b,
+  input  logic signed [7:0] T_zero_c,
+  input  logic signed [7:0] T_zero_d,
+  input  logic signed [7:0] T_pos_a,
+  input  logic signed [7:0] T_pos_b,
+  input  logic signed [7:0] T_pos_c,
+  input  logic signed [7:0] T_pos_d,
+  input  logic signed [7:0] dT_neg_a,
+  input  logic signed [7:0] dT_neg_b,
+  input  logic signed [7:0] dT_neg_c,
+  input  logic signed [7:0] dT_neg_d,
+  input  logic signed [7:0] dT_zero_a,
+  input  logic signed [7:0] dT_zero_b,
+  input  logic signed [7:0] dT_zero_c,
+  input  logic signed [7:0] dT_zero_d,
+  input  logic signed [7:0] dT_pos_a,
+  input  logic signed [7:0] dT_pos_b,
+  input  logic signed [7:0] dT_pos_c,
+  input  logic signed [7:0] dT_pos_d,
+  input  logic  [7:0] g00,             // singletons, percent 0..100
+  input  logic  [7:0] g01,
+  input  logic  [7:0] g02,
+  input  logic  [7:0] g10,
+  input  logic  [7:0] g11,
+  input  logic  [7:0] g12,
+  input  logic  [7:0] g20,
+  input  logic  [7:0] g21,
+  input  logic  [7:0] g22,
+  input  logic  [7:0] alpha,           // estimator: approx alpha/256
+  input  logic  [7:0] k_dt,            // estimator: divide by 2^k
+  input  logic  [7:0] d_max,           // estimator: clamp Q7.0
+  output logic        valid,           // high for one cycle per issued vector
+  output logic  [7:0] G_out            // 0..100 result (registered)
+);
+
+  // Edge detect for init (start is a per-cycle issue strobe here)
+  logic init_q;
+  logic init_pulse;
+  assign init_pulse = init & ~init_q;
+
+  always_ff @(posedge clk or negedge rst_n) begin
+    if (!rst_n) init_q <= 1'b0; else init_q <= init;
+  end
+
+  // Internal dT estimator: one step per issued vector
+  logic signed [7:0] dT_est;
+  logic signed [7:0] dT_est_next;
+  logic              dt_valid;
+  dt_estimator u_dt_estimator (
+    .clk(clk),
+    .rst_n(rst_n),
+    .T_cur(T_in),
+    .alpha(alpha),
+    .k_dt(k_dt),
+    .d_max(d_max),
+    .init(init_pulse),
+    .step(start),
+    .dT_out(dT_est),
+    .dT_next(dT_est_next),
+    .dt_valid(dt_valid)
+  );
+
+  // dT select (an issue cycle already sees the estimate of its own sample)
+  logic signed [7:0] dT_sel;
+  assign dT_sel = !dt_mode ? dT_in : (start ? dT_est_next : dT_est);
+
+  // Fuzzification for T
+  logic [15:0] muT_neg;
+  logic [15:0] muT_zero;
+  logic [15:0] muT_pos;
+  fuzzifier_T u_fuzz_T (
+    .x(T_in),
+    .a_neg(T_neg_a),
+    .b_neg(T_neg_b),
+    .c_neg(T_neg_c),
+    .d_neg(T_neg_d),
+    .a_zero(T_zero_a),
+    .b_zero(T_zero_b),
+    .c_zero(T_zero_c),
+    .d_zero(T_zero_d),
+    .a_pos(T_pos_a),
+    .b_pos(T_pos_b),
+    .c_pos(T_pos_c),
+    .d_pos(T_pos_d),
+    .mu_neg(muT_neg),
+    .mu_zero(muT_zero),
+    .mu_pos(muT_pos)
+  );
+
+  // Fuzzification for dT
+  logic [15:0] muD_neg;
+  logic [15:0] muD_zero;
+  logic [15:0] muD_pos;
+  fuzzifier_dT u_fuzz_dT (
+    .x(dT_sel),
+    .a_neg(dT_neg_a),
+    .b_neg(dT_neg_b),
+    .c_neg(dT_neg_c),
+    .d_neg(dT_neg_d),
+    .a_zero(dT_zero_a),
+    .b_zero(dT_zero_b),
+    .c_zero(dT_zero_c),
+    .d_zero(dT_zero_d),
+    .a_pos(dT_pos_a),
+    .b_pos(dT_pos_b),
+    .c_pos(dT_pos_c),
+    .d_pos(dT_pos_d),
+    .mu_neg(muD_neg),
+    .mu_zero(muD_zero),
+    .mu_pos(muD_pos)
+  );
+
+  // P1: fuzzify register
+  logic [15:0] p1_muT_neg;
+  logic [15:0] p1_muT_zero;
+  logic [15:0] p1_muT_pos;
+  logic [15:0] p1_muD_neg;
+  logic [15:0] p1_muD_zero;
+  logic [15:0] p1_muD_pos;
+  logic        p1_mode;
+  logic        p1_v;
+
+  always_ff @(posedge clk or negedge rst_n) begin
+    if (!rst_n) begin
+      p1_muT_neg  <= 16'd0;
+      p1_muT_zero <= 16'd0;
+      p1_muT_pos  <= 16'd0;
+      p1_muD_neg  <= 16'd0;
+      p1_muD_zero <= 16'd0;
+      p1_muD_pos  <= 16'd0;
+      p1_mode     <= 1'b1;
+      p1_v        <= 1'b0;
+    end else begin
+      p1_muT_neg  <= muT_neg;
+      p1_muT_zero <= muT_zero;
+      p1_muT_pos  <= muT_pos;
+      p1_muD_neg  <= muD_neg;
+      p1_muD_zero <= muD_zero;
+      p1_muD_pos  <= muD_pos;
+      p1_mode     <= reg_mode;
+      p1_v        <= start;
+    end
+  end
+
+  // Rules
+  logic [15:0] w00;
+  logic [15:0] w01;
+  logic [15:0] w02;
+  logic [15:0] w10;
+  logic [15:0] w11;
+  logic [15:0] w12;
+  logic [15:0] w20;
+  logic [15:0] w21;
+  logic [15:0] w22;
+  rules9 u_rules9 (
+    .muT_neg(p1_muT_neg),
+    .muT_zero(p1_muT_zero),
+    .muT_pos(p1_muT_pos),
+    .muD_neg(p1_muD_neg),
+    .muD_zero(p1_muD_zero),
+    .muD_pos(p1_muD_pos),
+    .w00(w00),
+    .w01(w01),
+    .w02(w02),
+    .w10(w10),
+    .w11(w11),
+    .w12(w12),
+    .w20(w20),
+    .w21(w21),
+    .w22(w22)
+  );
+
+  // P2: rule weight register
+  logic [15:0] p2_w [9];
+  logic        p2_mode;
+  logic        p2_v;
+
+  always_ff @(posedge clk or negedge rst_n) begin
+    if (!rst_n) begin
+      for (int i = 0; i < 9; i++) p2_w[i] <= 16'd0;
+      p2_mode <= 1'b1;
+      p2_v    <= 1'b0;
+    end else begin
+      p2_w[0] <= w00;
+      p2_w[1] <= w01;
+      p2_w[2] <= w02;
+      p2_w[3] <= w10;
+      p2_w[4] <= w11;
+      p2_w[5] <= w12;
+      p2_w[6] <= w20;
+      p2_w[7] <= w21;
+      p2_w[8] <= w22;
+      p2_mode <= p1_mode;
+      p2_v    <= p1_v;
+    end
+  end
+
+  // Aggregation
+  logic [15:0] S_w;
+  logic [15:0] S_wg;
+  aggregator u_aggregator (
+    .reg_mode(p2_mode),
+    .w00(p2_w[0]),
+    .w01(p2_w[1]),
+    .w02(p2_w[2]),
+    .w10(p2_w[3]),
+    .w11(p2_w[4]),
+    .w12(p2_w[5]),
+    .w20(p2_w[6]),
+    .w21(p2_w[7]),
+    .w22(p2_w[8]),
+    .g00(g00),
+    .g01(g01),
+    .g02(g02),
+    .g10(g10),
+    .g11(g11),
+    .g12(g12),
+    .g20(g20),
+    .g21(g21),
+    .g22(g22),
+    .S_w(S_w),
+    .S_wg(S_wg)
+  );
+
+  // P3: sums register
+  logic [15:0] p3_S_w;
+  logic [15:0] p3_S_wg;
+  logic        p3_v;
+
+  always_ff @(posedge clk or negedge rst_n) begin
+    if (!rst_n) begin
+      p3_S_w  <= 16'd0;
+      p3_S_wg <= 16'd0;
+      p3_v    <= 1'b0;
+    end else begin
+      p3_S_w  <= S_w;
+      p3_S_wg <= S_wg;
+      p3_v    <= p2_v;
+    end
+  end
+
+  // P4: defuzz (output register inside defuzz)
+  defuzz u_defuzz (
+    .clk(clk),
+    .rst_n(rst_n),
+    .S_w(p3_S_w),
+    .S_wg(p3_S_wg),
+    .G_out(G_out)
+  );
+
+  always_ff @(posedge clk or negedge rst_n) begin
+    if (!rst_n) valid <= 1'b0; else valid <= p3_v;
+  end
+
+endmodule
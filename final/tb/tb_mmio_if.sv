@@ -0,0 +1,402 @@
+// tb_mmio_if.sv - TB for mmio_if (MCU register shadow), both flavours
+//   final/sv/mmio_if.sv:  verilator --binary --timing tb_mmio_if.sv ../sv/mmio_if.sv
+//   final/v/mmio_if.v:    ... +define+MMIO_IF_V tb_mmio_if.sv ../v/mmio_if.v
+// The core is a behavioural stub: CORE_LAT clocks after START it pulses valid for
+// one clock with G_out = T_in + dT_in (held afterwards), so every result identifies
+// its vector. Bus strobes span WR_CLK/RD_CLK clocks, like the 8-bit MCU bus, so
+// the edge-triggered side effects (push, pop, START, burst advance) must fire once.
+// STATUS[0] differs between the flavours (raw valid vs sticky) and is masked.
+
+`timescale 1ns/1ps
+module tb_mmio_if;
+
+  localparam real TCLK_NS  = 10.0;
+  localparam int  CORE_LAT = 3;
+  localparam int  WR_CLK   = 2;
+  localparam int  RD_CLK   = 2;
+  localparam int  DEPTH    = 16;
+
+  localparam logic [7:0] A_STATUS  = 8'h00;
+  localparam logic [7:0] A_CTRL    = 8'h01;
+  localparam logic [7:0] A_FIFO_T  = 8'h28;
+  localparam logic [7:0] A_FIFO_DT = 8'h29;
+  localparam logic [7:0] A_FIFO_G  = 8'h2A;
+  localparam logic [7:0] A_IN_LVL  = 8'h2B;
+  localparam logic [7:0] A_OUT_LVL = 8'h2C;
+  localparam logic [7:0] A_BURST_ADDR = 8'h2D;
+  localparam logic [7:0] A_BURST_DATA = 8'h2E;
+  localparam logic [7:0] A_G00       = 8'h30;
+  localparam logic [7:0] A_ALPHA     = 8'h39;
+  localparam logic [7:0] A_RESULT    = 8'h3C;
+
+  localparam logic [7:0] G_RESET [9] = '{8'd100, 8'd50, 8'd30, 8'd50, 8'd50, 8'd50, 8'd80, 8'd50, 8'd0};
+  localparam logic [7:0] EST_RESET [3] = '{8'd32, 8'd3, 8'd64};   // ALPHA, K_DT, D_MAX
+  localparam string      EST_NAME [3]  = '{"ALPHA", "K_DT", "D_MAX"};
+
+  localparam logic [7:0] ST_IN_FULL  = 8'h02;
+  localparam logic [7:0] ST_OUT_NE   = 8'h04;
+  localparam logic [7:0] ST_OVF      = 8'h08;
+  localparam logic [7:0] CTRL_STREAM = 8'h10;
+  localparam logic [7:0] CTRL_CLR    = 8'h20;
+
+  logic clk;
+  logic rst_n;
+  initial begin
+    clk = 1'b0;
+    forever #(TCLK_NS/2.0) clk = ~clk;
+  end
+
+  // MCU bus
+  logic       cs;
+  logic       rd;
+  logic       wr;
+  logic [7:0] addr;
+  logic [7:0] wdata;
+  logic [7:0] rdata;
+
+  // Shadow outputs
+  logic       start;
+  logic       init;
+  logic       done_irq;
+  logic       reg_mode;
+  logic       dt_mode;
+  logic signed [7:0] T_in;
+  logic signed [7:0] dT_in;
+  logic signed [7:0] thr [24];   // T neg/zero/pos a..d, then dT neg/zero/pos a..d (0x10..0x27)
+  logic [7:0] gs [9];            // G00..G22 (0x30..0x38)
+  logic [7:0] est [3];           // ALPHA, K_DT, D_MAX (0x39..0x3B)
+
+  // Core stub
+  logic       valid;
+  logic [7:0] G_out;
+
+  mmio_if dut (
+    .clk(clk),
+    .rst_n(rst_n),
+    .cs(cs),
+    .rd(rd),
+    .wr(wr),
+    .addr(addr),
+    .wdata(wdata),
+    .rdata(rdata),
+    .start(start),
+    .init(init),
+    .done_irq(done_irq),
+    .reg_mode(reg_mode),
+    .dt_mode(dt_mode),
+    .T_in(T_in),
+    .dT_in(dT_in),
+    .T_neg_a(thr[0]),
+    .T_neg_b(thr[1]),
+    .T_neg_c(thr[2]),
+    .T_neg_d(thr[3]),
+    .T_zero_a(thr[4]),
+    .T_zero_b(thr[5]),
+    .T_zero_c(thr[6]),
+    .T_zero_d(thr[7]),
+    .T_pos_a(thr[8]),
+    .T_pos_b(thr[9]),
+    .T_pos_c(thr[10]),
+    .T_pos_d(thr[11]),
+    .dT_neg_a(thr[12]),
+    .dT_neg_b(thr[13]),
+    .dT_neg_c(thr[14]),
+    .dT_neg_d(thr[15]),
+    .dT_zero_a(thr[16]),
+    .dT_zero_b(thr[17]),
+    .dT_zero_c(thr[18]),
+    .dT_zero_d(thr[19]),
+    .dT_pos_a(thr[20]),
+    .dT_pos_b(thr[21]),
+    .dT_pos_c(thr[22]),
+    .dT_pos_d(thr[23]),
+    .g00(gs[0]),
+    .g01(gs[1]),
+    .g02(gs[2]),
+    .g10(gs[3]),
+    .g11(gs[4]),
+    .g12(gs[5]),
+    .g20(gs[6]),
+    .g21(gs[7]),
+    .g22(gs[8]),
+    .alpha(est[0]),
+    .k_dt(est[1]),
+    .d_max(est[2]),
+`ifdef MMIO_IF_V
+    .dbg_S_w(16'h0000),
+    .dbg_S_wg(16'h0000),
+    .dbg_G_q(8'h00),
+    .dbg_dT_sel(8'h00),
+`endif
+    .valid(valid),
+    .G_out(G_out)
+  );
+
+  // Core stub, clocked on the negedge so its outputs look registered to the DUT.
+  // core_kick() lands a result without START (RESULT/done_irq race cases).
+  int n_start;
+  int core_cnt;
+  logic [7:0] core_G;
+  realtime valid_t;
+  always @(negedge clk) begin
+    if (!rst_n) begin
+      valid <= 1'b0;
+      G_out <= 8'h00;
+      n_start <= 0;
+      core_cnt <= 0;
+    end else begin
+      valid <= 1'b0;
+      if (start) begin
+        n_start <= n_start + 1;
+        core_G <= T_in + dT_in;
+        core_cnt <= CORE_LAT;
+      end else if (core_cnt == 1) begin
+        valid <= 1'b1;
+        G_out <= core_G;
+        valid_t <= $realtime;
+        core_cnt <= 0;
+      end else if (core_cnt != 0) begin
+        core_cnt <= core_cnt - 1;
+      end
+    end
+  end
+
+  int n_err;
+
+  task automatic check(input string tag, input logic [7:0] got, input logic [7:0] exp);
+    if (got !== exp) begin
+      n_err++;
+      $error("%s: got 0x%02h exp 0x%02h", tag, got, exp);
+    end
+  endtask
+
+  // One write strobe of WR_CLK clocks, then one idle clock
+  task automatic bus_wr(input logic [7:0] a, input logic [7:0] d);
+    @(negedge clk);
+    cs = 1'b1;
+    wr = 1'b1;
+    addr = a;
+    wdata = d;
+    repeat (WR_CLK) @(negedge clk);
+    cs = 1'b0;
+    wr = 1'b0;
+  endtask
+
+  // One read strobe of n_clk clocks; data is taken at its end, then one idle clock
+  task automatic bus_rd(input logic [7:0] a, output logic [7:0] d, input int n_clk = RD_CLK);
+    @(negedge clk);
+    cs = 1'b1;
+    rd = 1'b1;
+    addr = a;
+    repeat (n_clk) @(negedge clk);
+    d = rdata;
+    cs = 1'b0;
+    rd = 1'b0;
+  endtask
+
+  task automatic expect_rd(input string tag, input logic [7:0] a, input logic [7:0] exp,
+                           input logic [7:0] mask = 8'hFF);
+    logic [7:0] d;
+    bus_rd(a, d);
+    check(tag, d & mask, exp & mask);
+  endtask
+
+  task automatic core_kick(input logic [7:0] G, input int lat);
+    core_G = G;
+    core_cnt = lat;
+  endtask
+
+  function automatic logic [7:0] vec_T(input int i);
+    return 8'(i * 7 - 50);
+  endfunction
+
+  function automatic logic [7:0] vec_dT(input int i);
+    return 8'(i * 3 + 1);
+  endfunction
+
+  task automatic push_vec(input int i);
+    bus_wr(A_FIFO_T, vec_T(i));
+    bus_wr(A_FIFO_DT, vec_dT(i));
+  endtask
+
+  task automatic pop_expect(input int i);
+    expect_rd($sformatf("FIFO_G[%0d]", i), A_FIFO_G, vec_T(i) + vec_dT(i));
+  endtask
+
+  // FIFO order, stall on a full result FIFO, overflow and FIFO_CLR
+  task automatic test_fifo();
+    int n0;
+    bus_wr(A_CTRL, 8'h00);                       // dt_mode=0: FIFO dT goes to the core
+    n0 = n_start;
+    for (int i = 0; i < DEPTH; i++) push_vec(i);
+    expect_rd("IN_LEVEL full", A_IN_LVL, DEPTH);
+    expect_rd("STATUS in_full", A_STATUS, ST_IN_FULL, 8'hFE);
+    push_vec(99);                                // dropped
+    expect_rd("IN_LEVEL after overflow", A_IN_LVL, DEPTH);
+    expect_rd("STATUS overflow", A_STATUS, ST_IN_FULL | ST_OVF, 8'hFE);
+    check("no START while STREAM=0", 8'(n_start - n0), 8'd0);
+
+    bus_wr(A_CTRL, CTRL_STREAM);
+    repeat (DEPTH * (CORE_LAT + 4)) @(negedge clk);
+    expect_rd("IN_LEVEL drained", A_IN_LVL, 8'd0);
+    expect_rd("OUT_LEVEL full", A_OUT_LVL, DEPTH);
+    expect_rd("STATUS out_nonempty", A_STATUS, ST_OUT_NE | ST_OVF, 8'hFE);
+
+    // Result FIFO full: new vectors stay in the input FIFO
+    for (int i = DEPTH; i < DEPTH + 3; i++) push_vec(i);
+    repeat (4 * (CORE_LAT + 4)) @(negedge clk);
+    expect_rd("IN_LEVEL stalled", A_IN_LVL, 8'd3);
+    check("START count while stalled", 8'(n_start - n0), DEPTH);
+
+    for (int i = 0; i < DEPTH + 3; i++) begin
+      pop_expect(i);
+      repeat (CORE_LAT + 4) @(negedge clk);
+    end
+    expect_rd("OUT_LEVEL empty", A_OUT_LVL, 8'd0);
+    expect_rd("IN_LEVEL empty", A_IN_LVL, 8'd0);
+    check("START count", 8'(n_start - n0), DEPTH + 3);
+
+    // FIFO_CLR drops queued vectors and the overflow flag; pointers restart cleanly
+    bus_wr(A_CTRL, 8'h00);
+    push_vec(40);
+    push_vec(41);
+    expect_rd("IN_LEVEL before CLR", A_IN_LVL, 8'd2);
+    bus_wr(A_CTRL, CTRL_CLR);
+    expect_rd("IN_LEVEL after CLR", A_IN_LVL, 8'd0);
+    expect_rd("STATUS after CLR", A_STATUS, 8'h00, 8'hFE);
+    bus_wr(A_CTRL, CTRL_STREAM);
+    push_vec(42);
+    repeat (CORE_LAT + 4) @(negedge clk);
+    expect_rd("OUT_LEVEL after CLR", A_OUT_LVL, 8'd1);
+    pop_expect(42);
+    bus_wr(A_CTRL, 8'h00);
+  endtask
+
+  // G00..G22 (0x30..0x38): reset values, one write per register, then a burst
+  task automatic test_singletons();
+    logic [7:0] exp [9];
+    exp = G_RESET;
+    foreach (gs[k]) check($sformatf("G%0d%0d reset", k / 3, k % 3), gs[k], exp[k]);
+    for (int k = 0; k < 9; k++) begin
+      exp[k] = 8'(10 * k + 7);
+      bus_wr(8'(A_G00 + k), exp[k]);
+      foreach (gs[j]) check($sformatf("G%0d%0d after write 0x%02h", j / 3, j % 3, A_G00 + k), gs[j], exp[j]);
+    end
+    bus_wr(A_BURST_ADDR, A_G00);
+    for (int k = 0; k < 9; k++) bus_wr(A_BURST_DATA, G_RESET[k]);
+    foreach (gs[k]) check($sformatf("G%0d%0d after burst", k / 3, k % 3), gs[k], G_RESET[k]);
+  endtask
+
+  // ALPHA/K_DT/D_MAX (0x39..0x3B): reset values, writes, no alias at RESULT (0x3C)
+  task automatic test_estimator_regs();
+    logic [7:0] exp [3];
+    exp = EST_RESET;
+    foreach (est[k]) check({EST_NAME[k], " reset"}, est[k], exp[k]);
+    for (int k = 0; k < 3; k++) begin
+      exp[k] = 8'(8'hA5 + 17 * k);
+      bus_wr(8'(A_ALPHA + k), exp[k]);
+      foreach (est[j]) check($sformatf("%s after write 0x%02h", EST_NAME[j], A_ALPHA + k), est[j], exp[j]);
+    end
+    bus_wr(A_RESULT, 8'h00);
+    foreach (est[k]) check({EST_NAME[k], " after write to RESULT"}, est[k], exp[k]);
+    check("G22 after estimator writes", gs[8], G_RESET[8]);
+    for (int k = 0; k < 3; k++) bus_wr(8'(A_ALPHA + k), EST_RESET[k]);
+    foreach (est[k]) check({EST_NAME[k], " restored"}, est[k], EST_RESET[k]);
+  endtask
+
+  // RESULT (0x3C) read by a long strobe while a result lands in its middle: the byte
+  // is the first-clock sample, and the flag is cleared only if that sample had it set
+  // and nothing landed since
+  task automatic rd_result_race(input string tag, input logic [7:0] G_new, output logic [7:0] d);
+    realtime t0;
+    realtime t1;
+    t0 = $realtime;
+    fork
+      bus_rd(A_RESULT, d, 10);
+      begin
+        repeat (3) @(negedge clk);
+        core_kick(G_new, 3);
+      end
+    join
+    t1 = $realtime;
+    if (!(valid_t > t0 + 2 * TCLK_NS && valid_t < t1 - 2 * TCLK_NS)) begin
+      n_err++;
+      $error("%s: result did not land mid-read (valid at %0t, read %0t..%0t)", tag, valid_t, t0, t1);
+    end
+  endtask
+
+  task automatic test_result_race();
+    logic [7:0] d;
+    bus_wr(A_CTRL, 8'h00);
+    bus_wr(8'h02, 8'd10);
+    bus_wr(8'h03, 8'd5);
+    bus_wr(A_CTRL, 8'h01);                       // START: G = 15
+    repeat (CORE_LAT + 4) @(negedge clk);
+    expect_rd("RESULT fresh", A_RESULT, 8'h80 | 8'd15);
+    expect_rd("RESULT consumed", A_RESULT, 8'd15);
+
+    // Sample had fresh=0: the read returns it, the landed result stays fresh
+    rd_result_race("race fresh=0", 8'd33, d);
+    check("race fresh=0: read", d, 8'd15);
+    expect_rd("race fresh=0: next read", A_RESULT, 8'h80 | 8'd33);
+    expect_rd("race fresh=0: consumed", A_RESULT, 8'd33);
+
+    // Sample had fresh=1: the read returns the old result, the clear is cancelled
+    core_kick(8'd44, 1);
+    repeat (4) @(negedge clk);
+    rd_result_race("race fresh=1", 8'd55, d);
+    check("race fresh=1: read", d, 8'h80 | 8'd44);
+    expect_rd("race fresh=1: next read", A_RESULT, 8'h80 | 8'd55);
+    expect_rd("race fresh=1: consumed", A_RESULT, 8'd55);
+  endtask
+
+  // BURST_ADDR/BURST_DATA: 24 thresholds in a row, then on into FIFO_T/FIFO_DT
+  task automatic test_burst();
+    logic [7:0] g0;
+    g0 = gs[0];
+    bus_wr(A_BURST_ADDR, 8'h10);
+    for (int k = 0; k < 24; k++) bus_wr(A_BURST_DATA, 8'(8'h40 + 3 * k));
+    for (int k = 0; k < 24; k++) check($sformatf("burst thr[0x%02h]", 8'h10 + k), thr[k], 8'(8'h40 + 3 * k));
+    check("burst stops at 0x27 (G00)", gs[0], g0);
+
+    // The pointer is at FIFO_T now: the 0x29 write must push
+    bus_wr(A_BURST_DATA, vec_T(50));
+    bus_wr(A_BURST_DATA, vec_dT(50));
+    expect_rd("IN_LEVEL after burst push", A_IN_LVL, 8'd1);
+    bus_wr(A_CTRL, CTRL_STREAM);
+    repeat (CORE_LAT + 4) @(negedge clk);
+    pop_expect(50);
+    bus_wr(A_CTRL, 8'h00);
+
+    // A new base restarts the burst; its neighbours stay untouched
+    bus_wr(A_BURST_ADDR, 8'h13);
+    bus_wr(A_BURST_DATA, 8'h7F);
+    check("burst rebase thr[0x13]", thr[3], 8'h7F);
+    check("burst rebase thr[0x12]", thr[2], 8'(8'h40 + 3 * 2));
+    check("burst rebase thr[0x14]", thr[4], 8'(8'h40 + 3 * 4));
+  endtask
+
+  initial begin
+    cs = 1'b0;
+    rd = 1'b0;
+    wr = 1'b0;
+    addr = 8'h00;
+    wdata = 8'h00;
+    n_err = 0;
+    rst_n = 1'b0;
+    repeat (3) @(posedge clk);
+    @(negedge clk);
+    rst_n = 1'b1;
+    @(negedge clk);
+
+    test_singletons();
+    test_estimator_regs();
+    test_fifo();
+    test_burst();
+    test_result_race();
+
+    $display("mmio_if TB finished: %0d errors", n_err);
+    $finish;
+  end
+
+endmodule
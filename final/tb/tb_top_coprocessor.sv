@@ -126,6 +126,8 @@ module tb_top_coprocessor;
   string  git_rev;
   string  tool_ver;
   int     seed_meta;
+  string  vec_dir;        // +vectors=<dir>: packed golden vectors replace the SV-reference blocks
+  bit     use_vectors;
 
   // Local per-case indices
   int idx_grid;
@@ -159,6 +161,29 @@ module tb_top_coprocessor;
   logic [7:0] G_rm0;
   logic [7:0] G_rm1;
 
+  // Singletons (driven into the DUT g00..g22 inputs, mmio_if reset values)
+  localparam logic [7:0] G00 = 8'd100;
+  localparam logic [7:0] G01 = 8'd50;
+  localparam logic [7:0] G02 = 8'd30;
+  localparam logic [7:0] G10 = 8'd50;
+  localparam logic [7:0] G11 = 8'd50;
+  localparam logic [7:0] G12 = 8'd50;
+  localparam logic [7:0] G20 = 8'd80;
+  localparam logic [7:0] G21 = 8'd50;
+  localparam logic [7:0] G22 = 8'd0;
+
+  // dT estimator parameters (mmio_if reset values)
+  localparam logic [7:0] ALPHA_P = 8'd32;
+  localparam logic [7:0] KDT_P   = 8'd3;
+  localparam logic [7:0] DMAX_P  = 8'd64;
+  // Series vector set (tb_vectors.SERIES_EST): fast enough to reach the D_MAX clamp
+  localparam logic [7:0] SER_ALPHA = 8'd128;
+  localparam logic [7:0] SER_KDT   = 8'd0;
+  localparam logic [7:0] SER_DMAX  = 8'd40;
+  logic [7:0] alpha_r = ALPHA_P;
+  logic [7:0] k_dt_r  = KDT_P;
+  logic [7:0] d_max_r = DMAX_P;
+
   // Instantiate DUT
   top_coprocessor dut (
     .clk(clk),
@@ -193,6 +218,18 @@ module tb_top_coprocessor;
     .dT_pos_b(dT_pos_b),
     .dT_pos_c(dT_pos_c),
     .dT_pos_d(dT_pos_d),
+    .g00(G00),
+    .g01(G01),
+    .g02(G02),
+    .g10(G10),
+    .g11(G11),
+    .g12(G12),
+    .g20(G20),
+    .g21(G21),
+    .g22(G22),
+    .alpha(alpha_r),
+    .k_dt(k_dt_r),
+    .d_max(d_max_r),
     .valid(valid),
     .G_out(G_out)
   );
@@ -361,17 +398,6 @@ module tb_top_coprocessor;
     if (csv_fd != 0) $fdisplay(csv_fd, "%s,%s,%0d,%0d,%0d,%0d,%0d,%0d,%0d", run_id, case_id, idx, reg_mode, dt_mode, $signed(T_in), $signed(dT_in), Gexp, Gimpl);
   endtask
 
-  // Singletons (copy of DUT locals)
-  localparam logic [7:0] G00 = 8'd100;
-  localparam logic [7:0] G01 = 8'd50;
-  localparam logic [7:0] G02 = 8'd30;
-  localparam logic [7:0] G10 = 8'd50;
-  localparam logic [7:0] G11 = 8'd50;
-  localparam logic [7:0] G12 = 8'd50;
-  localparam logic [7:0] G20 = 8'd80;
-  localparam logic [7:0] G21 = 8'd50;
-  localparam logic [7:0] G22 = 8'd0;
-
   // Tasks
   task automatic set_mf_defaults();
     // T sets
@@ -405,14 +431,14 @@ module tb_top_coprocessor;
   task automatic pulse_start();
     @(negedge clk);
     start <= 1'b1;
-    @(posedge clk);
+    @(negedge clk);             // one rising edge sees it; no drive on the posedge itself
     start <= 1'b0;
   endtask
 
   task automatic pulse_init();
     @(negedge clk);
     init <= 1'b1;
-    @(posedge clk);
+    @(negedge clk);             // one rising edge sees it; no drive on the posedge itself
     init <= 1'b0;
   endtask
 
@@ -544,6 +570,80 @@ module tb_top_coprocessor;
     Gexp_o = ref_defuzz(sumw_i[15:0], sumwg_i[15:0]);
   endtask
 
+  // Packed golden vectors from final/ref/tb_vectors.py ($readmemh, one 64-bit word each):
+  // [58] INIT first, [57] dt_mode, [56] reg_mode, [55:48] T, [47:40] dT (dT_sel with dt_mode=1),
+  // [39:24] S_w, [23:8] S_wg, [7:0] G; all ones ends the set. dt_mode=1 words are the series_trace()
+  // flow: INIT with the T of a segment's first sample, then one START per sample, dT_sel checked.
+  // An existing file with no vectors or without the end marker is fatal: with +vectors the
+  // SV-reference blocks are skipped, so a bad $readmemh must not pass as an empty run.
+  localparam int VEC_MAX = 131073;
+  localparam logic [63:0] VEC_UNSET = 64'h8000_0000_0000_0000;   // bits [63:59] are never set in a vector
+  logic [63:0] vec_mem [0:VEC_MAX-1];
+
+  task automatic run_vector_file(input string dir, input string name, output int n_run, output int n_err);
+    integer fd;
+    string  path;
+    logic [7:0] Gexp_v;
+    logic signed [7:0] dTexp_v;
+    n_run = 0;
+    n_err = 0;
+    path = {dir, "/", name, ".hex"};
+    fd = $fopen(path, "r");
+    if (fd == 0) begin
+      $display("WARN: vectors %s not found; skip.", path);
+      return;
+    end
+    $fclose(fd);
+    foreach (vec_mem[k]) vec_mem[k] = VEC_UNSET;
+    $readmemh(path, vec_mem);
+    dt_mode = 1'b0;
+    while (n_run < VEC_MAX && vec_mem[n_run] !== '1) begin
+      if (vec_mem[n_run][63:59] !== 5'b0) $fatal(1, "vectors %s: no VEC_END after %0d vectors", path, n_run);
+      dt_mode = vec_mem[n_run][57];
+      reg_mode = vec_mem[n_run][56];
+      T_in = vec_mem[n_run][55:48];
+      dT_in = dt_mode ? 8'sd0 : vec_mem[n_run][47:40];
+      Gexp_v = vec_mem[n_run][7:0];
+      if (dt_mode) begin
+        alpha_r = SER_ALPHA;
+        k_dt_r = SER_KDT;
+        d_max_r = SER_DMAX;
+      end
+      if (vec_mem[n_run][58]) pulse_init();
+      pulse_start();
+      wait_valid_count_cycles(lat);
+      assert (lat <= 10) else $error("[REQ-230] %s latency=%0d > 10", name, lat);
+      check_valid_one_shot();
+      @(posedge clk);
+      if (G_out !== Gexp_v) begin
+        n_err++;
+        $error("[REQ-010] %s[%0d] rm=%0d T=%0d dT=%0d G_out=%0d exp=%0d", name, n_run, reg_mode,
+               $signed(T_in), $signed(dT_in), G_out, Gexp_v);
+      end
+      // Aggregator outputs (combinational from the held inputs): S_w/S_wg checked as well as G
+      if (dut.u_aggregator.S_w !== vec_mem[n_run][39:24] || dut.u_aggregator.S_wg !== vec_mem[n_run][23:8]) begin
+        n_err++;
+        $error("[REQ-040] %s[%0d] rm=%0d T=%0d dT=%0d S_w=%0d S_wg=%0d exp=%0d/%0d", name, n_run, reg_mode,
+               $signed(T_in), $signed(dT_in), dut.u_aggregator.S_w, dut.u_aggregator.S_wg,
+               vec_mem[n_run][39:24], vec_mem[n_run][23:8]);
+      end
+      // dt_mode=1: the estimate of this sample (one estimator step per START)
+      dTexp_v = vec_mem[n_run][47:40];
+      if (dt_mode && dut.dT_sel !== dTexp_v) begin
+        n_err++;
+        $error("[REQ-061] %s[%0d] T=%0d dT_sel=%0d exp=%0d", name, n_run, $signed(T_in),
+               $signed(dut.dT_sel), dTexp_v);
+      end
+      csv_emit_line({"Vec_", name}, n_run, vec_mem[n_run][39:24], vec_mem[n_run][23:8], Gexp_v, G_out, valid);
+      n_run++;
+    end
+    if (n_run == 0) $fatal(1, "vectors %s: no vectors loaded", path);
+    alpha_r = ALPHA_P;
+    k_dt_r = KDT_P;
+    d_max_r = DMAX_P;
+    dt_mode = 1'b0;
+  endtask
+
   // Test flow
   initial begin
     // CSV: open file and parse plusargs
@@ -562,6 +662,8 @@ module tb_top_coprocessor;
       csv_write_header();
     end
     verbose = $test$plusargs("verbose");
+    use_vectors = $value$plusargs("vectors=%s", vec_dir);
+    if (use_vectors) $display("INFO: +vectors=%s: SV-reference grid/random/VIS blocks skipped", vec_dir);
 
     // Reset
     start = 1'b0;
@@ -585,264 +687,287 @@ module tb_top_coprocessor;
     idx_est_down = 0;
     idx_est_rw = 0;
 
-    // Block 1: DT_MODE=0, dense grid + A/B same vectors (REQ-010/020/030/040/050/210)
-    dt_mode = 1'b0;
-    Ts[0] = -128; Ts[1] = -64; Ts[2] = -32; Ts[3] = -16; Ts[4] = 0;
-    Ts[5] = 16; Ts[6] = 32; Ts[7] = 64; Ts[8] = 96; Ts[9] = 127;
-    dTs[0] = -60; dTs[1] = -30; dTs[2] = -10; dTs[3] = 0;
-    dTs[4] = 10; dTs[5] = 30; dTs[6] = 60;
-
-    // DT_MODE=0 GRID: CSV per sample
-    for (int rm = 0; rm <= 1; rm = rm + 1) begin : REG_AB
-      reg_mode = rm[0];
-      idx_grid = 0;
-      for (i = 0; i < 10; i = i + 1) begin
-        for (j = 0; j < 7; j = j + 1) begin
-          T_in = Ts[i][7:0];
-          dT_in = dTs[j][7:0];
-          // Compute expected, run DUT, and check
-          compute_and_check_expected($sformatf("Grid rm=%0d T=%0d dT=%0d", reg_mode, $signed(T_in), $signed(dT_in)));
-          // Recompute for CSV fields
-          t_muTn = ref_mu(T_in, T_neg_a, T_neg_b, T_neg_c, T_neg_d);
-          t_muTz = ref_mu(T_in, T_zero_a, T_zero_b, T_zero_c, T_zero_d);
-          t_muTp = ref_mu(T_in, T_pos_a, T_pos_b, T_pos_c, T_pos_d);
-          t_muDn = ref_mu(dT_in, dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d);
-          t_muDz = ref_mu(dT_in, dT_zero_a, dT_zero_b, dT_zero_c, dT_zero_d);
-          t_muDp = ref_mu(dT_in, dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d);
-          t_w00 = q15_min(t_muTn, t_muDn);
-          t_w01 = q15_min(t_muTn, t_muDz);
-          t_w02 = q15_min(t_muTn, t_muDp);
-          t_w10 = q15_min(t_muTz, t_muDn);
-          t_w11 = q15_min(t_muTz, t_muDz);
-          t_w12 = q15_min(t_muTz, t_muDp);
-          t_w20 = q15_min(t_muTp, t_muDn);
-          t_w21 = q15_min(t_muTp, t_muDz);
-          t_w22 = q15_min(t_muTp, t_muDp);
-          t_sumw = 20'd0;
-          t_sumwg = 20'd0;
-          t_sumw += t_w00; t_sumwg += w_mul_g_q15(t_w00, G00);
-          t_sumw += t_w02; t_sumwg += w_mul_g_q15(t_w02, G02);
-          t_sumw += t_w20; t_sumwg += w_mul_g_q15(t_w20, G20);
-          t_sumw += t_w22; t_sumwg += w_mul_g_q15(t_w22, G22);
-          if (reg_mode) begin
-            t_sumw += t_w01; t_sumwg += w_mul_g_q15(t_w01, G01);
-            t_sumw += t_w10; t_sumwg += w_mul_g_q15(t_w10, G10);
-            t_sumw += t_w11; t_sumwg += w_mul_g_q15(t_w11, G11);
-            t_sumw += t_w12; t_sumwg += w_mul_g_q15(t_w12, G12);
-            t_sumw += t_w21; t_sumwg += w_mul_g_q15(t_w21, G21);
+    // Blocks 1-2, A/B and VIS: expected values from the SV reference (ref_mu/ref_defuzz);
+    // with +vectors the packed golden sets below cover the same points
+    if (!use_vectors) begin : SV_REF_BLOCKS
+      // Block 1: DT_MODE=0, dense grid + A/B same vectors (REQ-010/020/030/040/050/210)
+      dt_mode = 1'b0;
+      Ts[0] = -128; Ts[1] = -64; Ts[2] = -32; Ts[3] = -16; Ts[4] = 0;
+      Ts[5] = 16; Ts[6] = 32; Ts[7] = 64; Ts[8] = 96; Ts[9] = 127;
+      dTs[0] = -60; dTs[1] = -30; dTs[2] = -10; dTs[3] = 0;
+      dTs[4] = 10; dTs[5] = 30; dTs[6] = 60;
+
+      // DT_MODE=0 GRID: CSV per sample
+      for (int rm = 0; rm <= 1; rm = rm + 1) begin : REG_AB
+        reg_mode = rm[0];
+        idx_grid = 0;
+        for (i = 0; i < 10; i = i + 1) begin
+          for (j = 0; j < 7; j = j + 1) begin
+            T_in = Ts[i][7:0];
+            dT_in = dTs[j][7:0];
+            // Compute expected, run DUT, and check
+            compute_and_check_expected($sformatf("Grid rm=%0d T=%0d dT=%0d", reg_mode, $signed(T_in), $signed(dT_in)));
+            // Recompute for CSV fields
+            t_muTn = ref_mu(T_in, T_neg_a, T_neg_b, T_neg_c, T_neg_d);
+            t_muTz = ref_mu(T_in, T_zero_a, T_zero_b, T_zero_c, T_zero_d);
+            t_muTp = ref_mu(T_in, T_pos_a, T_pos_b, T_pos_c, T_pos_d);
+            t_muDn = ref_mu(dT_in, dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d);
+            t_muDz = ref_mu(dT_in, dT_zero_a, dT_zero_b, dT_zero_c, dT_zero_d);
+            t_muDp = ref_mu(dT_in, dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d);
+            t_w00 = q15_min(t_muTn, t_muDn);
+            t_w01 = q15_min(t_muTn, t_muDz);
+            t_w02 = q15_min(t_muTn, t_muDp);
+            t_w10 = q15_min(t_muTz, t_muDn);
+            t_w11 = q15_min(t_muTz, t_muDz);
+            t_w12 = q15_min(t_muTz, t_muDp);
+            t_w20 = q15_min(t_muTp, t_muDn);
+            t_w21 = q15_min(t_muTp, t_muDz);
+            t_w22 = q15_min(t_muTp, t_muDp);
+            t_sumw = 20'd0;
+            t_sumwg = 20'd0;
+            t_sumw += t_w00; t_sumwg += w_mul_g_q15(t_w00, G00);
+            t_sumw += t_w02; t_sumwg += w_mul_g_q15(t_w02, G02);
+            t_sumw += t_w20; t_sumwg += w_mul_g_q15(t_w20, G20);
+            t_sumw += t_w22; t_sumwg += w_mul_g_q15(t_w22, G22);
+            if (reg_mode) begin
+              t_sumw += t_w01; t_sumwg += w_mul_g_q15(t_w01, G01);
+              t_sumw += t_w10; t_sumwg += w_mul_g_q15(t_w10, G10);
+              t_sumw += t_w11; t_sumwg += w_mul_g_q15(t_w11, G11);
+              t_sumw += t_w12; t_sumwg += w_mul_g_q15(t_w12, G12);
+              t_sumw += t_w21; t_sumwg += w_mul_g_q15(t_w21, G21);
+            end
+            if (t_sumw > 20'd32767) t_sumw = 20'd32767;
+            if (t_sumwg > 20'd32767) t_sumwg = 20'd32767;
+            t_Gexp = ref_defuzz(t_sumw[15:0], t_sumwg[15:0]);
+            csv_emit_line($sformatf("Grid_T=%0d_dT=%0d", $signed(T_in), $signed(dT_in)), idx_grid++, t_sumw[15:0], t_sumwg[15:0], t_Gexp, G_out, valid);
           end
-          if (t_sumw > 20'd32767) t_sumw = 20'd32767;
-          if (t_sumwg > 20'd32767) t_sumwg = 20'd32767;
-          t_Gexp = ref_defuzz(t_sumw[15:0], t_sumwg[15:0]);
-          csv_emit_line($sformatf("Grid_T=%0d_dT=%0d", $signed(T_in), $signed(dT_in)), idx_grid++, t_sumw[15:0], t_sumwg[15:0], t_Gexp, G_out, valid);
         end
       end
-    end
 
-    // SumW approximately zero edge: extremes (expect G=0)
-    reg_mode = 1'b1;
-    T_in = -128;
-    dT_in = 127;
-    compute_and_check_expected("Edge SumW approx 0");
-
-    // Near-EPS case: find a vector with 1..4 LSB of SumW, ensure safe defuzz (no blowup)
-    begin : NEAR_EPS
-      bit found_eps;
-      logic signed [7:0] eps_T;
-      logic signed [7:0] eps_dT;
-      int ii;
-      int jj;
-      logic [15:0] muTn_e;
-      logic [15:0] muTz_e;
-      logic [15:0] muTp_e;
-      logic [15:0] muDn_e;
-      logic [15:0] muDz_e;
-      logic [15:0] muDp_e;
-      logic [19:0] Sw_e;
-      found_eps = 0;
-      for (ii = 0; ii < 10 && !found_eps; ii++) begin
-        for (jj = 0; jj < 7 && !found_eps; jj++) begin
-          muTn_e = ref_mu(Ts[ii], T_neg_a, T_neg_b, T_neg_c, T_neg_d);
-          muTz_e = ref_mu(Ts[ii], T_zero_a, T_zero_b, T_zero_c, T_zero_d);
-          muTp_e = ref_mu(Ts[ii], T_pos_a, T_pos_b, T_pos_c, T_pos_d);
-          muDn_e = ref_mu(dTs[jj], dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d);
-          muDz_e = ref_mu(dTs[jj], dT_zero_a, dT_zero_b, dT_zero_c, dT_zero_d);
-          muDp_e = ref_mu(dTs[jj], dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d);
-          Sw_e = 20'd0;
-          Sw_e += q15_min(muTn_e, muDn_e);
-          Sw_e += q15_min(muTn_e, muDp_e);
-          Sw_e += q15_min(muTp_e, muDn_e);
-          Sw_e += q15_min(muTp_e, muDp_e);
-          if (reg_mode) Sw_e += q15_min(muTn_e, muDz_e) + q15_min(muTz_e, muDn_e) + q15_min(muTz_e, muDz_e) + q15_min(muTz_e, muDp_e) + q15_min(muTp_e, muDz_e);
-          if (Sw_e[15:0] >= 16'd1 && Sw_e[15:0] <= 16'd4) begin
-            eps_T = Ts[ii];
-            eps_dT = dTs[jj];
-            found_eps = 1;
+      // SumW approximately zero edge: extremes (expect G=0)
+      reg_mode = 1'b1;
+      T_in = -128;
+      dT_in = 127;
+      compute_and_check_expected("Edge SumW approx 0");
+
+      // Near-EPS case: find a vector with 1..4 LSB of SumW, ensure safe defuzz (no blowup)
+      begin : NEAR_EPS
+        bit found_eps;
+        logic signed [7:0] eps_T;
+        logic signed [7:0] eps_dT;
+        int ii;
+        int jj;
+        logic [15:0] muTn_e;
+        logic [15:0] muTz_e;
+        logic [15:0] muTp_e;
+        logic [15:0] muDn_e;
+        logic [15:0] muDz_e;
+        logic [15:0] muDp_e;
+        logic [19:0] Sw_e;
+        found_eps = 0;
+        for (ii = 0; ii < 10 && !found_eps; ii++) begin
+          for (jj = 0; jj < 7 && !found_eps; jj++) begin
+            muTn_e = ref_mu(Ts[ii], T_neg_a, T_neg_b, T_neg_c, T_neg_d);
+            muTz_e = ref_mu(Ts[ii], T_zero_a, T_zero_b, T_zero_c, T_zero_d);
+            muTp_e = ref_mu(Ts[ii], T_pos_a, T_pos_b, T_pos_c, T_pos_d);
+            muDn_e = ref_mu(dTs[jj], dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d);
+            muDz_e = ref_mu(dTs[jj], dT_zero_a, dT_zero_b, dT_zero_c, dT_zero_d);
+            muDp_e = ref_mu(dTs[jj], dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d);
+            Sw_e = 20'd0;
+            Sw_e += q15_min(muTn_e, muDn_e);
+            Sw_e += q15_min(muTn_e, muDp_e);
+            Sw_e += q15_min(muTp_e, muDn_e);
+            Sw_e += q15_min(muTp_e, muDp_e);
+            if (reg_mode) Sw_e += q15_min(muTn_e, muDz_e) + q15_min(muTz_e, muDn_e) + q15_min(muTz_e, muDz_e) + q15_min(muTz_e, muDp_e) + q15_min(muTp_e, muDz_e);
+            if (Sw_e[15:0] >= 16'd1 && Sw_e[15:0] <= 16'd4) begin
+              eps_T = Ts[ii];
+              eps_dT = dTs[jj];
+              found_eps = 1;
+            end
           end
         end
+        if (found_eps) begin
+          T_in = eps_T;
+          dT_in = eps_dT;
+          update_cov_vars();
+          compute_and_check_expected($sformatf("NearEPS T=%0d dT=%0d", $signed(T_in), $signed(dT_in)));
+          csv_emit_line("NearEPS", 0, -1, -1, -1, G_out, 1'b0);
+        end else begin
+          $display("WARN: could not find NearEPS case in coarse grid; skip.");
+        end
       end
-      if (found_eps) begin
-        T_in = eps_T;
-        dT_in = eps_dT;
-        update_cov_vars();
-        compute_and_check_expected($sformatf("NearEPS T=%0d dT=%0d", $signed(T_in), $signed(dT_in)));
-        csv_emit_line("NearEPS", 0, -1, -1, -1, G_out, 1'b0);
-      end else begin
-        $display("WARN: could not find NearEPS case in coarse grid; skip.");
-      end
-    end
 
-    // Block 2: DT_MODE=0, random MAE over >=1000 samples (REQ-310 <=1%)
-    N = 1000;
-    mae_acc = 0;
-    reg_mode = 1'b1;
-    for (i = 0; i < N; i = i + 1) begin
-      T_in = ($urandom() % 256) - 128;
-      dT_in = ($urandom() % 256) - 128;
-      muTn = ref_mu(T_in, T_neg_a, T_neg_b, T_neg_c, T_neg_d);
-      muTz = ref_mu(T_in, T_zero_a, T_zero_b, T_zero_c, T_zero_d);
-      muTp = ref_mu(T_in, T_pos_a, T_pos_b, T_pos_c, T_pos_d);
-      muDn = ref_mu(dT_in, dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d);
-      muDz = ref_mu(dT_in, dT_zero_a, dT_zero_b, dT_zero_c, dT_zero_d);
-      muDp = ref_mu(dT_in, dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d);
-      w00 = q15_min(muTn, muDn);
-      w01 = q15_min(muTn, muDz);
-      w02 = q15_min(muTn, muDp);
-      w10 = q15_min(muTz, muDn);
-      w11 = q15_min(muTz, muDz);
-      w12 = q15_min(muTz, muDp);
-      w20 = q15_min(muTp, muDn);
-      w21 = q15_min(muTp, muDz);
-      w22 = q15_min(muTp, muDp);
-      sumw = 20'd0;
-      sumwg = 20'd0;
-      sumw += w00; sumwg += w_mul_g_q15(w00, G00);
-      sumw += w02; sumwg += w_mul_g_q15(w02, G02);
-      sumw += w20; sumwg += w_mul_g_q15(w20, G20);
-      sumw += w22; sumwg += w_mul_g_q15(w22, G22);
-      if (reg_mode) begin
-        sumw += w01; sumwg += w_mul_g_q15(w01, G01);
-        sumw += w10; sumwg += w_mul_g_q15(w10, G10);
-        sumw += w11; sumwg += w_mul_g_q15(w11, G11);
-        sumw += w12; sumwg += w_mul_g_q15(w12, G12);
-        sumw += w21; sumwg += w_mul_g_q15(w21, G21);
+      // Block 2: DT_MODE=0, random MAE over >=1000 samples (REQ-310 <=1%)
+      N = 1000;
+      mae_acc = 0;
+      reg_mode = 1'b1;
+      for (i = 0; i < N; i = i + 1) begin
+        T_in = ($urandom() % 256) - 128;
+        dT_in = ($urandom() % 256) - 128;
+        muTn = ref_mu(T_in, T_neg_a, T_neg_b, T_neg_c, T_neg_d);
+        muTz = ref_mu(T_in, T_zero_a, T_zero_b, T_zero_c, T_zero_d);
+        muTp = ref_mu(T_in, T_pos_a, T_pos_b, T_pos_c, T_pos_d);
+        muDn = ref_mu(dT_in, dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d);
+        muDz = ref_mu(dT_in, dT_zero_a, dT_zero_b, dT_zero_c, dT_zero_d);
+        muDp = ref_mu(dT_in, dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d);
+        w00 = q15_min(muTn, muDn);
+        w01 = q15_min(muTn, muDz);
+        w02 = q15_min(muTn, muDp);
+        w10 = q15_min(muTz, muDn);
+        w11 = q15_min(muTz, muDz);
+        w12 = q15_min(muTz, muDp);
+        w20 = q15_min(muTp, muDn);
+        w21 = q15_min(muTp, muDz);
+        w22 = q15_min(muTp, muDp);
+        sumw = 20'd0;
+        sumwg = 20'd0;
+        sumw += w00; sumwg += w_mul_g_q15(w00, G00);
+        sumw += w02; sumwg += w_mul_g_q15(w02, G02);
+        sumw += w20; sumwg += w_mul_g_q15(w20, G20);
+        sumw += w22; sumwg += w_mul_g_q15(w22, G22);
+        if (reg_mode) begin
+          sumw += w01; sumwg += w_mul_g_q15(w01, G01);
+          sumw += w10; sumwg += w_mul_g_q15(w10, G10);
+          sumw += w11; sumwg += w_mul_g_q15(w11, G11);
+          sumw += w12; sumwg += w_mul_g_q15(w12, G12);
+          sumw += w21; sumwg += w_mul_g_q15(w21, G21);
+        end
+        if (sumw > 20'd32767) sumw = 20'd32767;
+        if (sumwg > 20'd32767) sumwg = 20'd32767;
+        Gexp = ref_defuzz(sumw[15:0], sumwg[15:0]);
+        update_cov_vars();
+        pulse_start();
+        wait_valid_count_cycles(latR);
+        check_valid_one_shot();
+        cov_touch();
+        @(posedge clk);
+        csv_emit_line("Random", idx_rand++, sumw[15:0], sumwg[15:0], Gexp, G_out, valid);
+        diff = (G_out > Gexp) ? (G_out - Gexp) : (Gexp - G_out);
+        mae_acc = mae_acc + diff;
       end
-      if (sumw > 20'd32767) sumw = 20'd32767;
-      if (sumwg > 20'd32767) sumwg = 20'd32767;
-      Gexp = ref_defuzz(sumw[15:0], sumwg[15:0]);
+      mae = mae_acc / N;
+      if (verbose) $display("INFO: [REQ-310] MAE over %0d samples = %0d (percent points)", N, mae);
+      assert (mae <= 1) else $error("[REQ-310] MAE=%0d%% > 1%%", mae);
+
+      // A/B stability on same inputs (no glitches across mode flips)
+      T_in = 8'sd32;
+      dT_in = -8'sd10;
+      // REG_MODE=0
+      reg_mode = 1'b0;
       update_cov_vars();
       pulse_start();
-      wait_valid_count_cycles(latR);
+      wait_valid_count_cycles(lat);
       check_valid_one_shot();
       cov_touch();
       @(posedge clk);
-      csv_emit_line("Random", idx_rand++, sumw[15:0], sumwg[15:0], Gexp, G_out, valid);
-      diff = (G_out > Gexp) ? (G_out - Gexp) : (Gexp - G_out);
-      mae_acc = mae_acc + diff;
-    end
-    mae = mae_acc / N;
-    if (verbose) $display("INFO: [REQ-310] MAE over %0d samples = %0d (percent points)", N, mae);
-    assert (mae <= 1) else $error("[REQ-310] MAE=%0d%% > 1%%", mae);
-
-    // A/B stability on same inputs (no glitches across mode flips)
-    T_in = 8'sd32;
-    dT_in = -8'sd10;
-    // REG_MODE=0
-    reg_mode = 1'b0;
-    update_cov_vars();
-    pulse_start();
-    wait_valid_count_cycles(lat);
-    check_valid_one_shot();
-    cov_touch();
-    @(posedge clk);
-    G_rm0 = G_out;
-    csv_emit_line("AB_Toggle_reg0", 0, -1, -1, -1, G_out, 1'b0);
-    // REG_MODE=1
-    reg_mode = 1'b1;
-    update_cov_vars();
-    pulse_start();
-    wait_valid_count_cycles(lat);
-    check_valid_one_shot();
-    cov_touch();
-    @(posedge clk);
-    G_rm1 = G_out;
-    csv_emit_line("AB_Toggle_reg1", 0, -1, -1, -1, G_out, 1'b0);
-    // Flip back to 0 (no lingering state)
-    reg_mode = 1'b0;
-    update_cov_vars();
-    pulse_start();
-    wait_valid_count_cycles(lat);
-    check_valid_one_shot();
-    cov_touch();
-    @(posedge clk);
-    // Sanity
-    assert (G_rm0 <= 8'd100 && G_rm1 <= 8'd100) else $error("[REQ-030] AB toggle produced invalid G");
-
-    // VIS 1: T sweep at dT=0
-    begin : VIS_T_AT_DT0
-      integer vis_fd1;
-      string vis_path1;
-      int Ti;
-      vis_path1 = "out/vis_T_at_dt0.csv";
-      vis_fd1 = $fopen(vis_path1, "w");
-      if (vis_fd1 != 0) $fdisplay(vis_fd1, "T,dT,Gimpl,Gexp");
+      G_rm0 = G_out;
+      csv_emit_line("AB_Toggle_reg0", 0, -1, -1, -1, G_out, 1'b0);
+      // REG_MODE=1
       reg_mode = 1'b1;
-      dt_mode = 1'b0;
-      dT_in = 8'sd0;
-      for (Ti = -128; Ti <= 127; Ti += 2) begin
-        T_in = Ti[7:0];
-        compute_and_check_expected("VIS_T_at_dt0");
-        if (vis_fd1 != 0) $fdisplay(vis_fd1, "%0d,%0d,%0d,%0d", $signed(T_in), $signed(dT_in), G_out, Gexp);
+      update_cov_vars();
+      pulse_start();
+      wait_valid_count_cycles(lat);
+      check_valid_one_shot();
+      cov_touch();
+      @(posedge clk);
+      G_rm1 = G_out;
+      csv_emit_line("AB_Toggle_reg1", 0, -1, -1, -1, G_out, 1'b0);
+      // Flip back to 0 (no lingering state)
+      reg_mode = 1'b0;
+      update_cov_vars();
+      pulse_start();
+      wait_valid_count_cycles(lat);
+      check_valid_one_shot();
+      cov_touch();
+      @(posedge clk);
+      // Sanity
+      assert (G_rm0 <= 8'd100 && G_rm1 <= 8'd100) else $error("[REQ-030] AB toggle produced invalid G");
+
+      // VIS 1: T sweep at dT=0
+      begin : VIS_T_AT_DT0
+        integer vis_fd1;
+        string vis_path1;
+        int Ti;
+        vis_path1 = "out/vis_T_at_dt0.csv";
+        vis_fd1 = $fopen(vis_path1, "w");
+        if (vis_fd1 != 0) $fdisplay(vis_fd1, "T,dT,Gimpl,Gexp");
+        reg_mode = 1'b1;
+        dt_mode = 1'b0;
+        dT_in = 8'sd0;
+        for (Ti = -128; Ti <= 127; Ti += 2) begin
+          T_in = Ti[7:0];
+          compute_and_check_expected("VIS_T_at_dt0");
+          if (vis_fd1 != 0) $fdisplay(vis_fd1, "%0d,%0d,%0d,%0d", $signed(T_in), $signed(dT_in), G_out, Gexp);
+        end
+        if (vis_fd1 != 0) begin $fflush(vis_fd1); $fclose(vis_fd1); end
+        $display("INFO: VIS_T_at_dt0 -> %s", vis_path1);
       end
-      if (vis_fd1 != 0) begin $fflush(vis_fd1); $fclose(vis_fd1); end
-      $display("INFO: VIS_T_at_dt0 -> %s", vis_path1);
-    end
 
-    // VIS 2: dT sweeps at fixed T values
-    begin : VIS_DT_LINES
-      integer vis_fd2;
-      string vis_path2;
-      int Dj;
-      int TT[0:2];
-      vis_path2 = "out/vis_dT_lines.csv";
-      vis_fd2 = $fopen(vis_path2, "w");
-      if (vis_fd2 != 0) $fdisplay(vis_fd2, "T,dT,Gimpl,Gexp");
-      reg_mode = 1'b1;
-      dt_mode = 1'b0;
-      TT[0] = -32; TT[1] = 0; TT[2] = 32;
-      for (int k = 0; k < 3; k++) begin
-        T_in = TT[k][7:0];
-        for (Dj = -60; Dj <= 60; Dj += 4) begin
-          dT_in = Dj[7:0];
-          compute_and_check_expected("VIS_dT_line");
-          if (vis_fd2 != 0) $fdisplay(vis_fd2, "%0d,%0d,%0d,%0d", $signed(T_in), $signed(dT_in), G_out, Gexp);
+      // VIS 2: dT sweeps at fixed T values
+      begin : VIS_DT_LINES
+        integer vis_fd2;
+        string vis_path2;
+        int Dj;
+        int TT[0:2];
+        vis_path2 = "out/vis_dT_lines.csv";
+        vis_fd2 = $fopen(vis_path2, "w");
+        if (vis_fd2 != 0) $fdisplay(vis_fd2, "T,dT,Gimpl,Gexp");
+        reg_mode = 1'b1;
+        dt_mode = 1'b0;
+        TT[0] = -32; TT[1] = 0; TT[2] = 32;
+        for (int k = 0; k < 3; k++) begin
+          T_in = TT[k][7:0];
+          for (Dj = -60; Dj <= 60; Dj += 4) begin
+            dT_in = Dj[7:0];
+            compute_and_check_expected("VIS_dT_line");
+            if (vis_fd2 != 0) $fdisplay(vis_fd2, "%0d,%0d,%0d,%0d", $signed(T_in), $signed(dT_in), G_out, Gexp);
+          end
+        end
+        if (vis_fd2 != 0) begin $fflush(vis_fd2); $fclose(vis_fd2); end
+        $display("INFO: VIS_dT_lines -> %s", vis_path2);
+      end
+
+      // VIS 3: 2D heatmap grid over T and dT
+      begin : VIS_HEATMAP
+        integer vis_fd3;
+        string vis_path3;
+        int Ti;
+        int Dj;
+        vis_path3 = "out/vis_heatmap.csv";
+        vis_fd3 = $fopen(vis_path3, "w");
+        if (vis_fd3 != 0) $fdisplay(vis_fd3, "T,dT,Gimpl,Gexp");
+        reg_mode = 1'b1;
+        dt_mode = 1'b0;
+        for (Ti = -64; Ti <= 64; Ti += 8) begin
+          for (Dj = -60; Dj <= 60; Dj += 5) begin
+            T_in = Ti[7:0];
+            dT_in = Dj[7:0];
+            compute_and_check_expected("VIS_heatmap");
+            if (vis_fd3 != 0) $fdisplay(vis_fd3, "%0d,%0d,%0d,%0d", $signed(T_in), $signed(dT_in), G_out, Gexp);
+          end
         end
+        if (vis_fd3 != 0) begin $fflush(vis_fd3); $fclose(vis_fd3); end
+        $display("INFO: VIS_heatmap -> %s", vis_path3);
       end
-      if (vis_fd2 != 0) begin $fflush(vis_fd2); $fclose(vis_fd2); end
-      $display("INFO: VIS_dT_lines -> %s", vis_path2);
     end
 
-    // VIS 3: 2D heatmap grid over T and dT
-    begin : VIS_HEATMAP
-      integer vis_fd3;
-      string vis_path3;
-      int Ti;
-      int Dj;
-      vis_path3 = "out/vis_heatmap.csv";
-      vis_fd3 = $fopen(vis_path3, "w");
-      if (vis_fd3 != 0) $fdisplay(vis_fd3, "T,dT,Gimpl,Gexp");
-      reg_mode = 1'b1;
-      dt_mode = 1'b0;
-      for (Ti = -64; Ti <= 64; Ti += 8) begin
-        for (Dj = -60; Dj <= 60; Dj += 5) begin
-          T_in = Ti[7:0];
-          dT_in = Dj[7:0];
-          compute_and_check_expected("VIS_heatmap");
-          if (vis_fd3 != 0) $fdisplay(vis_fd3, "%0d,%0d,%0d,%0d", $signed(T_in), $signed(dT_in), G_out, Gexp);
+    // Packed golden vectors (+vectors=<dir>, see final/ref/tb_vectors.py): expected values
+    // come from the files, no per-vector ref_mu/ref_defuzz
+    begin : VECTOR_FILES
+      string vec_sets[7];
+      int n_run;
+      int n_err;
+      int n_total;
+      n_total = 0;
+      vec_sets = '{"grid", "random", "vis_T_at_dt0", "vis_dT_lines", "vis_heatmap", "series", "exhaustive"};
+      if (use_vectors) begin
+        foreach (vec_sets[k]) begin
+          run_vector_file(vec_dir, vec_sets[k], n_run, n_err);
+          if (n_run > 0) $display("INFO: vectors %s: %0d run, %0d mismatches", vec_sets[k], n_run, n_err);
+          n_total += n_run;
         end
+        if (n_total == 0) $fatal(1, "+vectors=%s: no vector file found", vec_dir);
       end
-      if (vis_fd3 != 0) begin $fflush(vis_fd3); $fclose(vis_fd3); end
-      $display("INFO: VIS_heatmap -> %s", vis_path3);
     end
 
     // Block 3: DT_MODE=1, estimator scenarios (REQ-060/061/062 + 230)
@@ -1006,7 +1131,7 @@ module tb_top_coprocessor;
       pulse_start(); wait_valid_count_cycles(lat);
       fork
         begin
-          @(posedge clk); start <= 1'b1; @(posedge clk); start <= 1'b0;
+          @(posedge clk); @(negedge clk); start <= 1'b1; @(negedge clk); start <= 1'b0;
         end
         begin
           @(posedge valid);
@@ -1024,7 +1149,7 @@ module tb_top_coprocessor;
       @(negedge clk);
       init <= 1'b1;
       start <= 1'b1;
-      @(posedge clk);
+      @(negedge clk);
       init <= 1'b0;
       start <= 1'b0;
       wait_valid_count_cycles(lat1);
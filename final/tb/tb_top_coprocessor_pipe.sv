@@ -0,0 +1,253 @@
+// tb_top_coprocessor_pipe.sv - TB for top_coprocessor_pipe (II = 1, LATENCY = 4)
+// Issues the packed golden vectors of final/ref/tb_vectors.py (+vectors=<dir>) back to
+// back, one per clock, and checks for every vector that valid/G_out arrive exactly
+// LATENCY clocks after issue (the issue edge counts, as in final/ref/pipeline_model.py:
+// valid is seen after edge E+3 for a vector sampled at edge E), in order. Every 7th vector is followed by a
+// bubble (start=0), which must not produce a valid. The dt_mode=1 series set checks
+// dT_sel in the issue cycle (one estimator step per issued vector).
+// Covers REQ-010/040/061/230 for the pipelined core.
+
+`timescale 1ns/1ps
+module tb_top_coprocessor_pipe;
+
+  localparam real TCLK_NS = 10.0;
+  localparam int  LATENCY = 4;
+  localparam int  VEC_MAX = 131073;
+  localparam logic [63:0] VEC_UNSET = 64'h8000_0000_0000_0000;   // bits [63:59] are never set in a vector
+
+  // Config of tb_top_coprocessor (set_mf_defaults, G00..G22, estimator; series: SER_*)
+  localparam logic signed [7:0] T_NEG [4]  = '{-128, -64, -32, 0};
+  localparam logic signed [7:0] T_ZERO [4] = '{-16, 0, 0, 16};
+  localparam logic signed [7:0] T_POS [4]  = '{0, 32, 64, 127};
+  localparam logic signed [7:0] D_NEG [4]  = '{-100, -50, -30, -5};
+  localparam logic signed [7:0] D_ZERO [4] = '{-10, 0, 0, 10};
+  localparam logic signed [7:0] D_POS [4]  = '{5, 25, 35, 60};
+  localparam logic [7:0] ALPHA_P = 8'd32;
+  localparam logic [7:0] KDT_P   = 8'd3;
+  localparam logic [7:0] DMAX_P  = 8'd64;
+  localparam logic [7:0] SER_ALPHA = 8'd128;
+  localparam logic [7:0] SER_KDT   = 8'd0;
+  localparam logic [7:0] SER_DMAX  = 8'd40;
+
+  logic clk;
+  logic rst_n;
+  initial begin
+    clk = 1'b0;
+    forever #(TCLK_NS/2.0) clk = ~clk;
+  end
+
+  logic start;
+  logic init;
+  logic reg_mode;
+  logic dt_mode;
+  logic signed [7:0] T_in;
+  logic signed [7:0] dT_in;
+  logic [7:0] alpha_r;
+  logic [7:0] k_dt_r;
+  logic [7:0] d_max_r;
+  logic       valid;
+  logic [7:0] G_out;
+
+  top_coprocessor_pipe dut (
+    .clk(clk),
+    .rst_n(rst_n),
+    .start(start),
+    .init(init),
+    .reg_mode(reg_mode),
+    .dt_mode(dt_mode),
+    .T_in(T_in),
+    .dT_in(dT_in),
+    .T_neg_a(T_NEG[0]),
+    .T_neg_b(T_NEG[1]),
+    .T_neg_c(T_NEG[2]),
+    .T_neg_d(T_NEG[3]),
+    .T_zero_a(T_ZERO[0]),
+    .T_zero_b(T_ZERO[1]),
+    .T_zero_c(T_ZERO[2]),
+    .T_zero_d(T_ZERO[3]),
+    .T_pos_a(T_POS[0]),
+    .T_pos_b(T_POS[1]),
+    .T_pos_c(T_POS[2]),
+    .T_pos_d(T_POS[3]),
+    .dT_neg_a(D_NEG[0]),
+    .dT_neg_b(D_NEG[1]),
+    .dT_neg_c(D_NEG[2]),
+    .dT_neg_d(D_NEG[3]),
+    .dT_zero_a(D_ZERO[0]),
+    .dT_zero_b(D_ZERO[1]),
+    .dT_zero_c(D_ZERO[2]),
+    .dT_zero_d(D_ZERO[3]),
+    .dT_pos_a(D_POS[0]),
+    .dT_pos_b(D_POS[1]),
+    .dT_pos_c(D_POS[2]),
+    .dT_pos_d(D_POS[3]),
+    .g00(8'd100),
+    .g01(8'd50),
+    .g02(8'd30),
+    .g10(8'd50),
+    .g11(8'd50),
+    .g12(8'd50),
+    .g20(8'd80),
+    .g21(8'd50),
+    .g22(8'd0),
+    .alpha(alpha_r),
+    .k_dt(k_dt_r),
+    .d_max(d_max_r),
+    .valid(valid),
+    .G_out(G_out)
+  );
+
+  // Scoreboard: issued vectors in order, checked when their valid arrives
+  typedef struct {
+    int         idx;
+    int         edge_no;      // clock edge that issued the vector
+    logic [7:0] G;
+  } issue_t;
+  issue_t sb[$];
+  int     edge_n;             // posedges since reset
+  int     n_err;
+  int     n_checked;
+  string  set_name;
+
+  always @(posedge clk) edge_n <= rst_n ? edge_n + 1 : 0;
+
+  // Outputs are sampled on the negedge after the edge that produced them
+  always @(negedge clk) begin
+    if (rst_n && valid) begin
+      if (sb.size() == 0) begin
+        n_err++;
+        $error("[REQ-230] %s: valid at edge %0d with nothing in flight", set_name, edge_n);
+      end else begin
+        issue_t e;
+        int     lat;
+        e = sb.pop_front();
+        lat = edge_n - e.edge_no + 1;
+        n_checked++;
+        if (lat != LATENCY) begin
+          n_err++;
+          $error("[REQ-230] %s[%0d]: latency=%0d (expected %0d)", set_name, e.idx, lat, LATENCY);
+        end
+        if (G_out !== e.G) begin
+          n_err++;
+          $error("[REQ-010] %s[%0d]: G_out=%0d exp=%0d", set_name, e.idx, G_out, e.G);
+        end
+      end
+    end else if (rst_n && sb.size() > 0 && edge_n - sb[0].edge_no + 1 >= LATENCY) begin
+      n_err++;
+      $error("[REQ-230] %s[%0d]: no valid %0d clocks after issue", set_name, sb[0].idx, LATENCY);
+      void'(sb.pop_front());
+    end
+  end
+
+  logic [63:0] vec_mem [0:VEC_MAX-1];
+
+  // One set back to back; returns the number of vectors issued
+  task automatic run_set(input string dir, input string name, output int n_run);
+    integer fd;
+    string  path;
+    issue_t e;
+    logic signed [7:0] dTexp;
+    n_run = 0;
+    path = {dir, "/", name, ".hex"};
+    fd = $fopen(path, "r");
+    if (fd == 0) begin
+      $display("WARN: vectors %s not found; skip.", path);
+      return;
+    end
+    $fclose(fd);
+    foreach (vec_mem[k]) vec_mem[k] = VEC_UNSET;
+    $readmemh(path, vec_mem);
+    set_name = name;
+    while (n_run < VEC_MAX && vec_mem[n_run] !== '1) begin
+      if (vec_mem[n_run][63:59] !== 5'b0) $fatal(1, "vectors %s: no VEC_END after %0d vectors", path, n_run);
+      dt_mode = vec_mem[n_run][57];
+      reg_mode = vec_mem[n_run][56];
+      T_in = vec_mem[n_run][55:48];
+      dT_in = dt_mode ? 8'sd0 : vec_mem[n_run][47:40];
+      dTexp = vec_mem[n_run][47:40];
+      if (dt_mode) begin
+        alpha_r = SER_ALPHA;
+        k_dt_r = SER_KDT;
+        d_max_r = SER_DMAX;
+      end
+      if (vec_mem[n_run][58]) begin
+        // INIT in a bubble cycle, with T_in already at the first sample of the segment
+        start = 1'b0;
+        init = 1'b1;
+        @(negedge clk);
+        init = 1'b0;
+      end
+      start = 1'b1;
+      #1;
+      if (dt_mode && dut.dT_sel !== dTexp) begin
+        n_err++;
+        $error("[REQ-061] %s[%0d]: T=%0d dT_sel=%0d exp=%0d", name, n_run, T_in, dut.dT_sel, dTexp);
+      end
+      e.idx = n_run;
+      e.edge_no = edge_n + 1;
+      e.G = vec_mem[n_run][7:0];
+      sb.push_back(e);
+      @(negedge clk);
+      n_run++;
+      if (n_run % 7 == 0) begin
+        start = 1'b0;
+        @(negedge clk);
+      end
+    end
+    if (n_run == 0) $fatal(1, "vectors %s: no vectors loaded", path);
+    start = 1'b0;
+    repeat (LATENCY + 1) @(negedge clk);
+    if (sb.size() != 0) begin
+      n_err++;
+      $error("[REQ-230] %s: %0d vectors without valid", name, sb.size());
+      sb.delete();
+    end
+    alpha_r = ALPHA_P;
+    k_dt_r = KDT_P;
+    d_max_r = DMAX_P;
+  endtask
+
+  initial begin
+    string vec_dir;
+    string vec_sets[7];
+    int    n_run;
+    int    n_total;
+    int    e0;
+    int    err0;
+    vec_sets = '{"grid", "random", "vis_T_at_dt0", "vis_dT_lines", "vis_heatmap", "series", "exhaustive"};
+    if (!$value$plusargs("vectors=%s", vec_dir)) $fatal(1, "usage: +vectors=<dir> (final/ref/tb_vectors.py --out-dir)");
+
+    start = 1'b0;
+    init = 1'b0;
+    reg_mode = 1'b1;
+    dt_mode = 1'b0;
+    T_in = 8'sd0;
+    dT_in = 8'sd0;
+    alpha_r = ALPHA_P;
+    k_dt_r = KDT_P;
+    d_max_r = DMAX_P;
+    n_err = 0;
+    n_checked = 0;
+    n_total = 0;
+    rst_n = 1'b0;
+    repeat (3) @(posedge clk);
+    @(negedge clk);
+    rst_n = 1'b1;
+    @(negedge clk);
+
+    foreach (vec_sets[k]) begin
+      e0 = edge_n;
+      err0 = n_err;
+      run_set(vec_dir, vec_sets[k], n_run);
+      if (n_run > 0)
+        $display("INFO: pipe %s: %0d vectors in %0d clocks, %0d mismatches", vec_sets[k], n_run,
+                 edge_n - e0, n_err - err0);
+      n_total += n_run;
+    end
+    if (n_total == 0) $fatal(1, "+vectors=%s: no vector file found", vec_dir);
+    if (n_checked != n_total) $error("[REQ-230] %0d vectors issued, %0d results checked", n_total, n_checked);
+    $display("[REQ-010][REQ-040][REQ-061][REQ-230] pipe TB finished: %0d vectors, %0d errors", n_total, n_err);
+    $finish;
+  end
+
+endmodule
@@ -0,0 +1,236 @@
+// tb_top_wukong_mmio.sv - TB for the Pico bus side of top_wukong (final/v/top_wukong_mmio.v)
+// Sources: ../v/top_wukong_mmio.v, ../v/mmio_if.v, ../v/top_coprocessor.v and its
+// submodules; inv_q15.hex in the run directory.
+// The Pico drives CS/WR/RD asynchronously with microsecond setup/strobe times, as in
+// final/pico/main.py (write_reg/read_reg). The RDY pin is checked around the CS edges:
+// with CS low it carries done_irq; after CS rises it must drop before RD is raised
+// (within RDY_CS_CLK clocks: 3-stage CS synchronizer + RDY register) and only rise
+// again with the read data on D_R; after CS falls it carries done_irq again.
+
+`timescale 1ns/1ps
+
+// Simulation stand-in for the Xilinx clock wizard: clk_out1 = clk_in1 (the TB runs
+// the 20 MHz core clock directly), locked a few clocks after resetn.
+module clk_wiz_0 (
+  output wire clk_out1,
+  input  wire resetn,
+  output reg  locked,
+  input  wire clk_in1
+);
+  assign clk_out1 = clk_in1;
+  reg [1:0] lock_cnt;
+  always @(posedge clk_in1 or negedge resetn) begin
+    if (!resetn) begin
+      lock_cnt <= 2'd0;
+      locked   <= 1'b0;
+    end else if (!locked) begin
+      lock_cnt <= lock_cnt + 2'd1;
+      locked   <= (lock_cnt == 2'd3);
+    end
+  end
+endmodule
+
+module tb_top_wukong_mmio;
+
+  localparam real TCLK_NS    = 50.0;      // clk20
+  localparam real T_SETUP_NS = 1000.0;    // main.py T_SETUP_US = 1
+  localparam real T_STROBE_NS = 2000.0;
+  localparam int  RDY_CS_CLK = 5;         // CS rise -> RDY low, in clk20 periods (with margin)
+  localparam int  RD_TIMEOUT_CLK = 100;
+  localparam int  DONE_TIMEOUT_CLK = 200;
+
+  localparam logic [5:0] A_STATUS = 6'h00;
+  localparam logic [5:0] A_CTRL   = 6'h01;
+  localparam logic [5:0] A_TIN    = 6'h02;
+  localparam logic [5:0] A_DTIN   = 6'h03;
+  localparam logic [5:0] A_G      = 6'h04;
+  localparam logic [7:0] MODES_EXT = 8'h02;   // reg_mode=1, dt_mode=0
+
+  logic clk;
+  logic rst_n;
+  initial begin
+    clk = 1'b0;
+    forever #(TCLK_NS/2.0) clk = ~clk;
+  end
+
+  logic       cs_i;
+  logic       wr_i;
+  logic       rd_i;
+  logic [5:0] a_i;
+  logic [7:0] d_w_i;
+  wire  [7:0] d_r_o;
+  wire        rdy_o;
+  wire        led_clk;
+  wire        led_rdy;
+
+  top_wukong dut (
+    .clk(clk),
+    .rst_n(rst_n),
+    .cs_i(cs_i),
+    .wr_i(wr_i),
+    .rd_i(rd_i),
+    .a_i(a_i),
+    .d_w_i(d_w_i),
+    .d_r_o(d_r_o),
+    .rdy_o(rdy_o),
+    .LED_CLK_PIN(led_clk),
+    .LED_RDY_PIN(led_rdy)
+  );
+
+  int n_err;
+
+  task automatic check(input string tag, input logic [7:0] got, input logic [7:0] exp);
+    if (got !== exp) begin
+      n_err++;
+      $error("%s: got 0x%02h exp 0x%02h", tag, got, exp);
+    end
+  endtask
+
+  // RDY must hold `level` for n clocks (sampled on every clk20 edge)
+  task automatic expect_rdy_for(input string tag, input logic level, input int n);
+    repeat (n) begin
+      @(posedge clk);
+      #1;
+      if (rdy_o !== level) begin
+        n_err++;
+        $error("%s: RDY=%b, expected %b", tag, rdy_o, level);
+        return;
+      end
+    end
+  endtask
+
+  // CS has just risen: RDY (done_irq before) must be low within RDY_CS_CLK clocks
+  task automatic expect_rdy_drop(input string tag);
+    repeat (RDY_CS_CLK) @(posedge clk);
+    #1;
+    if (rdy_o !== 1'b0) begin
+      n_err++;
+      $error("%s: RDY still high %0d clocks after CS rose", tag, RDY_CS_CLK);
+    end
+  endtask
+
+  // write_reg(): A, D_W; CS=1; pulse WR; CS=0
+  task automatic pico_wr(input logic [5:0] a, input logic [7:0] d);
+    a_i = a;
+    d_w_i = d;
+    #(T_SETUP_NS);
+    cs_i = 1'b1;
+    fork
+      expect_rdy_drop($sformatf("write 0x%02h", a));
+      #(T_SETUP_NS);
+    join
+    wr_i = 1'b1;
+    #(T_STROBE_NS);
+    if (rdy_o !== 1'b0) begin
+      n_err++;
+      $error("write 0x%02h: RDY high during a write strobe", a);
+    end
+    wr_i = 1'b0;
+    #(T_SETUP_NS);
+    cs_i = 1'b0;
+    #(T_SETUP_NS);
+  endtask
+
+  // read_reg(): A; CS=1; RD=1; wait RDY=1; sample D_R; RD=0; CS=0
+  task automatic pico_rd(input logic [5:0] a, output logic [7:0] d);
+    int n;
+    a_i = a;
+    #(T_SETUP_NS);
+    cs_i = 1'b1;
+    fork
+      expect_rdy_drop($sformatf("read 0x%02h", a));
+      #(T_SETUP_NS);
+    join
+    rd_i = 1'b1;
+    n = 0;
+    while (rdy_o !== 1'b1) begin
+      @(posedge clk);
+      #1;
+      n++;
+      if (n > RD_TIMEOUT_CLK) begin
+        n_err++;
+        $error("read 0x%02h: RD timeout", a);
+        break;
+      end
+    end
+    d = d_r_o;
+    #(T_STROBE_NS);
+    rd_i = 1'b0;
+    #(T_SETUP_NS);
+    cs_i = 1'b0;
+  endtask
+
+  // Bus idle: wait for the done_irq edge on RDY
+  task automatic wait_done(input string tag);
+    int n;
+    n = 0;
+    while (rdy_o !== 1'b1) begin
+      @(posedge clk);
+      #1;
+      n++;
+      if (n > DONE_TIMEOUT_CLK) begin
+        n_err++;
+        $error("%s: no done_irq on RDY", tag);
+        return;
+      end
+    end
+    if (dut.done_irq !== 1'b1) begin
+      n_err++;
+      $error("%s: RDY high with CS low but done_irq=0", tag);
+    end
+  endtask
+
+  initial begin
+    logic [7:0] d;
+    logic [7:0] G_exp;
+    cs_i = 1'b0;
+    wr_i = 1'b0;
+    rd_i = 1'b0;
+    a_i = 6'h00;
+    d_w_i = 8'h00;
+    n_err = 0;
+    rst_n = 1'b0;
+    repeat (3) @(posedge clk);
+    @(negedge clk);
+    rst_n = 1'b1;
+    repeat (10) @(posedge clk);
+
+    // Idle after reset: CS low, nothing done
+    expect_rdy_for("idle after reset", 1'b0, 20);
+
+    // One evaluation; START keeps RDY low (CS high, and START clears done_irq)
+    pico_wr(A_CTRL, MODES_EXT);
+    pico_wr(A_TIN, 8'd20);
+    pico_wr(A_DTIN, 8'hF6);             // -10
+    pico_wr(A_CTRL, 8'h01 | MODES_EXT);
+    wait_done("START");
+    G_exp = dut.G_out;
+
+    // STATUS read with done_irq set: RDY drops after CS rises, rises with the
+    // data, and carries done_irq again once CS is low (STATUS does not clear it)
+    pico_rd(A_STATUS, d);
+    check("STATUS.valid", d & 8'h01, 8'h01);
+    #(T_SETUP_NS);
+    expect_rdy_for("after STATUS read (done_irq kept)", 1'b1, 10);
+
+    // G read clears done_irq: RDY stays low after CS falls
+    pico_rd(A_G, d);
+    check("G", d, G_exp);
+    #(T_SETUP_NS);
+    expect_rdy_for("after G read (done_irq cleared)", 1'b0, 40);
+
+    // Second evaluation with a different input: RDY rises again, G follows
+    pico_wr(A_TIN, 8'hD8);              // -40
+    pico_wr(A_CTRL, 8'h01 | MODES_EXT);
+    wait_done("second START");
+    G_exp = dut.G_out;
+    pico_rd(A_G, d);
+    check("G (second)", d, G_exp);
+    #(T_SETUP_NS);
+    expect_rdy_for("after second G read", 1'b0, 40);
+
+    $display("top_wukong RDY TB finished: %0d errors", n_err);
+    $finish;
+  end
+
+endmodule
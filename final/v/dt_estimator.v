@@ -3,6 +3,11 @@
 // REQ-061: parameters ALPHA (~/256), K_DT (2^k), D_MAX clamp in Q7.0
 // REQ-062: INIT pulse resets estimator without output spike
 // REQ-210: internal fixed-point Q0.7 (legacy name "*_q15" kept)
+//
+// The state advances once per sample (step = accepted START), not every clock, so
+// a time series matches fuzzy_refmodel.EstimatorRTLExact.step() regardless of bus
+// timing. dT_next is the value dT_out takes on a step; the core uses it in the
+// START cycle, so the evaluation sees the estimate of the sample it was started for.
 
 module dt_estimator (
   input               clk,
@@ -12,7 +17,9 @@ module dt_estimator (
   input        [7:0]  k_dt,       // scale divider 2^k (0..7 suggested)
   input        [7:0]  d_max,      // abs clamp in Q7.0
   input               init,       // 1-cycle pulse
-  output reg  signed [7:0] dT_out,     // Q7.0
+  input               step,       // 1-cycle pulse: T_cur is the next sample
+  output reg  signed [7:0] dT_out,     // Q7.0, held between steps
+  output      signed [7:0] dT_next,    // Q7.0, dT_out after a step in this cycle
   output reg           dt_valid
 );
 
@@ -58,7 +65,9 @@ module dt_estimator (
     q07_to_s8   = $signed(((clamped_q15 < 0) ? (clamped_q15 + 16'sd127) : clamped_q15) >>> 7);
   end
 
-  // Sequential update with INIT handling
+  assign dT_next = init ? 8'sd0 : q07_to_s8;
+
+  // Sequential update with INIT handling; the state only moves on a step
   always @(posedge clk or negedge rst_n) begin
     if (!rst_n) begin
       T_prev      <= 8'sd0;
@@ -70,7 +79,7 @@ module dt_estimator (
       dT_prev_q15 <= 16'sd0;
       dT_out      <= 8'sd0;
       dt_valid    <= 1'b0;
-    end else begin
+    end else if (step) begin
       T_prev      <= T_cur;
       dT_prev_q15 <= clamped_q15;
       dT_out      <= q07_to_s8;
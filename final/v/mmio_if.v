@@ -1,17 +1,44 @@
 // mmio_if.v - register shadow for MCU (8-bit bus) <-> top_coprocessor (core)
 //
 // RO:
-//   0x00 STATUS: {7'b0, valid_sticky}          // sticky, cleared on read of 0x00
+//   0x00 STATUS: {4'b0, fifo_ovf, out_nonempty, in_full, valid_sticky}  // [0] cleared by a read that returned 1
 //   0x04 G_LATCH: last computed G               // sticky (held until next valid)
 //   0x05..0x06: S_w (hi, lo)                    // DEBUG
 //   0x07..0x08: S_wg (hi, lo)                   // DEBUG
 //   0x09:       G_q (raw from defuzz)           // DEBUG
 //   0x0A:       dT_sel (post-mux)               // DEBUG (signed, but here as 8-bit)
+//   0x2A FIFO_G:    result FIFO head             // popped at the end of the read strobe
+//   0x2B IN_LEVEL:  input FIFO entries
+//   0x2C OUT_LEVEL: result FIFO entries
+//   0x3C RESULT:    {fresh, G_LATCH[6:0]}     // fresh set with G_LATCH, cleared by START
+//                                              // or at the end of a RESULT read that
+//                                              // returned fresh=1
 // WO:
-//   0x01 CTRL: [3]=INIT (W1P), [2]=DT_MODE, [1]=REG_MODE, [0]=START (W1P)
+//   0x01 CTRL: [5]=FIFO_CLR (W1P), [4]=STREAM, [3]=INIT (W1P), [2]=DT_MODE, [1]=REG_MODE, [0]=START (W1P)
 //   0x02 T (Q7.0), 0x03 dT (Q7.0; ignored when DT_MODE=1)
 //   0x10..0x1B: T thresholds (a,b,c,d) for {neg,zero,pos}
 //   0x1C..0x27: dT thresholds (a,b,c,d) for {neg,zero,pos}
+//   0x28 FIFO_T:  stage T of the next vector
+//   0x29 FIFO_DT: push {FIFO_T, dT} into the input FIFO (rising edge of the write strobe)
+//   0x2D BURST_ADDR: base address for BURST_DATA
+//   0x2E BURST_DATA: write wdata to the register at BURST_ADDR, which advances by one
+//                    at the end of the write strobe (24 thresholds = 1 + 24 strobes)
+//                    a burst write to 0x29 pushes into the input FIFO like a direct write
+//   0x30..0x38: singletons G00,G01,G02,G10,G11,G12,G20,G21,G22 (percent 0..100)
+//   0x39 ALPHA (~/256), 0x3A K_DT (2^k), 0x3B D_MAX (Q7.0): dT estimator parameters
+//
+// done_irq: level DONE/IRQ output, set together with G_LATCH (one cycle after the
+// valid edge), cleared by the next START or at the end of a G_LATCH (0x04) read
+// that began while it was set.
+//
+// Clear-on-read flags (STATUS[0], RESULT.fresh, done_irq): the read data is sampled
+// in the first clock of the read strobe and held until it ends; the flag is cleared
+// at the end only if the sample had it set and no new result was latched since, so
+// a result landing mid-read is seen by the next read.
+//
+// STREAM mode: while the input FIFO is non-empty, no evaluation is in flight and
+// the result FIFO has room, one vector is popped into T_in/dT_in and START is
+// auto-pulsed; G is pushed into the result FIFO (in input order) when it is latched.
 module mmio_if (
   input         clk,
   input         rst_n,
@@ -23,6 +50,7 @@ module mmio_if (
   output reg [7:0] rdata,
   output        start,        // one-cycle level (core edge-detects)
   output        init,         // one-cycle level (core edge-detects)
+  output reg    done_irq,     // level: result ready, cleared by START or G read
   output reg    reg_mode,
   output reg    dt_mode,
   output reg signed [7:0] T_in,
@@ -51,6 +79,10 @@ module mmio_if (
   output reg signed [7:0] dT_pos_b,
   output reg signed [7:0] dT_pos_c,
   output reg signed [7:0] dT_pos_d,
+  output reg  [7:0] g00, g01, g02,   // singletons (percent 0..100)
+  output reg  [7:0] g10, g11, g12,
+  output reg  [7:0] g20, g21, g22,
+  output reg  [7:0] alpha, k_dt, d_max,  // dT estimator parameters
   input         valid,        // 1-cycle DONE from core
   input   [7:0] G_out,
 
@@ -64,6 +96,8 @@ module mmio_if (
   // One-cycle strobes
   reg start_w1;
   reg init_w1;
+  reg start_w1_q;
+  wire start_rise = start_w1 & ~start_w1_q;  // START held for a whole write strobe clears once
 
   // Sticky bits / latching
   reg        valid_sticky;    // captures 'valid' pulse and holds until STATUS read
@@ -74,6 +108,50 @@ module mmio_if (
   reg g_cap_arm;              // "arm" capture for the cycle after valid_rise
   wire valid_rise = valid & ~valid_q;
 
+  // Streaming FIFOs
+  localparam FIFO_DEPTH = 16;
+  localparam FIFO_AW    = 4;
+  reg [15:0] in_mem  [0:FIFO_DEPTH-1];   // {T, dT}
+  reg  [7:0] out_mem [0:FIFO_DEPTH-1];
+  reg [FIFO_AW-1:0] in_wp, in_rp, out_wp, out_rp;
+  reg   [FIFO_AW:0] in_cnt, out_cnt;
+  reg               stream;
+  reg               busy;             // auto-started evaluation in flight
+  reg               fifo_ovf;         // sticky: a push into a full input FIFO was dropped
+  reg         [7:0] fifo_T;
+  reg               push_q, pop_q;
+
+  // RESULT register (clear-on-read fresh flag)
+  reg        res_fresh;
+  reg        res_rd_q;
+  wire       res_rd_now = cs & rd & (addr == 8'h3C);
+  reg  [7:0] res_rd_data;     // RESULT as sampled in the first clock of the read
+  reg        res_rd_clr;      // that sample had fresh=1 and nothing was latched since
+
+  // Reads of STATUS and G_LATCH sample and clear valid_sticky / done_irq the same way
+  reg        st_rd_q;
+  wire       st_rd_now  = cs & rd & (addr == 8'h00);
+  reg        st_rd_valid;
+  reg        st_rd_clr;
+  reg        g_rd_q;
+  wire       g_rd_now   = cs & rd & (addr == 8'h04);
+  reg  [7:0] g_rd_data;
+  reg        g_rd_clr;
+
+  // Auto-increment burst: BURST_DATA writes are redirected to burst_ptr
+  reg  [7:0] burst_ptr;
+  reg        bdata_q;
+  wire       bdata_now = cs & wr & (addr == 8'h2E);
+  wire [7:0] waddr     = (addr == 8'h2E) ? burst_ptr : addr;
+
+  wire push_now   = cs & wr & (waddr == 8'h29);
+  wire pop_now    = cs & rd & (addr == 8'h2A);
+  wire in_push    = push_now & ~push_q;
+  wire in_accept  = in_push & (in_cnt != FIFO_DEPTH);
+  wire out_pop    = pop_q & ~pop_now & (out_cnt != 0);
+  wire auto_start = stream & ~busy & (in_cnt != 0) & (out_cnt != FIFO_DEPTH);
+  wire out_push   = busy & g_cap_arm;  // same cycle G_latch captures G_out
+
   // Registers + W1P generation
   always @(posedge clk or negedge rst_n) begin
     if (!rst_n) begin
@@ -90,25 +168,56 @@ module mmio_if (
       dT_zero_a <= 8'hC0; dT_zero_b <= 8'h00; dT_zero_c <= 8'h00; dT_zero_d <= 8'h40;
       dT_pos_a  <= 8'h00; dT_pos_b  <= 8'h40; dT_pos_c  <= 8'h80; dT_pos_d  <= 8'h80;
 
+      g00 <= 8'd100; g01 <= 8'd50; g02 <= 8'd30;
+      g10 <= 8'd50;  g11 <= 8'd50; g12 <= 8'd50;
+      g20 <= 8'd80;  g21 <= 8'd50; g22 <= 8'd0;
+      alpha <= 8'd32; k_dt <= 8'd3; d_max <= 8'd64;
+
       start_w1      <= 1'b0;
       init_w1       <= 1'b0;
+      start_w1_q    <= 1'b0;
 
       valid_sticky  <= 1'b0;
       G_latch       <= 8'h00;
 
       valid_q       <= 1'b0;
       g_cap_arm     <= 1'b0;
+
+      in_wp <= 0; in_rp <= 0; out_wp <= 0; out_rp <= 0;
+      in_cnt <= 0; out_cnt <= 0;
+      stream   <= 1'b0;
+      busy     <= 1'b0;
+      fifo_ovf <= 1'b0;
+      fifo_T   <= 8'h00;
+      push_q   <= 1'b0;
+      pop_q    <= 1'b0;
+      burst_ptr <= 8'h00;
+      bdata_q   <= 1'b0;
+      done_irq  <= 1'b0;
+      res_fresh <= 1'b0;
+      res_rd_q  <= 1'b0;
+      res_rd_data <= 8'h00;
+      res_rd_clr  <= 1'b0;
+      st_rd_q     <= 1'b0;
+      st_rd_valid <= 1'b0;
+      st_rd_clr   <= 1'b0;
+      g_rd_q      <= 1'b0;
+      g_rd_data   <= 8'h00;
+      g_rd_clr    <= 1'b0;
     end else begin
       // default: clear W1P strobes
       start_w1  <= 1'b0;
       init_w1   <= 1'b0;
+      start_w1_q <= start_w1;
 
       // track valid for edge detection
       valid_q <= valid;
+      push_q  <= push_now;
+      pop_q   <= pop_now;
+      bdata_q <= bdata_now;
 
-      // DONE: set sticky and arm capture one cycle later
+      // DONE: arm capture one cycle later (valid_sticky is set below)
       if (valid_rise) begin
-        valid_sticky <= 1'b1;
         g_cap_arm    <= 1'b1;
       end else begin
         g_cap_arm    <= 1'b0;
@@ -119,17 +228,57 @@ module mmio_if (
         G_latch <= G_out;
       end
 
+      // Clear-on-read: sample when the read begins, clear when it ends if the
+      // sample had the flag set
+      st_rd_q  <= st_rd_now;
+      g_rd_q   <= g_rd_now;
+      res_rd_q <= res_rd_now;
+      if (st_rd_now && !st_rd_q) begin
+        st_rd_valid <= valid_sticky;
+        st_rd_clr   <= valid_sticky;
+      end
+      if (g_rd_now && !g_rd_q) begin
+        g_rd_data <= G_latch;
+        g_rd_clr  <= done_irq;
+      end
+      if (res_rd_now && !res_rd_q) begin
+        res_rd_data <= {res_fresh, G_latch[6:0]};
+        res_rd_clr  <= res_fresh;
+      end
+      if (st_rd_q && !st_rd_now && st_rd_clr)
+        valid_sticky <= 1'b0;
+      if (valid_rise) begin
+        valid_sticky <= 1'b1;
+        st_rd_clr    <= 1'b0;
+      end
+
+      // DONE/IRQ and RESULT.fresh follow G_latch; the capture wins over a clear in
+      // the same cycle and cancels one still pending
+      if (start_rise || (g_rd_q && !g_rd_now && g_rd_clr))
+        done_irq <= 1'b0;
+      if (start_rise || (res_rd_q && !res_rd_now && res_rd_clr))
+        res_fresh <= 1'b0;
+      if (g_cap_arm) begin
+        done_irq   <= 1'b1;
+        res_fresh  <= 1'b1;
+        g_rd_clr   <= 1'b0;
+        res_rd_clr <= 1'b0;
+      end
+
       // writes
       if (cs && wr) begin
-        case (addr)
+        case (waddr)
           8'h01: begin
             start_w1 <= wdata[0];
             init_w1  <= wdata[3];
             reg_mode <= wdata[1];
             dt_mode  <= wdata[2];
+            stream   <= wdata[4];
           end
           8'h02: T_in <= wdata;
           8'h03: if (!dt_mode) dT_in <= wdata;
+          8'h28: fifo_T <= wdata;
+          8'h2D: burst_ptr <= wdata;
 
           // T thresholds (WO)
           8'h10: T_neg_a  <= wdata;  8'h11: T_neg_b  <= wdata;
@@ -147,13 +296,53 @@ module mmio_if (
           8'h24: dT_pos_a  <= wdata; 8'h25: dT_pos_b  <= wdata;
           8'h26: dT_pos_c  <= wdata; 8'h27: dT_pos_d  <= wdata;
 
+          // singletons (WO)
+          8'h30: g00 <= wdata; 8'h31: g01 <= wdata; 8'h32: g02 <= wdata;
+          8'h33: g10 <= wdata; 8'h34: g11 <= wdata; 8'h35: g12 <= wdata;
+          8'h36: g20 <= wdata; 8'h37: g21 <= wdata; 8'h38: g22 <= wdata;
+
+          // dT estimator parameters (WO)
+          8'h39: alpha <= wdata; 8'h3A: k_dt <= wdata; 8'h3B: d_max <= wdata;
+
           default: /* no-op */ ;
         endcase
       end
+      if (bdata_q && !bdata_now)
+        burst_ptr <= burst_ptr + 1'b1;
 
-      // clear STATUS.valid_sticky after read of 0x00
-      if (cs && rd && addr == 8'h00)
-        valid_sticky <= 1'b0;
+      // input FIFO: push on write edge, pop on auto-start
+      if (in_accept) begin
+        in_mem[in_wp] <= {fifo_T, wdata};
+        in_wp         <= in_wp + 1'b1;
+      end
+      if (in_push && !in_accept)
+        fifo_ovf <= 1'b1;
+      if (auto_start) begin
+        T_in     <= in_mem[in_rp][15:8];
+        if (!dt_mode) dT_in <= in_mem[in_rp][7:0];
+        in_rp    <= in_rp + 1'b1;
+        start_w1 <= 1'b1;
+        busy     <= 1'b1;
+      end
+      in_cnt <= in_cnt + in_accept - auto_start;
+
+      // result FIFO: push with the G capture, pop at the end of a FIFO_G read
+      if (out_push) begin
+        out_mem[out_wp] <= G_out;
+        out_wp          <= out_wp + 1'b1;
+        busy            <= 1'b0;
+      end
+      if (out_pop)
+        out_rp <= out_rp + 1'b1;
+      out_cnt <= out_cnt + out_push - out_pop;
+
+      // FIFO_CLR (CTRL[5]) drops everything in flight
+      if (cs && wr && waddr == 8'h01 && wdata[5]) begin
+        in_wp <= 0; in_rp <= 0; out_wp <= 0; out_rp <= 0;
+        in_cnt <= 0; out_cnt <= 0;
+        busy     <= 1'b0;
+        fifo_ovf <= 1'b0;
+      end
     end
   end
 
@@ -166,14 +355,19 @@ module mmio_if (
     rdata = 8'h00;
     if (cs && rd) begin
       case (addr)
-        8'h00: rdata = {7'b0, valid_sticky}; // STATUS (sticky)
-        8'h04: rdata = G_latch;              // G result (sticky)
+        8'h00: rdata = {4'b0, fifo_ovf, (out_cnt != 0), (in_cnt == FIFO_DEPTH),
+                        st_rd_q ? st_rd_valid : valid_sticky};                          // STATUS
+        8'h04: rdata = g_rd_q ? g_rd_data : G_latch;  // G result (sticky)
         8'h05: rdata = dbg_S_w[15:8];        // DEBUG
         8'h06: rdata = dbg_S_w[7:0];         // DEBUG
         8'h07: rdata = dbg_S_wg[15:8];       // DEBUG
         8'h08: rdata = dbg_S_wg[7:0];        // DEBUG
         8'h09: rdata = dbg_G_q;              // DEBUG
         8'h0A: rdata = dbg_dT_sel;           // DEBUG
+        8'h2A: rdata = out_mem[out_rp];      // FIFO_G
+        8'h2B: rdata = {3'b0, in_cnt};       // IN_LEVEL
+        8'h2C: rdata = {3'b0, out_cnt};      // OUT_LEVEL
+        8'h3C: rdata = res_rd_q ? res_rd_data : {res_fresh, G_latch[6:0]}; // RESULT
         default: rdata = 8'h00;
       endcase
     end
@@ -8,7 +8,8 @@ module top (
   input         wr,
   input   [7:0] addr,
   input   [7:0] wdata,
-  output  [7:0] rdata
+  output  [7:0] rdata,
+  output        done_irq      // result ready (see mmio_if)
 );
 
   // Wires shadow <-> core
@@ -42,6 +43,8 @@ module top (
   wire signed [7:0] dT_pos_b;
   wire signed [7:0] dT_pos_c;
   wire signed [7:0] dT_pos_d;
+  wire        [7:0] g00, g01, g02, g10, g11, g12, g20, g21, g22;
+  wire        [7:0] alpha, k_dt, d_max;
   wire        valid;
   wire  [7:0] G_out;
 
@@ -55,6 +58,7 @@ module top (
     .addr(addr),
     .wdata(wdata),
     .rdata(rdata),
+    .done_irq(done_irq),
     .start(start),
     .init(init),
     .reg_mode(reg_mode),
@@ -85,6 +89,10 @@ module top (
     .dT_pos_b(dT_pos_b),
     .dT_pos_c(dT_pos_c),
     .dT_pos_d(dT_pos_d),
+    .g00(g00), .g01(g01), .g02(g02),
+    .g10(g10), .g11(g11), .g12(g12),
+    .g20(g20), .g21(g21), .g22(g22),
+    .alpha(alpha), .k_dt(k_dt), .d_max(d_max),
     .valid(valid),
     .G_out(G_out)
   );
@@ -123,6 +131,10 @@ module top (
     .dT_pos_b(dT_pos_b),
     .dT_pos_c(dT_pos_c),
     .dT_pos_d(dT_pos_d),
+    .g00(g00), .g01(g01), .g02(g02),
+    .g10(g10), .g11(g11), .g12(g12),
+    .g20(g20), .g21(g21), .g22(g22),
+    .alpha(alpha), .k_dt(k_dt), .d_max(d_max),
     .valid(valid),
     .G_out(G_out)
   );
@@ -34,6 +34,12 @@ module top_coprocessor (
   input  signed [7:0] dT_pos_b,
   input  signed [7:0] dT_pos_c,
   input  signed [7:0] dT_pos_d,
+  input         [7:0] g00, g01, g02,   // singletons, percent 0..100
+  input         [7:0] g10, g11, g12,
+  input         [7:0] g20, g21, g22,
+  input         [7:0] alpha,           // estimator: ~ alpha/256
+  input         [7:0] k_dt,            // estimator: divide by 2^k
+  input         [7:0] d_max,           // estimator: clamp Q7.0
   output reg        valid,           // 1-cycle DONE pulse (after 8 cycles)
   output reg  [7:0] G_out,           // 0..100 result (registered)
 
@@ -44,14 +50,6 @@ module top_coprocessor (
   output signed[7:0] dbg_dT_sel
 );
 
-  // Singletons and constants
-  localparam [7:0] G00 = 8'd100, G01 = 8'd50,  G02 = 8'd30;
-  localparam [7:0] G10 = 8'd50,  G11 = 8'd50,  G12 = 8'd50;
-  localparam [7:0] G20 = 8'd80,  G21 = 8'd50,  G22 = 8'd0;
-  localparam [7:0] ALPHA_P = 8'd32;  // ~ alpha/256
-  localparam [7:0] KDT_P   = 8'd3;   // divide by 2^k
-  localparam [7:0] DMAX_P  = 8'd64;  // clamp Q7.0
-
   // Edge detect for start/init
   reg  start_q, init_q;
   wire start_pulse = start & ~start_q;
@@ -64,17 +62,19 @@ module top_coprocessor (
     end
   end
 
-  // dT estimator
-  wire signed [7:0] dT_est;  wire dt_valid;
+  // dT estimator: one step per accepted START
+  wire signed [7:0] dT_est, dT_est_next;  wire dt_valid;
+  reg  running;
+  wire est_step = start_pulse & ~running;
   dt_estimator u_dt_estimator (
     .clk(clk), .rst_n(rst_n), .T_cur(T_in),
-    .alpha(ALPHA_P), .k_dt(KDT_P), .d_max(DMAX_P),
-    .init(init_pulse),
-    .dT_out(dT_est), .dt_valid(dt_valid)
+    .alpha(alpha), .k_dt(k_dt), .d_max(d_max),
+    .init(init_pulse), .step(est_step),
+    .dT_out(dT_est), .dT_next(dT_est_next), .dt_valid(dt_valid)
   );
 
-  // dT select
-  wire signed [7:0] dT_sel = dt_mode ? dT_est : dT_in;
+  // dT select (the START cycle already sees the estimate of this sample)
+  wire signed [7:0] dT_sel = !dt_mode ? dT_in : (est_step ? dT_est_next : dT_est);
   assign dbg_dT_sel = dT_sel;
 
   // Fuzzification T
@@ -114,9 +114,9 @@ module top_coprocessor (
     .w00(w00), .w01(w01), .w02(w02),
     .w10(w10), .w11(w11), .w12(w12),
     .w20(w20), .w21(w21), .w22(w22),
-    .g00(G00), .g01(G01), .g02(G02),
-    .g10(G10), .g11(G11), .g12(G12),
-    .g20(G20), .g21(G21), .g22(G22),
+    .g00(g00), .g01(g01), .g02(g02),
+    .g10(g10), .g11(g11), .g12(g12),
+    .g20(g20), .g21(g21), .g22(g22),
     .S_w(S_w), .S_wg(S_wg)
   );
   assign dbg_S_w  = S_w;
@@ -134,7 +134,6 @@ module top_coprocessor (
   // --- Counter delaying DONE by N cycles ---
   localparam integer DONE_LAT = 8;
   reg [$clog2(DONE_LAT+1)-1:0] cnt;
-  reg running;
 
   always @(posedge clk or negedge rst_n) begin
     if (!rst_n) begin
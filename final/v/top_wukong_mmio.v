@@ -87,7 +87,7 @@ always @(posedge clk20 or negedge core_rst_n) begin
 end
 
 // === 3) Core + debug ===
-wire        start, init, reg_mode, dt_mode, valid;
+wire        start, init, reg_mode, dt_mode, valid, done_irq;
 wire  [7:0] G_out;
 wire signed [7:0]
   T_in, dT_in,
@@ -97,6 +97,8 @@ wire signed [7:0]
   dT_neg_a, dT_neg_b, dT_neg_c, dT_neg_d,
   dT_zero_a,dT_zero_b,dT_zero_c,dT_zero_d,
   dT_pos_a, dT_pos_b, dT_pos_c, dT_pos_d;
+wire  [7:0] g00, g01, g02, g10, g11, g12, g20, g21, g22;
+wire  [7:0] alpha, k_dt, d_max;
 
 wire [15:0] dbg_S_w, dbg_S_wg;
 wire [7:0]  dbg_G_q;
@@ -108,7 +110,7 @@ mmio_if u_mmio_if (
   .addr(addr8),
   .wdata(wdata),
   .rdata(rdata),
-  .start(start), .init(init),
+  .start(start), .init(init), .done_irq(done_irq),
   .reg_mode(reg_mode), .dt_mode(dt_mode),
   .T_in(T_in), .dT_in(dT_in),
   .T_neg_a(T_neg_a), .T_neg_b(T_neg_b), .T_neg_c(T_neg_c), .T_neg_d(T_neg_d),
@@ -117,6 +119,8 @@ mmio_if u_mmio_if (
   .dT_neg_a(dT_neg_a), .dT_neg_b(dT_neg_b), .dT_neg_c(dT_neg_c), .dT_neg_d(dT_neg_d),
   .dT_zero_a(dT_zero_a), .dT_zero_b(dT_zero_b), .dT_zero_c(dT_zero_c), .dT_zero_d(dT_zero_d),
   .dT_pos_a(dT_pos_a), .dT_pos_b(dT_pos_b), .dT_pos_c(dT_pos_c), .dT_pos_d(dT_pos_d),
+  .g00(g00), .g01(g01), .g02(g02), .g10(g10), .g11(g11), .g12(g12), .g20(g20), .g21(g21), .g22(g22),
+  .alpha(alpha), .k_dt(k_dt), .d_max(d_max),
   .valid(valid), .G_out(G_out),
 
   // debug inputs mapped to RO
@@ -137,6 +141,8 @@ top_coprocessor u_top_coprocessor (
   .dT_neg_a(dT_neg_a), .dT_neg_b(dT_neg_b), .dT_neg_c(dT_neg_c), .dT_neg_d(dT_neg_d),
   .dT_zero_a(T_zero_a), .dT_zero_b(T_zero_b), .dT_zero_c(T_zero_c), .dT_zero_d(T_zero_d),
   .dT_pos_a(dT_pos_a), .dT_pos_b(dT_pos_b), .dT_pos_c(dT_pos_c), .dT_pos_d(dT_pos_d),
+  .g00(g00), .g01(g01), .g02(g02), .g10(g10), .g11(g11), .g12(g12), .g20(g20), .g21(g21), .g22(g22),
+  .alpha(alpha), .k_dt(k_dt), .d_max(d_max),
   .valid(valid), .G_out(G_out),
 
   // debug outputs
@@ -147,6 +153,8 @@ top_coprocessor u_top_coprocessor (
 );
 
 // === 4) 1T read latency and level RDY ===
+// While CS is low the RDY pin carries done_irq, so the Pico can take a pin
+// interrupt on completion instead of polling STATUS (no spare GPIO on the header).
 reg rd_pipe, rd_ready;
 always @(posedge clk20 or negedge core_rst_n) begin
   if(!core_rst_n) begin
@@ -155,7 +163,7 @@ always @(posedge clk20 or negedge core_rst_n) begin
     rd_ready<= 1'b0;
     rdy_o   <= 1'b0;
   end else begin
-    rdy_o <= rd_ready;
+    rdy_o <= cs ? rd_ready : done_irq;
     if (rd_rise) begin
       rd_pipe  <= 1'b1;
       rd_ready <= 1'b0;
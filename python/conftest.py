@@ -1,16 +1,29 @@
 # conftest.py — rejestracja własnych opcji CLI i wygodne fixture'y
 
-import os
 import pathlib
 import random
+import sys
 import pytest
 
+import fuzzy_refmodel
+from result_sink import CSV_FIELDS, ResultSink, cfg_thresholds
+
+# Konfiguracja TB (CoprocessorCfg() = progi MF z TB): domyślne kolumny Tneg_a..dTpos_d w csv_writer.
+# Jeden obiekt na sesję, więc ResultSink trafia w szybką ścieżkę (progi liczone raz).
+TB_CFG = fuzzy_refmodel.CoprocessorCfg()
+
+# final/ref na końcu sys.path: golden_surface stamtąd, fuzzy_refmodel nadal z python/
+_FINAL_REF = pathlib.Path(__file__).resolve().parent.parent / "final" / "ref"
+if str(_FINAL_REF) not in sys.path:
+    sys.path.append(str(_FINAL_REF))
+
 def pytest_addoption(parser: pytest.Parser):
     group = parser.getgroup("csv-meta")
     group.addoption("--csv", action="store", default="", help="Ścieżka do CSV z wynikami")
     group.addoption("--run-id", action="store", default="py_run", help="Identyfikator uruchomienia")
     group.addoption("--git-rev", action="store", default="", help="Commit / wersja kodu")
     group.addoption("--seed", action="store", type=int, default=0, help="Seed RNG (0 = brak)")
+    group.addoption("--npz", action="store", default="", help="Ścieżka do kolumnowego .npz z wynikami (result_sink.py)")
 
 @pytest.fixture(scope="session")
 def cli_opts(request: pytest.FixtureRequest):
@@ -19,6 +32,7 @@ def cli_opts(request: pytest.FixtureRequest):
     run_id   = request.config.getoption("--run-id")
     git_rev  = request.config.getoption("--git-rev")
     seed     = request.config.getoption("--seed")
+    npz_path = request.config.getoption("--npz")
 
     # Utwórz katalog docelowy na CSV
     out_dir = pathlib.Path(csv_path).expanduser().resolve().parent
@@ -33,49 +47,43 @@ def cli_opts(request: pytest.FixtureRequest):
         "run_id": run_id,
         "git_rev": git_rev,
         "seed": seed,
+        "npz": npz_path,
     }
 
-@pytest.fixture
-def csv_writer(cli_opts):
-    """Prosty 'writer': otwiera plik, dokłada nagłówek jeśli pusty, zwraca funkcję emitującą wiersze."""
-    path = cli_opts["csv"]
-    # Jeśli plik nie istnieje albo pusty → nagłówek
-    need_header = (not os.path.exists(path)) or (os.path.getsize(path) == 0)
-
-    f = open(path, "a", newline="", encoding="utf-8")
+@pytest.fixture(scope="session")
+def golden(request: pytest.FixtureRequest):
+    """Skompilowane powierzchnie G/S_w/S_wg (per cfg, reg_mode) z modelu python/, wspólne dla całej sesji.
+    Płaszczyzny trafiają do cache pytesta (mmap przy kolejnych uruchomieniach); --cache-clear je usuwa."""
+    from golden_surface import GoldenSurfaces, SurfaceCache
+    cache = getattr(request.config, "cache", None)
+    if cache is None:
+        return GoldenSurfaces(model=fuzzy_refmodel)
+    disk = SurfaceCache(str(cache.mkdir("golden_surfaces")), model=fuzzy_refmodel)
+    return GoldenSurfaces(model=fuzzy_refmodel, cache=disk)
 
-    if need_header:
-        f.write(
-            "run_id,source,case_id,idx,reg_mode,dt_mode,"
-            "T_in,dT_in,alpha,k_dt,"
-            "Tneg_a,Tneg_b,Tneg_c,Tneg_d,"
-            "Tzero_a,Tzero_b,Tzero_c,Tzero_d,"
-            "Tpos_a,Tpos_b,Tpos_c,Tpos_d,"
-            "dTneg_a,dTneg_b,dTneg_c,dTneg_d,"
-            "dTzero_a,dTzero_b,dTzero_c,dTzero_d,"
-            "dTpos_a,dTpos_b,dTpos_c,dTpos_d,"
-            "S_w,S_wg,G_exp,G_impl,valid_impl,"
-            "tool_ver,git_rev,seed\n"
-        )
-        f.flush()
+@pytest.fixture(scope="session")
+def result_sink(cli_opts):
+    """Jeden bufor wyników na sesję: CSV dopisywany porcjami, opcjonalnie .npz (--npz) przy zamknięciu."""
+    sink = ResultSink(cli_opts["csv"], cli_opts["npz"] or None,
+                      run_id=cli_opts["run_id"], git_rev=cli_opts["git_rev"],
+                      seed=cli_opts["seed"], append=True)
+    yield sink
+    sink.close()
 
+@pytest.fixture
+def csv_writer(result_sink):
+    """Prosty 'writer': zwraca funkcję emitującą wiersze do wspólnego bufora sesji (bez ponownego otwierania pliku)."""
     def emit(**row):
-        # 'row' podaj po nazwach z nagłówka (albo minimalny podzbiór)
-        fields = [
-            row.get("run_id",""), row.get("source","py"), row.get("case_id",""), row.get("idx",0),
-            row.get("reg_mode",0), row.get("dt_mode",0),
-            row.get("T_in",0), row.get("dT_in",0), row.get("alpha",0), row.get("k_dt",0),
-            row.get("Tneg_a",-128), row.get("Tneg_b",-64), row.get("Tneg_c",-32), row.get("Tneg_d",0),
-            row.get("Tzero_a",-16), row.get("Tzero_b",0), row.get("Tzero_c",0), row.get("Tzero_d",16),
-            row.get("Tpos_a",0), row.get("Tpos_b",32), row.get("Tpos_c",64), row.get("Tpos_d",127),
-            row.get("dTneg_a",-100), row.get("dTneg_b",-50), row.get("dTneg_c",-30), row.get("dTneg_d",-5),
-            row.get("dTzero_a",-10), row.get("dTzero_b",0), row.get("dTzero_c",0), row.get("dTzero_d",10),
-            row.get("dTpos_a",5), row.get("dTpos_b",25), row.get("dTpos_c",35), row.get("dTpos_d",60),
-            row.get("S_w",-1), row.get("S_wg",-1), row.get("G_exp",-1), row.get("G_impl",-1), int(bool(row.get("valid_impl",0))),
-            row.get("tool_ver","pytest"), row.get("git_rev",""), row.get("seed",0),
-        ]
-        line = ",".join(str(x) for x in fields) + "\n"
-        f.write(line)
+        # 'row' podaj po nazwach z nagłówka (albo minimalny podzbiór); brakujące progi = progi TB
+        thr = None
+        if any(k in row for k in CSV_FIELDS[10:34]):
+            thr = [row.get(k, v) for k, v in zip(CSV_FIELDS[10:34], cfg_thresholds(TB_CFG))]
+        run = {k: row[k] for k in ("run_id", "source", "tool_ver", "git_rev", "seed") if k in row}
+        result_sink.add(
+            row.get("case_id", ""), row.get("idx", 0), row.get("reg_mode", 0), row.get("dt_mode", 0),
+            row.get("T_in", 0), row.get("dT_in", 0), TB_CFG,
+            row.get("S_w", -1), row.get("S_wg", -1), row.get("G_exp", -1), row.get("G_impl", -1),
+            bool(row.get("valid_impl", 0)), alpha=row.get("alpha", 0), k_dt=row.get("k_dt", 0),
+            thresholds=thr, **run)
 
     yield emit
-    f.close()
@@ -31,6 +31,13 @@ REG_CTRL   = 0x01  # [3]=INIT(W1P), [0]=START(W1P), [1]=reg_mode(1=9r), [2]=dt_m
 REG_TIN    = 0x02  # T_in (Q7.0, int8)
 REG_DTIN   = 0x03  # dT_in (Q7.0, int8) — używane przy dt_mode=external
 REG_G_OUT  = 0x04  # wynik G (8-bit)
+REG_RESULT = 0x3C  # {fresh, G[6:0]}: fresh ustawiany przez DONE, kasowany po odczycie i przez START
+RES_FRESH  = 0x80
+
+# Bity REG_CTRL
+CTRL_START     = 0b00000001
+CTRL_INIT      = 0b00001000
+CTRL_MODES_INT = 0b00000110  # reg_mode=1 (9 reguł), dt_mode=1 (dT internal)
 
 # ===== Niskopoziomowe prymitywy =====
 def set_addr(a: int):
@@ -99,6 +106,19 @@ def poll_valid(max_ms=1000, step_ms=5) -> bool:
         time.sleep_ms(step_ms)
     return False
 
+def read_result(max_ms=1000) -> int:
+    """
+    Czyta RESULT aż do ustawionego bitu fresh i zwraca G. W przeciwieństwie do
+    STATUS[0] (w final/sv jednocyklowy impuls VALID) fresh trzyma się do odczytu.
+    """
+    t0 = time.ticks_ms()
+    while True:
+        v = read_reg(REG_RESULT)
+        if v & RES_FRESH:
+            return v & 0x7F
+        if time.ticks_diff(time.ticks_ms(), t0) > max_ms:
+            raise RuntimeError("RESULT timeout")
+
 # ===== Scenariusze wykonania =====
 def run_once(T_val: int = 20) -> int:
     """
@@ -125,6 +145,35 @@ def run_once_ext(T_val: int, dT_val: int) -> int:
         raise RuntimeError("VALID timeout")
     return read_reg(REG_G_OUT)
 
+def run_series(T_values, log=True):
+    """
+    Szereg czasowy z wewnętrznym estymatorem dT (dt_mode=1), tak jak pracuje regulator.
+    Tryby + INIT tylko raz (INIT przechwytuje pierwszą próbkę T), potem na próbkę:
+    zapis T_in, START, odczyt RESULT aż do bitu fresh. Bity trybu są wysyłane razem
+    z impulsami START/INIT, bo każdy zapis CTRL nadpisuje reg_mode/dt_mode.
+    Przy log=True drukuje CSV `idx,T,G` do porównania ze śladem EstimatorRTLExact
+    (fuzzy_refmodel.series_trace). Estymator robi jeden krok na START, więc ślad
+    nie zależy od czasów magistrali. Zwraca listę G.
+    """
+    out = []
+    first = True
+    for idx, T_val in enumerate(T_values):
+        write_reg(REG_TIN, T_val & 0xFF)
+        if first:
+            write_reg(REG_CTRL, CTRL_MODES_INT | CTRL_INIT)
+            first = False
+            if log:
+                print("idx,T,G")
+        write_reg(REG_CTRL, CTRL_MODES_INT | CTRL_START)
+        try:
+            g = read_result()
+        except RuntimeError:
+            raise RuntimeError("RESULT timeout @idx=%d" % idx)
+        out.append(g)
+        if log:
+            print("%d,%d,%d" % (idx, T_val, g))
+    return out
+
 # ===== Test/diagnostyka: wiggle, status, siatki =====
 def dump_status():
     try:
@@ -179,26 +228,18 @@ def sweep_csv(t_vals=None, dt_vals=None):
             except Exception as e:
                 print("%d,%d,ERR" % (t, d))
 
-# ===== Batch helpery: wgrywanie listy (addr, val) i weryfikacja =====
+# ===== Batch helper: wgrywanie listy (addr, val) =====
+# Progi, singletony i parametry estymatora są w mmio_if tylko do zapisu (odczyt
+# zwraca 0x00), więc nie ma weryfikacji odczytem: sprawdzenie to wektory golden
+# (final/pico/main.py: profile_apply/spot_check).
 def write_bulk(pairs):
     """pairs = [(addr, val), ...]"""
     for a, v in pairs:
         write_reg(a, v)
 
-def verify_bulk(pairs, raise_on_mismatch=True):
-    ok = True
-    for a, exp in pairs:
-        got = read_reg(a)
-        if got != (exp & 0xFF):
-            print("VERIFY FAIL @0x%02X: got=0x%02X exp=0x%02X" % (a & 0xFF, got, exp & 0xFF))
-            ok = False
-            if raise_on_mismatch:
-                raise RuntimeError("Verify failed")
-    return ok
-
 # ===== Minimalny „interfejs ręczny” przez REPL =====
 def repl_help():
-    print("cmds: wr a v | rd a | go T | goext T dT | init | start | modes_int | modes_ext | status | wiggle | sweep | csv | help")
+    print("cmds: wr a v | rd a | go T | goext T dT | series T0 T1 ... | init | start | modes_int | modes_ext | status | wiggle | sweep | csv | help")
 
 def repl():
     repl_help()
@@ -227,6 +268,8 @@ def repl():
                 dT = int(parts[2], 0)
                 G = run_once_ext(T, dT)
                 print("G =", G)
+            elif cmd == "series" and len(parts) >= 2:
+                run_series([int(x, 0) for x in parts[1:]])
             elif cmd == "init":
                 pulse_init(); print("ok")
             elif cmd == "start":
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+result_sink.py — Batched, columnar sink for the regression CSVs (TB layout, 42 columns).
+
+Rows are buffered column-wise in array.array. Per-run columns (run_id, source,
+alpha, k_dt, the 24 MF thresholds, tool_ver, git_rev, seed) are interned: each row
+only keeps an index into a small run table. The CSV is written in chunks of
+`chunk_rows` lines; optionally the whole session is saved to an .npz file
+(zip of .npy columns + runs.json, readable by numpy.load, written without numpy).
+npz_to_csv() converts it back to the TB CSV layout.
+
+    python result_sink.py run.npz out.csv
+"""
+
+import ast
+import json
+import os
+import sys
+import zipfile
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CSV_FIELDS = [
+    "run_id","source","case_id","idx","reg_mode","dt_mode",
+    "T_in","dT_in","alpha","k_dt",
+    "Tneg_a","Tneg_b","Tneg_c","Tneg_d",
+    "Tzero_a","Tzero_b","Tzero_c","Tzero_d",
+    "Tpos_a","Tpos_b","Tpos_c","Tpos_d",
+    "dTneg_a","dTneg_b","dTneg_c","dTneg_d",
+    "dTzero_a","dTzero_b","dTzero_c","dTzero_d",
+    "dTpos_a","dTpos_b","dTpos_c","dTpos_d",
+    "S_w","S_wg","G_exp","G_impl","valid_impl",
+    "tool_ver","git_rev","seed"
+]
+CSV_HEADER = ",".join(CSV_FIELDS) + "\n"
+
+# Kolumny per wiersz: nazwa -> typ array / descr .npy
+ROW_COLUMNS = [
+    ("run", "H", "<u2"), ("case", "H", "<u2"), ("idx", "i", "<i4"),
+    ("reg_mode", "B", "|u1"), ("dt_mode", "B", "|u1"),
+    ("T_in", "h", "<i2"), ("dT_in", "h", "<i2"),
+    ("S_w", "i", "<i4"), ("S_wg", "i", "<i4"), ("G_exp", "i", "<i4"), ("G_impl", "i", "<i4"),
+    ("valid_impl", "B", "|u1"),
+]
+RUN_FIELDS = ["run_id", "source", "alpha", "k_dt"] + CSV_FIELDS[10:34] + ["tool_ver", "git_rev", "seed"]
+
+EMPTY = -(1 << 31)                     # pusta komórka CSV ("") w kolumnach S_w/S_wg/G_exp/G_impl
+
+def cfg_thresholds(cfg) -> Tuple[int, ...]:
+    """24 MF thresholds in CSV column order (T neg/zero/pos, then dT)."""
+    return tuple(getattr(getattr(mf, s), k)
+                 for mf in (cfg.mf_T, cfg.mf_dT)
+                 for s in ("neg", "zero", "pos")
+                 for k in "abcd")
+
+def _cell(v) -> str:
+    return "" if v == EMPTY else str(v)
+
+def _opt(v) -> int:
+    return EMPTY if v == "" or v is None else int(v)
+
+# -------------------- Sink --------------------
+
+class ResultSink:
+    """Session-level result buffer; CSV (TB layout) in chunks and an optional .npz at close()."""
+
+    def __init__(self, csv_path: Optional[str] = None, npz_path: Optional[str] = None,
+                 run_id: str = "py_run", source: str = "py", tool_ver: str = "pytest",
+                 git_rev: str = "", seed: int = 0, append: bool = False,
+                 chunk_rows: int = 8192):
+        self.defaults = {"run_id": run_id, "source": source, "tool_ver": tool_ver,
+                         "git_rev": git_rev, "seed": seed}
+        self.npz_path = npz_path
+        self.chunk_rows = chunk_rows
+        self.cols: Dict[str, array] = {name: array(tc) for name, tc, _ in ROW_COLUMNS}
+        self.runs: List[tuple] = []
+        self._run_ix: Dict[tuple, int] = {}
+        self._run_txt: List[Tuple[str, str, str]] = []
+        self._fast: Dict[tuple, tuple] = {}
+        self.cases: List[str] = []
+        self._case_ix: Dict[str, int] = {}
+        self._written = 0
+        self._fd = None
+        if csv_path:
+            need_header = not append or not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self._fd = open(csv_path, "a" if append else "w", newline="", encoding="utf-8")
+            if need_header:
+                self._fd.write(CSV_HEADER)
+
+    def __len__(self) -> int:
+        return len(self.cols["idx"])
+
+    def _run(self, key: tuple) -> int:
+        i = self._run_ix.get(key)
+        if i is None:
+            i = self._run_ix[key] = len(self.runs)
+            self.runs.append(key)
+            run_id, source, alpha, k_dt = key[:4]
+            thr = ",".join(str(v) for v in key[4:28])
+            tool_ver, git_rev, seed = key[28:]
+            # stałe fragmenty wiersza CSV, liczone raz na run
+            self._run_txt.append(("%s,%s," % (run_id, source),
+                                  "%s,%s,%s," % (alpha, k_dt, thr),
+                                  "%s,%s,%s" % (tool_ver, git_rev, seed)))
+        return i
+
+    def add(self, case_id: str, idx: int, reg_mode: int, dt_mode: int, T_in: int, dT_in: int,
+            cfg, S_w=EMPTY, S_wg=EMPTY, G_exp=EMPTY, G_impl=EMPTY, valid_impl=True,
+            alpha: int = 32, k_dt: int = 3, thresholds: Optional[Sequence[int]] = None, **run):
+        """
+        One result row; `run` overrides run_id/source/tool_ver/git_rev/seed of this row.
+        A cfg object is assumed not to change while the sink is open (its thresholds are cached).
+        """
+        # szybka ścieżka: ten sam obiekt cfg i te same parametry runu co wcześniej
+        fast = (id(cfg), alpha, k_dt, tuple(run.items())) if thresholds is None else None
+        hit = self._fast.get(fast) if fast is not None else None
+        if hit is None:
+            d = self.defaults
+            thr = tuple(thresholds) if thresholds is not None else cfg_thresholds(cfg)
+            key = ((run.get("run_id", d["run_id"]), run.get("source", d["source"]), alpha, k_dt)
+                   + thr + (run.get("tool_ver", d["tool_ver"]), run.get("git_rev", d["git_rev"]),
+                            run.get("seed", d["seed"])))
+            hit = (self._run(key), cfg)     # cfg trzymany, żeby id() nie został użyty ponownie
+            if fast is not None:
+                self._fast[fast] = hit
+        c = self.cols
+        c["run"].append(hit[0])
+        ci = self._case_ix.get(case_id)
+        if ci is None:
+            ci = self._case_ix[case_id] = len(self.cases)
+            self.cases.append(case_id)
+        c["case"].append(ci)
+        c["idx"].append(idx)
+        c["reg_mode"].append(reg_mode)
+        c["dt_mode"].append(dt_mode)
+        c["T_in"].append(T_in)
+        c["dT_in"].append(dT_in)
+        c["S_w"].append(_opt(S_w))
+        c["S_wg"].append(_opt(S_wg))
+        c["G_exp"].append(_opt(G_exp))
+        c["G_impl"].append(_opt(G_impl))
+        c["valid_impl"].append(1 if valid_impl else 0)
+        if self._fd is not None and len(c["idx"]) - self._written >= self.chunk_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the rows buffered since the last flush as one CSV chunk."""
+        if self._fd is None:
+            return
+        n = len(self)
+        if n > self._written:
+            self._fd.write(csv_lines(self.cols, self._run_txt, self.cases, self._written, n))
+            self._written = n
+        self._fd.flush()
+
+    def close(self) -> None:
+        self.flush()
+        if self._fd is not None:
+            self._fd.close()
+            self._fd = None
+        if self.npz_path:
+            write_npz(self.npz_path, self.cols, self.runs, self.cases)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def csv_lines(cols: Dict[str, Sequence[int]], run_txt: Sequence[Tuple[str, str, str]],
+              cases: Sequence[str], lo: int, hi: int) -> str:
+    """Rows lo..hi-1 as TB CSV lines."""
+    out = []
+    rows = zip(cols["run"][lo:hi], cols["case"][lo:hi], cols["idx"][lo:hi],
+               cols["reg_mode"][lo:hi], cols["dt_mode"][lo:hi], cols["T_in"][lo:hi],
+               cols["dT_in"][lo:hi], cols["S_w"][lo:hi], cols["S_wg"][lo:hi],
+               cols["G_exp"][lo:hi], cols["G_impl"][lo:hi], cols["valid_impl"][lo:hi])
+    for r, cs, idx, rm, dt, T, dT, sw, swg, ge, gi, v in rows:
+        head, mid, tail = run_txt[r]
+        out.append("%s%s,%d,%d,%d,%d,%d,%s%s,%s,%s,%s,%d,%s\n" % (
+            head, cases[cs], idx, rm, dt, T, dT, mid,
+            _cell(sw), _cell(swg), _cell(ge), _cell(gi), v, tail))
+    return "".join(out)
+
+# -------------------- .npz (bez numpy) --------------------
+
+def _npy_bytes(descr: str, data: array) -> bytes:
+    hdr = "{'descr': '%s', 'fortran_order': False, 'shape': (%d,), }" % (descr, len(data))
+    pad = 64 - (10 + len(hdr) + 1) % 64
+    hdr = hdr + " " * pad + "\n"
+    body = data
+    if sys.byteorder == "big" and data.itemsize > 1:
+        body = array(data.typecode, data)
+        body.byteswap()
+    return b"\x93NUMPY\x01\x00" + len(hdr).to_bytes(2, "little") + hdr.encode("latin1") + body.tobytes()
+
+def _npy_array(raw: bytes, typecode: str) -> array:
+    hlen = int.from_bytes(raw[8:10], "little")
+    hdr = ast.literal_eval(raw[10:10 + hlen].decode("latin1"))
+    a = array(typecode)
+    a.frombytes(raw[10 + hlen:])
+    if sys.byteorder == "big" and a.itemsize > 1:
+        a.byteswap()
+    if len(a) != hdr["shape"][0]:
+        raise ValueError("npy: shape %r, got %d items" % (hdr["shape"], len(a)))
+    return a
+
+def write_npz(path: str, cols: Dict[str, array], runs: Sequence[tuple], cases: Sequence[str]) -> None:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        for name, _, descr in ROW_COLUMNS:
+            z.writestr(name + ".npy", _npy_bytes(descr, cols[name]))
+        meta = {"format": 1, "csv_fields": CSV_FIELDS, "run_fields": RUN_FIELDS,
+                "runs": [list(r) for r in runs], "cases": list(cases), "empty": EMPTY}
+        z.writestr("runs.json", json.dumps(meta, separators=(",", ":")))
+
+def read_npz(path: str) -> Tuple[Dict[str, array], List[tuple], List[str]]:
+    """(row columns, run table, case_id table) of a file written by ResultSink."""
+    with zipfile.ZipFile(path) as z:
+        meta = json.loads(z.read("runs.json"))
+        if meta.get("format") != 1:
+            raise ValueError("%s: unknown result format %r" % (path, meta.get("format")))
+        cols = {name: _npy_array(z.read(name + ".npy"), tc) for name, tc, _ in ROW_COLUMNS}
+    return cols, [tuple(r) for r in meta["runs"]], meta["cases"]
+
+def npz_to_csv(npz_path: str, csv_path: str) -> int:
+    """Convert a ResultSink .npz back to the TB CSV layout; returns the row count."""
+    cols, runs, cases = read_npz(npz_path)
+    sink = ResultSink(csv_path)
+    for key in runs:
+        sink._run(key)
+    sink.cols, sink.cases = cols, cases
+    n = len(sink)
+    sink.close()
+    return n
+
+def main(argv: List[str] = None) -> int:
+    import argparse
+    p = argparse.ArgumentParser("Convert a result .npz back to the TB CSV layout")
+    p.add_argument("npz")
+    p.add_argument("csv")
+    args = p.parse_args(argv)
+    n = npz_to_csv(args.npz, args.csv)
+    print("%s: %d rows" % (args.csv, n))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ from fuzzy_refmodel import (
     g2q15_percent, mul_q15_round, trapezoid_mu, rules9_min, aggregate, defuzz,
     top_step, EstimatorRTLExact, SimpleDtEstimator, fuzzify,
 )
+from result_sink import ResultSink
 
 # ================== Konfiguracja równoważna TB ==================
 
@@ -44,53 +45,20 @@ KDT_CONST   = 3   # jak w TB (KDT_P)
 
 # ================== CSV helpers (format jak w TB) ==================
 
-def _csv_open():
-    csv_path = os.environ.get("CSV", "out/results_tb.csv")
-    try:
-        pathlib.Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
-    except Exception:
-        pass
-    fd = open(csv_path, "w", encoding="utf-8")
-    return fd, csv_path
-
-
-def _csv_header(fd):
-    hdr = (
-        "run_id,source,case_id,idx,reg_mode,dt_mode," \
-        "T_in,dT_in,alpha,k_dt," \
-        "Tneg_a,Tneg_b,Tneg_c,Tneg_d," \
-        "Tzero_a,Tzero_b,Tzero_c,Tzero_d," \
-        "Tpos_a,Tpos_b,Tpos_c,Tpos_d," \
-        "dTneg_a,dTneg_b,dTneg_c,dTneg_d," \
-        "dTzero_a,dTzero_b,dTzero_c,dTzero_d," \
-        "dTpos_a,dTpos_b,dTpos_c,dTpos_d," \
-        "S_w,S_wg,G_exp,G_impl,valid_impl," \
-        "tool_ver,git_rev,seed"
-    )
-    fd.write(hdr + "\n")
-
-
-def _csv_emit(fd, run_id, source, case_id, idx, reg_mode, dt_mode,
+def _csv_emit(sink: ResultSink, run_id, source, case_id, idx, reg_mode, dt_mode,
               T_in, dT_in, alpha, k_dt,
               cfg: CoprocessorCfg,
               Sw, Swg, Gexp, Gimpl, valid_impl,
               tool_ver, git_rev, seed_meta):
-    line = (
-        f"{run_id},{source},{case_id},{idx},{reg_mode},{dt_mode},"
-        f"{T_in},{dT_in},{alpha},{k_dt},"
-        f"{cfg.mf_T.neg.a},{cfg.mf_T.neg.b},{cfg.mf_T.neg.c},{cfg.mf_T.neg.d},"
-        f"{cfg.mf_T.zero.a},{cfg.mf_T.zero.b},{cfg.mf_T.zero.c},{cfg.mf_T.zero.d},"
-        f"{cfg.mf_T.pos.a},{cfg.mf_T.pos.b},{cfg.mf_T.pos.c},{cfg.mf_T.pos.d},"
-        f"{cfg.mf_dT.neg.a},{cfg.mf_dT.neg.b},{cfg.mf_dT.neg.c},{cfg.mf_dT.neg.d},"
-        f"{cfg.mf_dT.zero.a},{cfg.mf_dT.zero.b},{cfg.mf_dT.zero.c},{cfg.mf_dT.zero.d},"
-        f"{cfg.mf_dT.pos.a},{cfg.mf_dT.pos.b},{cfg.mf_dT.pos.c},{cfg.mf_dT.pos.d},"
-        f"{Sw},{Swg},{Gexp},{Gimpl},{1 if valid_impl else 0},"
-        f"{tool_ver},{git_rev},{seed_meta}"
-    )
-    fd.write(line + "\n")
+    # wiersz trafia do kolumnowego bufora; progi/alpha/k_dt/meta są trzymane raz na run
+    sink.add(case_id, idx, reg_mode, dt_mode, T_in, dT_in, cfg,
+             Sw, Swg, Gexp, Gimpl, valid_impl, alpha=alpha, k_dt=k_dt,
+             run_id=run_id, source=source, tool_ver=tool_ver, git_rev=git_rev, seed=seed_meta)
 
 
 # ================== Pomocnicze: bit-accurate ścieżka jak w TB ==================
+# Niezależna ścieżka golden; fixture `golden` (conftest.py) jest z nią porównywany
+# w test_golden_surface_cross_check.
 
 def _fuzzify_TD(T: int, dT: int, cfg: CoprocessorCfg):
     muT = fuzzify(T, cfg.mf_T)
@@ -130,14 +98,12 @@ SEED_META = int(_env("SEED", "0") or 0)
 
 @pytest.fixture(scope="module")
 def csv_file():
-    fd, path = _csv_open()
-    _csv_header(fd)
-    yield fd
-    try:
-        fd.flush()
-        fd.close()
-    except Exception:
-        pass
+    # CSV jak w TB (env CSV), opcjonalnie kolumnowy .npz (env NPZ)
+    csv_path = os.environ.get("CSV", "out/results_tb.csv")
+    pathlib.Path(csv_path).parent.mkdir(parents=True, exist_ok=True)
+    sink = ResultSink(csv_path, os.environ.get("NPZ") or None)
+    yield sink
+    sink.close()
 
 
 def _grid_T_values():
@@ -150,16 +116,15 @@ def _grid_dT_values():
 
 # ---- Block 1: DT_MODE=0, GRID + edge case (REQ-010/020/030/040/050/210) ----
 @pytest.mark.parametrize("reg_mode", [0, 1])
-def test_grid_dt_mode0(csv_file, reg_mode):
+def test_grid_dt_mode0(csv_file, golden, reg_mode):
     if SEED_META:
         random.seed(SEED_META)
     idx = 0
+    srf = golden.surface(CFG_TB, reg_mode)
 
     for T in _grid_T_values():
         for dT in _grid_dT_values():
-            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-            w = _weights_q15(muT, muD)
-            Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+            Sw, Swg, Gexp = srf.point(T, dT)
 
             Gimpl, dbg = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
 
@@ -180,12 +145,10 @@ def test_grid_dt_mode0(csv_file, reg_mode):
 
 
 # Edge: sum_w ≈ 0 → G=0
-def test_edge_sumw_zero_dt_mode0(csv_file):
+def test_edge_sumw_zero_dt_mode0(csv_file, golden):
     reg_mode = 1
     T, dT = -128, 127
-    muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-    w = _weights_q15(muT, muD)
-    Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+    Sw, Swg, Gexp = golden.point(CFG_TB, reg_mode, T, dT)
     Gimpl, dbg = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
     assert Gexp == 0
     assert Gimpl == Gexp
@@ -202,19 +165,18 @@ def test_edge_sumw_zero_dt_mode0(csv_file):
 
 # ---- Block 2: DT_MODE=0, losowe MAE (REQ-310 <= 1%) ----
 
-def test_random_mae_dt_mode0(csv_file):
+def test_random_mae_dt_mode0(csv_file, golden):
     N = 1000
     reg_mode = 1
     mae_acc = 0
     idx = 0
+    srf = golden.surface(CFG_TB, reg_mode)
     if SEED_META:
         random.seed(SEED_META)
     for _ in range(N):
         T = random.randint(-128, 127)
         dT = random.randint(-128, 127)
-        muT, muD = _fuzzify_TD(T, dT, CFG_TB)
-        w = _weights_q15(muT, muD)
-        Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
+        Sw, Swg, Gexp = srf.point(T, dT)
         Gimpl, dbg = top_step(T, dT, CFG_TB, reg_mode, dt_mode=0, estimator=None)
 
         diff = abs(Gimpl - Gexp)
@@ -237,14 +199,20 @@ def test_random_mae_dt_mode0(csv_file):
 
 # ---- Block 3: DT_MODE=1, scenariusze estymatora (REQ-060/061/062/230/320) ----
 
-def _golden_at_dT0(T: int, reg_mode: int):
-    muT, muD0 = _fuzzify_TD(T, 0, CFG_TB)
-    w = _weights_q15(muT, muD0)
-    Sw, Swg, Gexp = _agg_and_defuzz(reg_mode, w, CFG_TB.singletons)
-    return Gexp
+def test_golden_surface_cross_check(golden):
+    # Niezależna ścieżka (fuzzify -> rules9_min -> aggregate -> defuzz) vs skompilowane powierzchnie
+    rnd = random.Random(1)
+    grid = [(T, dT) for T in _grid_T_values() for dT in _grid_dT_values()]
+    pts = grid + [(rnd.randint(-128, 127), rnd.randint(-128, 127)) for _ in range(1000)]
+    for reg_mode, vecs in ((0, grid), (1, pts)):
+        srf = golden.surface(CFG_TB, reg_mode)
+        for T, dT in vecs:
+            muT, muD = _fuzzify_TD(T, dT, CFG_TB)
+            w = _weights_q15(muT, muD)
+            assert srf.point(T, dT) == _agg_and_defuzz(reg_mode, w, CFG_TB.singletons), (reg_mode, T, dT)
 
 
-def test_estimator_flow_dt_mode1(csv_file):
+def test_estimator_flow_dt_mode1(csv_file, golden):
     reg_mode = 1
     dt_mode = 1
 
@@ -253,7 +221,7 @@ def test_estimator_flow_dt_mode1(csv_file):
 
     # INIT: oczekujemy zgodności z dT=0 dla T=0
     T = 0
-    Gexp_init = _golden_at_dT0(T, reg_mode)
+    Gexp_init = golden.g(CFG_TB, reg_mode, T, 0)
     Gimpl, dbg = top_step(T, 0, CFG_TB, reg_mode, dt_mode, est)
     _csv_emit(csv_file, RUN_ID, SOURCE_ID, "EST_INIT", 0,
               reg_mode, dt_mode, T, 0, ALPHA_CONST, KDT_CONST,
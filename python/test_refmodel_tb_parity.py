@@ -39,12 +39,19 @@ DT_MF = MfSet3(
 )
 
 # Domyślna konfiguracja koprocesora zgodna z TB (zastępuje DEFAULT_CFG, jeśli chcesz mieć twardy match)
-TB_CFG = CoprocessorCfg(T=T_MF, dT=DT_MF, singletons=TB_SINGLETONS)
+TB_CFG = CoprocessorCfg(mf_T=T_MF, mf_dT=DT_MF, singletons=TB_SINGLETONS)
 
 # Stałe estymatora z komentarza TB (informacyjnie)
 ALPHA_CONST = 32  # ALPHA_P
 KDT_CONST   = 3   # KDT_P
 
+# Singletony w kolejności aggregate() (g00..g22)
+TB_G = (
+    TB_SINGLETONS.g00, TB_SINGLETONS.g01, TB_SINGLETONS.g02,
+    TB_SINGLETONS.g10, TB_SINGLETONS.g11, TB_SINGLETONS.g12,
+    TB_SINGLETONS.g20, TB_SINGLETONS.g21, TB_SINGLETONS.g22,
+)
+
 # GRID wektorów jak w TB
 TS  = [-128, -64, -32, -16, 0, 16, 32, 64, 96, 127]
 DTS = [-60, -30, -10, 0, 10, 30, 60]
@@ -83,10 +90,10 @@ def test_req210_percent_q15_and_round_mul():
 def test_req040_050_aggregate_and_defuzz():
     # wymuszenie saturacji jak w TB teście myślowym
     w = (20000,)*9
-    S_w0, S_wg0 = aggregate(0, w, TB_SINGLETONS.as_tuple())
+    S_w0, S_wg0 = aggregate(0, w, TB_G)
     assert S_w0 == Q15_MAX
     assert 0 <= S_wg0 <= Q15_MAX
-    S_w1, S_wg1 = aggregate(1, w, TB_SINGLETONS.as_tuple())
+    S_w1, S_wg1 = aggregate(1, w, TB_G)
     assert S_w1  == Q15_MAX
     assert S_wg1 == Q15_MAX
 
@@ -117,22 +124,22 @@ def test_req010_030_040_050_e2e_dt0(reg_mode, T, dT, expG):
 
 # ---------- REQ-310: MAE ≤ 1% dla ≥1000 losowych (dt_mode=0, reg_mode=1) ----------
 
-def test_req310_mae_random_dt0():
+def test_req310_mae_random_dt0(golden):
     N = 1000
     mae_acc = 0
     reg_mode = 1
+    srf = golden.surface(TB_CFG, reg_mode)
     random.seed(0xC0FFEE)
     for _ in range(N):
         T  = random.randint(-128,127)
         dT = random.randint(-128,127)
         G, dbg = top_step(T, dT, TB_CFG, reg_mode, dt_mode=0, estimator=None)
-        # Gexp implicit w refmodelu — top_step zwraca już wynik ref
-        # Jeśli chcesz policzyć „impl vs golden”, podmień zgodnie z API.
+        # golden = skompilowana powierzchnia (fixture z conftest.py)
         assert 0 <= G <= 100
         assert 0 <= dbg["S_w"]  <= Q15_MAX
         assert 0 <= dbg["S_wg"] <= Q15_MAX
-        # w ref-modelu MAE=0; tu zostawiamy strukturę testu pod ewentualne warianty
-        mae_acc += 0
+        assert (dbg["S_w"], dbg["S_wg"], G) == srf.point(T, dT)
+        mae_acc += abs(G - srf.g(T, dT))
     mae = mae_acc // N
     assert mae <= 1
 
@@ -201,14 +208,15 @@ def test_req320_e2e_estimator_sequences():
 # ---------- GRID: pełna zgodność z TB (dt_mode=0) ----------
 
 @pytest.mark.parametrize("reg_mode", [0,1])
-def test_grid_full_match_tb_vector_set(reg_mode):
+def test_grid_full_match_tb_vector_set(golden, reg_mode):
+    srf = golden.surface(TB_CFG, reg_mode)
     for T in TS:
         for dT in DTS:
             G, dbg = top_step(T, dT, TB_CFG, reg_mode, dt_mode=0, estimator=None)
-            # W ref-modelu „golden” = wynik modelu; sprawdzamy tylko zakresy i że nie ma wycieków
             assert 0 <= G <= 100
             assert 0 <= dbg["S_w"]  <= Q15_MAX
             assert 0 <= dbg["S_wg"] <= Q15_MAX
+            assert (dbg["S_w"], dbg["S_wg"], G) == srf.point(T, dT)
 
 # ---------- Opcjonalny parity check z CSV wyplutym przez TB ----------
 
@@ -0,0 +1,40 @@
+# test_result_sink.py — kolumnowy bufor wyników: CSV porcjami, .npz i konwersja z powrotem do CSV TB
+
+import zipfile
+
+from fuzzy_refmodel import DEFAULT_CFG, top_step
+from result_sink import CSV_HEADER, ResultSink, npz_to_csv, read_npz
+from test_refmodel import CFG_TB
+
+def _fill(sink):
+    for i, (cfg, T, dT) in enumerate([(CFG_TB, -64, -10), (DEFAULT_CFG, 0, 0), (CFG_TB, 127, 60)]):
+        G, dbg = top_step(T, dT, cfg, 1)
+        sink.add(f"Grid_T={T}_dT={dT}", i, 1, 0, T, dT, cfg, dbg["S_w"], dbg["S_wg"], G, G)
+    sink.add("EST_INIT", 0, 1, 1, 0, 0, CFG_TB, "", "", "", 50, seed=7)
+
+def test_csv_chunks_match_row_layout(tmp_path):
+    path = tmp_path / "r.csv"
+    with ResultSink(str(path), run_id="r1", chunk_rows=3) as sink:
+        _fill(sink)
+        assert path.read_text().count("\n") == 1 + 3     # header + first chunk
+    lines = path.read_text().splitlines()
+    assert lines[0] + "\n" == CSV_HEADER and len(lines) == 5
+    assert lines[1] == ("r1,py,Grid_T=-64_dT=-10,0,1,0,-64,-10,32,3,"
+                        "-128,-64,-32,0,-16,0,0,16,0,32,64,127,-100,-50,-30,-5,-10,0,0,10,5,25,35,60,"
+                        "6553,6553,100,100,1,pytest,,0")
+    assert lines[4].endswith(",1,0,0,32,3,-128,-64,-32,0,-16,0,0,16,0,32,64,127,"
+                             "-100,-50,-30,-5,-10,0,0,10,5,25,35,60,,,,50,1,pytest,,7")
+
+def test_npz_stores_config_once_and_converts_back(tmp_path):
+    csv_path, npz_path = tmp_path / "r.csv", tmp_path / "r.npz"
+    with ResultSink(str(csv_path), str(npz_path)) as sink:
+        _fill(sink)
+    cols, runs, cases = read_npz(str(npz_path))
+    assert len(runs) == 3 and list(cols["run"]) == [0, 1, 0, 2]   # CFG_TB, DEFAULT_CFG, CFG_TB+seed
+    assert len(cases) == 4 and list(cols["G_impl"])[:3] == [100, 50, 0]
+    with zipfile.ZipFile(str(npz_path)) as z:
+        raw = z.read("T_in.npy")
+    assert raw[:8] == b"\x93NUMPY\x01\x00" and (10 + int.from_bytes(raw[8:10], "little")) % 64 == 0
+    back = tmp_path / "back.csv"
+    assert npz_to_csv(str(npz_path), str(back)) == 4
+    assert back.read_bytes() == csv_path.read_bytes()